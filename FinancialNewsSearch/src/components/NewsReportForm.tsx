@@ -88,7 +88,7 @@ const NewsReportForm: React.FC = () => {
       console.log("✅ 完整回應資料:", data);
       setTaskId(data.task_id);
       setStatus("running");
-      console.log("🔄 已設定 taskId，useEffect 應該會開始輪詢");
+      console.log("🔄 已設定 taskId，useEffect 應該會開始追蹤進度");
     } catch (error: unknown) {
       console.error("❌ 建立任務失敗:", error);
       setErrorMessage(
@@ -101,57 +101,88 @@ const NewsReportForm: React.FC = () => {
   useEffect(() => {
     if (!taskId) return;
 
-    console.log("🔄 開始輪詢任務進度，Task ID:", taskId);
+    let eventSource: EventSource | null = null;
+    let interval: ReturnType<typeof setInterval> | null = null;
 
-    const interval = setInterval(async () => {
-      try {
-        const res = await fetch(`${BASE_URL}/${taskId}`);
-        if (!res.ok) throw new Error("查詢任務失敗");
-        
-        const data: TaskProgress = await res.json();
-        console.log("📊 後端回傳的進度資料:", JSON.stringify(data, null, 2));
-        
-        setProgress(data);
+    const stop = () => {
+      eventSource?.close();
+      eventSource = null;
+      if (interval) clearInterval(interval);
+      interval = null;
+    };
 
-        // ✅ 成功狀態
-        if (data.status === "succeeded") {
-          console.log("✅ 任務成功完成");
-          clearInterval(interval);
-          setStatus("idle");
-          setSuccessMessage(
-            `🎉 所有步驟完成！報告已發送至: ${
-              data.artifacts?.email_sent_to || userEmail
-            }`
-          );
-          setTaskId(null);
-          setProgress(null);
-        } 
-        // ❌ 失敗狀態（顯示實際錯誤）
-        else if (data.status === "failed") {
-          console.log("❌ 任務失敗:", data.error);
-          clearInterval(interval);
-          setStatus("idle");
-          setErrorMessage(data.error || "任務執行失敗，請稍後再試");
-          setTaskId(null);
-          setProgress(null);
-        }
-        // ℹ️ 其他狀態（pending、running 等）繼續輪詢
-        else {
-          console.log(`ℹ️ 任務進行中 - 狀態: ${data.status}, 進度: ${data.progress}%, 步驟: ${data.current_step}`);
-        }
-      } catch (err) {
-        console.error("❌ 查詢任務時發生錯誤:", err);
-        clearInterval(interval);
+    const handleProgress = (data: TaskProgress) => {
+      setProgress(data);
+
+      // ✅ 成功狀態
+      if (data.status === "succeeded") {
+        console.log("✅ 任務成功完成");
+        stop();
+        setStatus("idle");
+        setSuccessMessage(
+          `🎉 所有步驟完成！報告已發送至: ${
+            data.artifacts?.email_sent_to || userEmail
+          }`
+        );
+        setTaskId(null);
+        setProgress(null);
+      } 
+      // ❌ 失敗狀態（顯示實際錯誤）
+      else if (data.status === "failed") {
+        console.log("❌ 任務失敗:", data.error);
+        stop();
         setStatus("idle");
-        setErrorMessage("無法連接到伺服器，請檢查後端是否啟動");
+        setErrorMessage(data.error || "任務執行失敗，請稍後再試");
         setTaskId(null);
         setProgress(null);
       }
-    }, 2000);
+      // ℹ️ 其他狀態（queued、running 等）繼續等待
+      else {
+        console.log(`ℹ️ 任務進行中 - 狀態: ${data.status}, 進度: ${data.progress}%, 步驟: ${data.current_step}`);
+      }
+    };
+
+    // 備援：瀏覽器或代理伺服器不支援 SSE 時每 2 秒輪詢
+    const startPolling = () => {
+      console.log("🔄 開始輪詢任務進度，Task ID:", taskId);
+      stop();
+      interval = setInterval(async () => {
+        try {
+          const res = await fetch(`${BASE_URL}/${taskId}`);
+          if (!res.ok) throw new Error("查詢任務失敗");
+          handleProgress(await res.json());
+        } catch (err) {
+          console.error("❌ 查詢任務時發生錯誤:", err);
+          stop();
+          setStatus("idle");
+          setErrorMessage("無法連接到伺服器，請檢查後端是否啟動");
+          setTaskId(null);
+          setProgress(null);
+        }
+      }, 2000);
+    };
+
+    if (typeof EventSource === "undefined") {
+      startPolling();
+    } else {
+      // 伺服器推送進度；斷線時 EventSource 自動帶 Last-Event-ID 重連
+      console.log("📡 訂閱任務進度（SSE），Task ID:", taskId);
+      let received = false;
+      eventSource = new EventSource(`${BASE_URL}/${taskId}/events`);
+      eventSource.addEventListener("progress", (event) => {
+        received = true;
+        handleProgress(JSON.parse((event as MessageEvent).data));
+      });
+      eventSource.addEventListener("end", stop);
+      eventSource.onerror = () => {
+        // 從未收到事件時改用輪詢，否則交給 EventSource 重連
+        if (!received) startPolling();
+      };
+    }
 
     return () => {
-      console.log("🛑 停止輪詢");
-      clearInterval(interval);
+      console.log("🛑 停止追蹤任務進度");
+      stop();
     };
   }, [taskId, userEmail]);
 
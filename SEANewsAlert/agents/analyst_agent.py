@@ -5,22 +5,45 @@ Analyst Agent
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from config import Config
-from typing import Dict, Any, List, Tuple
+from utils.openai_client import openai_chat_client_kwargs
+from utils.progress_reporter import ProgressReporter
+from utils.entity_tagger import country_tagger
+from utils.markdown_extract import extract_news
+from utils.news_model import NewsBatch, NewsItem
+from utils.report_template import STRUCTURED_SCHEMA, StructuredReport, parse_structured_report, render_report_markdown
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from datetime import datetime
 import json
 import re
+import time
 
 
 class AnalystAgent:
     """分析代理 - 將原始搜尋結果整理成結構化報告"""
     
-    def __init__(self):
-        """初始化 Analyst Agent"""
+    OUTPUT_MODES = ("markdown", "json", "chunked")
+    
+    def __init__(self, output_mode: str = None):
+        """
+        初始化 Analyst Agent
+        
+        Args:
+            output_mode: 'markdown'（模型撰寫整份報告）、'json'（模型只輸出結構化 JSON，報告由本機範本產生）
+                         或 'chunked'（分批平行整理新聞，再以一次簡短呼叫撰寫市場洞察），
+                         預設使用 Config.ANALYST_OUTPUT_MODE
+        """
+        self.output_mode = (output_mode or Config.ANALYST_OUTPUT_MODE).lower()
+        if self.output_mode not in self.OUTPUT_MODES:
+            raise ValueError(f"不支援的分析輸出模式: {self.output_mode}（可用: {', '.join(self.OUTPUT_MODES)}）")
+        self._structured_agent = None
+        self.country_tagger = country_tagger
         self.agent = Agent(
             name="金融新聞分析師",
             model=OpenAIChat(
                 id=Config.OPENAI_MODEL,
                 api_key=Config.OPENAI_API_KEY,
+                **openai_chat_client_kwargs(),
                 # max_tokens=4096,  # 增加輸出 token 限制，允許更詳細的報告
             ),
             description="專業的金融新聞分析師，擅長整理和結構化資訊",
@@ -31,6 +54,7 @@ class AnalystAgent:
                 "使用 Markdown 格式輸出",
                 "每條新聞都要附上來源超連結",
                 "去除重複和冗餘資訊",
+                "帶有 previously_reported 的新聞已出現在近期報告中，只在有新進展時收錄並註明為後續報導",
                 "按照重要性和時間順序排列",
                 "使用專業但易懂的語言",
                 "提供詳細且深入的分析，不要過於簡短",
@@ -40,15 +64,19 @@ class AnalystAgent:
             markdown=True,
         )
     
-    def analyze(self, search_results: Dict[str, Any]) -> Tuple[str, List[Dict[str, str]]]:
+    def analyze(self, search_results: Dict[str, Any], progress: Optional[ProgressReporter] = None,
+                on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[str, NewsBatch]:
         """
         分析並結構化搜尋結果
         
         Args:
             search_results: 來自 Research Agent 的搜尋結果
+            progress: 可選的合併式進度回報器（逐則回報擷取進度）
+            on_chunk: 可選的回呼函數，chunked 模式每完成一次模型呼叫（各批次與最後的洞察）就呼叫，
+                      參數為該次呼叫的耗時與 token 統計
             
         Returns:
-            Tuple[str, List[Dict]]: (Markdown 格式的報告, 結構化新聞列表)
+            Tuple[str, NewsBatch]: (Markdown 格式的報告, 結構化新聞批次)
         """
         print("📊 Analyst Agent 開始分析...")
         
@@ -56,6 +84,26 @@ class AnalystAgent:
         content = search_results.get("content", "")
         query = search_results.get("query", "")
         
+        if self.output_mode == "chunked":
+            items = self._search_items(search_results)
+            if len(items) > Config.ANALYST_CHUNK_SIZE:
+                try:
+                    return self._analyze_chunked(items, query, progress, on_chunk)
+                except Exception as e:
+                    print(f"❌ Analyst Agent 分析失敗: {str(e)}")
+                    return self._error_report(e, query), NewsBatch()
+        
+        if self.output_mode in ("json", "chunked"):
+            # chunked 模式下新聞數不超過一批（或無法取得逐則結果）時，一次呼叫即可
+            try:
+                result = self._analyze_structured(content, query, progress)
+            except Exception as e:
+                print(f"❌ Analyst Agent 分析失敗: {str(e)}")
+                return self._error_report(e, query), NewsBatch()
+            if result is not None:
+                return result
+            print("⚠️ 結構化輸出解析失敗，改用 Markdown 模式重新分析...")
+        
         # 構建分析提示
         analysis_prompt = f"""
         請將以下搜尋結果整理成一份專業的繁體中文金融報告。
@@ -117,6 +165,8 @@ class AnalystAgent:
         
         try:
             # 使用 Agent 執行分析
+            if progress:
+                progress.report(None, "analyzing", "🧠 分析模型正在撰寫報告...")
             response = self.agent.run(analysis_prompt)
             
             # 提取 Markdown 內容
@@ -126,7 +176,7 @@ class AnalystAgent:
                 markdown_report = str(response)
             
             # 提取結構化新聞數據
-            structured_news = self._extract_structured_data(markdown_report, content, query)
+            structured_news = self._extract_structured_data(markdown_report, content, query, progress)
             
             print("✅ Analyst Agent 分析完成")
             return markdown_report, structured_news
@@ -134,20 +184,279 @@ class AnalystAgent:
         except Exception as e:
             print(f"❌ Analyst Agent 分析失敗: {str(e)}")
             # 返回錯誤報告
-            error_report = f"""
+            return self._error_report(e, query), NewsBatch()
+    
+    def _error_report(self, error: Exception, query: str) -> str:
+        """分析失敗時返回的錯誤報告"""
+        return f"""
 # 報告生成失敗
 
 ## 錯誤資訊
-{str(e)}
+{str(error)}
 
 ## 原始搜尋查詢
 {query}
 
 請檢查系統設定並重試。
 """
-            return error_report, []
     
-    def _extract_structured_data(self, markdown_report: str, raw_content: str, query: str) -> List[Dict[str, str]]:
+    def _build_structured_agent(self) -> Agent:
+        """建立只要求輸出 JSON 的 Agent（不套用 Markdown 指示）"""
+        return Agent(
+            name="金融新聞分析師（結構化輸出）",
+            model=OpenAIChat(
+                id=Config.OPENAI_MODEL,
+                api_key=Config.OPENAI_API_KEY,
+                **openai_chat_client_kwargs(),
+            ),
+            description="專業的金融新聞分析師，將新聞整理成結構化 JSON",
+            instructions=[
+                "你是一位專業的金融分析師，負責整理新聞資訊",
+                "只輸出一個 JSON 物件，不要輸出 Markdown 或任何說明文字",
+                "所有文字欄位使用繁體中文，網址照抄搜尋結果",
+                "去除重複和冗餘資訊，按照重要性和時間順序排列",
+                "每則新聞的摘要應該詳細完整，至少 100-300 字",
+            ],
+        )
+    
+    def _get_structured_agent(self) -> Agent:
+        """延遲建立 json 模式使用的 Agent"""
+        if self._structured_agent is None:
+            self._structured_agent = self._build_structured_agent()
+        return self._structured_agent
+    
+    def _analyze_structured(self, content: str, query: str,
+                            progress: Optional[ProgressReporter] = None) -> Optional[Tuple[str, NewsBatch]]:
+        """
+        json 模式：模型只輸出結構化 JSON，Markdown 報告由本機範本產生
+        
+        Args:
+            content: 來自搜尋的原始內容
+            query: 搜尋查詢
+            progress: 可選的合併式進度回報器
+            
+        Returns:
+            Optional[Tuple[str, NewsBatch]]: (Markdown 報告, 結構化新聞批次)，JSON 無法解析時回傳 None
+        """
+        analysis_prompt = f"""
+        請閱讀以下搜尋結果，整理成繁體中文金融新聞的結構化資料。
+        
+        原始查詢：{query}
+        搜尋結果：
+        {content}
+        
+        只輸出符合以下格式的 JSON 物件：
+        {STRUCTURED_SCHEMA}
+        
+        注意事項：
+        1. 每則新聞都必須包含 title、source、url、date、summary、analysis
+        2. analysis 為 3-5 點條列分析，insights 為 3-5 點關鍵洞察
+        3. 去除重複資訊
+        4. 如果沒有找到相關新聞，items 請輸出空陣列
+        """
+        
+        if progress:
+            progress.report(None, "analyzing", "🧠 分析模型正在整理結構化資料...")
+        response = self._get_structured_agent().run(analysis_prompt)
+        output = response.content if hasattr(response, 'content') else str(response)
+        
+        try:
+            report = parse_structured_report(output or "", query, self._extract_country)
+        except ValueError as e:
+            print(f"⚠️ {str(e)}")
+            return None
+        
+        if progress:
+            progress.report(None, "analyzing", f"🧩 已整理 {len(report.news)} 則新聞，正在產生報告...")
+        markdown_report = render_report_markdown(report, query)
+        print(f"✅ Analyst Agent 分析完成（結構化輸出，共 {len(report.news)} 則新聞）")
+        return markdown_report, report.news
+    
+    @staticmethod
+    def _search_items(search_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """取得搜尋結果中逐則的新聞（串流搜尋已解析的 results，或 content 中的 ```json 區塊）"""
+        items = search_results.get("results")
+        if items:
+            return [item for item in items if isinstance(item, dict)]
+        json_match = re.search(r'```json\s*(\{.*?\})\s*```', search_results.get("content", ""), re.DOTALL)
+        if not json_match:
+            return []
+        try:
+            items = json.loads(json_match.group(1)).get("results", [])
+        except (json.JSONDecodeError, AttributeError):
+            return []
+        return [item for item in items if isinstance(item, dict)]
+    
+    @staticmethod
+    def _run_usage(response) -> Tuple[int, int]:
+        """取得一次 Agent 呼叫的輸入／輸出 token 數（無統計時為 0）"""
+        metrics = getattr(response, "metrics", None)
+        if metrics is None:
+            return 0, 0
+        if isinstance(metrics, dict):
+            # 較舊版本的 agno：每個欄位為各次模型呼叫的列表
+            def total(value):
+                return sum(value) if isinstance(value, list) else (value or 0)
+            return total(metrics.get("input_tokens", 0)), total(metrics.get("output_tokens", 0))
+        return getattr(metrics, "input_tokens", 0) or 0, getattr(metrics, "output_tokens", 0) or 0
+    
+    def _timed_run(self, prompt: str, stage: str, chunk: int, items: int) -> Tuple[str, Dict[str, Any]]:
+        """以新的結構化 Agent 執行一次呼叫（各批次同時執行，不共用 Agent 狀態），回傳輸出與統計"""
+        start = time.perf_counter()
+        response = self._build_structured_agent().run(prompt)
+        seconds = time.perf_counter() - start
+        input_tokens, output_tokens = self._run_usage(response)
+        output = response.content if hasattr(response, 'content') else str(response)
+        return output or "", {
+            "stage": stage,
+            "chunk": chunk,
+            "items": items,
+            "seconds": round(seconds, 3),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+        }
+    
+    def _raw_news(self, items: List[Dict[str, Any]], query: str) -> NewsBatch:
+        """批次分析失敗時，直接以搜尋結果的原始欄位組成新聞（標題未翻譯）"""
+        news = NewsBatch()
+        for item in items:
+            title, source, summary = (str(item.get(key) or '') for key in ('title', 'source', 'summary'))
+            news.append(NewsItem(
+                title=title,
+                country=self._extract_country(title, source, summary),
+                keyword=query,
+                url=str(item.get('url') or ''),
+                published_at=str(item.get('date') or ''),
+                summary=summary,
+                source=source
+            ))
+        return news
+    
+    def _analyze_chunk(self, items: List[Dict[str, Any]], query: str, index: int, total: int) -> Tuple[NewsBatch, Dict[str, Any]]:
+        """map：整理一批新聞（翻譯標題、摘要、重點分析）"""
+        prompt = f"""
+        請將以下 {len(items)} 則搜尋結果整理成繁體中文金融新聞的結構化資料（第 {index}/{total} 批）。
+        
+        原始查詢：{query}
+        搜尋結果（JSON）：
+        {json.dumps(items, ensure_ascii=False)}
+        
+        只輸出符合以下格式的 JSON 物件，但只需要 items，不要輸出 summary 與 insights：
+        {STRUCTURED_SCHEMA}
+        
+        注意事項：
+        1. 每則新聞都必須包含 title、source、url、date、summary、analysis
+        2. analysis 為 3-5 點條列分析
+        3. 去除重複資訊
+        """
+        try:
+            output, stats = self._timed_run(prompt, "map", index, len(items))
+        except Exception as e:
+            print(f"⚠️ 第 {index} 批分析失敗，改用原始搜尋結果: {str(e)}")
+            return self._raw_news(items, query), {
+                "stage": "map", "chunk": index, "items": len(items), "seconds": 0.0,
+                "input_tokens": 0, "output_tokens": 0, "error": str(e),
+            }
+        try:
+            news = parse_structured_report(output, query, self._extract_country).news
+        except ValueError as e:
+            print(f"⚠️ 第 {index} 批輸出無法解析，改用原始搜尋結果: {str(e)}")
+            news, stats["error"] = NewsBatch(), str(e)
+        if not news:
+            news = self._raw_news(items, query)
+        return news, stats
+    
+    def _reduce_insights(self, news: NewsBatch, query: str) -> Tuple[StructuredReport, Dict[str, Any]]:
+        """reduce：根據各則新聞的重點撰寫報告摘要與市場洞察"""
+        digest = "\n".join(
+            f"{index}. {item.title}：{item.analysis or item.summary[:200]}"
+            for index, item in enumerate(news, start=1)
+        )
+        prompt = f"""
+        以下是「{query}」相關新聞的逐則重點（共 {len(news)} 則）：
+        {digest}
+        
+        只輸出 JSON 物件：{{"summary": "用 2-3 句話總結本報告的核心內容", "insights": ["市場洞察 1", "市場洞察 2"]}}
+        insights 為 3-5 點基於以上新聞的關鍵洞察，使用繁體中文。
+        """
+        try:
+            output, stats = self._timed_run(prompt, "reduce", 0, len(news))
+        except Exception as e:
+            print(f"⚠️ 市場洞察撰寫失敗，報告不含摘要與洞察: {str(e)}")
+            return StructuredReport(), {
+                "stage": "reduce", "chunk": 0, "items": len(news), "seconds": 0.0,
+                "input_tokens": 0, "output_tokens": 0, "error": str(e),
+            }
+        try:
+            report = parse_structured_report(output)
+        except ValueError as e:
+            print(f"⚠️ 市場洞察輸出無法解析: {str(e)}")
+            report, stats["error"] = StructuredReport(), str(e)
+        return report, stats
+    
+    def _analyze_chunked(self, items: List[Dict[str, Any]], query: str,
+                         progress: Optional[ProgressReporter] = None,
+                         on_chunk: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[str, NewsBatch]:
+        """
+        chunked 模式：將新聞分成每批 Config.ANALYST_CHUNK_SIZE 則同時整理（map），
+        再以一次簡短呼叫撰寫報告摘要與市場洞察（reduce），Markdown 報告由本機範本產生
+        
+        Args:
+            items: 搜尋結果中逐則的新聞
+            query: 搜尋查詢
+            progress: 可選的合併式進度回報器
+            on_chunk: 可選的回呼函數，每完成一次模型呼叫就以該次的統計呼叫
+            
+        Returns:
+            Tuple[str, NewsBatch]: (Markdown 報告, 結構化新聞批次)
+        """
+        size = max(1, Config.ANALYST_CHUNK_SIZE)
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        limit = max(1, min(Config.ANALYST_CHUNK_CONCURRENCY, len(chunks)))
+        print(f"🔀 Analyst Agent 分批分析: {len(items)} 則新聞分成 {len(chunks)} 批，同時上限 {limit}")
+        if progress:
+            progress.report(None, "analyzing", f"🧠 分析模型正在分 {len(chunks)} 批整理 {len(items)} 則新聞...")
+        
+        def record(stats: Dict[str, Any]):
+            label = f"第 {stats['chunk']}/{len(chunks)} 批" if stats["stage"] == "map" else "市場洞察"
+            message = (f"🧩 {label}完成（{stats['items']} 則，{stats['seconds']:.1f} 秒，"
+                       f"輸入 {stats['input_tokens']}／輸出 {stats['output_tokens']} tokens）")
+            print(message)
+            if progress:
+                progress.report(None, "analyzing", message)
+            if on_chunk:
+                on_chunk(stats)
+        
+        results: List[Optional[NewsBatch]] = [None] * len(chunks)
+        all_stats = []
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="analyst-chunk") as pool:
+            futures = {
+                pool.submit(self._analyze_chunk, chunk, query, index, len(chunks)): index - 1
+                for index, chunk in enumerate(chunks, start=1)
+            }
+            # 在呼叫端執行緒中依完成順序回報
+            for future in as_completed(futures):
+                news, stats = future.result()
+                results[futures[future]] = news
+                all_stats.append(stats)
+                record(stats)
+        
+        merged = NewsBatch()
+        for news in results:
+            for item in news:
+                merged.append(item)
+        
+        report, stats = self._reduce_insights(merged, query)
+        all_stats.append(stats)
+        record(stats)
+        report.news = merged
+        
+        total_in = sum(stats["input_tokens"] for stats in all_stats)
+        total_out = sum(stats["output_tokens"] for stats in all_stats)
+        print(f"✅ Analyst Agent 分析完成（分批輸出，共 {len(merged)} 則新聞，輸入 {total_in}／輸出 {total_out} tokens）")
+        return render_report_markdown(report, query), merged
+    
+    def _extract_structured_data(self, markdown_report: str, raw_content: str, query: str, progress: Optional[ProgressReporter] = None) -> NewsBatch:
         """
         從 Markdown 報告和原始內容中提取結構化新聞數據
         
@@ -157,16 +466,17 @@ class AnalystAgent:
             markdown_report: Markdown 格式的報告（包含已翻譯的中文標題）
             raw_content: 來自搜尋的原始內容
             query: 搜尋查詢（作為關鍵字）
+            progress: 可選的合併式進度回報器
             
         Returns:
-            List[Dict]: 結構化的新聞列表
+            NewsBatch: 結構化的新聞批次
         """
-        structured_news = []
+        structured_news = NewsBatch()
         
         try:
             # 優先從 Markdown 報告中提取（標題已翻譯成中文）
             print("📝 從 Markdown 報告中提取結構化數據（含中文標題）...")
-            structured_news = self._extract_from_markdown(markdown_report, query)
+            structured_news = self._extract_from_markdown(markdown_report, query, progress)
             
             # 如果 Markdown 提取失敗，才嘗試從 JSON 解析
             if not structured_news:
@@ -184,14 +494,15 @@ class AnalystAgent:
                             result.get('summary', '')
                         )
                         
-                        structured_news.append({
-                            '新聞標題（中文）': result.get('title', ''),
-                            '來源國家': country,
-                            '關鍵字': query,
-                            '來源網站連結': result.get('url', ''),
-                            '發布日期': result.get('date', ''),
-                            '來源': result.get('source', '')
-                        })
+                        structured_news.append(NewsItem(
+                            title=result.get('title', ''),
+                            country=country,
+                            keyword=query,
+                            url=result.get('url', ''),
+                            published_at=result.get('date', ''),
+                            summary=result.get('summary', ''),
+                            source=result.get('source', '')
+                        ))
         
         except Exception as e:
             print(f"⚠️ 結構化數據提取失敗: {str(e)}")
@@ -206,101 +517,17 @@ class AnalystAgent:
         return structured_news
     
     def _extract_country(self, title: str, source: str, summary: str) -> str:
-        """從文本中提取國家資訊"""
-        text = f"{title} {source} {summary}".lower()
-        
-        countries = {
-            'singapore': '新加坡',
-            'malaysia': '馬來西亞',
-            'thailand': '泰國',
-            'indonesia': '印尼',
-            'vietnam': '越南',
-            'philippines': '菲律賓',
-            '新加坡': '新加坡',
-            '馬來西亞': '馬來西亞',
-            '泰國': '泰國',
-            '印尼': '印尼',
-            '越南': '越南',
-            '菲律賓': '菲律賓'
-        }
-        
-        for key, value in countries.items():
-            if key in text:
-                return value
-        
-        return '東南亞'
+        """從文本中提取國家資訊（地名辭典比對，依各國的加權提及次數判斷）"""
+        return self.country_tagger.tag(title, source, summary)
     
-    def _extract_from_markdown(self, markdown_report: str, query: str) -> List[Dict[str, str]]:
-        """從 Markdown 報告中提取新聞資訊"""
-        structured_news = []
-        
-        # 使用正則表達式匹配新聞標題和相關資訊
-        news_pattern = r'###\s+\d+\.\s+(.*?)\n(.*?)(?=###|\Z)'
-        matches = re.findall(news_pattern, markdown_report, re.DOTALL)
+    def _extract_from_markdown(self, markdown_report: str, query: str, progress: Optional[ProgressReporter] = None) -> NewsBatch:
+        """從 Markdown 報告中提取新聞資訊（逐行狀態機，耗時與報告長度成線性關係）"""
+        structured_news = NewsBatch()
         
-        for title, content in matches:
-            title = title.strip()
-            
-            # 提取來源和網址
-            source_match = re.search(r'\*\*來源\*\*[：:]\s*\[?(.*?)\]?\(?(https?://[^\s\)]+)', content)
-            source = ''
-            url = ''
-            if source_match:
-                source = source_match.group(1).strip()
-                url = source_match.group(2).strip()
-            else:
-                # 嘗試另一種格式
-                url_match = re.search(r'(https?://[^\s\)]+)', content)
-                if url_match:
-                    url = url_match.group(1).strip()
-            
-            # 提取日期 - 改進的日期提取邏輯
-            date = ''
-            # 首先嘗試匹配 "**日期**：YYYY-MM-DD" 格式
-            date_match = re.search(r'\*\*日期\*\*[：:]\s*([^\n*]+)', content)
-            if date_match:
-                date = date_match.group(1).strip()
-            else:
-                # 嘗試匹配其他常見日期格式
-                # 格式如：2025-10-13, 2025/10/13, 2025.10.13
-                date_pattern = r'(\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2})'
-                date_match2 = re.search(date_pattern, content)
-                if date_match2:
-                    date = date_match2.group(1)
-                else:
-                    # 嘗試中文日期格式：2025年10月13日
-                    date_pattern_cn = r'(\d{4}年\d{1,2}月\d{1,2}日)'
-                    date_match3 = re.search(date_pattern_cn, content)
-                    if date_match3:
-                        date = date_match3.group(1)
-            
-            # 提取摘要 - 改進的正則表達式，支援多行內容
-            summary = ''
-            # 嘗試匹配摘要內容，直到遇到下一個粗體項目或結束
-            summary_match = re.search(r'\*\*摘要\*\*[：:]\s*([^\n]*(?:\n(?!\s*[-\*]\s*\*\*)[^\n]*)*)', content, re.DOTALL)
-            if summary_match:
-                summary = summary_match.group(1).strip()
-            
-            # 提取重點分析 - 改進的正則表達式，支援多行和條列式內容
-            analysis = ''
-            # 嘗試匹配重點分析內容，直到遇到下一個標題或結束
-            analysis_match = re.search(r'\*\*重點分析\*\*[：:]\s*([^\n]*(?:\n(?!\s*###|\s*##|\s*[-\*]\s*\*\*(?!.*分析))[^\n]*)*)', content, re.DOTALL)
-            if analysis_match:
-                analysis = analysis_match.group(1).strip()
-            
-            # 提取國家
-            country = self._extract_country(title, source, content)
-            
-            structured_news.append({
-                '新聞標題（中文）': title,
-                '來源國家': country,
-                '關鍵字': query,
-                '來源網站連結': url,
-                '發布日期': date,
-                '摘要': summary,
-                '重點分析': analysis,
-                '來源': source
-            })
+        for item in extract_news(markdown_report, query, self._extract_country):
+            structured_news.append(item)
+            if progress:
+                progress.report(None, "analyzing", f"🧩 已擷取第 {len(structured_news)} 則新聞：{item.title[:80]}")
         
         return structured_news
 
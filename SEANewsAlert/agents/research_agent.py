@@ -2,45 +2,145 @@
 Research Agent
 負責使用 OpenAI Responses API 進行深度網路搜尋
 """
-from openai import OpenAI
 from config import Config
+from utils.helpers import canonicalize_url
+from utils.openai_client import get_openai_client, get_async_openai_client
+from utils.progress_reporter import ProgressReporter
+from utils.search_cache import create_search_cache
+from utils.stream_parser import StreamingResultsExtractor
+from utils.source_registry import source_registry
+import asyncio
 import json
-from typing import Dict, Any
+import re
+import time
+from typing import Dict, Any, List, Callable, Optional
 from datetime import datetime
 
 
+class _StreamState:
+    """
+    Responses 串流的累積狀態
+    
+    文字片段先收集在列表中，只在讀取 content 時合併一次（線性時間）；
+    每個內容片段以 (output_index, content_index) 追蹤是否已收到 delta，
+    取代對整段累積文字的子字串搜尋。文字同時餵給 StreamingResultsExtractor，
+    results 中的每則新聞在其右大括號到達時即可取得。
+    進度訊息經由 ProgressReporter 合併後才寫入任務狀態與 console。
+    """
+    
+    def __init__(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None, progress: Optional[ProgressReporter] = None):
+        self.on_result = on_result
+        self.progress = progress or ProgressReporter(None, None, "searching")
+        self.extractor = StreamingResultsExtractor()
+        self.sources = []
+        self.web_search_count = 0
+        self.text_chunks = 0
+        self.length = 0
+        self._chunks = []
+        self._parts_with_deltas = set()
+        self._joined = None
+    
+    @staticmethod
+    def part_key(event) -> tuple:
+        """取得事件所屬內容片段的索引"""
+        return (getattr(event, 'output_index', None), getattr(event, 'content_index', None))
+    
+    def append_delta(self, part_key: tuple, text: str) -> List[Dict[str, Any]]:
+        """加入一個 delta 文字片段，回傳因此完成的新聞物件"""
+        self._chunks.append(text)
+        self._parts_with_deltas.add(part_key)
+        self.length += len(text)
+        self.text_chunks += 1
+        self._joined = None
+        return self.extractor.feed(text)
+    
+    def complete_part(self, part_key: tuple, text: str) -> List[Dict[str, Any]]:
+        """內容片段完成：只有在該片段未收到任何 delta 時才加入完整文字"""
+        if text and part_key not in self._parts_with_deltas:
+            self._chunks.append(text)
+            self.length += len(text)
+            self._joined = None
+            return self.extractor.feed(text)
+        return []
+    
+    @property
+    def results(self) -> List[Dict[str, Any]]:
+        """目前已完整解析的新聞物件"""
+        return self.extractor.items
+    
+    @property
+    def content(self) -> str:
+        """合併後的完整文字"""
+        if self._joined is None:
+            self._joined = "".join(self._chunks)
+            self._chunks = [self._joined] if self._joined else []
+        return self._joined
+
+
+class ResultStream:
+    """asearch 的非同步迭代包裝：逐一產出新聞，結束後可由 result 取得完整搜尋結果"""
+    
+    _DONE = object()
+    
+    def __init__(self, start: Callable[[Callable], Any]):
+        self._start = start
+        self.result: Optional[Dict[str, Any]] = None
+    
+    async def __aiter__(self):
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def run():
+            try:
+                self.result = await self._start(queue.put_nowait)
+            finally:
+                queue.put_nowait(self._DONE)
+        
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is self._DONE:
+                    break
+                yield item
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+
 class ResearchAgent:
     """研究代理 - 執行深度網路搜尋"""
     
-    # 指定的18個可信新聞來源網站
-    TRUSTED_NEWS_SOURCES = [
-        {"name": "VietJo", "domain": "viet-jo.com", "region": "Vietnam"},
-        {"name": "Cafef", "domain": "cafef.vn", "region": "Vietnam"},
-        {"name": "VNExpress", "domain": "vnexpress.net", "region": "Vietnam"},
-        {"name": "Vietnam Finance", "domain": "vietnamfinance.vn", "region": "Vietnam"},
-        {"name": "Vietnam Investment Review", "domain": "vir.com.vn", "region": "Vietnam"},
-        {"name": "Vietnambiz", "domain": "vietnambiz.vn", "region": "Vietnam"},
-        {"name": "Tap Chi Tai chinh", "domain": "tapchikinhtetaichinh.vn", "region": "Vietnam"},
-        {"name": "Bangkok Post", "domain": "bangkokpost.com", "region": "Thailand"},
-        {"name": "Techsauce", "domain": "techsauce.co", "region": "Thailand"},
-        {"name": "Fintech Singapore", "domain": "fintechnews.sg", "region": "Singapore"},
-        {"name": "Fintech Philippines", "domain": "fintechnews.ph", "region": "Philippines"},
-        {"name": "Khmer Times", "domain": "khmertimeskh.com", "region": "Cambodia"},
-        {"name": "柬中時報", "domain": "cc-times.com", "region": "Cambodia"},
-        {"name": "The Phnom Penh Post", "domain": "phnompenhpost.com", "region": "Cambodia"},
-        {"name": "Deal Street Asia", "domain": "dealstreetasia.com", "region": "Southeast Asia"},
-        {"name": "Tech in Asia", "domain": "techinasia.com", "region": "Southeast Asia"},
-        {"name": "Nikkei Asia", "domain": "asia.nikkei.com", "region": "Southeast Asia"},
-        {"name": "Heaptalk", "domain": "heaptalk.com", "region": "Southeast Asia"},
-    ]
+    # 語言與國家映射
+    LANGUAGE_CONFIG = {
+        "English": {"keywords": "in English", "countries": ["Singapore", "Malaysia", "Thailand", "Vietnam", "Philippines"]},
+        "Chinese": {"keywords": "中文 華語 Chinese", "countries": ["Singapore", "Malaysia"]},
+        "Vietnamese": {"keywords": "tiếng Việt Vietnamese", "countries": ["Vietnam"]},
+        "Thai": {"keywords": "ภาษาไทย Thai", "countries": ["Thailand"]},
+        "Malay": {"keywords": "Bahasa Melayu Malay", "countries": ["Malaysia"]},
+        "Indonesian": {"keywords": "Bahasa Indonesia Indonesian", "countries": ["Indonesia"]}
+    }
     
     def __init__(self):
         """初始化 Research Agent"""
-        # 初始化 OpenAI 客戶端
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+        # 行程共用的 OpenAI 客戶端與連線池（OPENAI_REPLAY_MODE 可切換為錄製／離線重播）
+        self.client = get_openai_client()
         self.model = Config.OPENAI_MODEL
+        # 可指定專用的非同步客戶端；預設使用目前事件迴圈共用的客戶端
+        self._async_client = None
+        # 搜尋結果快取（SEARCH_CACHE_BACKEND=off 時為 None）
+        self.cache = create_search_cache()
+        # 可信新聞來源（data/trusted_sources.json，自動重新載入）
+        self.source_registry = source_registry
     
-    def search(self, query: str, time_instruction: str = "最近 7 天內", num_instruction: str = "5-10篇", language: str = "English", task_id: str = None) -> Dict[str, Any]:
+    @property
+    def async_client(self):
+        """取得 AsyncOpenAI 客戶端（預設為目前事件迴圈共用的客戶端）"""
+        if self._async_client is not None:
+            return self._async_client
+        return get_async_openai_client()
+    
+    def search(self, query: str, time_instruction: str = "最近 7 天內", num_instruction: str = "5-10篇", language: str = "English", task_id: str = None, on_result: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
         """
         執行搜尋
         
@@ -50,51 +150,307 @@ class ResearchAgent:
             num_instruction: 新聞數量指令 (例如: "約15篇")
             language: 新聞來源語言 (例如: "English", "Chinese", "Vietnamese", "Thai", "Malay", "Indonesian")
             task_id: 可選的任務 ID，用於更新前端進度顯示
+            on_result: 可選的回呼函數，串流中每解析出一則新聞（results[i]）就立即呼叫
             
         Returns:
-            Dict: 包含搜尋結果和來源的字典
+            Dict: 包含搜尋結果和來源的字典（results 為已解析的新聞列表）
         """
         print(f"🔍 Research Agent 開始搜尋: {query} ({time_instruction}, {num_instruction}, 語言: {language})")
         
-        # 動態導入 task_manager（避免循環導入）
-        task_manager = None
-        if task_id:
-            try:
-                from app.services.progress import task_manager as tm
-                task_manager = tm
-            except ImportError:
-                print("⚠️ 無法導入 task_manager，將不更新前端進度")
+        task_manager = self._get_task_manager(task_id)
+        cache_params = (query, time_instruction, num_instruction, language)
+        cached = self._get_cached(cache_params, None, task_manager, task_id, on_result)
+        if cached:
+            return cached
+        enhanced_query = self._build_search_prompt(query, time_instruction, num_instruction, language)
+        state = None
         
-        # 建立語言與國家映射
-        language_config = {
-            "English": {"keywords": "in English", "countries": ["Singapore", "Malaysia", "Thailand", "Vietnam", "Philippines"]},
-            "Chinese": {"keywords": "中文 華語 Chinese", "countries": ["Singapore", "Malaysia"]},
-            "Vietnamese": {"keywords": "tiếng Việt Vietnamese", "countries": ["Vietnam"]},
-            "Thai": {"keywords": "ภาษาไทย Thai", "countries": ["Thailand"]},
-            "Malay": {"keywords": "Bahasa Melayu Malay", "countries": ["Malaysia"]},
-            "Indonesian": {"keywords": "Bahasa Indonesia Indonesian", "countries": ["Indonesia"]}
-        }
+        try:
+            # 使用 OpenAI Responses API 執行網路搜尋（串流模式）
+            print("🌐 正在啟動串流搜尋...")
+            
+            stream = self.client.responses.create(
+                model=self.model,
+                input=enhanced_query,
+                tools=[
+                    {
+                        "type": "web_search"
+                    }
+                ],
+                stream=True  # 啟用串流模式
+            )
+
+            state = self._start_stream(task_manager, task_id, on_result)
+            for event in stream:
+                self._handle_stream_event(event, state)
+
+            result = self._finish_stream(query, state)
+            self._store_cached(cache_params, None, result)
+            return result
+
+        except Exception as e:
+            if state is not None:
+                state.progress.close()
+            print(f"❌ Research Agent 搜尋失敗: {str(e)}")
+            return {
+                "status": "error",
+                "query": query,
+                "error": str(e)
+            }
+    
+    async def asearch(self, query: str, time_instruction: str = "最近 7 天內", num_instruction: str = "5-10篇", language: str = "English", task_id: str = None, countries: List[str] = None, on_result: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        執行搜尋（非同步版本）
         
-        lang_info = language_config.get(language, language_config["English"])
-        language_keywords = lang_info["keywords"]
-        target_countries = ", ".join(lang_info["countries"])
+        使用 AsyncOpenAI 以 async for 消費 Responses 串流，多個搜尋可在同一個
+        事件迴圈上同時進行而不需各自佔用一個執行緒。參數與回傳值同 search()，
+        另可用 countries 限定目標國家（分片搜尋使用）。
+        """
+        print(f"🔍 Research Agent 開始非同步搜尋: {query} ({time_instruction}, {num_instruction}, 語言: {language})")
+        
+        task_manager = self._get_task_manager(task_id)
+        cache_params = (query, time_instruction, num_instruction, language)
+        cached = self._get_cached(cache_params, countries, task_manager, task_id, on_result)
+        if cached:
+            return cached
+        enhanced_query = self._build_search_prompt(query, time_instruction, num_instruction, language, countries)
+        state = None
+        
+        try:
+            print("🌐 正在啟動非同步串流搜尋...")
+            
+            stream = await self.async_client.responses.create(
+                model=self.model,
+                input=enhanced_query,
+                tools=[
+                    {
+                        "type": "web_search"
+                    }
+                ],
+                stream=True
+            )
+
+            state = self._start_stream(task_manager, task_id, on_result)
+            async for event in stream:
+                self._handle_stream_event(event, state)
+
+            result = self._finish_stream(query, state)
+            self._store_cached(cache_params, countries, result)
+            return result
+
+        except Exception as e:
+            if state is not None:
+                state.progress.close()
+            print(f"❌ Research Agent 搜尋失敗: {str(e)}")
+            return {
+                "status": "error",
+                "query": query,
+                "error": str(e)
+            }
+    
+    def astream(self, query: str, time_instruction: str = "最近 7 天內", num_instruction: str = "5-10篇", language: str = "English", task_id: str = None, countries: List[str] = None) -> "ResultStream":
+        """
+        以非同步迭代器取得串流中逐一完成的新聞
+        
+        用法：
+            stream = agent.astream("越南金融科技")
+            async for item in stream:
+                ...  # 每則新聞的右大括號到達時即可處理
+            search_results = stream.result  # 與 asearch() 相同格式
+        """
+        return ResultStream(lambda on_result: self.asearch(
+            query, time_instruction, num_instruction, language,
+            task_id=task_id, countries=countries, on_result=on_result
+        ))
+    
+    async def fanout_search(self, query: str, time_instruction: str = "最近 7 天內", num_instruction: str = "5-10篇", language: str = "English", task_id: str = None, split_by: str = "country", languages: List[str] = None, max_concurrency: int = None) -> Dict[str, Any]:
+        """
+        分片平行搜尋
+        
+        將一個請求拆成多個同時進行的子搜尋（每個國家或每種語言一個），
+        合併各分片的 results JSON 與 sources，並以正規化 URL 去重。
+        牆鐘時間約等於最慢的分片，而非一次冗長的序列搜尋。
+        
+        Args:
+            split_by: 分片方式，'country'（依語言的目標國家）或 'language'
+            languages: split_by='language' 時使用的語言列表（預設為 language 本身加上英文）
+            max_concurrency: 同時進行的子搜尋上限（預設使用 Config.RESEARCH_FANOUT_CONCURRENCY）
+            其餘參數同 search()
+            
+        Returns:
+            Dict: 與 search() 相同格式的字典，另附各分片摘要 shards
+        """
+        shards = self._plan_shards(language, split_by, languages)
+        limit = max(1, max_concurrency or Config.RESEARCH_FANOUT_CONCURRENCY)
+        semaphore = asyncio.Semaphore(limit)
+        print(f"🔀 Research Agent 分片搜尋: {len(shards)} 個分片（依 {split_by}），同時上限 {limit}")
+        
+        async def run_shard(shard: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                started = time.perf_counter()
+                result = await self.asearch(
+                    query=query,
+                    time_instruction=time_instruction,
+                    num_instruction=f"{num_instruction}（整體目標，由 {len(shards)} 個子搜尋分攤）",
+                    language=shard["language"],
+                    task_id=task_id,
+                    countries=shard["countries"]
+                )
+                result["elapsed"] = round(time.perf_counter() - started, 3)
+                return result
+        
+        shard_results = await asyncio.gather(*(run_shard(shard) for shard in shards))
+        return self._merge_shard_results(query, shards, shard_results)
+    
+    def _plan_shards(self, language: str, split_by: str, languages: List[str] = None) -> List[Dict[str, Any]]:
+        """依分片方式產生子搜尋列表"""
+        if split_by == "country":
+            lang_info = self.LANGUAGE_CONFIG.get(language, self.LANGUAGE_CONFIG["English"])
+            return [
+                {"label": country, "language": language, "countries": [country]}
+                for country in lang_info["countries"]
+            ]
+        if split_by == "language":
+            languages = languages or list(dict.fromkeys([language, "English"]))
+            return [
+                {"label": lang, "language": lang, "countries": None}
+                for lang in languages
+            ]
+        raise ValueError(f"不支援的分片方式: {split_by}")
+    
+    def _merge_shard_results(self, query: str, shards: List[Dict[str, Any]], shard_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """合併分片結果，依正規化 URL 去除重複的新聞與來源"""
+        merged_results = []
+        merged_sources = []
+        seen_results = set()
+        seen_sources = set()
+        web_search_count = 0
+        shard_summaries = []
+        
+        for shard, result in zip(shards, shard_results):
+            summary = {"shard": shard["label"], "status": result.get("status"), "elapsed": result.get("elapsed")}
+            if result.get("status") != "success":
+                summary["error"] = result.get("error")
+                shard_summaries.append(summary)
+                continue
+            
+            web_search_count += result.get("web_search_count", 0)
+            items = result.get("results") or self._extract_results_json(result.get("content", ""))
+            summary["results"] = len(items)
+            shard_summaries.append(summary)
+            
+            for item in items:
+                key = canonicalize_url(item.get("url", "")) or item.get("title", "")
+                if key and key in seen_results:
+                    continue
+                seen_results.add(key)
+                merged_results.append(item)
+            
+            for source in result.get("sources", []):
+                key = canonicalize_url(source.get("url", ""))
+                if key:
+                    # 沒有網址的來源無法判斷是否重複，一律保留
+                    if key in seen_sources:
+                        continue
+                    seen_sources.add(key)
+                merged_sources.append(source)
+        
+        if not any(summary["status"] == "success" for summary in shard_summaries):
+            errors = "; ".join(f"{s['shard']}: {s.get('error')}" for s in shard_summaries)
+            return {
+                "status": "error",
+                "query": query,
+                "error": f"所有分片搜尋皆失敗（{errors}）"
+            }
         
-        # 生成可信來源列表
-        sources_list = "\n".join([
-            f"  - {src['name']} (site:{src['domain']}) - {src['region']}" 
-            for src in self.TRUSTED_NEWS_SOURCES
-        ])
+        merged_json = {
+            "search_query": query,
+            "search_date": datetime.now().strftime('%Y-%m-%d'),
+            "results": merged_results
+        }
+        content = "```json\n" + json.dumps(merged_json, ensure_ascii=False, indent=2) + "\n```"
+        
+        print(f"✅ 分片搜尋合併完成: {len(merged_results)} 則新聞, {len(merged_sources)} 個來源")
+        return {
+            "status": "success",
+            "query": query,
+            "content": content,
+            "sources": merged_sources,
+            "results": merged_results,
+            "web_search_count": web_search_count,
+            "shards": shard_summaries
+        }
+    
+    @staticmethod
+    def _replace_results_json(content: str, results: List[Dict[str, Any]]) -> str:
+        """以過濾後的 results 取代回應內容中的 ```json 區塊"""
+        json_match = re.search(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
+        if not json_match:
+            return content
+        try:
+            data = json.loads(json_match.group(1))
+        except json.JSONDecodeError:
+            return content
+        data["results"] = results
+        block = "```json\n" + json.dumps(data, ensure_ascii=False, indent=2) + "\n```"
+        return content[:json_match.start()] + block + content[json_match.end():]
+    
+    @staticmethod
+    def _extract_results_json(content: str) -> List[Dict[str, Any]]:
+        """從回應內容的 ```json 區塊中取出 results 列表"""
+        json_match = re.search(r'```json\s*(\{.*?\})\s*```', content, re.DOTALL)
+        if not json_match:
+            return []
+        try:
+            return json.loads(json_match.group(1)).get("results", [])
+        except (json.JSONDecodeError, AttributeError):
+            return []
+    
+    def _get_cached(self, cache_params: tuple, countries: List[str] = None, task_manager=None, task_id: str = None, on_result: Callable = None) -> Dict[str, Any]:
+        """查詢搜尋結果快取，命中時回傳標記為 cached 的結果副本（並將新聞依序交給 on_result）"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(*cache_params, countries=countries)
+        if cached is None:
+            return None
+        message = f"⚡ 命中搜尋快取：{len(cached.get('sources', []))} 個來源"
+        print(message)
+        if task_manager and task_id:
+            task_manager.set_progress(task_id, 65, "searching", message)
+        if on_result:
+            for item in cached.get("results", []):
+                on_result(item)
+        return {**cached, "cached": True}
+    
+    def _store_cached(self, cache_params: tuple, countries: List[str], result: Dict[str, Any]):
+        """寫入搜尋結果快取（只快取成功的結果）"""
+        if self.cache is not None and result.get("status") == "success":
+            self.cache.set(*cache_params, result, countries=countries)
+    
+    def _get_task_manager(self, task_id: str = None):
+        """動態導入 task_manager（避免循環導入）"""
+        if not task_id:
+            return None
+        try:
+            from app.services.progress import task_manager
+            return task_manager
+        except ImportError:
+            print("⚠️ 無法導入 task_manager，將不更新前端進度")
+            return None
+    
+    def _build_search_prompt(self, query: str, time_instruction: str, num_instruction: str, language: str, countries: List[str] = None) -> str:
+        """
+        建立搜尋提示詞
         
-        # 生成 site: 搜尋字串組合（用於建議搜尋範例）
-        site_examples = [
-            f"site:{src['domain']}" 
-            for src in self.TRUSTED_NEWS_SOURCES[:5]  # 只取前5個作為範例
-        ]
-        site_search_example = " OR ".join(site_examples)
+        Args:
+            countries: 可選的目標國家列表（分片搜尋時使用），預設依語言決定
+        """
+        lang_info = self.LANGUAGE_CONFIG.get(language, self.LANGUAGE_CONFIG["English"])
+        language_keywords = lang_info["keywords"]
+        target_countries = ", ".join(countries or lang_info["countries"])
         
-        # 生成域名列表用於驗證
-        allowed_domains = [src['domain'] for src in self.TRUSTED_NEWS_SOURCES]
-        allowed_domains_str = ", ".join(allowed_domains)
+        # 可信來源網域列表（註冊表載入時已預先產生）
+        allowed_domains_str = self.source_registry.allowed_domains_str
         
         # 精簡優化的搜尋提示詞
         enhanced_query = f"""
@@ -138,134 +494,145 @@ class ResearchAgent:
 
 注意：確保 JSON 語法正確、所有欄位完整、日期在指定範圍內。
         """
+        return enhanced_query
+    
+    def _start_stream(self, task_manager, task_id: str = None, on_result: Callable = None) -> "_StreamState":
+        """建立串流狀態（含合併式進度回報器）並通知前端開始接收事件"""
+        if task_manager and task_id:
+            progress = task_manager.reporter(task_id, "searching")
+        else:
+            progress = ProgressReporter(None, None, "searching")
+        progress.report(35, "searching", "📡 開始接收串流事件...", force=True)
+        return _StreamState(on_result, progress)
+    
+    def _handle_stream_event(self, event, state: "_StreamState"):
+        """
+        處理單一 Responses 串流事件（同步與非同步路徑共用）
         
-        try:
-            # 使用 OpenAI Responses API 執行網路搜尋（串流模式）
-            print("🌐 正在啟動串流搜尋...")
+        進度訊息一律交給 state.progress，間隔內的多次更新只會送出最新一筆。
+        
+        Args:
+            event: Responses API 串流事件
+            state: 串流累積狀態
+        """
+        event_type = event.type
+        
+        # 回應創建事件
+        if event_type == "response.created":
+            print(f"📡 回應已創建 (ID: {event.response.id})")
+        
+        # 工具呼叫開始
+        elif event_type == "response.output_item.added":
+            output_item = event.item
+            if hasattr(output_item, 'type') and output_item.type == "web_search_call":
+                state.web_search_count += 1
+                state.progress.report(
+                    35 + state.web_search_count * 2, "searching",
+                    f"🔍 開始第 {state.web_search_count} 次網路搜尋..."
+                )
+        
+        # 工具呼叫完成
+        elif event_type == "response.output_item.done":
+            output_item = event.item
+            if hasattr(output_item, 'type') and output_item.type == "web_search_call":
+                status = getattr(output_item, 'status', 'unknown')
+                state.progress.report(
+                    40 + state.web_search_count * 2, "searching",
+                    f"✅ 第 {state.web_search_count} 次網路搜尋完成 (狀態: {status})"
+                )
+        
+        # 文字內容片段（逐步接收）
+        elif event_type == "response.content_part.delta":
+            delta = event.delta
+            if hasattr(delta, 'text') and delta.text:
+                new_results = state.append_delta(state.part_key(event), delta.text)
+                self._emit_results(new_results, state)
+                # 每接收 10 個片段顯示一次進度
+                if state.text_chunks % 10 == 0:
+                    print(f"📝 已接收 {state.length} 字元... ({state.text_chunks} 個片段)")
+        
+        # 內容片段完成（包含 annotations）
+        elif event_type == "response.content_part.done":
+            # 正確的屬性名稱是 part，不是 content_part
+            content_part = event.part
+            if hasattr(content_part, 'text'):
+                # 確保完整文字被加入（該片段沒有串流 delta 時）
+                new_results = state.complete_part(state.part_key(event), content_part.text)
+                self._emit_results(new_results, state)
             
-            stream = self.client.responses.create(
-                model=self.model,
-                input=enhanced_query,
-                tools=[
-                    {
-                        "type": "web_search"
-                    }
-                ],
-                stream=True  # 啟用串流模式
+            # 處理引用/來源資訊
+            if hasattr(content_part, 'annotations') and content_part.annotations:
+                for annotation in content_part.annotations:
+                    if annotation.type == "url_citation":
+                        source_info = {
+                            "title": annotation.title,
+                            "url": annotation.url,
+                            "index": annotation.index if hasattr(annotation, 'index') else None
+                        }
+                        state.sources.append(source_info)
+                        
+                        # ✅ 更新前端進度（顯示正在抓取的文章網址）
+                        state.progress.report(
+                            min(45 + len(state.sources) * 2, 65),  # 從 45% 開始，每篇文章增加 2%，最多到 65%
+                            "searching",
+                            f"📌 找到第 {len(state.sources)} 篇文章\n標題：{annotation.title[:80]}\n網址：{annotation.url}"
+                        )
+        
+        # 回應完成
+        elif event_type == "response.done":
+            state.progress.report(
+                65, "searching",
+                f"🎉 串流接收完成\n📰 共找到 {len(state.sources)} 個來源\n🔍 執行了 {state.web_search_count} 次網路搜尋",
+                force=True
             )
+        
+        # 錯誤事件
+        elif event_type == "error":
+            error_data = event.error
+            print(f"❌ 串流錯誤: {error_data}")
+            raise Exception(f"串流錯誤: {error_data}")
+    
+    def _emit_results(self, new_results: List[Dict[str, Any]], state: "_StreamState"):
+        """串流中每解析出一則新聞：更新前端進度（顯示實際標題）並通知下游"""
+        for item in new_results:
+            state.progress.report(
+                min(45 + len(state.sources) * 2, 65), "searching",
+                f"📰 已解析第 {len(state.results)} 則新聞：{str(item.get('title', ''))[:80]}"
+            )
+            if state.on_result:
+                state.on_result(item)
+    
+    def _finish_stream(self, query: str, state: "_StreamState") -> Dict[str, Any]:
+        """輸出搜尋摘要並組成回傳結果（依設定移除非可信來源）"""
+        # 強制送出最後一筆被合併的進度更新
+        state.progress.close()
+        content = state.content
+        sources = state.sources
+        results = list(state.results)
+        
+        if Config.TRUSTED_SOURCES_FILTER:
+            sources, dropped_sources = self.source_registry.filter_trusted(sources)
+            results, dropped_results = self.source_registry.filter_trusted(results)
+            if dropped_results:
+                # 讓下游分析只看到可信來源的新聞
+                content = self._replace_results_json(content, results)
+            if dropped_sources or dropped_results:
+                print(f"🛡️ 已移除非可信來源：{dropped_sources} 個來源、{dropped_results} 則新聞")
+            state.sources = sources
+        
+        print("✅ Research Agent 搜尋完成")
+        print(f"📰 找到 {len(state.sources)} 個來源")
+        print(f"📄 總文字長度: {len(state.content)} 字元")
+        print(f"🔍 執行了 {state.web_search_count} 次網路搜尋")
 
-            # 提取回應內容和來源
-            content = ""
-            sources = []
-            web_search_count = 0
-            text_chunks = 0
-
-            # 串流接收事件
-            print("📡 開始接收串流事件...")
-            if task_manager and task_id:
-                task_manager.set_progress(task_id, 35, "searching", "📡 開始接收串流事件...")
-            
-            for event in stream:
-                event_type = event.type
-                
-                # 回應創建事件
-                if event_type == "response.created":
-                    print(f"📡 回應已創建 (ID: {event.response.id})")
-                
-                # 工具呼叫開始
-                elif event_type == "response.output_item.added":
-                    output_item = event.item
-                    if hasattr(output_item, 'type') and output_item.type == "web_search_call":
-                        web_search_count += 1
-                        message = f"🔍 開始第 {web_search_count} 次網路搜尋..."
-                        print(message)
-                        if task_manager and task_id:
-                            task_manager.set_progress(task_id, 35 + web_search_count * 2, "searching", message)
-                
-                # 工具呼叫完成
-                elif event_type == "response.output_item.done":
-                    output_item = event.item
-                    if hasattr(output_item, 'type') and output_item.type == "web_search_call":
-                        status = getattr(output_item, 'status', 'unknown')
-                        message = f"✅ 第 {web_search_count} 次網路搜尋完成 (狀態: {status})"
-                        print(message)
-                        if task_manager and task_id:
-                            task_manager.set_progress(task_id, 40 + web_search_count * 2, "searching", message)
-                
-                # 文字內容片段（逐步接收）
-                elif event_type == "response.content_part.delta":
-                    delta = event.delta
-                    if hasattr(delta, 'text') and delta.text:
-                        content += delta.text
-                        text_chunks += 1
-                        # 每接收 10 個片段顯示一次進度
-                        if text_chunks % 10 == 0:
-                            print(f"📝 已接收 {len(content)} 字元... ({text_chunks} 個片段)")
-                
-                # 內容片段完成（包含 annotations）
-                elif event_type == "response.content_part.done":
-                    # 正確的屬性名稱是 part，不是 content_part
-                    content_part = event.part
-                    if hasattr(content_part, 'text'):
-                        # 確保完整文字被加入
-                        if content_part.text and content_part.text not in content:
-                            content += content_part.text
-                    
-                    # 處理引用/來源資訊
-                    if hasattr(content_part, 'annotations') and content_part.annotations:
-                        for annotation in content_part.annotations:
-                            if annotation.type == "url_citation":
-                                source_info = {
-                                    "title": annotation.title,
-                                    "url": annotation.url,
-                                    "index": annotation.index if hasattr(annotation, 'index') else None
-                                }
-                                sources.append(source_info)
-                                message = f"📌 找到第 {len(sources)} 篇文章\n標題：{annotation.title[:80]}\n網址：{annotation.url}"
-                                print(f"📌 找到來源: {annotation.title[:50]}... - {annotation.url}")
-                                
-                                # ✅ 即時更新前端進度（顯示正在抓取的文章網址）
-                                if task_manager and task_id:
-                                    task_manager.set_progress(
-                                        task_id,
-                                        min(45 + len(sources) * 2, 65),  # 從 45% 開始，每篇文章增加 2%，最多到 65%
-                                        "searching",
-                                        message
-                                    )
-                
-                # 回應完成
-                elif event_type == "response.done":
-                    message = f"🎉 串流接收完成\n📰 共找到 {len(sources)} 個來源\n🔍 執行了 {web_search_count} 次網路搜尋"
-                    print("🎉 串流接收完成")
-                    if task_manager and task_id:
-                        task_manager.set_progress(task_id, 65, "searching", message)
-                
-                # 錯誤事件
-                elif event_type == "error":
-                    error_data = event.error
-                    print(f"❌ 串流錯誤: {error_data}")
-                    raise Exception(f"串流錯誤: {error_data}")
-
-            print("✅ Research Agent 搜尋完成")
-            print(f"📰 找到 {len(sources)} 個來源")
-            print(f"📄 總文字長度: {len(content)} 字元")
-            print(f"🔍 執行了 {web_search_count} 次網路搜尋")
-
-            return {
-                "status": "success",
-                "query": query,
-                "content": content,
-                "sources": sources,
-                "web_search_count": web_search_count
-            }
-
-        except Exception as e:
-            print(f"❌ Research Agent 搜尋失敗: {str(e)}")
-            return {
-                "status": "error",
-                "query": query,
-                "error": str(e)
-            }
+        return {
+            "status": "success",
+            "query": query,
+            "content": content,
+            "sources": sources,
+            "results": results,
+            "web_search_count": state.web_search_count
+        }
     
     def test_connection(self) -> bool:
         """測試 OpenAI API 連接是否正常"""
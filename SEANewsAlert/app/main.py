@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from pathlib import Path
+import asyncio
 import sys
 
 # 確保可以導入專案根目錄的模組
@@ -15,7 +16,13 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from config import Config
-from app.routers import tasks
+from app.routers import reports, tasks
+from app.services.executor import blocking_executor
+from app.services.renderer import artifact_renderer
+from app.services.workflow import workflow
+from utils.openai_client import aclose_openai_clients, pool_stats
+from utils.prompt_parser import rule_prompt_parser
+from utils.report_index import get_report_index
 
 # 創建 FastAPI 應用
 app = FastAPI(
@@ -44,6 +51,7 @@ app.add_middleware(
 
 # 註冊路由
 app.include_router(tasks.router)
+app.include_router(reports.router)
 
 # 掛載靜態文件目錄（用於提供前端頁面）
 public_dir = project_root / "public"
@@ -112,6 +120,9 @@ async def root():
             <ul class="link-list">
                 <li><strong>POST</strong> /api/tasks/news-report - 創建新聞報告任務</li>
                 <li><strong>GET</strong> /api/tasks/{task_id} - 查詢任務狀態</li>
+                <li><strong>GET</strong> /api/tasks/{task_id}/events - 任務進度推送（Server-Sent Events）</li>
+                <li><strong>GET</strong> /api/reports?page=1&amp;page_size=20 - 列出已產生的報告</li>
+                <li><strong>GET</strong> /api/reports/search?q=越南央行 - 全文搜尋報告與新聞</li>
             </ul>
             
             <h2>ℹ️ 系統資訊</h2>
@@ -123,13 +134,52 @@ async def root():
     """
 
 
+@app.on_event("startup")
+async def warm_up_prompt_memo():
+    """在背景預熱需求解析快取（不阻塞服務啟動）"""
+    if Config.PROMPT_MEMO_WARMUP_PATH:
+        app.state.prompt_memo_warmup = asyncio.create_task(
+            blocking_executor.run(workflow.warm_up_prompt_memo)
+        )
+
+
+@app.on_event("startup")
+async def warm_up_renderer():
+    """預先啟動報告渲染 worker（字體註冊與樣式建立不落在第一個報告上）"""
+    if Config.REPORT_RENDER_PREWARM:
+        artifact_renderer.warm_up()
+
+
+@app.on_event("startup")
+async def sync_report_index():
+    """在背景補建 reports/ 中尚未索引的報告（之後由 ReportGeneratorAgent 增量更新）"""
+    index = get_report_index()
+    if index is not None:
+        app.state.report_index_sync = asyncio.create_task(
+            blocking_executor.run(index.sync_directory, Config.REPORTS_DIR)
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """關閉阻塞階段執行緒池、報告渲染池與共用的 OpenAI 連線池"""
+    blocking_executor.shutdown(wait=False)
+    artifact_renderer.shutdown(wait=False)
+    await aclose_openai_clients()
+
+
 @app.get("/health")
 async def health_check():
     """健康檢查端點"""
     return {
         "status": "healthy",
         "service": "SEA News Alert API",
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "executor": blocking_executor.stats(),
+        "renderer": artifact_renderer.stats(),
+        "openai_pool": pool_stats.snapshot(),
+        "prompt_parser": rule_prompt_parser.stats(),
+        "prompt_memo": workflow.prompt_memo.stats() if workflow.prompt_memo else None
     }
 
 
@@ -0,0 +1,57 @@
+"""
+報告路由
+列出與全文搜尋已產生的報告（查詢報告索引，不掃描 reports/ 目錄）
+"""
+from fastapi import APIRouter, HTTPException, Query, Response
+from typing import List, Optional
+from utils.report_index import get_report_index
+from ..services.executor import blocking_executor
+
+router = APIRouter(prefix="/api/reports", tags=["reports"])
+
+
+def _index():
+    index = get_report_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Report index is disabled")
+    return index
+
+
+@router.get("", response_model=List[dict])
+async def list_reports(
+    response: Response,
+    q: Optional[str] = Query(default=None, description="全文搜尋關鍵字（未提供時依生成時間列出）"),
+    page: int = Query(default=1, ge=1, description="頁碼（從 1 開始）"),
+    page_size: int = Query(default=20, ge=1, le=100, description="每頁報告數")
+):
+    """
+    列出報告，或以 q 全文搜尋報告與其新聞
+
+    回傳 AIReport 格式的列表，符合的總數放在 X-Total-Count 標頭。
+    """
+    index = _index()
+    offset = (page - 1) * page_size
+    if q and q.strip():
+        total, reports = await blocking_executor.run(index.search, q, page_size, offset)
+    else:
+        total, reports = await blocking_executor.run(index.list, page_size, offset)
+    response.headers["X-Total-Count"] = str(total)
+    return reports
+
+
+@router.get("/search", response_model=List[dict])
+async def search_reports(
+    response: Response,
+    q: str = Query(..., min_length=1, description="全文搜尋關鍵字（中文以兩字詞比對，英文以字首比對）"),
+    page: int = Query(default=1, ge=1, description="頁碼（從 1 開始）"),
+    page_size: int = Query(default=20, ge=1, le=100, description="每頁報告數")
+):
+    """
+    全文搜尋報告與其新聞（依相關性排序）
+
+    每份報告附上 matches（最多 3 則符合的新聞），符合的報告總數放在 X-Total-Count 標頭。
+    """
+    index = _index()
+    total, reports = await blocking_executor.run(index.search, q, page_size, (page - 1) * page_size)
+    response.headers["X-Total-Count"] = str(total)
+    return reports
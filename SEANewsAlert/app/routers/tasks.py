@@ -2,10 +2,12 @@
 任務路由
 處理新聞報告任務的 API 端點
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from ..services.progress import task_manager
+from typing import AsyncIterator, Optional
+from config import Config
+from ..services.progress import TERMINAL_STATUSES, task_manager
 from ..services.workflow import workflow
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
@@ -97,3 +99,56 @@ async def get_task_status(task_id: str):
         raise HTTPException(status_code=404, detail="Task not found")
     
     return TaskStatusResponse(**task)
+
+
+async def _task_event_stream(request: Request, task_id: str, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    """依序送出任務事件，沒有事件時送出心跳註解；任務結束或客戶端斷線後停止"""
+    subscription = task_manager.events.subscribe(task_id, last_event_id)
+    try:
+        # 斷線後 EventSource 在 3 秒後帶著 Last-Event-ID 重新連線
+        yield "retry: 3000\n\n"
+        # 任務已結束且沒有需要補送的事件（例如收到結束事件前斷線後重連）
+        if subscription.queue.empty() and task_manager.get_task(task_id)["status"] in TERMINAL_STATUSES:
+            yield "event: end\ndata: {}\n\n"
+            return
+        while True:
+            event = await subscription.get(timeout=Config.TASK_EVENTS_HEARTBEAT)
+            if event is None:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+            yield event.encode()
+            if event.data["status"] in TERMINAL_STATUSES and subscription.queue.empty():
+                yield "event: end\ndata: {}\n\n"
+                break
+    finally:
+        subscription.close()
+
+
+@router.get("/{task_id}/events")
+async def stream_task_events(
+    request: Request,
+    task_id: str,
+    last_event_id: Optional[str] = Header(default=None)
+):
+    """
+    以 Server-Sent Events 推送任務狀態（取代輪詢 GET /api/tasks/{task_id}）
+    
+    - 每個 `progress` 事件的 data 與 GET /api/tasks/{task_id} 的回應相同，id 為任務內遞增的事件序號
+    - 重新連線時帶上 **Last-Event-ID** 會補送之後的事件（超出保留範圍時送出最新狀態）
+    - 任務成功或失敗後送出 `end` 事件並結束連線
+    """
+    if not task_manager.get_task(task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    try:
+        resume_from = int(last_event_id) if last_event_id else None
+    except ValueError:
+        resume_from = None
+    
+    return StreamingResponse(
+        _task_event_stream(request, task_id, resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,123 @@
+"""
+任務事件分送服務
+TaskProgress 每次更新任務狀態時發布一個事件（完整的 API 狀態快照），
+分送給訂閱該任務的 SSE 連線；事件帶有每個任務遞增的 ID，保留最近幾筆供 Last-Event-ID 續傳。
+
+工作流程階段在執行緒池中執行，發布端透過 loop.call_soon_threadsafe 把事件放進
+每個訂閱者所屬事件迴圈的 asyncio.Queue。
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional
+import asyncio
+import json
+import threading
+
+from config import Config
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    """一筆任務事件"""
+    id: int
+    data: Dict[str, Any]
+
+    def encode(self, event: str = "progress") -> str:
+        """編碼為 SSE 訊息"""
+        return f"id: {self.id}\nevent: {event}\ndata: {json.dumps(self.data, ensure_ascii=False)}\n\n"
+
+
+class TaskSubscription:
+    """單一 SSE 連線對某任務的訂閱（在建立它的事件迴圈中讀取）"""
+
+    def __init__(self, broker: "TaskEventBroker", task_id: str, loop: asyncio.AbstractEventLoop):
+        self.broker = broker
+        self.task_id = task_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[TaskEvent]" = asyncio.Queue()
+
+    def deliver(self, event: TaskEvent) -> bool:
+        """由任何執行緒投遞事件；事件迴圈已關閉時回傳 False"""
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+            return True
+        except RuntimeError:
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[TaskEvent]:
+        """等待下一筆事件，逾時回傳 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class TaskEventBroker:
+    """以任務為單位的事件分送"""
+
+    def __init__(self, history: int = None):
+        """
+        Args:
+            history: 每個任務保留的最近事件數（預設使用 Config.TASK_EVENTS_HISTORY）
+        """
+        self.history = history or Config.TASK_EVENTS_HISTORY
+        self._events: Dict[str, Deque[TaskEvent]] = {}
+        self._next_id: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[TaskSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, task_id: str, data: Dict[str, Any]) -> TaskEvent:
+        """發布事件並投遞給目前的訂閱者"""
+        with self._lock:
+            event_id = self._next_id.get(task_id, 0) + 1
+            self._next_id[task_id] = event_id
+            event = TaskEvent(event_id, data)
+            self._events.setdefault(task_id, deque(maxlen=self.history)).append(event)
+            subscribers = self._subscribers.get(task_id, [])
+            closed = [subscription for subscription in subscribers if not subscription.deliver(event)]
+            for subscription in closed:
+                subscribers.remove(subscription)
+        return event
+
+    def subscribe(self, task_id: str, last_event_id: Optional[int] = None) -> TaskSubscription:
+        """
+        訂閱任務事件（須在事件迴圈中呼叫）
+
+        Args:
+            task_id: 任務 ID
+            last_event_id: 客戶端最後收到的事件 ID；保留的事件足以銜接時補送之後的事件，
+                否則（或未提供時）先送出最新的狀態快照
+
+        Returns:
+            TaskSubscription: 已放入補送事件的訂閱
+        """
+        subscription = TaskSubscription(self, task_id, asyncio.get_running_loop())
+        with self._lock:
+            events = list(self._events.get(task_id, ()))
+            if events:
+                if last_event_id is not None and events[0].id <= last_event_id + 1:
+                    replay = [event for event in events if event.id > last_event_id]
+                else:
+                    replay = events[-1:]
+                for event in replay:
+                    subscription.queue.put_nowait(event)
+            self._subscribers.setdefault(task_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: TaskSubscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.task_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.task_id, None)
+
+    def subscriber_count(self, task_id: str = None) -> int:
+        """目前的訂閱數（未指定任務時為全部）"""
+        with self._lock:
+            if task_id is not None:
+                return len(self._subscribers.get(task_id, []))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
@@ -0,0 +1,88 @@
+"""
+阻塞階段執行器
+將同步的 Agent 呼叫（OpenAI 串流、ReportLab、SMTP）移出事件迴圈執行
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import functools
+import threading
+
+from config import Config
+
+
+class BlockingStageExecutor:
+    """阻塞階段執行器 - 以專用執行緒池執行同步工作"""
+
+    MODES = ("threaded", "inline")
+
+    def __init__(self, max_workers: int = None, mode: str = None):
+        """
+        初始化執行器
+
+        Args:
+            max_workers: 執行緒池大小（預設使用 Config.WORKFLOW_MAX_WORKERS）
+            mode: 執行模式，'threaded' 或 'inline'（預設使用 Config.WORKFLOW_EXECUTION_MODE）
+        """
+        self.max_workers = max(1, max_workers or Config.WORKFLOW_MAX_WORKERS)
+        self.mode = (mode or Config.WORKFLOW_EXECUTION_MODE).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"不支援的執行模式: {self.mode}（可用: {', '.join(self.MODES)}）")
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """延遲建立執行緒池（第一次使用時才建立）"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="workflow-stage"
+                )
+            return self._pool
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        執行一個阻塞函數並等待結果
+
+        Args:
+            func: 同步函數
+            *args, **kwargs: 傳遞給函數的參數
+
+        Returns:
+            Any: 函數回傳值
+        """
+        if self.mode == "inline":
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+
+        with self._lock:
+            self._active += 1
+        try:
+            return await loop.run_in_executor(self._get_pool(), call)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def stats(self) -> dict:
+        """回傳執行器狀態"""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "active": self._active,
+        }
+
+    def shutdown(self, wait: bool = True):
+        """關閉執行緒池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+# 全域阻塞階段執行器實例
+blocking_executor = BlockingStageExecutor()
@@ -5,8 +5,12 @@
 from typing import Dict, Optional, Any
 from datetime import datetime
 from enum import Enum
+import threading
 import uuid
 
+from utils.progress_reporter import ProgressReporter
+from .events import TaskEventBroker
+
 
 class TaskStatus(str, Enum):
     """任務狀態"""
@@ -16,12 +20,21 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
 
 
+# get_task 回傳（並透過事件推送）的欄位；其他欄位的更新不發布事件
+PUBLIC_FIELDS = ("task_id", "status", "progress", "error", "artifacts", "current_step", "step_message")
+TERMINAL_STATUSES = (TaskStatus.SUCCEEDED, TaskStatus.FAILED)
+
+
 class TaskProgress:
     """任務進度管理"""
     
     def __init__(self):
         """初始化任務進度管理器"""
         self._tasks: Dict[str, Dict[str, Any]] = {}
+        # 工作流程階段在執行緒池中執行，更新可能來自多個執行緒
+        self._lock = threading.RLock()
+        # 狀態變更推送給 SSE 連線（GET /api/tasks/{task_id}/events）
+        self.events = TaskEventBroker()
     
     def create_task(self, user_prompt: str, email: str, language: str = "English", 
                    time_range: str = "最近 7 天內", count_hint: str = "5-10篇") -> str:
@@ -40,7 +53,7 @@ class TaskProgress:
         """
         task_id = str(uuid.uuid4())
         
-        self._tasks[task_id] = {
+        task = {
             "task_id": task_id,
             "status": TaskStatus.QUEUED,
             "progress": 0,
@@ -59,6 +72,9 @@ class TaskProgress:
             "current_step": None,
             "step_message": None
         }
+        with self._lock:
+            self._tasks[task_id] = task
+            self.events.publish(task_id, self._public(task))
         
         return task_id
     
@@ -75,17 +91,15 @@ class TaskProgress:
         task = self._tasks.get(task_id)
         if task:
             # 返回用於 API 的簡化版本
-            return {
-                "task_id": task["task_id"],
-                "status": task["status"],
-                "progress": task["progress"],
-                "error": task["error"],
-                "artifacts": task["artifacts"],
-                "current_step": task.get("current_step"),
-                "step_message": task.get("step_message")
-            }
+            return self._public(task)
         return None
     
+    @staticmethod
+    def _public(task: Dict[str, Any]) -> Dict[str, Any]:
+        public = {field: task.get(field) for field in PUBLIC_FIELDS}
+        public["artifacts"] = dict(task["artifacts"])
+        return public
+    
     def update_task(self, task_id: str, **kwargs):
         """
         更新任務狀態
@@ -94,9 +108,12 @@ class TaskProgress:
             task_id: 任務 ID
             **kwargs: 要更新的欄位
         """
-        if task_id in self._tasks:
-            self._tasks[task_id].update(kwargs)
-            self._tasks[task_id]["updated_at"] = datetime.now().isoformat()
+        with self._lock:
+            if task_id in self._tasks:
+                self._tasks[task_id].update(kwargs)
+                self._tasks[task_id]["updated_at"] = datetime.now().isoformat()
+                if any(field in PUBLIC_FIELDS for field in kwargs):
+                    self.events.publish(task_id, self._public(self._tasks[task_id]))
     
     def set_running(self, task_id: str, progress: int = 10):
         """設置任務為執行中"""
@@ -137,6 +154,29 @@ class TaskProgress:
     def get_task_details(self, task_id: str) -> Optional[Dict[str, Any]]:
         """獲取完整任務詳情（包含內部資訊）"""
         return self._tasks.get(task_id)
+    
+    def reporter(self, task_id: Optional[str], stage: str, interval: float = None) -> ProgressReporter:
+        """
+        建立合併式進度回報器（用於串流等高頻更新的迴圈）
+        
+        Args:
+            task_id: 任務 ID（None 時只輸出到 console）
+            stage: 階段名稱（統計數據依此彙總）
+            interval: 合併間隔秒數（預設使用 Config.PROGRESS_COALESCE_INTERVAL）
+        """
+        return ProgressReporter(self if task_id else None, task_id, stage, interval)
+    
+    def record_progress_stats(self, task_id: str, stage: str, stats: Dict[str, int]):
+        """累加某階段的進度回報統計（reported / published / coalesced）"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            stage_stats = task.setdefault("progress_stats", {}).setdefault(
+                stage, {"reported": 0, "published": 0, "coalesced": 0}
+            )
+            for key, value in stats.items():
+                stage_stats[key] = stage_stats.get(key, 0) + value
 
 
 # 全域任務管理器實例
@@ -0,0 +1,338 @@
+"""
+報告渲染服務
+PDF 與 Excel 只共用基礎文件名，因此同時渲染：
+ReportLab 排版是受 GIL 限制的 CPU 工作，預設交給行程池在多核心上平行執行。
+行程池的 worker 在啟動時註冊中文字體並建立 ParagraphStyle，之後只處理渲染工作。
+"""
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+from config import Config
+from utils.news_model import NewsBatch
+from utils.progress_reporter import ProgressReporter
+
+REPORT_TITLE = "東南亞金融新聞報告"
+ARTIFACT_FORMATS = ("pdf", "xlsx")
+
+# 子行程內的 ReportGeneratorAgent（每個 worker 只初始化一次字體與樣式）
+_worker_agent = None
+
+
+def artifact_basename(task_id: str, created_at: Optional[str] = None) -> str:
+    """
+    由任務決定報告的基礎文件名（與渲染完成的時間無關，所有格式共用）
+
+    Args:
+        task_id: 任務 ID
+        created_at: 任務建立時間（ISO 格式），未提供時使用目前時間
+
+    Returns:
+        str: 不含副檔名的文件名，例如 東南亞金融新聞報告_20250101_093000_1a2b3c4d
+    """
+    created = datetime.fromisoformat(created_at) if created_at else datetime.now()
+    return f"{REPORT_TITLE}_{created.strftime('%Y%m%d_%H%M%S')}_{task_id[:8]}"
+
+
+def _get_worker_agent():
+    global _worker_agent
+    if _worker_agent is None:
+        from agents.report_agent import ReportGeneratorAgent
+        _worker_agent = ReportGeneratorAgent()
+    return _worker_agent
+
+
+def _init_worker():
+    """行程池 worker 的啟動函數：註冊字體、建立樣式（每個 worker 只執行一次）"""
+    agent = _get_worker_agent()
+    print(f"🖨️ 渲染 worker {os.getpid()} 已就緒（字體: {agent.chinese_font}）")
+
+
+def _worker_ready() -> int:
+    """預熱用的空工作，回傳 worker 的 PID"""
+    return os.getpid()
+
+
+def render_artifact(fmt: str, content: Any, filename: str) -> Tuple[str, float, float]:
+    """
+    在行程池的 worker 中渲染一種格式（模組層級函數，可被 pickle）
+
+    Args:
+        fmt: 'pdf' 或 'xlsx'
+        content: PDF 為 Markdown 文字，Excel 為結構化新聞批次（NewsBatch 以欄位列表 pickle，傳給 worker 的成本低）
+        filename: 輸出文件名
+
+    Returns:
+        Tuple[str, float, float]: 輸出路徑、渲染秒數與開始渲染的時間戳（用於計算排隊時間）
+    """
+    started_at = time.time()
+    agent = _get_worker_agent()
+    start = time.perf_counter()
+    if fmt == "pdf":
+        path = agent.generate_pdf(content, filename)
+    else:
+        path = agent.generate_excel(content, filename)
+    return str(path), time.perf_counter() - start, started_at
+
+
+def _summary(samples: Sequence[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class RenderMetrics:
+    """
+    渲染工作統計：排隊深度、排隊時間與各格式的渲染時間
+
+    排隊深度以「已送出但尚未完成的工作數」減去 worker 數估算。
+    """
+
+    def __init__(self, window: int = 200):
+        """
+        Args:
+            window: 每種統計保留的最近樣本數
+        """
+        self._lock = threading.Lock()
+        self._window = window
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self._render_seconds: Dict[str, Deque[float]] = {}
+        self._queue_waits: Deque[float] = deque(maxlen=window)
+
+    def submitted(self):
+        with self._lock:
+            self.pending += 1
+
+    def finished(self, fmt: str, render_seconds: float, queue_wait: float):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+            self._render_seconds.setdefault(fmt, deque(maxlen=self._window)).append(render_seconds)
+            self._queue_waits.append(max(0.0, queue_wait))
+
+    def errored(self):
+        with self._lock:
+            self.pending -= 1
+            self.failed += 1
+
+    def snapshot(self, max_workers: int) -> Dict[str, Any]:
+        """回傳渲染統計"""
+        with self._lock:
+            return {
+                "pending": self.pending,
+                "queue_depth": max(0, self.pending - max_workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "queue_wait_seconds": _summary(self._queue_waits),
+                "render_seconds": {fmt: _summary(samples) for fmt, samples in self._render_seconds.items()},
+            }
+
+
+class ArtifactRenderer:
+    """報告渲染器 - 同時產生 PDF 與 Excel"""
+
+    MODES = ("process", "threaded", "inline")
+
+    def __init__(self, max_workers: int = None, mode: str = None):
+        """
+        初始化渲染器
+
+        Args:
+            max_workers: 行程池／執行緒池大小（預設使用 Config.REPORT_RENDER_WORKERS）
+            mode: 'process'（行程池）、'threaded'（執行緒池）或 'inline'（依序執行，僅供除錯）
+        """
+        self.max_workers = max(1, max_workers or Config.REPORT_RENDER_WORKERS)
+        self.mode = (mode or Config.REPORT_RENDER_MODE).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"不支援的渲染模式: {self.mode}（可用: {', '.join(self.MODES)}）")
+
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._active = 0
+        self.rendered = 0
+        self.metrics = RenderMetrics()
+
+    def _get_pool(self) -> Executor:
+        """延遲建立池（第一次渲染時才建立）"""
+        with self._lock:
+            if self._pool is None:
+                if self.mode == "process":
+                    # spawn：服務本身有多個執行緒，fork 可能複製到被持有的鎖
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="report-render"
+                    )
+            return self._pool
+
+    def _reset_pool(self):
+        """行程池損壞（worker 異常結束）時丟棄，下次渲染重新建立"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def warm_up(self, wait: bool = False) -> List[int]:
+        """
+        預先啟動所有 worker（行程池模式），讓字體註冊與樣式建立不落在第一個報告上
+
+        Args:
+            wait: 是否等待所有 worker 就緒
+
+        Returns:
+            List[int]: wait=True 時回傳就緒 worker 的 PID，否則為空列表
+        """
+        if self.mode != "process":
+            return []
+        pool = self._get_pool()
+        futures = [pool.submit(_worker_ready) for _ in range(self.max_workers)]
+        if not wait:
+            return []
+        return sorted({future.result() for future in futures})
+
+    async def _render_one(self, report_agent, fmt: str, content: Any, filename: str,
+                          progress: Optional[ProgressReporter]) -> Tuple[Path, float]:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self.metrics.submitted()
+        try:
+            if self.mode == "process":
+                try:
+                    path, seconds, started_at = await loop.run_in_executor(
+                        self._get_pool(), render_artifact, fmt, content, filename
+                    )
+                except BrokenProcessPool:
+                    self._reset_pool()
+                    raise
+            else:
+                generate = report_agent.generate_pdf if fmt == "pdf" else report_agent.generate_excel
+
+                def timed():
+                    started = time.time()
+                    start = time.perf_counter()
+                    result = generate(content, filename, progress=progress)
+                    return result, time.perf_counter() - start, started
+
+                if self.mode == "inline":
+                    path, seconds, started_at = timed()
+                else:
+                    path, seconds, started_at = await loop.run_in_executor(self._get_pool(), timed)
+        except Exception:
+            self.metrics.errored()
+            raise
+        self.metrics.finished(fmt, seconds, started_at - submitted_at)
+        return Path(path), seconds
+
+    async def render_pdf(self, markdown_content: str, filename: str, report_agent=None) -> Path:
+        """
+        渲染單一 Markdown 報告為 PDF
+
+        Args:
+            markdown_content: Markdown 報告
+            filename: 輸出文件名
+            report_agent: 執行緒／inline 模式使用的 ReportGeneratorAgent
+
+        Returns:
+            Path: PDF 路徑
+        """
+        path, _ = await self._render_one(report_agent, "pdf", markdown_content, filename, None)
+        return path
+
+    async def render(
+        self,
+        report_agent,
+        markdown_content: str,
+        news_data: NewsBatch,
+        basename: str,
+        formats: Sequence[str] = ARTIFACT_FORMATS,
+        progress: Optional[ProgressReporter] = None
+    ) -> Tuple[Dict[str, Path], Dict[str, float]]:
+        """
+        同時渲染所有要求的報告格式
+
+        Args:
+            report_agent: 執行緒／inline 模式使用的 ReportGeneratorAgent（行程池模式由 worker 自行建立）
+            markdown_content: PDF 使用的 Markdown 報告
+            news_data: Excel 使用的結構化新聞批次（也接受 dict 列表）
+            basename: 所有格式共用的基礎文件名（見 artifact_basename）
+            formats: 要產生的格式
+            progress: 可選的合併式進度回報器
+
+        Returns:
+            Tuple[Dict[str, Path], Dict[str, float]]: 各格式的輸出路徑，以及各格式與總計（total）的渲染秒數
+        """
+        unknown = [fmt for fmt in formats if fmt not in ARTIFACT_FORMATS]
+        if unknown:
+            raise ValueError(f"不支援的報告格式: {', '.join(unknown)}")
+
+        contents = {"pdf": markdown_content, "xlsx": news_data}
+        paths: Dict[str, Path] = {}
+        timings: Dict[str, float] = {}
+
+        async def render_format(fmt: str):
+            path, seconds = await self._render_one(
+                report_agent, fmt, contents[fmt], f"{basename}.{fmt}", progress
+            )
+            paths[fmt] = path
+            timings[fmt] = round(seconds, 3)
+            if progress:
+                progress.report(None, "generating_report", f"✅ {fmt.upper()} 已完成（{seconds:.2f} 秒）: {path.name}")
+
+        with self._lock:
+            self._active += 1
+        start = time.perf_counter()
+        try:
+            if self.mode == "inline":
+                for fmt in formats:
+                    await render_format(fmt)
+            else:
+                await asyncio.gather(*(render_format(fmt) for fmt in formats))
+        finally:
+            with self._lock:
+                self._active -= 1
+        timings["total"] = round(time.perf_counter() - start, 3)
+        with self._lock:
+            self.rendered += 1
+        return paths, timings
+
+    def stats(self) -> dict:
+        """回傳渲染器狀態"""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "active": self._active,
+            "rendered": self.rendered,
+            **self.metrics.snapshot(self.max_workers),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """關閉行程池／執行緒池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+# 全域報告渲染器實例
+artifact_renderer = ArtifactRenderer()
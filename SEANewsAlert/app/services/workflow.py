@@ -11,12 +11,21 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from agents import ResearchAgent, AnalystAgent, ReportGeneratorAgent, EmailAgent
-from typing import Dict, Any
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from config import Config
+from utils.article_store import DEFAULT_ARTICLE_COUNT, SearchPlan, create_article_store, merge_articles
+from utils.entity_tagger import country_tagger
+from utils.helpers import parse_article_count
+from utils.news_dedup import create_news_deduplicator
+from utils.openai_client import openai_chat_client_kwargs
+from utils.prompt_memo import create_prompt_memo
+from utils.prompt_parser import rule_prompt_parser
 from .progress import task_manager, TaskStatus
+from .executor import blocking_executor
+from .renderer import artifact_renderer, artifact_basename
 import json
 import traceback
 
@@ -32,11 +41,46 @@ class NewsReportWorkflow:
         self.analyst_agent = AnalystAgent()
         self.report_agent = ReportGeneratorAgent()
         self.email_agent = EmailAgent()
+        # PDF 與 Excel 同時渲染（預設在行程池中）
+        self.artifact_renderer = artifact_renderer
+        # LLM 需求解析結果快取（PROMPT_MEMO_ENABLED=false 時為 None）
+        self.prompt_memo = create_prompt_memo()
+        # 搜尋與分析之間的近似重複新聞合併（NEWS_DEDUP_BACKEND=off 時為 None）
+        self.news_deduplicator = create_news_deduplicator()
+        # 保存每次搜尋的新聞，相同主題的新需求只即時搜尋尚未涵蓋的天數（ARTICLE_STORE_ENABLED=false 時為 None）
+        self.article_store = create_article_store()
         
         print("✅ 所有 Agents 初始化完成")
     
+    def _fast_parse_prompt(self, task_id: str, user_prompt: str, language: str = None,
+                           time_range: str = None, count_hint: str = None) -> Optional[dict]:
+        """
+        以規則解析需求（不呼叫 LLM），並套用請求中的 language / time_range / count_hint
+        
+        Returns:
+            Optional[dict]: 解析結果；需求含糊或停用規則解析時回傳 None（改由 LLM 解析）
+        """
+        if not Config.PROMPT_RULE_PARSER:
+            return None
+        parsed = rule_prompt_parser.parse(user_prompt, language, time_range, count_hint)
+        if parsed:
+            task_manager.set_progress(
+                task_id, 20, "prompt_parsing",
+                f"⚡ 需求解析完成（規則）：主題='{parsed['keywords']}', 時間='{parsed['time_instruction']}', 數量='{parsed['num_instruction']}', 語言='{parsed['language']}'"
+            )
+        return parsed
+    
     def _parse_prompt(self, task_id: str, user_prompt: str) -> dict:
-        """使用 LLM 解析用戶 prompt，提取關鍵字、時間指令和數量指令。"""
+        """使用 LLM 解析用戶 prompt，提取關鍵字、時間指令和數量指令（相同的 prompt 直接使用快取結果）。"""
+        if self.prompt_memo is not None:
+            cached = self.prompt_memo.get(user_prompt)
+            if cached:
+                task_manager.set_progress(
+                    task_id, 20, "prompt_parsing",
+                    f"♻️ 需求解析完成（快取）：主題='{cached['keywords']}', 時間='{cached['time_instruction']}', 數量='{cached['num_instruction']}', 語言='{cached['language']}'"
+                )
+                return {**cached, "parser": "memo"}
+        
         try:
             task_manager.set_progress(task_id, 15, "prompt_parsing", "🧠 正在解析您的需求...")
             
@@ -45,7 +89,8 @@ class NewsReportWorkflow:
                 name="需求解析專家",
                 model=OpenAIChat(
                     id=Config.OPENAI_MODEL,
-                    api_key=Config.OPENAI_API_KEY
+                    api_key=Config.OPENAI_API_KEY,
+                    **openai_chat_client_kwargs()
                 ),
                 description="專門解析使用者需求的專家",
                 instructions=[
@@ -99,12 +144,16 @@ class NewsReportWorkflow:
                     f"✅ 需求解析完成：主題='{keywords}', 時間='{time_instruction}', 數量='{num_instruction}', 語言='{language}'"
                 )
                 
-                return {
+                parsed = {
                     "keywords": keywords,
                     "time_instruction": time_instruction,
                     "num_instruction": num_instruction,
-                    "language": language
+                    "language": language,
+                    "parser": "llm"
                 }
+                if self.prompt_memo is not None:
+                    self.prompt_memo.set(user_prompt, parsed)
+                return parsed
 
         except Exception as e:
             task_manager.set_progress(
@@ -117,13 +166,159 @@ class NewsReportWorkflow:
             "keywords": user_prompt,
             "time_instruction": "最近7天內",
             "num_instruction": "5-10篇",
-            "language": "English"
+            "language": "English",
+            "parser": "fallback"
+        }
+    
+    def warm_up_prompt_memo(self, path: Path = None) -> int:
+        """
+        從檔案預熱需求解析快取（只有提示詞的項目會呼叫 LLM 解析）
+        
+        Args:
+            path: 預熱檔案路徑（預設使用 Config.PROMPT_MEMO_WARMUP_PATH）
+            
+        Returns:
+            int: 寫入快取的筆數
+        """
+        path = Path(path or Config.PROMPT_MEMO_WARMUP_PATH or "")
+        if self.prompt_memo is None or not path.is_file():
+            return 0
+        count = self.prompt_memo.warm_up(path, lambda prompt: self._parse_prompt(None, prompt))
+        print(f"♻️ 需求解析快取預熱完成：{count} 筆")
+        return count
+    
+    def _plan_search(self, task_id: str, parsed_prompt: dict) -> Optional[SearchPlan]:
+        """
+        由文章庫規劃搜尋：時間範圍內已搜尋過的部分使用文章庫，即時搜尋只涵蓋缺口
+        
+        Returns:
+            Optional[SearchPlan]: 搜尋計畫；未啟用文章庫或查詢失敗時回傳 None（完整即時搜尋）
+        """
+        if self.article_store is None:
+            return None
+        try:
+            plan = self.article_store.plan(
+                parsed_prompt['keywords'], parsed_prompt['time_instruction'], parsed_prompt['language'],
+                max_articles=parse_article_count(parsed_prompt.get('num_instruction')) or DEFAULT_ARTICLE_COUNT
+            )
+        except Exception as e:
+            print(f"⚠️ 文章庫查詢失敗，改為完整搜尋: {str(e)}")
+            return None
+        task_manager.update_task(task_id, article_store={
+            "stored": len(plan.stored),
+            "live_time_instruction": plan.live_time_instruction
+        })
+        if not plan.stored:
+            return plan
+        if not plan.needs_search:
+            message = f"📚 文章庫已有 {len(plan.stored)} 則「{parsed_prompt['keywords']}」的新聞（今天已搜尋過），略過即時搜尋"
+        elif plan.live_time_instruction != parsed_prompt['time_instruction']:
+            message = f"📚 文章庫已有 {len(plan.stored)} 則時間範圍內的新聞，即時搜尋只涵蓋{plan.live_time_instruction}"
+        else:
+            return plan
+        task_manager.set_progress(task_id, 26, "searching", message)
+        return plan
+    
+    @staticmethod
+    def _stored_search_results(query: str, stored: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """以文章庫中的新聞組成搜尋結果（格式與 ResearchAgent 的回傳相同）"""
+        results = merge_articles([], stored)
+        content = "```json\n" + json.dumps({
+            "search_query": query,
+            "search_date": datetime.now().strftime('%Y-%m-%d'),
+            "results": results
+        }, ensure_ascii=False, indent=2) + "\n```"
+        return {
+            "status": "success",
+            "query": query,
+            "content": content,
+            "sources": [{"title": item["title"], "url": item["url"]} for item in results if item["url"]],
+            "results": results,
+            "web_search_count": 0,
+            "from_store": True
         }
     
+    def _store_articles(self, parsed_prompt: dict, plan: Optional[SearchPlan],
+                        search_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        將即時搜尋的新聞寫入文章庫並記錄已涵蓋的時間範圍，再併入文章庫中時間範圍內的新聞
+        
+        Returns:
+            Dict[str, Any]: results 與 content 中的 JSON 區塊包含文章庫新聞的搜尋結果
+        """
+        if self.article_store is None or plan is None or search_results.get("from_store"):
+            return search_results
+        items = AnalystAgent._search_items(search_results)
+        try:
+            self.article_store.ingest(
+                items, parsed_prompt['keywords'], parsed_prompt['language'], classify_country=country_tagger.tag
+            )
+            if plan.live_start:
+                self.article_store.record_coverage(
+                    parsed_prompt['keywords'], parsed_prompt['language'], plan.live_start, date.today().isoformat()
+                )
+        except Exception as e:
+            print(f"⚠️ 文章庫寫入失敗: {str(e)}")
+        if not plan.stored:
+            return search_results
+        merged = merge_articles(items, plan.stored, plan.max_articles)
+        content = ResearchAgent._replace_results_json(search_results.get("content", ""), merged)
+        return {**search_results, "results": merged, "content": content}
+    
+    def _attach_translations(self, structured_news):
+        """以分析結果的翻譯標題與國家更新文章庫（失敗不影響任務）"""
+        if self.article_store is None:
+            return
+        try:
+            self.article_store.attach_translations(structured_news)
+        except Exception as e:
+            print(f"⚠️ 文章庫更新翻譯標題失敗: {str(e)}")
+    
+    def _deduplicate(self, task_id: str, search_results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        合併搜尋結果中近似重複的新聞，並標註或移除近期報告中出現過的新聞
+        
+        Returns:
+            Dict[str, Any]: results 與 content 中的 JSON 區塊皆替換為去重後新聞的搜尋結果；
+                去重失敗時原樣回傳（不影響任務）
+        """
+        if self.news_deduplicator is None:
+            return search_results
+        items = AnalystAgent._search_items(search_results)
+        if not items:
+            return search_results
+        try:
+            kept, stats = self.news_deduplicator.deduplicate(items)
+        except Exception as e:
+            print(f"⚠️ 新聞去重失敗，改用未去重的搜尋結果: {str(e)}")
+            return search_results
+        task_manager.update_task(task_id, news_dedup=stats)
+        if stats["collapsed"] or stats["flagged"] or stats["suppressed"]:
+            message = f"🧹 新聞去重：{stats['input']} 則 → {stats['kept']} 則（合併 {stats['collapsed']} 則重複"
+            if stats["suppressed"]:
+                message += f"，移除 {stats['suppressed']} 則近期報告已出現的新聞"
+            if stats["flagged"]:
+                message += f"，{stats['flagged']} 則曾出現在近期報告"
+            task_manager.set_progress(task_id, 68, "searching", message + "）")
+        content = ResearchAgent._replace_results_json(search_results.get("content", ""), kept)
+        return {**search_results, "results": kept, "content": content, "dedup": stats}
+    
+    def _remember_news(self, task_id: str, search_results: Dict[str, Any]):
+        """將本次報告的新聞加入指紋索引（失敗不影響任務）"""
+        if self.news_deduplicator is None:
+            return
+        try:
+            self.news_deduplicator.remember(search_results.get("results") or [], report=task_id)
+        except Exception as e:
+            print(f"⚠️ 新聞指紋寫入失敗: {str(e)}")
+    
     async def execute_task(self, task_id: str):
         """
         執行完整的新聞報告生成流程（背景任務）
         
+        所有同步阻塞的階段（LLM 解析、串流搜尋、分析、報告渲染、SMTP）
+        都交由 blocking_executor 執行，避免凍結事件迴圈與狀態輪詢。
+        
         Args:
             task_id: 任務 ID
         """
@@ -145,24 +340,45 @@ class NewsReportWorkflow:
             # ============ 步驟 1: 解析 Prompt & Web Search ============
             task_manager.set_progress(task_id, 15, "parsing", "🧠 正在解析您的研究需求...")
             
-            # 解析用戶 Prompt
-            parsed_prompt = self._parse_prompt(task_id, user_prompt)
+            # 解析用戶 Prompt：常見寫法直接以規則解析，含糊時才呼叫 LLM
+            parsed_prompt = self._fast_parse_prompt(task_id, user_prompt, language, time_range, count_hint)
+            if parsed_prompt is None:
+                parsed_prompt = await blocking_executor.run(self._parse_prompt, task_id, user_prompt)
+            task_manager.update_task(task_id, prompt_parser=parsed_prompt.get("parser"))
             
             task_manager.set_progress(
                 task_id, 25, "searching",
                 f"🔍 正在搜尋關於「{parsed_prompt['keywords']}」的新聞({parsed_prompt['time_instruction']}, {parsed_prompt['num_instruction']}, {parsed_prompt['language']})..."
             )
             
-            search_results = self.research_agent.search(
+            search_kwargs = dict(
                 query=parsed_prompt['keywords'],
                 time_instruction=parsed_prompt['time_instruction'],
                 num_instruction=parsed_prompt['num_instruction'],
                 language=parsed_prompt['language'],
                 task_id=task_id  # ✅ 傳遞 task_id 以支持前端即時進度更新
             )
+            # 文章庫已涵蓋的天數不再即時搜尋，只搜尋之後的缺口
+            plan = await blocking_executor.run(self._plan_search, task_id, parsed_prompt)
+            if plan is not None and plan.needs_search:
+                search_kwargs["time_instruction"] = plan.live_time_instruction
+            if plan is not None and not plan.needs_search:
+                # 今天已搜尋過相同主題：直接使用文章庫中的新聞
+                search_results = self._stored_search_results(parsed_prompt['keywords'], plan.stored)
+            elif Config.RESEARCH_FANOUT_MODE in ("country", "language"):
+                # 拆成多個子搜尋平行執行並合併結果
+                search_results = await self.research_agent.fanout_search(
+                    split_by=Config.RESEARCH_FANOUT_MODE, **search_kwargs
+                )
+            elif Config.RESEARCH_ASYNC_STREAMING:
+                # 直接在事件迴圈上消費串流，不佔用執行緒池
+                search_results = await self.research_agent.asearch(**search_kwargs)
+            else:
+                search_results = await blocking_executor.run(self.research_agent.search, **search_kwargs)
             
             if search_results.get("status") == "error":
                 raise Exception(f"搜尋失敗: {search_results.get('error')}")
+            search_results = await blocking_executor.run(self._store_articles, parsed_prompt, plan, search_results)
             
             # ✅ 顯示找到的來源（sources 陣列）
             sources = search_results.get("sources", [])
@@ -174,35 +390,57 @@ class NewsReportWorkflow:
             
             task_manager.set_progress(task_id, 67, "searching", sources_summary)
             
-            # ============ 步驟 2: 資訊結構化 ============
-            task_manager.set_progress(task_id, 70, "analyzing", "📊 正在分析並結構化資訊...")
-            
-            markdown_report, structured_news = self.analyst_agent.analyze(search_results)
+            # 同一事件的多家報導合併成一則，近期報告出現過的新聞依設定標註或移除
+            search_results = await blocking_executor.run(self._deduplicate, task_id, search_results)
             
-            task_manager.set_progress(
-                task_id, 60, "analyzing",
-                f"✅ 資訊分析完成（共 {len(structured_news)} 則新聞）"
-            )
+            # ============ 步驟 2: 資訊結構化 ============
+            # 分析與報告階段的進度經由合併式回報器送出（進度只增不減）
+            with task_manager.reporter(task_id, "analyzing") as progress:
+                progress.report(70, "analyzing", "📊 正在分析並結構化資訊...", force=True)
+                
+                # chunked 分析模式逐次回報各批次的耗時與 token 數
+                analysis_chunks = []
+                markdown_report, structured_news = await blocking_executor.run(
+                    self.analyst_agent.analyze, search_results, progress=progress,
+                    on_chunk=analysis_chunks.append
+                )
+                if analysis_chunks:
+                    task_manager.update_task(task_id, analysis_chunks=analysis_chunks)
+                await blocking_executor.run(self._attach_translations, structured_news)
+                
+                progress.report(
+                    75, "analyzing",
+                    f"✅ 資訊分析完成（共 {len(structured_news)} 則新聞）",
+                    force=True
+                )
             
             # ============ 步驟 3: 生成 PDF 和 Excel 報告 ============
-            task_manager.set_progress(task_id, 65, "generating_report", "📄 正在生成 PDF 和 Excel 報告...")
-            
-            # 生成 PDF
-            pdf_path = self.report_agent.generate_pdf(markdown_report)
-            
-            # 生成 Excel（使用相同的基礎文件名）
-            excel_filename = pdf_path.stem + '.xlsx'
-            excel_path = self.report_agent.generate_excel(structured_news, excel_filename)
-            
-            task_manager.set_progress(
-                task_id, 80, "generating_report",
-                f"✅ 報告生成完成: {pdf_path.name} 和 {excel_path.name}"
-            )
+            with task_manager.reporter(task_id, "generating_report") as progress:
+                progress.report(76, "generating_report", "📄 正在生成 PDF 和 Excel 報告...", force=True)
+                
+                # PDF 與 Excel 只共用基礎文件名（由任務決定），因此同時渲染
+                artifacts, render_timings = await self.artifact_renderer.render(
+                    self.report_agent,
+                    markdown_report,
+                    structured_news,
+                    artifact_basename(task_id, task_details.get("created_at")),
+                    progress=progress
+                )
+                pdf_path, excel_path = artifacts["pdf"], artifacts["xlsx"]
+                task_manager.update_task(task_id, render_timings=render_timings)
+                await blocking_executor.run(self._remember_news, task_id, search_results)
+                
+                progress.report(
+                    80, "generating_report",
+                    f"✅ 報告生成完成: {pdf_path.name} 和 {excel_path.name}",
+                    force=True
+                )
             
             # ============ 步驟 4: 發送郵件 ============
             task_manager.set_progress(task_id, 85, "sending_email", "📧 正在發送郵件（含 PDF 和 Excel 附件）...")
             
-            email_success = self.email_agent.send_report(
+            email_success = await blocking_executor.run(
+                self.email_agent.send_report,
                 recipients=email,
                 pdf_path=pdf_path,
                 excel_path=excel_path
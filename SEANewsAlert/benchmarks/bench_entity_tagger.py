@@ -0,0 +1,114 @@
+"""
+新聞國家判斷基準測試
+比較舊的 AnalystAgent._extract_country（12 個關鍵字依序做子字串搜尋，回傳第一個命中）
+、以相同地名辭典逐別名做子字串計數的寫法，
+與地名辭典的 CountryTagger（逐則 tag() 與串接後一次掃描的 tag_many()）。
+新聞由十個東南亞國家的標題、來源與內文範本組成，並附上每則新聞的正確國家以比較準確率。
+
+用法：
+    python benchmarks/bench_entity_tagger.py [--items 1000] [--content-chars 1500] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from utils.entity_tagger import country_tagger
+
+# (正確國家, 標題, 來源, 內文片段)
+TEMPLATES = [
+    ("越南", "越南央行調降再融資利率", "VnExpress", "The State Bank of Vietnam cut rates; HOSE rallied in Ho Chi Minh City."),
+    ("越南", "胡志明市證券交易所成交值創新高", "Cafef", "VN-Index tăng mạnh, dòng tiền đổ vào cổ phiếu ngân hàng."),
+    ("泰國", "泰國央行維持利率不變", "Bangkok Post", "The Bank of Thailand kept its policy rate; the SET index slipped."),
+    ("泰國", "曼谷房地產市場回溫", "Techsauce", "Bangkok condo transfers rose as the baht weakened."),
+    ("新加坡", "新加坡金管局收緊加密規範", "The Straits Times", "MAS issued new rules; SGX-listed banks were flat."),
+    ("馬來西亞", "大馬國家銀行維持隔夜政策利率", "The Edge", "Bank Negara Malaysia held the OPR; the ringgit firmed in Kuala Lumpur."),
+    ("印尼", "印尼盾創兩年新低", "Reuters", "Bank Indonesia intervened as the rupiah fell; the JCI dropped in Jakarta."),
+    ("菲律賓", "菲律賓央行暗示降息", "Inquirer", "Bangko Sentral ng Pilipinas signalled easing; PSEi gained in Manila trading."),
+    ("柬埔寨", "柬埔寨國家銀行推動本幣化", "Khmer Times", "The National Bank of Cambodia promoted riel usage in Phnom Penh."),
+    ("緬甸", "緬甸央行調整匯率規定", "Myanmar Now", "The Central Bank of Myanmar revised kyat rules; Yangon traders reacted."),
+    ("寮國", "寮國通膨率回落", "Vientiane Times", "Laos inflation eased as the kip stabilised in Vientiane."),
+    ("汶萊", "汶萊主權基金擴大投資", "Borneo Bulletin", "Brunei's AMBD reported reserves; Bandar Seri Begawan officials commented."),
+]
+FILLER = "市場分析師表示，區域資金流向仍受美元走勢與利率預期影響，投資人宜留意後續數據。"
+
+
+def build_items(count: int, content_chars: int, seed: int = 7):
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        country, title, source, snippet = rng.choice(TEMPLATES)
+        filler = (FILLER * (content_chars // len(FILLER) + 1))[:max(0, content_chars - len(snippet))]
+        position = rng.randint(0, len(filler))
+        items.append((country, title, source, filler[:position] + snippet + filler[position:]))
+    return items
+
+
+def legacy_extract_country(title: str, source: str, summary: str) -> str:
+    """舊實作（改寫前的 AnalystAgent._extract_country）"""
+    text = f"{title} {source} {summary}".lower()
+    countries = {
+        'singapore': '新加坡', 'malaysia': '馬來西亞', 'thailand': '泰國', 'indonesia': '印尼',
+        'vietnam': '越南', 'philippines': '菲律賓', '新加坡': '新加坡', '馬來西亞': '馬來西亞',
+        '泰國': '泰國', '印尼': '印尼', '越南': '越南', '菲律賓': '菲律賓'
+    }
+    for key, value in countries.items():
+        if key in text:
+            return value
+    return '東南亞'
+
+
+def naive_gazetteer_tag(title: str, source: str, content: str) -> str:
+    """同樣的地名辭典，但每個別名各做一次子字串計數（不處理單字邊界與大小寫縮寫）"""
+    scores = {}
+    for weight, text in zip(country_tagger.FIELD_WEIGHTS, (title, source, content)):
+        text = text.lower()
+        for alias, entities in country_tagger.matcher.entities.items():
+            hits = text.count(alias)
+            if hits:
+                for entity in entities:
+                    scores[entity.country] = scores.get(entity.country, 0) + hits * weight
+    return max(scores, key=scores.get) if scores else country_tagger.default
+
+
+def timed(func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--content-chars", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    items = build_items(args.items, args.content_chars)
+    expected = [country for country, *_ in items]
+    records = [record for _, *record in items]
+
+    runs = [
+        ("legacy _extract_country", lambda: [legacy_extract_country(*record) for record in records]),
+        ("逐別名子字串計數", lambda: [naive_gazetteer_tag(*record) for record in records]),
+        ("CountryTagger.tag", lambda: [country_tagger.tag(*record) for record in records]),
+        ("CountryTagger.tag_many", lambda: country_tagger.tag_many(records)),
+    ]
+    print(f"{args.items} 則新聞，每則內文約 {args.content_chars} 字元")
+    print(f"{'實作':<26}{'總耗時':>12}{'每則':>12}{'準確率':>10}")
+    for name, func in runs:
+        seconds, result = timed(func, args.repeat)
+        accuracy = sum(a == b for a, b in zip(result, expected)) / len(expected)
+        print(f"{name:<26}{seconds * 1000:>10.1f}ms{seconds / len(records) * 1e6:>10.1f}µs{accuracy:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
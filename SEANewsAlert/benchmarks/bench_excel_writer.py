@@ -0,0 +1,74 @@
+"""
+Excel 輸出基準測試
+比較 pandas 模式（DataFrame + ExcelWriter + 逐格套用樣式）與 streaming 模式（write-only 逐列寫出）
+在 10 / 1,000 / 50,000 則新聞時的耗時與峰值記憶體配置（tracemalloc 會拖慢執行，因此耗時與記憶體分兩次量測）
+
+註：openpyxl 在安裝 lxml 時改用 C 實作的 XML 序列化，兩種模式都會明顯加快。
+
+用法：
+    python benchmarks/bench_excel_writer.py [--sizes 10 1000 50000] [--modes streaming pandas]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from utils.excel_writer import write_news_excel
+
+
+def news_items(count: int):
+    """逐筆產生新聞項目（streaming 模式不會一次持有全部資料）"""
+    for i in range(count):
+        yield {
+            "新聞標題（中文）": f"越南數位銀行用戶成長第 {i} 則",
+            "來源國家": ("越南", "泰國", "新加坡", "印尼")[i % 4],
+            "來源網站連結": f"https://vnexpress.net/fintech/article-{i}.html",
+            "發布日期": "2025-01-01",
+            "摘要": "數位支付交易量與用戶數同步成長，監管單位持續推動沙盒計畫。" * 2,
+            "重點分析": "利率調降有助於信貸成長；外資持續流入金融科技。",
+        }
+
+
+def measure(mode: str, count: int, directory: Path):
+    path = directory / f"bench_{mode}_{count}.xlsx"
+    start = time.perf_counter()
+    write_news_excel(path, news_items(count), mode=mode)
+    elapsed = time.perf_counter() - start
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    write_news_excel(path, news_items(count), mode=mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    path.unlink()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 50000])
+    parser.add_argument("--modes", nargs="+", default=["streaming", "pandas"])
+    args = parser.parse_args()
+
+    import openpyxl
+    print(f"openpyxl {openpyxl.__version__}，lxml: {'是' if openpyxl.LXML else '否'}")
+    print(f"{'列數':>8}{'模式':>12}{'耗時 (s)':>12}{'峰值配置 (MiB)':>18}{'檔案 (KiB)':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            for mode in args.modes:
+                try:
+                    elapsed, peak, size = measure(mode, count, Path(directory))
+                except ImportError as e:
+                    print(f"{count:>8}{mode:>12}  略過：{e}")
+                    continue
+                print(f"{count:>8}{mode:>12}{elapsed:>12.3f}{peak / 1024 / 1024:>18.1f}{size / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+分析報告結構化擷取基準測試
+比較舊的多段正則實作（整份報告 re.DOTALL 切分，每則新聞再執行多個含巢狀重複的搜尋）
+與逐行狀態機 utils.markdown_extract.extract_news。
+
+語料來自 tests/fixtures/analyst_markdown（真實格式、格式變化、缺少欄位），
+並以下列方式放大成不同規模：
+    repeat      重複語料中的新聞（新聞數成長）
+    blank_runs  每個欄位之後插入大量空白行（舊實作的 \\s* 前瞻在此退化為平方時間）
+    long_lines  摘要為單一超長行並夾雜未配對的 ** 與 [
+    crlf        repeat 的 CRLF 版本
+
+用法：
+    python benchmarks/bench_markdown_extract.py [--scales 1 4 16] [--repeat 3] [--skip-legacy]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from utils.markdown_extract import extract_news
+
+CORPUS_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "analyst_markdown"
+
+
+def load_corpus() -> str:
+    """合併語料中的所有報告"""
+    return "\n".join(path.read_text(encoding="utf-8") for path in sorted(CORPUS_DIR.glob("*.md")))
+
+
+def build_case(case: str, scale: int, corpus: str) -> str:
+    """依情境與規模產生報告"""
+    if case == "repeat":
+        return "\n".join([corpus] * (scale * 20))
+    if case == "crlf":
+        return "\r\n".join([corpus] * (scale * 20)).replace("\n", "\r\n")
+    if case == "blank_runs":
+        blank = "\n" * (scale * 2000)
+        return "\n".join([
+            "### 1. 空白行攻擊",
+            "- **摘要**：第一行" + blank + "仍是摘要",
+            "- **重點分析**：第一點" + blank + "仍是分析",
+        ])
+    if case == "long_lines":
+        noise = "** [未配對 *強調 _底線 " * (scale * 2000)
+        return "\n".join([
+            "### 1. 超長行",
+            "- **來源**：[" + noise,
+            "- **摘要**：" + noise,
+            "- **重點分析**：" + noise,
+        ])
+    raise ValueError(case)
+
+
+def legacy_extract(markdown_report: str) -> list:
+    """舊實作（AnalystAgent._extract_from_markdown 改寫前）"""
+    results = []
+    for title, content in re.findall(r'###\s+\d+\.\s+(.*?)\n(.*?)(?=###|\Z)', markdown_report, re.DOTALL):
+        source = url = date = summary = analysis = ''
+        source_match = re.search(r'\*\*來源\*\*[：:]\s*\[?(.*?)\]?\(?(https?://[^\s\)]+)', content)
+        if source_match:
+            source, url = source_match.group(1).strip(), source_match.group(2).strip()
+        else:
+            url_match = re.search(r'(https?://[^\s\)]+)', content)
+            if url_match:
+                url = url_match.group(1).strip()
+        date_match = re.search(r'\*\*日期\*\*[：:]\s*([^\n*]+)', content)
+        if date_match:
+            date = date_match.group(1).strip()
+        else:
+            date_match = (re.search(r'(\d{4}[-/\.]\d{1,2}[-/\.]\d{1,2})', content)
+                          or re.search(r'(\d{4}年\d{1,2}月\d{1,2}日)', content))
+            if date_match:
+                date = date_match.group(1)
+        summary_match = re.search(r'\*\*摘要\*\*[：:]\s*([^\n]*(?:\n(?!\s*[-\*]\s*\*\*)[^\n]*)*)', content, re.DOTALL)
+        if summary_match:
+            summary = summary_match.group(1).strip()
+        analysis_match = re.search(r'\*\*重點分析\*\*[：:]\s*([^\n]*(?:\n(?!\s*###|\s*##|\s*[-\*]\s*\*\*(?!.*分析))[^\n]*)*)', content, re.DOTALL)
+        if analysis_match:
+            analysis = analysis_match.group(1).strip()
+        results.append((title.strip(), source, url, date, summary, analysis))
+    return results
+
+
+def state_machine_extract(markdown_report: str) -> list:
+    return list(extract_news(markdown_report))
+
+
+def best_of(func, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="不執行舊實作（blank_runs 在大規模時非常慢）")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    implementations = [("state_machine", state_machine_extract)]
+    if not args.skip_legacy:
+        implementations.insert(0, ("legacy_regex", legacy_extract))
+
+    print(f"{'情境':<12}{'規模':>6}{'字元數':>12}" + "".join(f"{name:>18}" for name, _ in implementations))
+    for case in ("repeat", "crlf", "blank_runs", "long_lines"):
+        first = {}
+        for scale in args.scales:
+            text = build_case(case, scale, corpus)
+            row = f"{case:<12}{scale:>6}{len(text):>12}"
+            for name, func in implementations:
+                seconds = best_of(func, text, args.repeat)
+                first.setdefault(name, (scale, seconds))
+                base_scale, base_seconds = first[name]
+                growth = seconds / base_seconds if base_seconds else 0.0
+                row += f"{seconds * 1000:>10.2f}ms ×{growth:<5.1f}"
+            print(row)
+        print(f"{'':<12}（×N 為相對於規模 {args.scales[0]} 的耗時倍數；線性時應接近規模倍數）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Markdown 轉 Flowable 基準測試
+比較舊的逐行多次 re.sub（_clean_markdown / _clean_markdown_links）實作
+與單次掃描的 MarkdownFlowableCompiler，報告規模為 10 / 100 / 1000 則新聞。
+分別計時行內標記轉換（純文字處理）與完整 Story 建立（包含 ReportLab Paragraph 自身的標記解析）。
+
+用法：
+    python benchmarks/bench_markdown_flowables.py [--sizes 10 100 1000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer
+
+from agents.report_agent import ReportGeneratorAgent
+from utils.markdown_flowables import render_inline
+
+
+def build_report(items: int) -> str:
+    """產生與 Analyst Agent 輸出相同結構的 Markdown 報告"""
+    lines = ["# 東南亞金融新聞報告", "", "## 報告摘要", "本報告涵蓋 **東南亞** 主要國家的 *金融市場* 動態。", "", "## 新聞詳情", ""]
+    for i in range(1, items + 1):
+        lines += [
+            f"### {i}. 越南數位銀行用戶成長 **{i}%**",
+            f"- **來源**：[VnExpress](https://vnexpress.net/fintech/article_{i}.html)",
+            "- **發布日期**：2025-01-01",
+            "- **摘要**：數位支付交易量與用戶數 *同步成長*，監管單位持續推動 __沙盒計畫__。",
+            "- **重點分析**：",
+            "  1. 利率調降有助於信貸成長",
+            "  2. 外資持續流入金融科技",
+            "",
+        ]
+    lines += ["---", "## 市場洞察", "- 區域經濟持續復甦", "- 投資信心增強"]
+    return "\n".join(lines)
+
+
+def _legacy_clean_markdown(text: str) -> str:
+    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
+    text = re.sub(r'__(.*?)__', r'<b>\1</b>', text)
+    text = re.sub(r'(?<!\*)\*(?!\*)([^*]+?)(?<!\*)\*(?!\*)', r'<i>\1</i>', text)
+    text = re.sub(r'(?<!_)_(?!_)([^_]+?)(?<!_)_(?!_)', r'<i>\1</i>', text)
+    return re.sub(r'\[(.*?)\]\((.*?)\)', r'\1 <font color="blue">\2</font>', text)
+
+
+def legacy_story(styles, markdown_content: str):
+    """舊實作：逐行多次 re.sub（原 ReportGeneratorAgent._parse_markdown_to_story）"""
+    story = []
+    for line in markdown_content.split('\n'):
+        line = line.strip()
+        if not line:
+            story.append(Spacer(1, 0.2*inch))
+            continue
+        if line.startswith('# '):
+            story.append(Paragraph(line[2:].strip(), styles['CustomTitle']))
+            story.append(Spacer(1, 0.3*inch))
+        elif line.startswith('## '):
+            story.append(Paragraph(line[3:].strip(), styles['CustomHeading2']))
+            story.append(Spacer(1, 0.2*inch))
+        elif line.startswith('### '):
+            story.append(Paragraph(line[4:].strip(), styles['CustomHeading3']))
+            story.append(Spacer(1, 0.1*inch))
+        elif line.startswith('- ') or line.startswith('* '):
+            story.append(Paragraph(_legacy_clean_markdown('• ' + line[2:].strip()), styles['CustomBody']))
+        elif line.startswith('---') or line.startswith('***'):
+            story.append(Spacer(1, 0.2*inch))
+            story.append(Paragraph('_' * 80, styles['CustomBody']))
+            story.append(Spacer(1, 0.2*inch))
+        else:
+            text = _legacy_clean_markdown(line)
+            if text:
+                story.append(Paragraph(text, styles['CustomBody']))
+                story.append(Spacer(1, 0.1*inch))
+    return story
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    agent = ReportGeneratorAgent()
+    print(f"{'新聞數':>8}{'行數':>8}{'階段':>8}{'舊實作 (ms)':>16}{'編譯器 (ms)':>16}{'加速':>10}")
+    for size in args.sizes:
+        markdown_content = build_report(size)
+        lines = [line.strip() for line in markdown_content.split("\n")]
+        for stage, legacy_func, new_func in [
+            ("行內標記", lambda: [_legacy_clean_markdown(line) for line in lines],
+             lambda: [render_inline(line) for line in lines]),
+            ("Story", lambda: legacy_story(agent.styles, markdown_content),
+             lambda: agent.markdown_compiler.compile(markdown_content)),
+        ]:
+            legacy = measure(legacy_func, args.repeat)
+            compiled = measure(new_func, args.repeat)
+            print(f"{size:>8}{len(lines):>8}{stage:>8}{legacy * 1000:>16.2f}{compiled * 1000:>16.2f}{legacy / compiled:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
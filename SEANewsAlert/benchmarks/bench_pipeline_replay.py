@@ -0,0 +1,147 @@
+"""
+離線管線壓測
+以錄製的 OpenAI fixture（OPENAI_REPLAY_MODE=replay）重播搜尋 → 分析 → 報告生成，
+不需網路與 API 金鑰即可重現完整管線的負載並分析各階段耗時
+
+錄製 fixture：
+    OPENAI_REPLAY_MODE=record OPENAI_FIXTURES_DIR=tests/fixtures/openai python main.py
+
+用法：
+    python benchmarks/bench_pipeline_replay.py --fixtures tests/fixtures/openai [--concurrency 8] [--latency 0.005]
+    python benchmarks/bench_pipeline_replay.py --demo     # 使用合成的 fixture
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ["OPENAI_REPLAY_MODE"] = "replay"
+os.environ.setdefault("SEARCH_CACHE_BACKEND", "off")
+
+
+def synthesize_fixtures(directory: Path, items: int = 10):
+    """產生一組合成 fixture：一次搜尋串流與一次分析用的 chat completion"""
+    from utils.openai_replay import write_fixture
+
+    results = [
+        {"title": f"Vietnam fintech update {i}", "url": f"https://e.vnexpress.net/news/{i}",
+         "date": "2025-10-01", "summary": "Digital payments keep growing in Vietnam. " * 5}
+        for i in range(1, items + 1)
+    ]
+    text = "```json\n" + json.dumps({"results": results}, ensure_ascii=False, indent=2) + "\n```"
+    events = [SimpleNamespace(type="response.created", response=SimpleNamespace(id="resp_demo"))]
+    for _ in range(3):
+        events.append(SimpleNamespace(type="response.output_item.added", item=SimpleNamespace(type="web_search_call")))
+        events.append(SimpleNamespace(type="response.output_item.done", item=SimpleNamespace(type="web_search_call")))
+    for start in range(0, len(text), 16):
+        events.append(SimpleNamespace(type="response.output_text.delta", output_index=1,
+                                      content_index=0, delta=text[start:start + 16]))
+    events.append(SimpleNamespace(type="response.completed"))
+    write_fixture(directory, "responses", {"model": "demo", "input": "demo"}, events=events)
+
+    report = ["# 東南亞金融新聞報告", "", "## 報告摘要", "越南數位支付持續成長。", "", "## 新聞詳情", ""]
+    for i, item in enumerate(results, 1):
+        report += [
+            f"### {i}. 越南金融科技動態 {i}",
+            f"- **來源**：VnExpress({item['url']})",
+            f"- **日期**：{item['date']}",
+            "- **摘要**：越南數位支付持續成長，電子錢包使用者增加。",
+            "- **重點分析**：1) 支付量成長 2) 監管趨嚴",
+            "",
+        ]
+    completion = {
+        "id": "chatcmpl-demo", "object": "chat.completion", "created": 1700000000, "model": "demo",
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "\n".join(report)}}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 800, "total_tokens": 1800},
+    }
+    write_fixture(directory, "chat.completions", {"model": "demo", "messages": []}, response=completion)
+
+
+async def run_pipeline(index: int, agents, output_dir: Path, timings: dict):
+    """執行一次完整管線並記錄各階段耗時"""
+    research, analyst, report = agents
+    loop = asyncio.get_running_loop()
+
+    start = time.perf_counter()
+    search_results = await research.asearch("越南金融科技", "最近 7 天內", "5-10篇", "English")
+    timings["search"].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    markdown, news = await loop.run_in_executor(None, analyst.analyze, search_results)
+    timings["analyze"].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pdf = await loop.run_in_executor(None, report.generate_pdf, markdown, f"bench_{index}.pdf")
+    xlsx = await loop.run_in_executor(None, report.generate_excel, news, f"bench_{index}.xlsx")
+    timings["report"].append(time.perf_counter() - start)
+
+    for path in (pdf, xlsx):
+        Path(path).replace(output_dir / Path(path).name)
+
+
+def summarize(name: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<10}{statistics.median(samples) * 1000:>12.1f}{p95 * 1000:>12.1f}{samples[-1] * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以錄製的 fixture 離線壓測完整管線")
+    parser.add_argument("--fixtures", type=Path, help="fixture 目錄")
+    parser.add_argument("--demo", action="store_true", help="使用合成的 fixture")
+    parser.add_argument("--runs", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", default="0.002", help="每個事件的延遲秒數，或 'recorded'")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="replay_bench_"))
+    fixtures = args.fixtures
+    if args.demo or fixtures is None:
+        fixtures = workdir / "fixtures"
+        synthesize_fixtures(fixtures)
+    os.environ["OPENAI_FIXTURES_DIR"] = str(fixtures)
+    os.environ["OPENAI_REPLAY_LATENCY"] = args.latency
+
+    from agents import ResearchAgent, AnalystAgent, ReportGeneratorAgent
+
+    agents = (ResearchAgent(), AnalystAgent(), ReportGeneratorAgent())
+    timings = {"search": [], "analyze": [], "report": []}
+
+    async def run_all():
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(i):
+            async with semaphore:
+                await run_pipeline(i, agents, workdir, timings)
+
+        await asyncio.gather(*(bounded(i) for i in range(args.runs)))
+
+    # 進度輸出會干擾計時，重播期間靜音
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    start = time.perf_counter()
+    try:
+        asyncio.run(run_all())
+    finally:
+        sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+
+    print(f"fixture：{fixtures}")
+    print(f"{args.runs} 次管線，並行 {args.concurrency}，總耗時 {elapsed:.2f}s（{args.runs / elapsed:.2f} 次/秒）")
+    print(f"{'階段':<10}{'p50 (ms)':>12}{'p95 (ms)':>12}{'max (ms)':>12}")
+    for name, samples in timings.items():
+        summarize(name, samples)
+    print(f"輸出檔案：{workdir}")
+
+
+if __name__ == "__main__":
+    main()
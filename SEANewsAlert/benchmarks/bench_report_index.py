@@ -0,0 +1,107 @@
+"""
+報告全文索引基準測試
+建立含 N 則新聞的報告索引（每份報告 --per-report 則新聞與一份 Markdown），
+比較 FTS5 索引查詢與逐列 LIKE 掃描的查詢耗時，並回報寫入速度與資料庫大小。
+
+新聞標題與摘要由固定的中英文詞彙隨機組合，查詢涵蓋罕見詞、常見詞（大量符合、排序成本最高）、
+英文字首、多詞 AND 與沒有結果時改為 OR 的自然語言輸入。
+
+用法：
+    python benchmarks/bench_report_index.py [--items 100000] [--per-report 10] [--repeat 20] [--path /tmp/reports.sqlite3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from utils.report_index import ReportIndex
+
+COUNTRIES = ["越南", "泰國", "新加坡", "馬來西亞", "印尼", "菲律賓", "柬埔寨", "緬甸"]
+SUBJECTS = ["央行", "證交所", "財政部", "數位銀行", "電子支付", "金融科技", "保險業", "房地產", "出口", "外資"]
+EVENTS = ["宣布降息", "上調利率", "推出監管沙盒", "擴大投資", "發布年度報告", "收緊放款", "開放跨境結算",
+          "獲得融資", "股價下跌", "通膨升溫"]
+ENGLISH = ["bank", "fintech", "payments", "inflation", "bond", "equity", "crypto", "regulator", "export", "growth"]
+# 罕見詞只出現在約 0.1% 的新聞中
+RARE = "碳權交易"
+
+
+def make_item(rng: random.Random, i: int) -> dict:
+    country = rng.choice(COUNTRIES)
+    title = f"{country}{rng.choice(SUBJECTS)}{rng.choice(EVENTS)}"
+    if i % 1000 == 0:
+        title += RARE
+    summary = "，".join(
+        f"{rng.choice(COUNTRIES)}{rng.choice(SUBJECTS)}{rng.choice(EVENTS)} {rng.choice(ENGLISH)}" for _ in range(4)
+    )
+    return {"title": title, "country": country, "summary": summary, "source": rng.choice(["Reuters", "VnExpress"]),
+            "url": f"https://example.com/news/{i}", "published_at": "2025-11-21"}
+
+
+def markdown_for(items) -> str:
+    lines = ["# 東南亞金融新聞報告", "", "## 報告摘要", items[0]["summary"], "", "## 搜尋主題", items[0]["title"],
+             "", "## 新聞詳情"]
+    for position, item in enumerate(items, 1):
+        lines += [f"### {position}. {item['title']}", f"- **摘要**：{item['summary']}"]
+    lines += ["", "## 市場洞察", "- 區域利率走勢分歧", "- 金融科技投資持續增加"]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--per-report", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--path", type=Path, default=None, help="SQLite 路徑（預設為暫存目錄；請指定新檔案）")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path or Path(tmp) / "report_index.sqlite3"
+        index = ReportIndex(path)
+
+        start = time.perf_counter()
+        reports = args.items // args.per_report
+        for r in range(reports):
+            items = [make_item(rng, r * args.per_report + k) for k in range(args.per_report)]
+            stem = f"東南亞金融新聞報告_20251121_{r % 240000:06d}_{r:08x}"
+            index.index_pdf(Path(tmp) / f"{stem}.pdf", markdown_for(items))
+            index.index_excel(Path(tmp) / f"{stem}.xlsx", items)
+        insert_seconds = time.perf_counter() - start
+        size_mb = sum(p.stat().st_size for p in path.parent.glob(path.name + "*")) / 1e6
+        print(f"寫入 {reports} 份報告／{args.items} 則新聞：{insert_seconds:.1f}s"
+              f"（每份報告 {insert_seconds / reports * 1000:.2f}ms），資料庫 {size_mb:.1f} MB")
+
+        def timed(func, *func_args):
+            result = func(*func_args)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                func(*func_args)
+            return (time.perf_counter() - start) / args.repeat * 1000, result
+
+        ms, (total, _) = timed(index.list, 20, 0)
+        print(f"列表第 1 頁：{ms:.2f}ms（共 {total} 份）")
+        ms, _ = timed(index.list, 20, reports // 2)
+        print(f"列表中間頁：{ms:.2f}ms")
+
+        for query in (RARE, "越南央行", "央行", "bank", "越南 fintech", "上週越南碳權交易新聞摘要"):
+            ms, (total, page) = timed(index.search, query, 20, 0)
+            print(f"搜尋 {query!r}：{ms:.2f}ms（{total} 份報告，第 1 頁 {len(page)} 份）")
+
+        conn = index._conn
+        start = time.perf_counter()
+        count = conn.execute(
+            "SELECT COUNT(DISTINCT report_id) FROM report_news WHERE title LIKE ? OR summary LIKE ?",
+            (f"%{RARE}%", f"%{RARE}%")
+        ).fetchone()[0]
+        print(f"LIKE 逐列掃描 {RARE!r}：{(time.perf_counter() - start) * 1000:.1f}ms（{count} 份報告）")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
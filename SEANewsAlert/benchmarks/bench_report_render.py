@@ -0,0 +1,93 @@
+"""
+報告渲染基準測試
+同時渲染多份 PDF + Excel 報告，比較執行緒池與行程池（預熱的 worker）的總耗時，
+並輸出渲染器的排隊深度、排隊時間與各格式渲染時間統計
+
+註：執行緒池受 GIL 限制，ReportLab 排版無法在多核心上平行；行程池的效益取決於可用核心數。
+
+用法：
+    python benchmarks/bench_report_render.py [--reports 4] [--items 60] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from agents.report_agent import ReportGeneratorAgent
+from app.services.renderer import ArtifactRenderer
+
+
+def build_report(items: int):
+    """產生含 items 則新聞的 Markdown 報告與結構化新聞"""
+    lines = ["# 東南亞金融新聞報告", "", "## 報告摘要", "區域數位金融持續成長。", "", "## 新聞詳情", ""]
+    news = []
+    for i in range(1, items + 1):
+        lines += [
+            f"### {i}. 越南數位銀行第 {i} 季用戶成長",
+            f"- **來源**：[VnExpress](https://vnexpress.net/article-{i})",
+            "- **摘要**：" + "數位支付交易量與用戶數同步成長，監管單位持續推動沙盒計畫。" * 3,
+            "",
+        ]
+        news.append({
+            "新聞標題（中文）": f"越南數位銀行第 {i} 季用戶成長",
+            "來源國家": "越南",
+            "來源網站連結": f"https://vnexpress.net/article-{i}",
+            "發布日期": "2025-01-01",
+            "摘要": "數位支付交易量與用戶數同步成長。",
+            "重點分析": "監管單位持續推動沙盒計畫。",
+        })
+    return "\n".join(lines), news
+
+
+async def render_all(renderer, agent, reports: int, markdown: str, news):
+    jobs = [
+        renderer.render(agent, markdown, news, f"bench_render_{renderer.mode}_{i}")
+        for i in range(reports)
+    ]
+    results = await asyncio.gather(*jobs)
+    return [path for paths, _ in results for path in paths.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=4)
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    markdown, news = build_report(args.items)
+    print(f"同時渲染 {args.reports} 份報告（每份 {args.items} 則新聞），{args.workers} 個 worker，{os.cpu_count()} 核心")
+
+    # 渲染過程的輸出會干擾計時，執行期間靜音
+    devnull = open(os.devnull, "w")
+    for mode in ("threaded", "process"):
+        renderer = ArtifactRenderer(max_workers=args.workers, mode=mode)
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            agent = ReportGeneratorAgent() if mode == "threaded" else None
+            renderer.warm_up(wait=True)
+            start = time.perf_counter()
+            paths = asyncio.run(render_all(renderer, agent, args.reports, markdown, news))
+            elapsed = time.perf_counter() - start
+        finally:
+            sys.stdout = stdout
+            renderer.shutdown()
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+        stats = renderer.stats()
+        print(f"\n{mode:<10} 總耗時 {elapsed:.2f} 秒")
+        print(json.dumps({
+            "queue_wait_seconds": stats["queue_wait_seconds"],
+            "render_seconds": stats["render_seconds"],
+        }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
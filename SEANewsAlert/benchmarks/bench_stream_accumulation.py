@@ -0,0 +1,157 @@
+"""
+串流累積微基準測試
+重播約 100k 字元的 Responses 串流，比較舊的字串串接 + 子字串檢查
+與 _StreamState 的片段列表累積，輸出耗時與峰值記憶體配置
+
+註：區域變數的 += 會被 CPython 就地擴充而顯得很快，但這是實作細節；
+一旦字串存放在物件屬性上（串流狀態在同步／非同步路徑間共用時）就會退化為平方時間。
+
+用法：
+    python benchmarks/bench_stream_accumulation.py [--chars 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from agents.research_agent import ResearchAgent, _StreamState
+
+
+def record_stream(total_chars: int, seed: int = 42):
+    """
+    產生模擬的串流事件：兩個內容片段，每個片段由 2-12 字元的 delta 組成，
+    結束時送出包含完整文字的 content_part.done（舊實作的最壞情況）
+    """
+    rng = random.Random(seed)
+    alphabet = "東南亞金融科技新聞 Vietnam fintech SGX 2025-10-13 {}\":,\n"
+    events = []
+    per_part = total_chars // 2
+    for content_index in range(2):
+        text = "".join(rng.choice(alphabet) for _ in range(per_part))
+        pos = 0
+        while pos < len(text):
+            step = rng.randint(2, 12)
+            events.append(SimpleNamespace(
+                type="response.content_part.delta",
+                output_index=1, content_index=content_index,
+                delta=SimpleNamespace(text=text[pos:pos + step])
+            ))
+            pos += step
+        events.append(SimpleNamespace(
+            type="response.content_part.done",
+            output_index=1, content_index=content_index,
+            part=SimpleNamespace(text=text, annotations=[])
+        ))
+    return events
+
+
+def legacy_accumulate(events) -> str:
+    """舊實作：content += delta.text，完成時以 not in 掃描整段文字"""
+    content = ""
+    text_chunks = 0
+    for event in events:
+        if event.type == "response.content_part.delta":
+            content += event.delta.text
+            text_chunks += 1
+            if text_chunks % 10 == 0:
+                _ = len(content)
+        elif event.type == "response.content_part.done":
+            if event.part.text and event.part.text not in content:
+                content += event.part.text
+    return content
+
+
+class _LegacyState:
+    """讓舊實作與新實作一樣透過物件屬性累積（與重構前的 search 行為一致）"""
+
+    def __init__(self):
+        self.content = ""
+
+
+def legacy_attribute_accumulate(events) -> str:
+    """舊實作（屬性版本）：CPython 無法就地擴充屬性上的字串"""
+    state = _LegacyState()
+    for event in events:
+        if event.type == "response.content_part.delta":
+            state.content += event.delta.text
+        elif event.type == "response.content_part.done":
+            if event.part.text and event.part.text not in state.content:
+                state.content += event.part.text
+    return state.content
+
+
+def buffered_direct_accumulate(events) -> str:
+    """新實作（僅累積器）：直接呼叫 _StreamState，不含事件分派成本"""
+    state = _StreamState()
+    for event in events:
+        key = state.part_key(event)
+        if event.type == "response.content_part.delta":
+            state.append_delta(key, event.delta.text)
+        elif event.type == "response.content_part.done":
+            state.complete_part(key, event.part.text)
+    return state.content
+
+
+def buffered_accumulate(events) -> str:
+    """新實作：透過 ResearchAgent._handle_stream_event 與 _StreamState"""
+    agent = ResearchAgent.__new__(ResearchAgent)
+    state = _StreamState()
+    for event in events:
+        agent._handle_stream_event(event, state)
+    return state.content
+
+
+def measure(func, events, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(events)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(events)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    events = record_stream(args.chars)
+    deltas = sum(1 for e in events if e.type == "response.content_part.delta")
+    print(f"重播串流：{args.chars:,} 字元，{deltas:,} 個 delta 事件")
+    print(f"{'實作':<30}{'最佳耗時 (ms)':>16}{'峰值配置 (KiB)':>18}")
+
+    # 進度輸出會干擾計時，重播期間靜音
+    devnull = open(os.devnull, "w")
+    results = {}
+    for name, func in [
+        ("legacy (local +=)", legacy_accumulate),
+        ("legacy (attribute +=)", legacy_attribute_accumulate),
+        ("buffered (accumulator only)", buffered_direct_accumulate),
+        ("buffered (_handle_stream_event)", buffered_accumulate),
+    ]:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            best, peak, content = measure(func, events, args.repeat)
+        finally:
+            sys.stdout = stdout
+        results[name] = content
+        print(f"{name:<30}{best * 1000:>16.2f}{peak / 1024:>18.1f}")
+
+    assert len(set(results.values())) == 1, "各實作的累積結果不一致"
+
+
+if __name__ == "__main__":
+    main()
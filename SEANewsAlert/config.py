@@ -31,14 +31,102 @@ class Config:
     # Agno Configuration
     AGNO_TELEMETRY = os.getenv("AGNO_TELEMETRY", "false").lower() == "true"
     
+    # Workflow Execution Configuration
+    # threaded: 阻塞階段交給專用執行緒池；inline: 直接在事件迴圈中執行（僅供除錯）
+    WORKFLOW_EXECUTION_MODE = os.getenv("WORKFLOW_EXECUTION_MODE", "threaded").lower()
+    WORKFLOW_MAX_WORKERS = int(os.getenv("WORKFLOW_MAX_WORKERS", "8"))
+    # 使用 AsyncOpenAI 在事件迴圈上直接消費搜尋串流（不佔用執行緒）
+    RESEARCH_ASYNC_STREAMING = os.getenv("RESEARCH_ASYNC_STREAMING", "true").lower() == "true"
+    # 分片平行搜尋：off / country / language
+    RESEARCH_FANOUT_MODE = os.getenv("RESEARCH_FANOUT_MODE", "off").lower()
+    RESEARCH_FANOUT_CONCURRENCY = int(os.getenv("RESEARCH_FANOUT_CONCURRENCY", "4"))
+    # 常見的時間／數量寫法以規則解析需求，含糊時才呼叫 LLM
+    PROMPT_RULE_PARSER = os.getenv("PROMPT_RULE_PARSER", "true").lower() == "true"
+    # LLM 需求解析結果快取（以正規化的 prompt 為鍵）
+    PROMPT_MEMO_ENABLED = os.getenv("PROMPT_MEMO_ENABLED", "true").lower() == "true"
+    PROMPT_MEMO_MAX_ENTRIES = int(os.getenv("PROMPT_MEMO_MAX_ENTRIES", "512"))
+    PROMPT_MEMO_TTL = int(os.getenv("PROMPT_MEMO_TTL", "86400"))
+    # 啟動時預熱用的提示詞檔案（每行一筆，可留空）
+    PROMPT_MEMO_WARMUP_PATH = os.getenv("PROMPT_MEMO_WARMUP_PATH", "")
+    # 分析輸出：markdown（模型撰寫整份報告）/ json（模型只輸出結構化 JSON，報告由本機範本產生）
+    # / chunked（新聞分批平行整理，再以一次簡短呼叫撰寫市場洞察）
+    ANALYST_OUTPUT_MODE = os.getenv("ANALYST_OUTPUT_MODE", "markdown").lower()
+    ANALYST_CHUNK_SIZE = int(os.getenv("ANALYST_CHUNK_SIZE", "8"))
+    ANALYST_CHUNK_CONCURRENCY = int(os.getenv("ANALYST_CHUNK_CONCURRENCY", "4"))
+    # 報告渲染：process（行程池，PDF 與 Excel 在不同核心上同時渲染）/ threaded / inline
+    REPORT_RENDER_MODE = os.getenv("REPORT_RENDER_MODE", "process").lower()
+    REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+    # Excel 輸出：streaming（write-only 逐列寫出，不需要 pandas）/ pandas（DataFrame + ExcelWriter）
+    EXCEL_WRITER_MODE = os.getenv("EXCEL_WRITER_MODE", "streaming").lower()
+    # 服務啟動時預先啟動渲染 worker（註冊字體、建立樣式）
+    REPORT_RENDER_PREWARM = os.getenv("REPORT_RENDER_PREWARM", "true").lower() == "true"
+    # 進度更新合併間隔（秒）：間隔內只送出最新一筆，0 表示每次都送出
+    PROGRESS_COALESCE_INTERVAL = float(os.getenv("PROGRESS_COALESCE_INTERVAL", "0.25"))
+    # 進度 SSE：沒有事件時每隔幾秒送出心跳註解；每個任務保留最近幾筆事件供 Last-Event-ID 續傳
+    TASK_EVENTS_HEARTBEAT = float(os.getenv("TASK_EVENTS_HEARTBEAT", "15"))
+    TASK_EVENTS_HISTORY = int(os.getenv("TASK_EVENTS_HISTORY", "100"))
+    
+    # Search Cache Configuration
+    # memory / sqlite / off
+    SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", "memory").lower()
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+    SEARCH_CACHE_TTL_PER_DAY = int(os.getenv("SEARCH_CACHE_TTL_PER_DAY", "1800"))  # 每天時間範圍快取 30 分鐘
+    SEARCH_CACHE_MIN_TTL = int(os.getenv("SEARCH_CACHE_MIN_TTL", "600"))
+    SEARCH_CACHE_MAX_TTL = int(os.getenv("SEARCH_CACHE_MAX_TTL", "43200"))
+    SEARCH_CACHE_DEFAULT_TTL = int(os.getenv("SEARCH_CACHE_DEFAULT_TTL", "3600"))
+    
+    # News Dedup Configuration
+    # sqlite / memory / off；history: flag（標註近期報告出現過的新聞）/ suppress（移除）/ off
+    NEWS_DEDUP_BACKEND = os.getenv("NEWS_DEDUP_BACKEND", "sqlite").lower()
+    NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.5"))
+    NEWS_DEDUP_HISTORY = os.getenv("NEWS_DEDUP_HISTORY", "flag").lower()
+    NEWS_DEDUP_RETENTION_DAYS = float(os.getenv("NEWS_DEDUP_RETENTION_DAYS", "30"))
+    
+    # Article Store Configuration
+    # 相同主題的新需求先使用文章庫中時間範圍內的新聞，即時搜尋只涵蓋缺口；今天的搜尋在 FRESHNESS 秒內視為最新
+    ARTICLE_STORE_ENABLED = os.getenv("ARTICLE_STORE_ENABLED", "true").lower() == "true"
+    ARTICLE_STORE_FRESHNESS = float(os.getenv("ARTICLE_STORE_FRESHNESS", "1800"))
+    
+    # Report Index Configuration
+    # 報告產生時增量更新全文索引，/api/reports 只查詢索引；MAX_HITS 為每次搜尋最多排序的符合項目數
+    REPORT_INDEX_ENABLED = os.getenv("REPORT_INDEX_ENABLED", "true").lower() == "true"
+    REPORT_INDEX_MAX_HITS = int(os.getenv("REPORT_INDEX_MAX_HITS", "2000"))
+    
+    # Trusted Sources Configuration
+    # 設定檔修改後自動重新載入；TRUSTED_SOURCES_FILTER 會移除不屬於可信網域的來源與新聞
+    TRUSTED_SOURCES_RELOAD_INTERVAL = float(os.getenv("TRUSTED_SOURCES_RELOAD_INTERVAL", "5"))
+    TRUSTED_SOURCES_FILTER = os.getenv("TRUSTED_SOURCES_FILTER", "true").lower() == "true"
+
+    # OpenAI Connection Pool Configuration
+    # 所有 Agent 共用同一個 keep-alive 連線池
+    OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+    # OpenAI Record / Replay Configuration
+    # off: 直接呼叫 API；record: 呼叫 API 並錄製 fixture；replay: 完全離線重播 fixture
+    OPENAI_REPLAY_MODE = os.getenv("OPENAI_REPLAY_MODE", "off").lower()
+    # 重播時每個事件的延遲秒數，或 'recorded' 依錄製時的節奏重播
+    OPENAI_REPLAY_LATENCY = os.getenv("OPENAI_REPLAY_LATENCY", "0")
+
     # Paths
     BASE_DIR = Path(__file__).parent
     REPORTS_DIR = BASE_DIR / "reports"
     TEMPLATES_DIR = BASE_DIR / "templates"
+    CACHE_DIR = BASE_DIR / "cache"
+    DATA_DIR = BASE_DIR / "data"
+    TRUSTED_SOURCES_PATH = Path(os.getenv("TRUSTED_SOURCES_PATH", str(DATA_DIR / "trusted_sources.json")))
+    COUNTRY_GAZETTEER_PATH = Path(os.getenv("COUNTRY_GAZETTEER_PATH", str(DATA_DIR / "country_gazetteer.json")))
+    ARTICLE_STORE_PATH = Path(os.getenv("ARTICLE_STORE_PATH", str(CACHE_DIR / "articles.sqlite3")))
+    REPORT_INDEX_PATH = Path(os.getenv("REPORT_INDEX_PATH", str(CACHE_DIR / "report_index.sqlite3")))
+    NEWS_DEDUP_PATH = Path(os.getenv("NEWS_DEDUP_PATH", str(CACHE_DIR / "news_fingerprints.sqlite3")))
+    SEARCH_CACHE_PATH = Path(os.getenv("SEARCH_CACHE_PATH", str(CACHE_DIR / "search_cache.sqlite3")))
+    OPENAI_FIXTURES_DIR = Path(os.getenv("OPENAI_FIXTURES_DIR", str(BASE_DIR / "tests" / "fixtures" / "openai")))
     
     # 確保目錄存在
     REPORTS_DIR.mkdir(exist_ok=True)
     TEMPLATES_DIR.mkdir(exist_ok=True)
+    CACHE_DIR.mkdir(exist_ok=True)
     
     @classmethod
     def validate(cls):
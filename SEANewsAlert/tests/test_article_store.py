@@ -0,0 +1,276 @@
+"""
+測試文章庫（寫入、查詢與依已搜尋範圍規劃即時搜尋）
+"""
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.article_store import ArticleStore, merge_articles, normalize_date
+from utils.helpers import parse_article_count
+from utils.news_model import NewsItem
+
+TODAY = date(2025, 11, 21)
+ITEMS = [
+    {"title": "SBV cuts refinancing rate", "summary": "The State Bank of Vietnam cut rates.",
+     "source": "VnExpress", "url": "https://e.vnexpress.net/a?utm_source=x", "date": "2025-11-20", "language": "English"},
+    {"title": "SET index slips", "summary": "Thai stocks fell.",
+     "source": "Bangkok Post", "url": "https://www.bangkokpost.com/b", "date": "2025/11/18", "language": "English"},
+    {"title": "MAS tightens crypto rules", "summary": "Singapore regulator.",
+     "source": "The Straits Times", "url": "https://www.straitstimes.com/c", "date": "2025年11月10日"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(tmp_path / "articles.sqlite3", freshness=1800)
+    yield store
+    store.close()
+
+
+class TestIngest:
+    """測試寫入與查詢"""
+
+    def test_normalize_date(self):
+        """測試常見日期寫法"""
+        assert normalize_date("2025-1-5") == "2025-01-05"
+        assert normalize_date("2025年11月10日") == "2025-11-10"
+        assert normalize_date("2025-02-30") == ""
+        assert normalize_date(None) == ""
+
+    def test_ingest_and_query(self, store):
+        """測試寫入後依日期、國家、來源與主題查詢"""
+        assert store.ingest(ITEMS, "東南亞央行", "English", classify_country=lambda t, s, c: "測試") == 3
+        assert len(store) == 3
+        assert [a["source"] for a in store.query()] == ["VnExpress", "Bangkok Post", "The Straits Times"]
+        assert [a["date"] for a in store.query(start_date="2025-11-15")] == ["2025-11-20", "2025-11-18"]
+        assert [a["source"] for a in store.query(end_date="2025-11-18")] == ["Bangkok Post", "The Straits Times"]
+        assert [a["source"] for a in store.query(sources=["Bangkok Post"])] == ["Bangkok Post"]
+        assert len(store.query(countries=["測試"])) == 3
+        assert len(store.query(keywords=" 東南亞央行 ")) == 3
+        assert store.query(keywords="其他主題") == []
+        assert [a["source"] for a in store.query(limit=1, offset=1)] == ["Bangkok Post"]
+        assert store.query(language="English")[0]["language"] == "English"
+
+    def test_upsert_by_canonical_url(self, store):
+        """測試相同正規化網址的新聞更新非空欄位而不重複寫入"""
+        store.ingest(ITEMS[:1], "主題")
+        store.ingest([{"url": "https://e.vnexpress.net/a", "title": "", "summary": "更新後的摘要", "country": "越南"}], "主題")
+        assert len(store) == 1
+        article = store.get("https://e.vnexpress.net/a/")
+        assert article["title"] == "SBV cuts refinancing rate"
+        assert article["summary"] == "更新後的摘要"
+        assert article["country"] == "越南"
+
+    def test_attach_translations(self, store):
+        """測試以分析結果更新翻譯標題"""
+        store.ingest(ITEMS, "主題")
+        updated = store.attach_translations([NewsItem(title="越南央行降息", country="越南", url=ITEMS[0]["url"])])
+        assert updated == 1
+        assert store.get(ITEMS[0]["url"])["translated_title"] == "越南央行降息"
+
+    def test_indexes_exist(self, store):
+        """測試 (country, date)、(source, date) 與正規化網址索引"""
+        indexes = {row[0] for row in store._conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_articles_country_date", "idx_articles_source_date"} <= indexes
+        plan = store._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM articles WHERE country = ? AND date >= ?", ("越南", "2025-11-01")
+        ).fetchall()
+        assert "idx_articles_country_date" in str([tuple(row) for row in plan])
+
+
+class TestPlan:
+    """測試依已搜尋範圍規劃即時搜尋"""
+
+    def test_no_coverage_full_search(self, store):
+        """測試沒有搜尋紀錄時完整搜尋"""
+        plan = store.plan("東南亞央行", "最近 7 天內", "English", today=TODAY)
+        assert plan.live_time_instruction == "最近 7 天內"
+        assert plan.window_start == "2025-11-14"
+        assert plan.stored == []
+
+    def test_unparsable_window(self, store):
+        """測試無法解析時間範圍時以原本的指令搜尋"""
+        plan = store.plan("東南亞央行", "盡量新", "English", today=TODAY)
+        assert plan.needs_search and plan.live_time_instruction == "盡量新"
+
+    def test_gap_search(self, store):
+        """測試只即時搜尋最後一次搜尋之後的天數，並帶回時間範圍內的新聞"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        store.record_coverage("東南亞央行", "English", "2025-11-12", "2025-11-19")
+        plan = store.plan("東南亞央行", "最近 7 天內", "English", today=TODAY)
+        assert plan.live_time_instruction == "最近 3 天內"
+        assert plan.live_start == "2025-11-19"
+        assert [a["date"] for a in plan.stored] == ["2025-11-20", "2025-11-18"]
+
+    def test_chained_coverage(self, store):
+        """測試相連的多次搜尋合併為連續範圍，中間有空缺時只採用空缺之前的部分"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        store.record_coverage("東南亞央行", "English", "2025-11-10", "2025-11-15")
+        store.record_coverage("東南亞央行", "English", "2025-11-16", "2025-11-19")
+        assert store.covered_until("東南亞央行", "English", "2025-11-14")["end_date"] == "2025-11-19"
+        store.record_coverage("其他", "English", "2025-11-10", "2025-11-12")
+        store.record_coverage("其他", "English", "2025-11-15", "2025-11-20")
+        assert store.covered_until("其他", "English", "2025-11-11")["end_date"] == "2025-11-12"
+        assert store.covered_until("其他", "English", "2025-11-13") is None
+
+    def test_fresh_coverage_skips_search(self, store):
+        """測試今天已在 freshness 內搜尋過時不必即時搜尋"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        store.record_coverage("東南亞央行", "English", "2025-11-14", TODAY.isoformat(), fetched_at=1000)
+        plan = store.plan("東南亞央行", "最近 7 天內", "English", today=TODAY, now=1000 + 60)
+        assert not plan.needs_search and len(plan.stored) == 2
+        stale = store.plan("東南亞央行", "最近 7 天內", "English", today=TODAY, now=1000 + 3600)
+        assert stale.live_time_instruction == "最近 1 天內"
+
+    def test_other_language_not_reused(self, store):
+        """測試其他語言的搜尋紀錄不會被採用"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        store.record_coverage("東南亞央行", "English", "2025-11-14", "2025-11-20")
+        plan = store.plan("東南亞央行", "最近 7 天內", "Vietnamese", today=TODAY)
+        assert plan.live_time_instruction == "最近 7 天內" and plan.stored == []
+
+    def test_merge_articles(self, store):
+        """測試即時搜尋在前，文章庫中網址重複的新聞略過"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        merged = merge_articles([{"title": "live", "url": "https://e.vnexpress.net/a"}, ITEMS[1]], store.query())
+        assert [item["title"] for item in merged] == ["live", "SET index slips", "MAS tightens crypto rules"]
+        assert merged[2]["from_store"] is True
+
+    def test_max_articles(self, store):
+        """測試文章庫只取最新的 max_articles 則，合併後不超過需求數量（即時搜尋的新聞全部保留）"""
+        store.ingest(ITEMS, "東南亞央行", "English")
+        store.record_coverage("東南亞央行", "English", "2025-11-12", "2025-11-19")
+        plan = store.plan("東南亞央行", "最近 7 天內", "English", max_articles=1, today=TODAY)
+        assert plan.max_articles == 1
+        assert [a["date"] for a in plan.stored] == ["2025-11-20"]
+
+        stored = store.query()
+        assert len(merge_articles([{"title": "live", "url": "https://example.com/live"}], stored, 2)) == 2
+        assert len(merge_articles([ITEMS[0], ITEMS[1]], stored, 1)) == 2
+
+    @pytest.mark.parametrize("num_instruction, count", [
+        ("5-10篇", 10), ("約15篇", 15), ("十則", 10), ("top 10", 10),
+        ("10 to 20 articles", 20), ("５～８則", 8), ("一些", None), ("", None),
+    ])
+    def test_parse_article_count(self, num_instruction, count):
+        """測試由數量指令解析需求的新聞數（範圍取上限）"""
+        assert parse_article_count(num_instruction) == count
+
+
+class TestWorkflowStore:
+    """測試工作流程中的文章庫階段"""
+
+    def _workflow(self, store):
+        from app.services.workflow import NewsReportWorkflow
+
+        workflow = NewsReportWorkflow.__new__(NewsReportWorkflow)
+        workflow.article_store = store
+        return workflow
+
+    def test_store_and_reuse(self, store):
+        """測試即時搜尋的新聞寫入文章庫，之後的相同主題需求併入文章庫新聞"""
+        from agents import ResearchAgent
+        from app.services.progress import task_manager
+
+        recent = [{**item, "date": (date.today() - timedelta(days=i)).isoformat()} for i, item in enumerate(ITEMS)]
+        workflow = self._workflow(store)
+        parsed = {"keywords": "東南亞央行", "time_instruction": "最近 30 天內", "language": "English"}
+        task_id = task_manager.create_task("東南亞央行", "store@example.com")
+
+        first_plan = workflow._plan_search(task_id, parsed)
+        assert first_plan.needs_search and first_plan.live_time_instruction == "最近 30 天內"
+        search_results = {"status": "success", "query": "東南亞央行", "content": "", "results": recent[:2]}
+        workflow._store_articles(parsed, first_plan, search_results)
+        assert len(store) == 2 and store.get(recent[1]["url"])["country"] == "泰國"
+
+        second_plan = workflow._plan_search(task_id, parsed)
+        assert not second_plan.needs_search
+        assert task_manager.get_task_details(task_id)["article_store"]["stored"] == 2
+        reused = workflow._stored_search_results("東南亞央行", second_plan.stored)
+        assert reused["from_store"] and len(reused["results"]) == 2
+        assert len(ResearchAgent._extract_results_json(reused["content"])) == 2
+        assert workflow._store_articles(parsed, second_plan, reused) is reused
+
+        live = {"status": "success", "query": "東南亞央行",
+                "content": '```json\n{"results": []}\n```', "results": [recent[2]]}
+        merged = workflow._store_articles(parsed, second_plan, live)
+        assert len(merged["results"]) == 3
+        assert len(ResearchAgent._extract_results_json(merged["content"])) == 3
+
+    @pytest.mark.parametrize("history", ["flag", "suppress"])
+    def test_reused_articles_survive_dedup(self, store, history):
+        """測試文章庫重用的新聞不會被自己先前報告的指紋標註或移除"""
+        from app.services.progress import task_manager
+        from utils.news_dedup import MemoryFingerprintIndex, NewsDeduplicator
+
+        stories = [
+            ("SBV cuts refinancing rate to 4.5%", "The State Bank of Vietnam lowered its refinancing rate to support exporters.", "VnExpress"),
+            ("Thai tourism arrivals rebound in October", "Foreign visitors to Phuket and Bangkok rose sharply after visa waivers.", "Bangkok Post"),
+            ("Jakarta unveils nickel smelter incentives", "Indonesia offers tax holidays for battery supply chain investors.", "Jakarta Post"),
+            ("Manila remittances hit record high", "Overseas Filipino workers sent home more money ahead of the holidays.", "Inquirer"),
+            ("Bursa Malaysia lists first green sukuk ETF", "The exchange welcomed a sharia-compliant sustainability fund.", "The Star"),
+            ("MAS tightens crypto licensing rules", "Singapore requires digital token service providers to segregate client assets.", "The Straits Times"),
+        ]
+        articles = [
+            {"title": title, "summary": summary, "source": source, "url": f"https://news.example.com/{i}",
+             "date": (date.today() - timedelta(days=i)).isoformat(), "language": "English"}
+            for i, (title, summary, source) in enumerate(stories)
+        ]
+        workflow = self._workflow(store)
+        workflow.news_deduplicator = NewsDeduplicator(MemoryFingerprintIndex(), history=history)
+        parsed = {"keywords": "東南亞利率", "time_instruction": "最近 30 天內", "language": "English"}
+
+        first_task = task_manager.create_task("東南亞利率", "store@example.com")
+        plan = workflow._plan_search(first_task, parsed)
+        live = {"status": "success", "query": "東南亞利率", "content": "", "results": articles}
+        first = workflow._deduplicate(first_task, workflow._store_articles(parsed, plan, live))
+        assert len(first["results"]) == 6
+        workflow._remember_news(first_task, first)
+
+        second_task = task_manager.create_task("東南亞利率", "store@example.com")
+        plan = workflow._plan_search(second_task, parsed)
+        assert not plan.needs_search
+        reused = workflow._store_articles(parsed, plan, workflow._stored_search_results("東南亞利率", plan.stored))
+        second = workflow._deduplicate(second_task, reused)
+        assert len(second["results"]) == 6
+        assert not any("previously_reported" in item for item in second["results"])
+        assert task_manager.get_task_details(second_task)["news_dedup"]["kept"] == 6
+
+    def test_stored_articles_capped_to_requested_count(self, store):
+        """測試累積多日的文章庫新聞不會超過需求數量（有即時搜尋與不必即時搜尋時皆然）"""
+        from app.services.progress import task_manager
+
+        today = date.today()
+        articles = [
+            {"title": f"Regional bank story {i}", "summary": f"Story {i}", "source": "Reuters",
+             "url": f"https://news.example.com/story-{i}",
+             "date": (today - timedelta(days=i // 10)).isoformat(), "language": "English"}
+            for i in range(60)
+        ]
+        store.ingest(articles, "東南亞銀行", "English")
+        store.record_coverage("東南亞銀行", "English", (today - timedelta(days=7)).isoformat(),
+                              (today - timedelta(days=1)).isoformat())
+        workflow = self._workflow(store)
+        parsed = {"keywords": "東南亞銀行", "time_instruction": "最近7天內", "num_instruction": "5-10篇",
+                  "language": "English"}
+        task_id = task_manager.create_task("東南亞銀行", "store@example.com")
+
+        plan = workflow._plan_search(task_id, parsed)
+        assert plan.live_time_instruction == "最近 2 天內"
+        assert {a["url"] for a in plan.stored} == {f"https://news.example.com/story-{i}" for i in range(10)}
+        live = [{"title": f"Live story {i}", "summary": "", "source": "CNA", "url": f"https://cna.example.com/{i}",
+                 "date": today.isoformat()} for i in range(4)]
+        merged = workflow._store_articles(parsed, plan, {"status": "success", "content": "", "results": live})
+        assert len(merged["results"]) == 10
+        assert [item["title"] for item in merged["results"][:4]] == [f"Live story {i}" for i in range(4)]
+
+        fresh = workflow._plan_search(task_id, {**parsed, "num_instruction": "約5篇"})
+        assert not fresh.needs_search
+        assert len(workflow._stored_search_results("東南亞銀行", fresh.stored)["results"]) == 5
@@ -0,0 +1,183 @@
+"""
+測試分批（map-reduce）分析模式
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents.analyst_agent import AnalystAgent
+from config import Config
+
+
+def make_results(count):
+    return [
+        {
+            "title": f"Vietnam central bank news {i}",
+            "summary": f"Summary {i}",
+            "source": "VnExpress",
+            "url": f"https://vnexpress.net/{i}",
+            "date": "2025-01-02",
+        }
+        for i in range(count)
+    ]
+
+
+class FakeModel:
+    """模擬結構化 Agent：map 呼叫回傳翻譯後的新聞，reduce 呼叫回傳洞察，並記錄同時執行數"""
+
+    def __init__(self, delay=0.05, broken_chunks=(), broken_reduce=False):
+        self.delay = delay
+        self.broken_chunks = set(broken_chunks)
+        self.broken_reduce = broken_reduce
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.prompts = []
+
+    def run(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            metrics = SimpleNamespace(input_tokens=len(prompt), output_tokens=42)
+            batch = re.search(r"第 (\d+)/\d+ 批", prompt)
+            if not batch:
+                if self.broken_reduce:
+                    raise RuntimeError("reduce failed")
+                payload = {"summary": "越南央行動態摘要", "insights": ["利率下行", "匯率承壓"]}
+                return SimpleNamespace(content=json.dumps(payload, ensure_ascii=False), metrics=metrics)
+            if int(batch.group(1)) in self.broken_chunks:
+                return SimpleNamespace(content="無法輸出", metrics=metrics)
+            items = json.loads(re.search(r"搜尋結果（JSON）：\s*(\[.*?\])\s*\n", prompt, re.DOTALL).group(1))
+            payload = {"items": [
+                {
+                    "title": item["title"].replace("Vietnam central bank news", "越南央行新聞"),
+                    "source": item["source"],
+                    "url": item["url"],
+                    "date": item["date"],
+                    "summary": "中文摘要",
+                    "analysis": ["重點一", "重點二"],
+                }
+                for item in items
+            ]}
+            return SimpleNamespace(content=json.dumps(payload, ensure_ascii=False), metrics=metrics)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def chunked(monkeypatch):
+    monkeypatch.setattr(Config, "ANALYST_CHUNK_SIZE", 4)
+    monkeypatch.setattr(Config, "ANALYST_CHUNK_CONCURRENCY", 2)
+    agent = AnalystAgent(output_mode="chunked")
+    model = FakeModel()
+    monkeypatch.setattr(agent, "_build_structured_agent", lambda: model)
+    return agent, model
+
+
+class TestChunkedAnalyst:
+    """測試分批平行整理與市場洞察"""
+
+    def test_map_reduce(self, chunked):
+        """測試新聞依原順序合併，最後一次呼叫撰寫洞察"""
+        agent, model = chunked
+        stats = []
+        markdown, news = agent.analyze(
+            {"query": "越南 央行", "content": "", "results": make_results(10)},
+            on_chunk=stats.append
+        )
+
+        assert len(model.prompts) == 4  # 3 批 + 1 次洞察
+        assert [item.title for item in news] == [f"越南央行新聞 {i}" for i in range(10)]
+        assert news[0].country == "越南"
+        assert news[0].keyword == "越南 央行"
+        assert news[9].analysis == "1) 重點一 2) 重點二"
+        assert "## 市場洞察\n1. 利率下行\n2. 匯率承壓" in markdown
+        assert "### 10. 越南央行新聞 9" in markdown
+
+    def test_concurrency_cap(self, chunked):
+        """測試同時執行的批次不超過上限"""
+        agent, model = chunked
+        agent.analyze({"query": "越南", "content": "", "results": make_results(16)})
+        assert model.max_active == 2
+
+    def test_chunk_stats(self, chunked):
+        """測試每次呼叫都回報耗時與 token 數"""
+        agent, _ = chunked
+        stats = []
+        agent.analyze({"query": "越南", "content": "", "results": make_results(10)}, on_chunk=stats.append)
+
+        assert sorted(s["chunk"] for s in stats if s["stage"] == "map") == [1, 2, 3]
+        assert [s["items"] for s in sorted(stats[:3], key=lambda s: s["chunk"])] == [4, 4, 2]
+        assert stats[-1]["stage"] == "reduce"
+        assert stats[-1]["items"] == 10
+        assert all(s["output_tokens"] == 42 and s["input_tokens"] > 0 for s in stats)
+        assert all(s["seconds"] >= 0.05 for s in stats)
+
+    def test_broken_chunk_keeps_raw_items(self, chunked):
+        """測試某一批輸出無法解析時保留原始搜尋結果"""
+        agent, model = chunked
+        model.broken_chunks = {2}
+        stats = []
+        _, news = agent.analyze({"query": "越南", "content": "", "results": make_results(10)}, on_chunk=stats.append)
+
+        assert len(news) == 10
+        assert news[4].title == "Vietnam central bank news 4"
+        assert news[4].summary == "Summary 4"
+        assert "error" in next(s for s in stats if s["chunk"] == 2)
+
+    def test_failed_reduce_keeps_news(self, chunked):
+        """測試市場洞察呼叫失敗時保留已整理的新聞，報告只是不含摘要與洞察"""
+        agent, model = chunked
+        model.broken_reduce = True
+        stats = []
+        markdown, news = agent.analyze({"query": "越南", "content": "", "results": make_results(10)}, on_chunk=stats.append)
+
+        assert [item.title for item in news] == [f"越南央行新聞 {i}" for i in range(10)]
+        assert "### 10. 越南央行新聞 9" in markdown
+        assert "利率下行" not in markdown
+        assert stats[-1]["stage"] == "reduce" and stats[-1]["error"] == "reduce failed"
+
+    def test_results_from_content(self, chunked):
+        """測試沒有 results 欄位時由 content 的 ```json 區塊取得新聞"""
+        agent, model = chunked
+        content = "```json\n" + json.dumps({"results": make_results(5)}) + "\n```"
+        _, news = agent.analyze({"query": "越南", "content": content})
+        assert len(news) == 5
+        assert len(model.prompts) == 3
+
+    def test_small_payload_single_call(self, chunked, monkeypatch):
+        """測試新聞數不超過一批時只呼叫一次（與 json 模式相同）"""
+        agent, model = chunked
+        payload = {"summary": "摘要", "items": [{"title": "單則新聞", "url": "https://example.com"}], "insights": []}
+        monkeypatch.setattr(agent, "_get_structured_agent", lambda: SimpleNamespace(
+            run=lambda prompt: SimpleNamespace(content=json.dumps(payload, ensure_ascii=False))
+        ))
+        _, news = agent.analyze({"query": "越南", "content": "", "results": make_results(3)})
+
+        assert model.prompts == []
+        assert [item.title for item in news] == ["單則新聞"]
+
+
+class TestRunUsage:
+    """測試 token 統計的讀取"""
+
+    def test_metrics_object_and_dict(self):
+        """測試物件與較舊版本的 dict（列表值）格式"""
+        assert AnalystAgent._run_usage(SimpleNamespace(metrics=SimpleNamespace(input_tokens=5, output_tokens=7))) == (5, 7)
+        assert AnalystAgent._run_usage(SimpleNamespace(metrics={"input_tokens": [1, 2], "output_tokens": [3]})) == (3, 3)
+        assert AnalystAgent._run_usage(SimpleNamespace()) == (0, 0)
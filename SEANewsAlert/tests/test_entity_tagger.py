@@ -0,0 +1,164 @@
+"""
+測試地名辭典驅動的國家標註器
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.entity_tagger import CountryTagger, GazetteerMatcher, Entity, country_tagger
+from utils.news_model import NewsBatch, NewsItem
+
+
+class TestGazetteerCoverage:
+    """測試地名辭典涵蓋的實體"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("Vietnam exports rise", "越南"),
+        ("胡志明市房價上漲", "越南"),
+        ("HOSE hits record turnover", "越南"),
+        ("Ngân hàng Nhà nước Việt Nam giữ lãi suất", "越南"),
+        ("SET index slips", "泰國"),
+        ("ธนาคารแห่งประเทศไทย คงดอกเบี้ย", "泰國"),
+        ("SGX-listed banks were flat", "新加坡"),
+        ("Bursa Malaysia closes higher", "馬來西亞"),
+        ("IDX composite falls in Jakarta", "印尼"),
+        ("PSEi gains in Manila", "菲律賓"),
+        ("Phnom Penh property boom", "柬埔寨"),
+        ("Yangon traders react", "緬甸"),
+        ("Vientiane inflation eases", "寮國"),
+        ("Bandar Seri Begawan officials comment", "汶萊"),
+    ])
+    def test_entities(self, text, expected):
+        """測試國名、城市、交易所、央行與當地語言名稱"""
+        assert country_tagger.tag(content=text) == expected
+
+    def test_no_mention_uses_default(self):
+        """測試沒有提到任何國家時使用預設值"""
+        assert country_tagger.tag("全球股市震盪", "Reuters", "Fed signals rate path") == "東南亞"
+
+
+class TestMatching:
+    """測試單字邊界、大小寫與重疊別名"""
+
+    def test_word_boundary(self):
+        """測試英數別名必須是完整單字"""
+        assert country_tagger.tag(content="Asset prices reset after the sell-off") == "東南亞"
+        assert country_tagger.tag(content="Thailander is not a word") == "東南亞"
+
+    def test_acronym_case_sensitive(self):
+        """測試全大寫縮寫須大小寫相符"""
+        assert country_tagger.tag(content="The Set of rules was revised") == "東南亞"
+        assert country_tagger.tag(content="The SET index slipped") == "泰國"
+
+    @pytest.mark.parametrize("alias", ["SET Index", "PSE Composite Index", "FBM KLCI", "VN-Index", "SET50"])
+    def test_acronym_first_aliases_case_sensitive(self, alias):
+        """測試以縮寫開頭的別名同樣須縮寫大小寫相符，其後的單字不區分大小寫"""
+        entity = next(entity for _, _, entity in country_tagger.entities(alias) if entity.alias == alias)
+        assert entity.case_sensitive
+        assert not any(entity.alias == alias for _, _, entity in country_tagger.entities(alias.lower()))
+
+    @pytest.mark.parametrize("title, source, content, expected", [
+        ("Giá vàng hôm nay tăng mạnh", "Lao Động", "", "東南亞"),
+        ("Lãi suất tiết kiệm", "Lao Dong", "Ngân hàng Nhà nước giữ lãi suất", "越南"),
+        ("", "", "Flooding in Lao Cai province, Vietnam", "越南"),
+        ("", "", "The committee will set index thresholds next year", "東南亞"),
+        ("", "", "Traders reset index weights; Set Index funds are unaffected", "東南亞"),
+    ])
+    def test_false_positive_aliases(self, title, source, content, expected):
+        """測試 Lao Động（報社）、Lao Cai（越南省份）與一般英文的 set index 不會被標為寮國或泰國"""
+        assert country_tagger.tag(title, source, content) == expected
+
+    def test_lao_still_matches_full_names(self):
+        """測試 Laos、Lao PDR 與寮國證券交易所仍然標為寮國"""
+        assert country_tagger.tag(content="Laos and the Lao PDR central bank") == "寮國"
+        assert country_tagger.tag(content="Lao Securities Exchange turnover") == "寮國"
+        assert country_tagger.tag(content="The SET Index and SET index both mean Thailand") == "泰國"
+
+    def test_longest_alias_wins(self):
+        """測試同一位置取最長的別名"""
+        matcher = GazetteerMatcher([
+            Entity("thai", "A", "names", False),
+            Entity("thailand", "B", "names", False),
+        ])
+        assert [(start, end) for start, end, _ in matcher.finditer("Thailand")] == [(0, 8)]
+
+    def test_rejected_match_does_not_hide_overlap(self):
+        """測試被拒絕的比對不會遮蔽從下一個字元開始的別名"""
+        matcher = GazetteerMatcher([
+            Entity("xab", "A", "names", False),
+            Entity("abc", "B", "names", False),
+        ])
+        matched = [entities[0].country for _, _, entities in matcher.finditer("yxabc abc")]
+        assert matched == ["B"]
+
+    def test_entities_positions(self):
+        """測試 entities 回傳別名的位置與種類"""
+        text = "Bank of Thailand"
+        found = country_tagger.entities(text)
+        assert any(text[start:end] == "Bank of Thailand" and entity.kind == "central_banks"
+                   for start, end, entity in found)
+
+
+class TestScoring:
+    """測試加權計分與批次標註"""
+
+    def test_title_outweighs_content(self):
+        """測試標題中的國家權重高於內文中的單次提及"""
+        assert country_tagger.tag("越南央行降息", "", "Singapore and Malaysia") == "越南"
+
+    def test_counts_mentions(self):
+        """測試依提及次數而非字典順序判斷"""
+        content = "Singapore was mentioned once; Hanoi, Da Nang and Ho Chi Minh City several times."
+        assert country_tagger.tag(content=content) == "越南"
+
+    def test_tie_goes_to_first_mention(self):
+        """測試分數相同時取最先被提到的國家"""
+        assert country_tagger.tag(content="Manila and Jakarta") == "菲律賓"
+        assert country_tagger.tag(content="Jakarta and Manila") == "印尼"
+
+    def test_tag_many_matches_tag(self):
+        """測試批次標註與逐則標註結果相同（欄位不會跨越彼此）"""
+        records = [
+            ("越南出口", "", "Singapore"),
+            ("", "Bangkok Post", ""),
+            ("", "", ""),
+            (None, None, "Phnom Penh"),
+            ("Thai", "land", ""),
+        ]
+        assert country_tagger.tag_many(records) == [country_tagger.tag(*record) for record in records]
+        assert country_tagger.tag_many(records)[4] == "泰國"
+
+    def test_tag_batch(self):
+        """測試以標題、來源與摘要更新 NewsBatch 的國家欄位"""
+        news = NewsBatch.from_items([
+            NewsItem(title="Yangon market update", source="Myanmar Now"),
+            NewsItem(title="Rates", summary="Bank Negara Malaysia held the OPR"),
+        ])
+        assert country_tagger.tag_batch(news) is news
+        assert news.columns["country"] == ["緬甸", "馬來西亞"]
+
+    def test_custom_gazetteer(self):
+        """測試以自訂地名辭典建立標註器"""
+        tagger = CountryTagger({"default": "其他", "countries": [{"name": "甲", "cities": ["Alpha"]}]})
+        assert tagger.countries == ["甲"]
+        assert tagger.tag(content="alpha city") == "甲"
+        assert tagger.tag(content="beta") == "其他"
+        assert CountryTagger({}).tag(content="Vietnam") == "東南亞"
+
+
+class TestAnalystIntegration:
+    """測試 AnalystAgent 使用標註器"""
+
+    def test_extract_country(self):
+        """測試 _extract_country 改用地名辭典標註器"""
+        from agents.analyst_agent import AnalystAgent
+
+        agent = AnalystAgent(output_mode="markdown")
+        assert agent.country_tagger is country_tagger
+        assert agent._extract_country("央行調整匯率規定", "Myanmar Now", "kyat") == "緬甸"
@@ -0,0 +1,108 @@
+"""
+測試新聞 Excel 輸出（streaming / pandas 模式）
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.excel_writer import NEWS_COLUMNS, SHEET_NAME, write_news_excel
+
+HEADERS = [name for name, _ in NEWS_COLUMNS]
+
+
+def make_items(count):
+    for i in range(count):
+        yield {
+            "新聞標題（中文）": f"越南央行調降利率 {i}",
+            "來源國家": "越南",
+            "來源網站連結": f"https://vnexpress.net/{i}",
+            "發布日期": "2025-01-01",
+            "摘要": "越南央行宣布調降政策利率。",
+            "重點分析": "有助於刺激信貸成長。",
+            "關鍵字": "不輸出的欄位",
+        }
+
+
+class TestStreamingWriter:
+    """測試 write-only 逐列寫出"""
+
+    def test_rows_and_column_order(self, tmp_path):
+        """測試由迭代器寫入的標題列、資料列與欄位順序"""
+        path = tmp_path / "news.xlsx"
+        assert write_news_excel(path, make_items(3)) == 3
+
+        sheet = load_workbook(path)[SHEET_NAME]
+        rows = list(sheet.iter_rows(values_only=True))
+        assert list(rows[0]) == HEADERS
+        assert len(rows) == 4
+        assert rows[1][0] == "越南央行調降利率 0"
+        assert rows[3][2] == "https://vnexpress.net/2"
+
+    def test_column_formats(self, tmp_path):
+        """測試欄寬、標題樣式與連結欄樣式"""
+        path = tmp_path / "news.xlsx"
+        write_news_excel(path, make_items(2))
+
+        sheet = load_workbook(path)[SHEET_NAME]
+        assert sheet.column_dimensions["A"].width == 50
+        assert sheet.column_dimensions["F"].width == 80
+        assert sheet["A1"].font.bold
+        assert sheet["A1"].fill.start_color.rgb.endswith("CCE5FF")
+        assert sheet["C2"].font.underline == "single"
+        assert sheet["C2"].font.color.rgb.endswith("0000FF")
+        assert sheet["E3"].alignment.wrap_text
+        assert sheet["E3"].alignment.vertical == "top"
+
+    def test_missing_values_and_control_characters(self, tmp_path):
+        """測試缺少的欄位留空，Excel 不接受的控制字元被移除"""
+        path = tmp_path / "news.xlsx"
+        write_news_excel(path, [{"新聞標題（中文）": "標題\x07含控制字元", "摘要": None}])
+
+        sheet = load_workbook(path)[SHEET_NAME]
+        assert sheet["A2"].value == "標題含控制字元"
+        assert sheet["B2"].value is None
+        assert sheet["E2"].value is None
+
+    def test_unknown_mode(self, tmp_path):
+        """測試不支援的輸出模式"""
+        with pytest.raises(ValueError):
+            write_news_excel(tmp_path / "news.xlsx", [], mode="csv")
+
+
+class TestPandasWriter:
+    """測試 pandas 模式與 streaming 模式輸出相同內容"""
+
+    def test_same_values(self, tmp_path):
+        """測試兩種模式寫出的儲存格內容一致"""
+        pytest.importorskip("pandas")
+        items = list(make_items(5))
+        streaming, pandas_path = tmp_path / "streaming.xlsx", tmp_path / "pandas.xlsx"
+        write_news_excel(streaming, items, mode="streaming")
+        write_news_excel(pandas_path, items, mode="pandas")
+
+        def values(path):
+            return list(load_workbook(path)[SHEET_NAME].iter_rows(values_only=True))
+
+        assert values(streaming) == values(pandas_path)
+
+
+class TestReportAgentExcel:
+    """測試 ReportGeneratorAgent.generate_excel 使用 streaming 寫入"""
+
+    def test_generate_excel_from_generator(self, tmp_path, monkeypatch):
+        """測試 generate_excel 可直接接受新聞迭代器"""
+        from agents.report_agent import ReportGeneratorAgent
+
+        agent = ReportGeneratorAgent()
+        monkeypatch.setattr(agent, "reports_dir", tmp_path)
+        path = agent.generate_excel(make_items(4), "report")
+
+        assert path == tmp_path / "report.xlsx"
+        assert load_workbook(path)[SHEET_NAME].max_row == 5
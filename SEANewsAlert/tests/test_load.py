@@ -0,0 +1,168 @@
+"""
+負載測試：報告執行期間狀態輪詢延遲
+10 個報告同時執行時，GET /api/tasks/{task_id} 的 p99 延遲必須維持平穩
+"""
+import asyncio
+import gc
+import os
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from app.main import app
+from app.services.executor import BlockingStageExecutor
+from app.services.progress import task_manager, TaskStatus
+from app.services.renderer import ArtifactRenderer
+from app.services import workflow as workflow_module
+
+STAGE_SECONDS = 0.3
+CONCURRENT_REPORTS = 10
+
+
+class SlowResearchAgent:
+    """模擬阻塞的串流搜尋"""
+
+    def search(self, query, time_instruction=None, num_instruction=None, language=None, task_id=None):
+        time.sleep(STAGE_SECONDS)
+        return {"status": "success", "query": query, "content": "", "sources": []}
+
+    async def asearch(self, query, time_instruction=None, num_instruction=None, language=None, task_id=None):
+        await asyncio.sleep(STAGE_SECONDS)
+        return {"status": "success", "query": query, "content": "", "sources": []}
+
+
+class SlowAnalystAgent:
+    """模擬阻塞的 LLM 分析"""
+
+    def analyze(self, search_results, progress=None, on_chunk=None):
+        time.sleep(STAGE_SECONDS)
+        return "# 測試報告", []
+
+
+class SlowReportAgent:
+    """模擬阻塞的 PDF / Excel 渲染"""
+
+    def generate_pdf(self, markdown_content, filename=None, progress=None):
+        time.sleep(STAGE_SECONDS)
+        return Path("load_test.pdf")
+
+    def generate_excel(self, news_data, filename=None, progress=None):
+        time.sleep(STAGE_SECONDS)
+        return Path(filename or "load_test.xlsx")
+
+
+class SlowEmailAgent:
+    """模擬阻塞的 SMTP 發送"""
+
+    def send_report(self, recipients, pdf_path, excel_path=None, subject=None, body=None):
+        time.sleep(STAGE_SECONDS)
+        return True
+
+
+def _p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+async def _poll(client, task_id, until, samples, interval=0.01):
+    # 延遲包含等待事件迴圈排程的時間，事件迴圈被阻塞時會反映在樣本中
+    while time.perf_counter() < until:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        response = await client.get(f"/api/tasks/{task_id}")
+        samples.append(time.perf_counter() - start - interval)
+        assert response.status_code == 200
+
+
+async def _run_load(concurrent_reports=CONCURRENT_REPORTS):
+    workflow = workflow_module.workflow
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        probe_id = task_manager.create_task("probe", "probe@example.com")
+
+        # 閒置時的基準延遲
+        idle_samples = []
+        await _poll(client, probe_id, time.perf_counter() + 0.5, idle_samples)
+
+        task_ids = [
+            task_manager.create_task(f"負載測試 {i}", "load@example.com")
+            for i in range(concurrent_reports)
+        ]
+        reports = [asyncio.create_task(workflow.execute_task(task_id)) for task_id in task_ids]
+
+        # 報告執行期間的延遲
+        loaded_samples = []
+        await _poll(client, probe_id, time.perf_counter() + STAGE_SECONDS * 4, loaded_samples)
+        await asyncio.gather(*reports)
+
+    return idle_samples, loaded_samples, task_ids
+
+
+class TestStatusPollingUnderLoad:
+    """測試報告執行期間 API 保持回應"""
+
+    @pytest.fixture(autouse=True)
+    def slow_agents(self, monkeypatch):
+        """以阻塞的假 Agent 取代真實 Agent，並使用足夠大的執行緒池"""
+        workflow = workflow_module.workflow
+        monkeypatch.setattr(workflow, "research_agent", SlowResearchAgent())
+        monkeypatch.setattr(workflow, "analyst_agent", SlowAnalystAgent())
+        monkeypatch.setattr(workflow, "report_agent", SlowReportAgent())
+        monkeypatch.setattr(workflow, "email_agent", SlowEmailAgent())
+        monkeypatch.setattr(
+            workflow, "_parse_prompt",
+            lambda task_id, user_prompt: {
+                "keywords": user_prompt,
+                "time_instruction": "最近7天內",
+                "num_instruction": "5-10篇",
+                "language": "English"
+            }
+        )
+        executor = BlockingStageExecutor(max_workers=CONCURRENT_REPORTS, mode="threaded")
+        monkeypatch.setattr(workflow_module, "blocking_executor", executor)
+        # 假的 ReportAgent 只存在於本行程，渲染改用執行緒池
+        renderer = ArtifactRenderer(max_workers=CONCURRENT_REPORTS * 2, mode="threaded")
+        monkeypatch.setattr(workflow, "artifact_renderer", renderer)
+        yield
+        executor.shutdown()
+        renderer.shutdown()
+
+    def test_p99_poll_latency_stays_flat(self):
+        """10 個報告同時執行時，輪詢 p99 延遲不應隨阻塞階段增長"""
+        # 凍結已匯入模組的物件，避免完整 GC 掃描造成與本測試無關的延遲尖峰
+        gc.collect()
+        gc.freeze()
+        try:
+            idle_samples, loaded_samples, task_ids = asyncio.run(_run_load())
+        finally:
+            gc.unfreeze()
+
+        idle_p99 = _p99(idle_samples)
+        loaded_p99 = _p99(loaded_samples)
+        latency = (f"idle p99={idle_p99 * 1000:.1f}ms, loaded p99={loaded_p99 * 1000:.1f}ms "
+                   f"({len(loaded_samples)} polls)")
+
+        # 若阻塞階段在事件迴圈中執行，輪詢會被卡住至少一個階段的時間
+        assert loaded_p99 < STAGE_SECONDS / 3, latency
+        assert loaded_p99 < idle_p99 + 0.05, latency
+        for task_id in task_ids:
+            assert task_manager.get_task(task_id)["status"] == TaskStatus.SUCCEEDED
+            assert set(task_manager.get_task_details(task_id)["render_timings"]) == {"pdf", "xlsx", "total"}
+
+    def test_inline_mode_blocks_polling(self, monkeypatch):
+        """對照組：inline 模式下輪詢會被阻塞階段卡住"""
+        monkeypatch.setattr(
+            workflow_module, "blocking_executor", BlockingStageExecutor(mode="inline")
+        )
+        monkeypatch.setattr(workflow_module.workflow, "artifact_renderer", ArtifactRenderer(mode="inline"))
+        _, loaded_samples, _ = asyncio.run(_run_load(concurrent_reports=1))
+
+        assert max(loaded_samples) >= STAGE_SECONDS
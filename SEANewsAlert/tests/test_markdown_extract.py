@@ -0,0 +1,150 @@
+"""
+測試分析報告 Markdown 的逐行擷取（語料、CRLF、模糊測試與線性時間）
+"""
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.markdown_extract import extract_news, iter_news_sections, parse_news_section
+
+CORPUS_DIR = Path(__file__).parent / "fixtures" / "analyst_markdown"
+EXPECTED = json.loads((CORPUS_DIR / "expected.json").read_text(encoding="utf-8"))
+FIELDS = ("title", "source", "url", "published_at", "summary", "analysis")
+
+
+def extract(text):
+    return [{field: getattr(item, field) for field in FIELDS} for item in extract_news(text)]
+
+
+class TestCorpus:
+    """測試真實格式與格式變化的語料"""
+
+    @pytest.mark.parametrize("name", sorted(EXPECTED))
+    def test_expected_fields(self, name):
+        """測試每份語料擷取出的欄位與預期一致"""
+        assert extract((CORPUS_DIR / name).read_text(encoding="utf-8")) == EXPECTED[name]
+
+    @pytest.mark.parametrize("name", sorted(EXPECTED))
+    def test_crlf_same_as_lf(self, name):
+        """測試 CRLF 換行的擷取結果與 LF 相同"""
+        text = (CORPUS_DIR / name).read_text(encoding="utf-8")
+        assert extract(text.replace("\n", "\r\n")) == extract(text)
+
+    def test_keyword_and_country(self):
+        """測試關鍵字與國家判斷函數"""
+        text = (CORPUS_DIR / "well_formed.md").read_text(encoding="utf-8")
+        items = list(extract_news(text, "央行", lambda title, source, content: title[:2]))
+        assert [item.country for item in items] == ["越南", "泰國", "新加"]
+        assert {item.keyword for item in items} == {"央行"}
+
+    def test_analyst_uses_extractor(self):
+        """測試 AnalystAgent 的 Markdown 擷取結果與語料預期一致"""
+        from agents.analyst_agent import AnalystAgent
+
+        text = (CORPUS_DIR / "well_formed.md").read_text(encoding="utf-8")
+        news = AnalystAgent(output_mode="markdown")._extract_from_markdown(text, "央行")
+        assert [item.url for item in news] == [item["url"] for item in EXPECTED["well_formed.md"]]
+        assert news[1].country == "泰國"
+
+
+class TestSections:
+    """測試標題切分與欄位狀態機"""
+
+    def test_non_item_heading_ends_section(self):
+        """測試非新聞標題結束目前的新聞，之後的內容不屬於任何新聞"""
+        sections = list(iter_news_sections("### 1. 甲\n內容\n## 市場洞察\nhttps://example.com\n### 2. 乙\n"))
+        assert sections == [("甲", ["內容"]), ("乙", [])]
+
+    def test_duplicate_field_keeps_first(self):
+        """測試重複的欄位只採用第一次出現的內容"""
+        values = parse_news_section(["- **摘要**：第一次", "續行", "- **摘要**：第二次", "不屬於摘要"])
+        assert values["summary"] == "第一次\n續行"
+
+    def test_source_without_url(self):
+        """測試沒有網址的來源保留名稱，網址由內容中的第一個網址補上"""
+        values = parse_news_section(["- **來源**：[路透社]", "原文 https://www.reuters.com/a"])
+        assert values["source"] == "路透社"
+        assert values["url"] == "https://www.reuters.com/a"
+
+
+FRAGMENTS = [
+    "", "   ", "### {n}. 標題 {n}", "### 市場觀察", "## 資料來源", "# 報告", "###", "### .", "####{n}、標題",
+    "- **來源**：[VnExpress](https://vnexpress.net/{n})", "**來源:** Reuters https://reuters.com/{n}",
+    "- **來源**：[未關閉", "- **日期**：2025-01-0{d}", "**發布日期**: 2025年1月{d}日", "- **日期**：",
+    "- **摘要**：摘要 {n}", "**摘要：** 摘要", "- **重點分析**：1) 一 2) 二", "  - **市場分析**：子項目",
+    "- **", "**", "****", "** [ ( ) ] **", "* * *", "---", "https://example.com/{n}", "1) 條列", "  2) 條列",
+    "- 一般項目", "**粗體**文字**：", "- **未知欄位**：值", "\t", "全形：冒號", "###   {n}.    ",
+]
+
+
+def random_report(rng, lines):
+    out = []
+    for _ in range(lines):
+        fragment = rng.choice(FRAGMENTS).format(n=rng.randint(1, 99), d=rng.randint(1, 9))
+        if rng.random() < 0.1:
+            fragment = fragment * rng.randint(2, 20)
+        out.append(fragment)
+    return rng.choice(["\n", "\r\n"]).join(out)
+
+
+class TestFuzz:
+    """以隨機組合的片段（含格式錯誤）測試擷取不會出錯"""
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_random_reports(self, seed):
+        """測試隨機報告：不拋出例外、新聞數等於新聞標題數、欄位不含跨行的標題或網址以外的字元"""
+        rng = random.Random(seed)
+        text = random_report(rng, rng.randint(0, 400))
+        items = list(extract_news(text))
+
+        assert len(items) == len(list(iter_news_sections(text)))
+        for item in items:
+            assert item.title and "\n" not in item.title
+            assert item.url == "" or (item.url.startswith("http") and " " not in item.url)
+            assert "\n" not in item.published_at
+            for text_field in (item.summary, item.analysis):
+                assert not any(line.lstrip().startswith("#") for line in text_field.splitlines())
+                assert "\r" not in text_field
+
+
+def best_time(text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(extract_news(text))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def blank_runs(scale):
+    blank = "\n" * (scale * 2000)
+    return f"### 1. 空白行\n- **摘要**：第一行{blank}摘要\n- **重點分析**：第一點{blank}分析\n"
+
+
+def long_lines(scale):
+    noise = "** [未配對 *強調 _底線 " * (scale * 2000)
+    return f"### 1. 超長行\n- **來源**：[{noise}\n- **摘要**：{noise}\n- **重點分析**：{noise}\n"
+
+
+def many_items(scale):
+    text = (CORPUS_DIR / "well_formed.md").read_text(encoding="utf-8")
+    return "\n".join([text] * (scale * 10))
+
+
+class TestLinearScaling:
+    """測試耗時與報告長度成線性關係（舊的正則實作在 blank_runs 上為平方時間）"""
+
+    @pytest.mark.parametrize("build", [blank_runs, long_lines, many_items])
+    def test_linear(self, build):
+        """測試規模放大 8 倍時耗時不超過約 8 倍（平方時間約為 64 倍）"""
+        small, large = best_time(build(1)), best_time(build(8))
+        assert large / max(small, 1e-4) < 24
@@ -0,0 +1,107 @@
+"""
+測試 Markdown 轉 ReportLab Flowable 編譯器
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from reportlab.platypus import Paragraph, Spacer
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.markdown_flowables import render_inline
+
+
+@pytest.fixture(scope="module")
+def agent():
+    from agents.report_agent import ReportGeneratorAgent
+    return ReportGeneratorAgent()
+
+
+class TestRenderInline:
+    """測試行內格式"""
+
+    @pytest.mark.parametrize("text, expected", [
+        ("**新加坡**股市", "<b>新加坡</b>股市"),
+        ("__粗體__ 與 *斜體* 與 _斜體_", "<b>粗體</b> 與 <i>斜體</i> 與 <i>斜體</i>"),
+        ("***重點***", "<b><i>重點</i></b>"),
+        ("**來源**：[Bloomberg](https://bloomberg.com/a_b_c)",
+         '<b>來源</b>：Bloomberg <font color="blue">https://bloomberg.com/a_b_c</font>'),
+        ("[**粗體**連結](https://x.com)", '<b>粗體</b>連結 <font color="blue">https://x.com</font>'),
+    ])
+    def test_emphasis_and_links(self, text, expected):
+        """測試粗體、斜體與連結"""
+        assert render_inline(text) == expected
+
+    @pytest.mark.parametrize("text, expected", [
+        ("R&D <script> 1 < 2 > 0", "R&amp;D &lt;script&gt; 1 &lt; 2 &gt; 0"),
+        ("[A&B](https://x.com/?a=1&b=2)", 'A&amp;B <font color="blue">https://x.com/?a=1&amp;b=2</font>'),
+    ])
+    def test_xml_escaping(self, text, expected):
+        """測試 XML 特殊字元被跳脫"""
+        assert render_inline(text) == expected
+
+    @pytest.mark.parametrize("text", [
+        "snake_case_name 與 file_v2_final",
+        "2 * 3 * 4",
+        "未關閉的 **粗體",
+        "單獨的 _ 底線",
+    ])
+    def test_literal_markers(self, text):
+        """測試不成對或單字內部的標記保留原樣"""
+        assert render_inline(text) == text
+
+
+class TestCompiler:
+    """測試區塊轉換"""
+
+    def test_blocks(self, agent):
+        """測試標題、項目符號、編號列表、分隔線與段落"""
+        story = agent._parse_markdown_to_story(
+            "# 標題\n## 摘要\n### 1. 新聞\n- **來源**：路透\n2. 第二點分析\n---\n一般段落\n\n#不是標題"
+        )
+        paragraphs = [f for f in story if isinstance(f, Paragraph)]
+        styles = [p.style.name for p in paragraphs]
+
+        assert styles == [
+            "CustomTitle", "CustomHeading2", "CustomHeading3", "CustomListItem",
+            "CustomListItem", "CustomBody", "CustomBody", "CustomBody",
+        ]
+        assert paragraphs[3].bulletText == "•"
+        assert paragraphs[4].bulletText == "2."
+        assert any(isinstance(f, Spacer) for f in story)
+
+    @pytest.mark.parametrize("line", [
+        "純文字段落",
+        "**來源**：[Bloomberg](https://bloomberg.com/a_b_c) 與 *分析*",
+        "M&A <快訊> ***重點***",
+    ])
+    def test_frags_match_reportlab_parser(self, agent, line):
+        """測試直接組成的 frags 與 ReportLab 解析標記的結果一致"""
+        style = agent.styles["CustomBody"]
+        compiled = agent.markdown_compiler.paragraph(line, style)
+        parsed = Paragraph(render_inline(line), style)
+
+        def describe(paragraph):
+            merged = []
+            for frag in paragraph.frags:
+                key = (frag.fontName, frag.fontSize, frag.textColor)
+                if merged and merged[-1][0] == key:
+                    merged[-1] = (key, merged[-1][1] + frag.text)
+                else:
+                    merged.append((key, frag.text))
+            return merged
+
+        assert describe(compiled) == describe(parsed)
+
+    def test_pdf_with_special_characters(self, agent, tmp_path, monkeypatch):
+        """測試含 <、& 的報告可以正常輸出 PDF"""
+        monkeypatch.setattr(agent, "reports_dir", tmp_path)
+        path = agent.generate_pdf(
+            "# M&A <快訊>\n- **Grab & GoTo**：合併傳聞 <未證實>\n1. 影響 *有限*\n",
+            "special.pdf"
+        )
+        assert path.read_bytes().startswith(b"%PDF")
@@ -0,0 +1,227 @@
+"""
+測試新聞近似重複偵測（MinHash + LSH 與持久化指紋索引）
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.news_dedup import (
+    MemoryFingerprintIndex,
+    MinHasher,
+    NewsDeduplicator,
+    SQLiteFingerprintIndex,
+    _fingerprint_text,
+    band_keys,
+    jaccard,
+)
+
+VNEXPRESS = {
+    "title": "State Bank of Vietnam cuts refinancing rate to 4.5%",
+    "summary": "The State Bank of Vietnam (SBV) cut its refinancing rate by 50 basis points to 4.5% on Friday, "
+               "its fourth cut this year, to support economic growth.",
+    "source": "VnExpress",
+    "url": "https://e.vnexpress.net/news/business/sbv-cut",
+}
+VIR = {
+    "title": "SBV cuts refinancing rate to 4.5 pct",
+    "summary": "The State Bank of Vietnam cut its refinancing rate by 50 basis points to 4.5 percent on Friday, "
+               "the fourth cut this year, to support growth.",
+    "source": "VIR",
+    "url": "https://vir.com.vn/sbv-cuts-refinancing-rate",
+}
+BANGKOK = {
+    "title": "Thai SET index falls 2% on political worries",
+    "summary": "The Stock Exchange of Thailand index fell 2% as investors worried about the political outlook.",
+    "source": "Bangkok Post",
+    "url": "https://www.bangkokpost.com/business/set-falls",
+}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def index(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryFingerprintIndex()
+    else:
+        index = SQLiteFingerprintIndex(tmp_path / "fingerprints.sqlite3")
+        yield index
+        index.close()
+
+
+class TestMinHash:
+    """測試簽章與相似度估計"""
+
+    def test_fingerprint_text(self):
+        """測試全形、大小寫與標點正規化"""
+        assert _fingerprint_text("ＳＢＶ  Cuts, Rates!") == "sbv cuts rates"
+
+    def test_signature_is_deterministic(self):
+        """測試固定種子的簽章可跨實例比較"""
+        assert MinHasher().signature("越南央行降息") == MinHasher().signature("越南央行降息")
+
+    def test_empty_text(self):
+        """測試沒有內容時不產生簽章"""
+        assert MinHasher().signature(" ,.! ") is None
+
+    def test_similarity_ordering(self):
+        """測試改寫的報導相似度高於不相關的新聞"""
+        hasher = MinHasher()
+        text = NewsDeduplicator.item_text
+        a, b, c = (hasher.signature(text(item)) for item in (VNEXPRESS, VIR, BANGKOK))
+        assert jaccard(a, a) == 1.0
+        assert jaccard(a, b) > 0.5 > jaccard(a, c)
+
+    def test_band_keys_unique_per_band(self):
+        """測試不同段的桶鍵不會相同"""
+        keys = band_keys(tuple([7] * 64), 16)
+        assert len(set(keys)) == 16
+
+
+class TestBatchDedup:
+    """測試同一次搜尋中的重複合併"""
+
+    def test_collapses_rewritten_story(self):
+        """測試同一事件的多家報導合併成最先出現的一則"""
+        kept, stats = NewsDeduplicator().deduplicate([VNEXPRESS, BANGKOK, VIR])
+        assert [item["source"] for item in kept] == ["VnExpress", "Bangkok Post"]
+        assert kept[0]["duplicates"][0]["source"] == "VIR"
+        assert stats["input"] == 3 and stats["kept"] == 2 and stats["collapsed"] == 1
+
+    def test_input_not_modified(self):
+        """測試不修改傳入的新聞"""
+        items = [dict(VNEXPRESS), dict(VIR)]
+        NewsDeduplicator().deduplicate(items)
+        assert "duplicates" not in items[0]
+
+    def test_items_without_text_kept(self):
+        """測試沒有標題與摘要的新聞直接保留"""
+        kept, stats = NewsDeduplicator().deduplicate([{"url": "https://a"}, {"url": "https://b"}])
+        assert len(kept) == 2 and stats["collapsed"] == 0
+
+    def test_threshold(self):
+        """測試門檻提高後改寫的報導不再合併"""
+        kept, _ = NewsDeduplicator(threshold=0.95).deduplicate([VNEXPRESS, VIR])
+        assert len(kept) == 2
+
+    def test_invalid_settings(self):
+        """測試不支援的設定"""
+        with pytest.raises(ValueError):
+            NewsDeduplicator(history="drop")
+        with pytest.raises(ValueError):
+            NewsDeduplicator(num_perm=64, bands=10)
+
+
+class TestHistory:
+    """測試與近期報告比對的持久化指紋索引"""
+
+    def test_flag_previously_reported(self, index):
+        """測試 flag 策略標註近期報告出現過的新聞"""
+        dedup = NewsDeduplicator(index)
+        assert dedup.remember([VNEXPRESS], report="task-1") == 1
+        kept, stats = dedup.deduplicate([VIR, BANGKOK])
+        assert len(kept) == 2 and stats["flagged"] == 1
+        assert kept[0]["previously_reported"]["report"] == "task-1"
+        assert kept[0]["previously_reported"]["url"] == VNEXPRESS["url"]
+        assert "previously_reported" not in kept[1]
+
+    def test_suppress(self, index):
+        """測試 suppress 策略移除近期報告出現過的新聞"""
+        dedup = NewsDeduplicator(index, history="suppress")
+        dedup.remember([VNEXPRESS], report="task-1")
+        kept, stats = dedup.deduplicate([VIR, BANGKOK])
+        assert [item["source"] for item in kept] == ["Bangkok Post"]
+        assert stats["suppressed"] == 1
+
+    def test_stored_articles_not_checked(self, index):
+        """測試文章庫重用的新聞（from_store）不與近期報告比對，即時搜尋的新聞仍會比對"""
+        dedup = NewsDeduplicator(index, history="suppress")
+        dedup.remember([VNEXPRESS, BANGKOK], report="task-1")
+        kept, stats = dedup.deduplicate([VIR, {**BANGKOK, "from_store": True}])
+        assert [item["source"] for item in kept] == ["Bangkok Post"]
+        assert stats["suppressed"] == 1
+
+    def test_history_off(self, index):
+        """測試 history=off 時只做同批去重"""
+        dedup = NewsDeduplicator(index, history="off")
+        dedup.remember([VNEXPRESS])
+        kept, stats = dedup.deduplicate([VIR])
+        assert len(kept) == 1 and stats["flagged"] == 0 and "previously_reported" not in kept[0]
+
+    def test_same_url_replaced(self, index):
+        """測試相同（正規化後）網址的指紋只保留最新一筆"""
+        dedup = NewsDeduplicator(index)
+        dedup.remember([VNEXPRESS], report="task-1")
+        dedup.remember([{**VNEXPRESS, "url": VNEXPRESS["url"] + "?utm_source=x"}], report="task-2")
+        assert len(index) == 1
+        kept, _ = dedup.deduplicate([VIR])
+        assert kept[0]["previously_reported"]["report"] == "task-2"
+
+    def test_retention(self, index):
+        """測試超過保留天數的指紋被移除"""
+        dedup = NewsDeduplicator(index, retention_days=7)
+        dedup.remember([VNEXPRESS], seen_at=time.time() - 10 * 86400)
+        dedup.remember([BANGKOK])
+        assert len(index) == 1
+        kept, stats = dedup.deduplicate([VIR])
+        assert stats["flagged"] == 0
+
+    def test_sqlite_persists(self, tmp_path):
+        """測試 SQLite 指紋索引在重新開啟後仍可比對"""
+        path = tmp_path / "fingerprints.sqlite3"
+        first = SQLiteFingerprintIndex(path)
+        NewsDeduplicator(first).remember([VNEXPRESS], report="task-1")
+        first.close()
+
+        second = SQLiteFingerprintIndex(path)
+        kept, stats = NewsDeduplicator(second).deduplicate([VIR])
+        second.close()
+        assert stats["flagged"] == 1
+
+
+class TestWorkflowDedup:
+    """測試工作流程中搜尋與分析之間的去重階段"""
+
+    def test_deduplicate_search_results(self):
+        """測試 results 與 content 中的 JSON 區塊都替換為去重後的新聞"""
+        from agents import ResearchAgent
+        from app.services.progress import task_manager
+        from app.services.workflow import NewsReportWorkflow
+
+        workflow = NewsReportWorkflow.__new__(NewsReportWorkflow)
+        workflow.news_deduplicator = NewsDeduplicator(MemoryFingerprintIndex())
+        task_id = task_manager.create_task("越南央行", "dedup@example.com")
+        content = '```json\n{"search_query": "越南央行", "results": []}\n```'
+        search_results = {"status": "success", "query": "越南央行", "content": content,
+                          "results": [VNEXPRESS, VIR, BANGKOK]}
+
+        deduped = workflow._deduplicate(task_id, search_results)
+        assert [item["source"] for item in deduped["results"]] == ["VnExpress", "Bangkok Post"]
+        assert len(ResearchAgent._extract_results_json(deduped["content"])) == 2
+        assert task_manager.get_task_details(task_id)["news_dedup"]["collapsed"] == 1
+
+        workflow._remember_news(task_id, deduped)
+        again = workflow._deduplicate(task_id, {**search_results, "results": [VIR]})
+        assert again["results"][0]["previously_reported"]["report"] == task_id
+
+    def test_deduplicate_failure_keeps_results(self):
+        """測試去重失敗（例如指紋索引無法讀取）時原樣回傳搜尋結果"""
+        from app.services.progress import task_manager
+        from app.services.workflow import NewsReportWorkflow
+
+        class BrokenIndex(MemoryFingerprintIndex):
+            def candidates(self, keys):
+                raise RuntimeError("database is locked")
+
+        workflow = NewsReportWorkflow.__new__(NewsReportWorkflow)
+        workflow.news_deduplicator = NewsDeduplicator(BrokenIndex())
+        task_id = task_manager.create_task("越南央行", "dedup@example.com")
+        search_results = {"status": "success", "query": "越南央行", "content": "", "results": [VNEXPRESS, VIR]}
+
+        assert workflow._deduplicate(task_id, search_results) is search_results
+        assert "news_dedup" not in task_manager.get_task_details(task_id)
@@ -0,0 +1,118 @@
+"""
+測試結構化新聞模型（NewsItem / NewsBatch）
+"""
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.excel_writer import SHEET_NAME, write_news_excel
+from utils.news_model import FIELDS, NewsBatch, NewsItem
+
+LEGACY = {
+    "新聞標題（中文）": "越南央行調降利率",
+    "來源國家": "越南",
+    "關鍵字": "越南 央行",
+    "來源網站連結": "https://vnexpress.net/1",
+    "發布日期": "2025-01-01",
+    "摘要": "越南央行宣布調降政策利率。",
+    "重點分析": "有助於刺激信貸成長。",
+    "來源": "VnExpress",
+}
+
+
+class TestNewsItem:
+    """測試單則新聞"""
+
+    def test_from_legacy_mapping(self):
+        """測試由中文欄名的 dict 建立，並可用中文欄名讀取"""
+        item = NewsItem.from_mapping(LEGACY)
+        assert item.title == "越南央行調降利率"
+        assert item.published_at == "2025-01-01"
+        assert item["來源網站連結"] == "https://vnexpress.net/1"
+        assert item.get("重點分析") == "有助於刺激信貸成長。"
+        assert item.get("不存在", "預設") == "預設"
+        assert item.to_dict() == LEGACY
+
+    def test_english_keys_and_missing_values(self):
+        """測試英文欄位名、缺少欄位與 None 值"""
+        item = NewsItem.from_mapping({"title": "標題", "summary": None, "extra": "忽略"})
+        assert item.title == "標題"
+        assert item.summary == ""
+        assert item.to_dict(labels=False)["country"] == ""
+
+    def test_slots(self):
+        """測試沒有每筆的 __dict__"""
+        assert not hasattr(NewsItem(), "__dict__")
+        with pytest.raises(KeyError):
+            NewsItem()["不存在"]
+
+
+class TestNewsBatch:
+    """測試欄位式新聞批次"""
+
+    def test_append_and_iterate(self):
+        """測試混合 NewsItem 與 dict 加入後依序讀回"""
+        batch = NewsBatch.from_items([LEGACY, NewsItem(title="第二則", country="泰國")])
+        assert len(batch) == 2
+        assert batch[1].country == "泰國"
+        assert [item.title for item in batch] == ["越南央行調降利率", "第二則"]
+        assert list(batch.rows(["title", "country"])) == [("越南央行調降利率", "越南"), ("第二則", "泰國")]
+        assert batch.to_dicts()[0] == LEGACY
+
+    def test_empty_batch(self):
+        """測試空批次為假值"""
+        batch = NewsBatch()
+        assert not batch
+        assert len(batch) == 0
+        assert list(batch) == []
+
+    def test_from_columns(self):
+        """測試由欄位列表建立，缺少的欄位補空字串，長度不一致時報錯"""
+        batch = NewsBatch({"title": ["a", "b"], "url": ["u1", "u2"]})
+        assert set(batch.columns) == set(FIELDS)
+        assert batch.columns["summary"] == ["", ""]
+        with pytest.raises(ValueError):
+            NewsBatch({"title": ["a"], "url": []})
+
+    def test_pickle_roundtrip(self):
+        """測試可 pickle（傳給渲染行程池）"""
+        batch = NewsBatch.from_items([LEGACY] * 3)
+        assert pickle.loads(pickle.dumps(batch)) == batch
+
+    def test_to_pandas(self):
+        """測試轉為 DataFrame 使用中文欄名"""
+        pytest.importorskip("pandas")
+        df = NewsBatch.from_items([LEGACY]).to_pandas()
+        assert df.loc[0, "新聞標題（中文）"] == "越南央行調降利率"
+        assert list(NewsBatch.from_items([LEGACY]).to_pandas(labels=False).columns) == list(FIELDS)
+
+    def test_to_arrow(self):
+        """測試轉為 Arrow Table"""
+        pytest.importorskip("pyarrow")
+        table = NewsBatch.from_items([LEGACY, LEGACY]).to_arrow(labels=False)
+        assert table.num_rows == 2
+        assert table.column("title").to_pylist() == ["越南央行調降利率"] * 2
+
+
+class TestBatchExcel:
+    """測試 NewsBatch 直接寫成 Excel"""
+
+    def test_same_output_as_dicts(self, tmp_path):
+        """測試 NewsBatch 與 dict 列表寫出的內容一致"""
+        items = [dict(LEGACY, **{"新聞標題（中文）": f"標題 {i}"}) for i in range(5)]
+        from_dicts, from_batch = tmp_path / "dicts.xlsx", tmp_path / "batch.xlsx"
+        assert write_news_excel(from_dicts, items) == 5
+        assert write_news_excel(from_batch, NewsBatch.from_items(items)) == 5
+
+        def values(path):
+            return list(load_workbook(path)[SHEET_NAME].iter_rows(values_only=True))
+
+        assert values(from_batch) == values(from_dicts)
@@ -0,0 +1,159 @@
+"""
+測試共用的 OpenAI 客戶端工廠與連線池統計
+"""
+import asyncio
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from config import Config
+from utils import openai_client
+from utils.openai_client import (
+    aclose_openai_clients,
+    create_async_http_client,
+    create_http_client,
+    get_async_openai_client,
+    get_openai_client,
+    openai_chat_client_kwargs,
+    pool_stats,
+)
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class TestSharedClients:
+    """測試所有 Agent 共用同一個客戶端"""
+
+    def test_agents_share_sync_client(self):
+        """測試 Research Agent 與 Analyst Agent（agno OpenAIChat）共用同一個客戶端"""
+        from agents import ResearchAgent, AnalystAgent
+
+        client = get_openai_client()
+        assert ResearchAgent().client is client
+        assert AnalystAgent().agent.model.client is client
+        assert openai_chat_client_kwargs()["client"] is client
+        assert get_openai_client() is client
+
+    def test_async_client_per_event_loop(self):
+        """測試同一事件迴圈共用 AsyncOpenAI 客戶端，不同事件迴圈各自一個"""
+        async def pair():
+            return get_async_openai_client(), get_async_openai_client()
+
+        first_a, first_b = asyncio.run(pair())
+        second_a, _ = asyncio.run(pair())
+
+        assert first_a is first_b
+        assert first_a is not second_a
+
+    def test_async_client_closed_with_loop(self):
+        """測試事件迴圈結束時關閉該迴圈的 AsyncOpenAI 客戶端並移除快取"""
+        async def use():
+            client = get_async_openai_client()
+            await asyncio.sleep(0)
+            assert not client.is_closed()
+            return client
+
+        client = asyncio.run(use())
+        assert client.is_closed()
+        assert client not in [entry[0] for entry in openai_client._async_clients.values()]
+
+        async def unused():
+            return get_async_openai_client()
+
+        asyncio.run(unused())
+        asyncio.run(use())
+        assert not any(loop.is_closed() for loop in openai_client._async_clients)
+
+    def test_aclose_closes_cached_async_clients(self):
+        """測試服務關閉時關閉目前事件迴圈與其他執行中事件迴圈的客戶端"""
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+
+        async def from_other_loop():
+            return get_async_openai_client()
+
+        other = asyncio.run_coroutine_threadsafe(from_other_loop(), other_loop).result(timeout=5)
+
+        async def shutdown():
+            current = get_async_openai_client()
+            await aclose_openai_clients()
+            return current
+
+        current = asyncio.run(shutdown())
+        assert current.is_closed() and other.is_closed()
+        assert openai_client._async_clients == {}
+        other_loop.call_soon_threadsafe(other_loop.stop)
+        thread.join(timeout=5)
+        other_loop.close()
+
+    def test_pool_limits_from_config(self):
+        """測試連線池上限來自 Config"""
+        client = create_http_client()
+        pool = client._transport._pool
+        assert pool._max_connections == Config.OPENAI_MAX_CONNECTIONS
+        assert pool._max_keepalive_connections == Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+        client.close()
+
+
+class TestPoolStats:
+    """測試連線池命中統計"""
+
+    def test_sync_keepalive_hits(self, server_url):
+        """測試連續請求沿用同一條 keep-alive 連線"""
+        pool_stats.reset()
+        with create_http_client() as client:
+            for _ in range(5):
+                assert client.get(f"{server_url}/v1/ping").status_code == 200
+
+        stats = pool_stats.snapshot()
+        assert stats["requests"] == 5
+        assert stats["misses"] == 1
+        assert stats["hits"] == 4
+        assert stats["hit_rate"] == 0.8
+
+    def test_async_keepalive_hits(self, server_url):
+        """測試非同步客戶端的連線重用統計"""
+        async def run():
+            async with create_async_http_client() as client:
+                for _ in range(4):
+                    response = await client.get(f"{server_url}/v1/ping")
+                    assert response.status_code == 200
+
+        pool_stats.reset()
+        asyncio.run(run())
+
+        stats = pool_stats.snapshot()
+        assert stats["requests"] == 4
+        assert stats["misses"] == 1
+        assert stats["hits"] == 3
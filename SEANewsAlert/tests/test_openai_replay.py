@@ -0,0 +1,176 @@
+"""
+測試 OpenAI 錄製／重播工具
+"""
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents import ResearchAgent
+from utils.openai_replay import RecordingOpenAI, ReplayOpenAI, request_key, write_fixture
+
+
+def _events():
+    """模擬一次 Responses 串流"""
+    citation = SimpleNamespace(type="url_citation", title="Vietnam fintech grows", url="https://e.vnexpress.net/a", index=3)
+    return [
+        SimpleNamespace(type="response.created", response=SimpleNamespace(id="resp_1")),
+        SimpleNamespace(type="response.output_item.added", item=SimpleNamespace(type="web_search_call")),
+        SimpleNamespace(type="response.output_item.done", item=SimpleNamespace(type="web_search_call", status="completed")),
+        SimpleNamespace(type="response.output_text.delta", output_index=1, content_index=0, delta="Hello "),
+        SimpleNamespace(type="response.output_text.delta", output_index=1, content_index=0, delta="world"),
+        SimpleNamespace(type="response.content_part.done", output_index=1, content_index=0,
+                        part=SimpleNamespace(text="Hello world", annotations=[citation])),
+        SimpleNamespace(type="response.completed"),
+    ]
+
+
+class _LiveResponses:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        return iter(_events())
+
+
+class _LiveClient:
+    """代替真實 OpenAI 客戶端"""
+
+    def __init__(self):
+        self.responses = _LiveResponses()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: {"id": "x"}))
+
+
+def _chat_completion(text: str) -> dict:
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 1700000000,
+        "model": "gpt-test",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": text},
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    }
+
+
+def _research_agent(client, async_client=None) -> ResearchAgent:
+    agent = ResearchAgent()
+    agent.cache = None
+    agent.client = client
+    agent._async_client = async_client
+    return agent
+
+
+class TestRecording:
+    """測試錄製"""
+
+    def test_records_stream_to_gzip_jsonl(self, tmp_path):
+        """測試串流事件逐筆寫入 fixture 且不改變回傳內容"""
+        live = _LiveClient()
+        recorder = RecordingOpenAI(live, tmp_path)
+
+        events = list(recorder.responses.create(model="m", input="越南 2025-01-01", stream=True))
+
+        assert [e.type for e in events] == [e.type for e in _events()]
+        files = list(tmp_path.glob("responses-*.jsonl.gz"))
+        assert len(files) == 1
+        with gzip.open(files[0], "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0]["kind"] == "responses"
+        assert lines[0]["stream"] is True
+        assert lines[0]["request"]["input"] == "越南 2025-01-01"
+        assert len(lines) == 1 + len(_events())
+        assert lines[4]["event"]["delta"] == "Hello "
+
+    def test_request_key_ignores_dates(self):
+        """測試請求鍵忽略日期（每天重新產生的提示詞仍對應同一份 fixture）"""
+        a = request_key("responses", {"model": "m", "input": "搜尋日期：2025年01月01日 2025-01-01"})
+        b = request_key("responses", {"model": "m", "input": "搜尋日期：2025年10月18日 2025-10-18"})
+        c = request_key("responses", {"model": "m", "input": "其他主題"})
+        assert a == b
+        assert a != c
+
+
+class TestReplay:
+    """測試重播"""
+
+    def test_search_replay_matches_live(self, tmp_path):
+        """測試錄製後重播的搜尋結果與即時結果相同"""
+        live_agent = _research_agent(RecordingOpenAI(_LiveClient(), tmp_path))
+        live = live_agent.search("越南金融科技")
+
+        replay_agent = _research_agent(ReplayOpenAI(tmp_path))
+        replayed = replay_agent.search("越南金融科技")
+
+        assert replayed == live
+        assert replayed["content"] == "Hello world"
+        assert replayed["web_search_count"] == 1
+
+    def test_async_replay(self, tmp_path):
+        """測試非同步重播（asearch）"""
+        _research_agent(RecordingOpenAI(_LiveClient(), tmp_path)).search("越南金融科技")
+        agent = _research_agent(None, ReplayOpenAI(tmp_path, is_async=True))
+
+        result = asyncio.run(agent.asearch("越南金融科技"))
+
+        assert result["status"] == "success"
+        assert result["content"] == "Hello world"
+
+    def test_fallback_round_robin(self, tmp_path):
+        """測試請求不完全相符時依序輪流使用同類型 fixture"""
+        write_fixture(tmp_path, "chat.completions", {"model": "m", "messages": ["a"]}, response=_chat_completion("A"))
+        write_fixture(tmp_path, "chat.completions", {"model": "m", "messages": ["b"]}, response=_chat_completion("B"))
+        client = ReplayOpenAI(tmp_path)
+
+        exact = client.chat.completions.create(model="m", messages=["b"])
+        first = client.chat.completions.create(model="m", messages=["unknown"])
+        second = client.chat.completions.create(model="m", messages=["unknown"])
+
+        assert exact.choices[0].message.content == "B"
+        assert {first.choices[0].message.content, second.choices[0].message.content} == {"A", "B"}
+        assert client.index.exact_hits == 1
+        assert client.index.fallback_hits == 2
+
+    def test_per_event_latency(self, tmp_path):
+        """測試逐事件延遲"""
+        write_fixture(tmp_path, "responses", {"model": "m", "input": "x"}, events=_events())
+        client = ReplayOpenAI(tmp_path, latency=0.01)
+
+        start = time.perf_counter()
+        events = list(client.responses.create(model="m", input="x", stream=True))
+        elapsed = time.perf_counter() - start
+
+        assert len(events) == len(_events())
+        assert elapsed >= 0.01 * len(events)
+
+    def test_agno_chat_replay(self, tmp_path):
+        """測試 agno OpenAIChat 可直接使用重播客戶端"""
+        from agno.agent import Agent
+        from agno.models.openai import OpenAIChat
+
+        write_fixture(tmp_path, "chat.completions", {"model": "m", "messages": []},
+                      response=_chat_completion('{"keywords": "越南"}'))
+        agent = Agent(model=OpenAIChat(id="gpt-test", api_key="sk-test", client=ReplayOpenAI(tmp_path)))
+
+        response = agent.run("解析需求")
+
+        assert response.content == '{"keywords": "越南"}'
+
+    def test_missing_fixtures(self, tmp_path):
+        """測試 fixture 目錄為空時明確報錯"""
+        with pytest.raises(FileNotFoundError):
+            ReplayOpenAI(tmp_path)
@@ -0,0 +1,144 @@
+"""
+測試合併式進度回報器
+"""
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from app.services.progress import TaskProgress
+from utils.progress_reporter import ProgressReporter
+
+
+@pytest.fixture
+def manager():
+    return TaskProgress()
+
+
+@pytest.fixture
+def task_id(manager):
+    return manager.create_task("越南金融科技", "test@example.com")
+
+
+class TestProgressReporter:
+    """測試合併、單調遞增與強制送出"""
+
+    def test_latest_wins_within_interval(self, manager, task_id):
+        """測試間隔內只送出第一筆，其餘合併為最新一筆"""
+        reporter = manager.reporter(task_id, "searching", interval=60)
+
+        for i in range(1, 11):
+            reporter.report(40 + i, "searching", f"訊息 {i}")
+
+        task = manager.get_task_details(task_id)
+        assert task["step_message"] == "訊息 1"
+        assert reporter.stats() == {"reported": 10, "published": 1, "coalesced": 8}
+
+        reporter.close()
+        task = manager.get_task_details(task_id)
+        assert task["step_message"] == "訊息 10"
+        assert task["progress"] == 50
+        assert reporter.stats()["published"] == 2
+
+    def test_zero_interval_publishes_every_update(self, manager, task_id):
+        """測試間隔為 0 時每次都送出"""
+        reporter = manager.reporter(task_id, "searching", interval=0)
+        for i in range(5):
+            reporter.report(40 + i, "searching", f"訊息 {i}")
+        assert reporter.stats() == {"reported": 5, "published": 5, "coalesced": 0}
+
+    def test_progress_never_decreases(self, manager, task_id):
+        """測試進度只增不減（包含任務已有的進度與其他回報器的進度）"""
+        manager.set_progress(task_id, 70, "analyzing")
+        reporter = manager.reporter(task_id, "analyzing", interval=0)
+
+        reporter.report(60, "analyzing", "較低的進度")
+        assert manager.get_task_details(task_id)["progress"] == 70
+
+        manager.set_progress(task_id, 78)
+        reporter.report(75, "analyzing", "另一個回報器已推進")
+        assert manager.get_task_details(task_id)["progress"] == 78
+
+        reporter.report(None, "analyzing", "只更新訊息")
+        assert manager.get_task_details(task_id)["progress"] == 78
+
+    def test_force_publishes_immediately(self, manager, task_id):
+        """測試 force 立即送出（階段邊界）"""
+        reporter = manager.reporter(task_id, "analyzing", interval=60)
+        reporter.report(70, "analyzing", "開始", force=True)
+        reporter.report(71, "analyzing", "中間")
+        reporter.report(75, "analyzing", "完成", force=True)
+
+        assert manager.get_task_details(task_id)["step_message"] == "完成"
+        assert reporter.stats() == {"reported": 3, "published": 2, "coalesced": 1}
+
+    def test_stats_recorded_per_stage(self, manager, task_id):
+        """測試 close 時依階段累加統計到任務詳情"""
+        for _ in range(2):
+            with manager.reporter(task_id, "searching", interval=60) as reporter:
+                for i in range(4):
+                    reporter.report(40 + i, "searching", f"訊息 {i}")
+
+        stats = manager.get_task_details(task_id)["progress_stats"]["searching"]
+        assert stats == {"reported": 8, "published": 4, "coalesced": 4}
+
+    def test_close_is_idempotent(self, manager, task_id):
+        """測試重複 close 不會重複記錄統計"""
+        reporter = manager.reporter(task_id, "searching")
+        reporter.report(40, "searching", "訊息")
+        reporter.close()
+        reporter.close()
+        assert manager.get_task_details(task_id)["progress_stats"]["searching"]["reported"] == 1
+
+    def test_console_only_reporter(self, capsys):
+        """測試沒有任務時只輸出到 console（同樣合併）"""
+        reporter = ProgressReporter(None, None, "searching", interval=60)
+        reporter.report(40, "searching", "第一筆")
+        reporter.report(41, "searching", "第二筆")
+        reporter.report(42, "searching", "第三筆")
+        reporter.close()
+
+        output = capsys.readouterr().out
+        assert "第一筆" in output
+        assert "第二筆" not in output
+        assert "第三筆" in output
+
+
+class TestResearchStreamCoalescing:
+    """測試串流迴圈中的進度合併"""
+
+    def test_citations_are_coalesced(self, manager, task_id, monkeypatch):
+        """測試大量引用只送出少數幾次進度，最後一筆一定送出"""
+        from agents import ResearchAgent
+        from config import Config
+
+        monkeypatch.setattr(Config, "PROGRESS_COALESCE_INTERVAL", 60)
+        annotations = [
+            SimpleNamespace(type="url_citation", title=f"News {i}", url=f"https://e.vnexpress.net/{i}", index=i)
+            for i in range(50)
+        ]
+        events = [
+            SimpleNamespace(type="response.created", response=SimpleNamespace(id="resp_1")),
+            SimpleNamespace(type="response.content_part.done", part=SimpleNamespace(text="done", annotations=annotations)),
+        ]
+        agent = ResearchAgent()
+        agent.cache = None
+        agent.client = SimpleNamespace(responses=SimpleNamespace(create=lambda **kwargs: iter(events)))
+        agent._get_task_manager = lambda task_id: manager
+
+        result = agent.search("越南金融科技", task_id=task_id)
+
+        assert result["status"] == "success"
+        task = manager.get_task_details(task_id)
+        stats = task["progress_stats"]["searching"]
+        assert stats["reported"] == 51
+        assert stats["published"] == 2
+        assert stats["coalesced"] == 49
+        assert task["progress"] == 65
+        assert "News 49" in task["step_message"]
@@ -0,0 +1,167 @@
+"""
+測試需求解析結果快取
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.prompt_memo import PromptParseMemo, create_prompt_memo, normalize_prompt
+
+PARSED = {"keywords": "越南金融科技", "time_instruction": "最近7天內", "num_instruction": "5-10篇", "language": "English"}
+
+
+class TestPromptParseMemo:
+    """測試快取鍵、TTL、LRU 與統計"""
+
+    def test_normalized_key(self):
+        """測試大小寫、全形與空白差異視為同一個 prompt"""
+        memo = PromptParseMemo()
+        memo.set("Vietnam  Fintech 最新動態", PARSED)
+
+        assert memo.get("vietnam fintech 最新動態") == PARSED
+        assert memo.get("  ＶＩＥＴＮＡＭ\tfintech   最新動態 ") == PARSED
+        assert normalize_prompt(" A  b ") == "a b"
+
+    def test_only_parsed_fields_are_stored(self):
+        """測試只保存解析欄位，且回傳副本"""
+        memo = PromptParseMemo()
+        memo.set("越南", {**PARSED, "parser": "llm"})
+
+        cached = memo.get("越南")
+        assert cached == PARSED
+        cached["keywords"] = "changed"
+        assert memo.get("越南")["keywords"] == "越南金融科技"
+
+    def test_ttl_expiry(self):
+        """測試過期後不再命中"""
+        memo = PromptParseMemo(ttl=0.05)
+        memo.set("越南", PARSED)
+        assert memo.get("越南") is not None
+        time.sleep(0.06)
+        assert memo.get("越南") is None
+
+    def test_lru_bound(self):
+        """測試超過上限時淘汰最久未使用者"""
+        memo = PromptParseMemo(max_entries=2)
+        memo.set("a", PARSED)
+        memo.set("b", PARSED)
+        memo.get("a")
+        memo.set("c", PARSED)
+
+        assert memo.get("b") is None
+        assert memo.get("a") is not None
+        assert memo.stats()["evictions"] == 1
+        assert memo.stats()["entries"] == 2
+
+    def test_stats(self):
+        """測試命中率統計"""
+        memo = PromptParseMemo()
+        memo.get("越南")
+        memo.set("越南", PARSED)
+        memo.get("越南")
+        memo.get("越南")
+        stats = memo.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(0.6667)
+
+    def test_opt_out(self, monkeypatch):
+        """測試 PROMPT_MEMO_ENABLED=false 時不建立快取"""
+        from config import Config
+
+        monkeypatch.setattr(Config, "PROMPT_MEMO_ENABLED", False)
+        assert create_prompt_memo() is None
+
+
+class TestWarmUp:
+    """測試從檔案預熱"""
+
+    def test_warm_up_from_file(self, tmp_path):
+        """測試預熱檔案：已解析的項目直接寫入，只有提示詞的項目呼叫解析函數"""
+        warmup = tmp_path / "prompts.txt"
+        warmup.write_text("\n".join([
+            "# 每日排程的提示詞",
+            "新加坡金融科技發展趨勢",
+            json.dumps("泰國央行利率決策", ensure_ascii=False),
+            json.dumps({"prompt": "越南數位銀行", "parsed": PARSED}, ensure_ascii=False),
+            "",
+            "解析失敗的提示詞",
+        ]), encoding="utf-8")
+        calls = []
+
+        def parse(prompt):
+            calls.append(prompt)
+            if prompt == "解析失敗的提示詞":
+                return {**PARSED, "keywords": prompt, "parser": "fallback"}
+            return {**PARSED, "keywords": prompt, "parser": "llm"}
+
+        memo = PromptParseMemo()
+        count = memo.warm_up(warmup, parse)
+
+        assert count == 3
+        assert calls == ["新加坡金融科技發展趨勢", "泰國央行利率決策", "解析失敗的提示詞"]
+        assert memo.get("越南數位銀行") == PARSED
+        assert memo.get("泰國央行利率決策")["keywords"] == "泰國央行利率決策"
+        assert memo.get("解析失敗的提示詞") is None
+        assert memo.stats()["warmed"] == 3
+
+    def test_warm_up_with_memoizing_parser(self, tmp_path):
+        """測試解析函數已寫入快取（工作流程的 _parse_prompt）時，預熱不重複寫入"""
+        warmup = tmp_path / "prompts.txt"
+        warmup.write_text("新加坡金融科技發展趨勢\n泰國央行利率決策\n", encoding="utf-8")
+        memo = PromptParseMemo()
+        writes = []
+        original_set = memo.set
+
+        def counting_set(prompt, parsed):
+            writes.append(prompt)
+            original_set(prompt, parsed)
+
+        memo.set = counting_set
+
+        def parse(prompt):
+            parsed = {**PARSED, "keywords": prompt, "parser": "llm"}
+            memo.set(prompt, parsed)
+            return parsed
+
+        assert memo.warm_up(warmup, parse) == 2
+        assert writes == ["新加坡金融科技發展趨勢", "泰國央行利率決策"]
+        assert memo.get("泰國央行利率決策")["keywords"] == "泰國央行利率決策"
+
+
+class TestWorkflowMemo:
+    """測試 _parse_prompt 使用快取"""
+
+    def test_second_parse_skips_llm(self, monkeypatch):
+        """測試相同的 prompt 第二次解析不呼叫 LLM"""
+        from app.services import workflow as workflow_module
+
+        runs = []
+
+        class FakeAgent:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def run(self, prompt):
+                runs.append(prompt)
+                return SimpleNamespace(content=json.dumps(PARSED, ensure_ascii=False))
+
+        monkeypatch.setattr(workflow_module, "Agent", FakeAgent)
+        workflow = workflow_module.NewsReportWorkflow()
+        workflow.prompt_memo = PromptParseMemo()
+
+        first = workflow._parse_prompt(None, "幫我整理越南金融科技的最新動態")
+        second = workflow._parse_prompt(None, "幫我整理越南金融科技的最新動態 ")
+
+        assert len(runs) == 1
+        assert first["parser"] == "llm"
+        assert second == {**PARSED, "parser": "memo"}
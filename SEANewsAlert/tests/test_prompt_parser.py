@@ -0,0 +1,142 @@
+"""
+測試規則式需求解析
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.prompt_parser import RulePromptParser
+
+
+@pytest.fixture
+def parser():
+    return RulePromptParser()
+
+
+class TestRulePromptParser:
+    """測試常見寫法的解析"""
+
+    @pytest.mark.parametrize("prompt, keywords, time_instruction, num_instruction", [
+        ("最近7天越南金融科技新聞，約15篇", "越南金融科技", "最近7天", "約15篇"),
+        ("一個月內泰國央行政策", "泰國央行政策", "一個月內", "5-10篇"),
+        ("過去兩週 新加坡 數位銀行 10-20則", "新加坡 數位銀行", "過去兩週", "10-20則"),
+        ("Vietnam fintech news last 2 weeks, 10 articles", "Vietnam fintech", "last 2 weeks", "10 articles"),
+        ("印尼電子錢包 top 10", "印尼電子錢包", "最近7天內", "top 10"),
+        ("請幫我搜尋今天的馬來西亞股市新聞", "馬來西亞股市", "今天", "5-10篇"),
+        ("最近７天 菲律賓 匯款", "菲律賓 匯款", "最近7天", "5-10篇"),
+        ("Indonesia nickel exports in past month", "Indonesia nickel exports", "in past month", "5-10篇"),
+    ])
+    def test_time_and_count_phrases(self, parser, prompt, keywords, time_instruction, num_instruction):
+        """測試中英文時間與數量寫法"""
+        result = parser.parse(prompt)
+        assert result["keywords"] == keywords
+        assert result["time_instruction"] == time_instruction
+        assert result["num_instruction"] == num_instruction
+        assert result["parser"] == "rules"
+
+    def test_words_that_look_like_units_are_kept(self, parser):
+        """測試「天然氣」「2025年」「5G」不會被當成時間或數量"""
+        result = parser.parse("2025年越南5G與天然氣發展")
+        assert result["keywords"] == "2025年越南5G與天然氣發展"
+        assert result["time_instruction"] == "最近7天內"
+        assert result["num_instruction"] == "5-10篇"
+
+    def test_language_in_prompt(self, parser):
+        """測試需求中明確指定的語言（沒有請求欄位或與其相同時）"""
+        assert parser.parse("一個月內泰國央行的英文新聞", language="English")["language"] == "English"
+        assert parser.parse("越南文 越南房地產")["language"] == "Vietnamese"
+        assert parser.parse("Thailand digital banking")["language"] == "English"
+        result = parser.parse("Vietnam fintech news in Thai, last 2 weeks")
+        assert result["language"] == "Thai" and result["keywords"] == "Vietnam fintech"
+        assert parser.parse("Thai-language coverage of SET")["language"] == "Thai"
+        assert parser.parse("bahasa indonesia news on Jakarta stocks")["keywords"] == "Jakarta stocks"
+
+    @pytest.mark.parametrize("prompt, keywords", [
+        ("Thai baht exchange rate last 2 weeks", "Thai baht exchange rate"),
+        ("Chinese investment in Vietnam", "Chinese investment in Vietnam"),
+        ("investment in Thai banks", "investment in Thai banks"),
+        ("Vietnamese property developers", "Vietnamese property developers"),
+    ])
+    def test_nationality_adjective_is_topic(self, parser, prompt, keywords):
+        """測試國籍形容詞留在主題中，不會被當成語言"""
+        result = parser.parse(prompt, language="Chinese")
+        assert result["keywords"] == keywords
+        assert result["language"] == "Chinese"
+
+    def test_request_language_wins(self, parser):
+        """測試請求欄位的語言優先，與需求中明確指定的語言不同時交由 LLM 解析"""
+        assert parser.parse("用泰文搜尋越南央行", language="Thai")["language"] == "Thai"
+        assert parser.parse("一個月內泰國央行的英文新聞", language="Chinese") is None
+        assert parser.stats()["miss_reasons"] == {"language_conflict": 1}
+
+    def test_request_fields_are_honored(self, parser):
+        """測試需求中沒有寫到的欄位採用請求欄位"""
+        result = parser.parse("新加坡金融科技發展趨勢", language="Chinese", time_range="最近 30 天內", count_hint="約20篇")
+        assert result == {
+            "keywords": "新加坡金融科技發展趨勢",
+            "time_instruction": "最近 30 天內",
+            "num_instruction": "約20篇",
+            "language": "Chinese",
+            "parser": "rules",
+        }
+
+    @pytest.mark.parametrize("prompt, kwargs, reason", [
+        ("本季新加坡銀行獲利", {}, "ambiguous_time"),
+        ("今年以來越南出口", {}, "ambiguous_time"),
+        ("今年泰國旅遊業", {}, "ambiguous_time"),
+        ("Vietnam exports this month", {}, "ambiguous_time"),
+        ("找出越南和泰國的支付監管差異並比較其影響，以及未來趨勢分析", {}, "complex_prompt"),
+        ("最近7天的新聞", {}, "empty_keywords"),
+        ("越南金融", {"time_range": "一陣子"}, "unparsed_time_range"),
+        ("越南金融", {"language": "Klingon"}, "unsupported_language"),
+    ])
+    def test_ambiguous_prompts_fall_back(self, parser, prompt, kwargs, reason):
+        """測試含糊的需求回傳 None（交由 LLM 解析）"""
+        assert parser.parse(prompt, **kwargs) is None
+        assert parser.stats()["miss_reasons"] == {reason: 1}
+
+    def test_hit_rate(self, parser):
+        """測試命中率統計"""
+        parser.parse("越南金融科技")
+        parser.parse("新加坡銀行 最近3天")
+        parser.parse("本季新加坡銀行獲利")
+        stats = parser.stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(0.6667)
+
+
+class TestWorkflowFastPath:
+    """測試工作流程的規則解析快速路徑"""
+
+    def test_fast_path_skips_llm(self, monkeypatch):
+        """測試規則命中時不建立 LLM 解析 Agent"""
+        from app.services import workflow as workflow_module
+        from app.services.progress import task_manager
+
+        def no_llm(*args, **kwargs):
+            raise AssertionError("規則命中時不應建立 LLM Agent")
+
+        monkeypatch.setattr(workflow_module, "Agent", no_llm)
+        workflow = workflow_module.workflow
+        task_id = task_manager.create_task("最近7天越南金融科技", "test@example.com", language="Chinese")
+
+        parsed = workflow._fast_parse_prompt(task_id, "最近7天越南金融科技", "Chinese", "最近 7 天內", "5-10篇")
+
+        assert parsed["keywords"] == "越南金融科技"
+        assert parsed["language"] == "Chinese"
+        assert task_manager.get_task_details(task_id)["step_message"].startswith("⚡")
+
+    def test_fast_path_can_be_disabled(self, monkeypatch):
+        """測試關閉規則解析時一律交給 LLM"""
+        from app.services import workflow as workflow_module
+        from config import Config
+
+        monkeypatch.setattr(Config, "PROMPT_RULE_PARSER", False)
+        assert workflow_module.workflow._fast_parse_prompt(None, "越南金融科技") is None
@@ -0,0 +1,181 @@
+"""
+測試報告渲染服務（PDF 與 Excel 同時渲染）
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from app.services.renderer import ArtifactRenderer, artifact_basename
+
+RENDER_SECONDS = 0.3
+
+NEWS = [{
+    "新聞標題（中文）": "越南央行調降利率",
+    "來源國家": "越南",
+    "來源網站連結": "https://vnexpress.net/a",
+    "發布日期": "2025-01-01",
+    "摘要": "越南央行宣布調降政策利率。",
+    "重點分析": "有助於刺激信貸成長。",
+}]
+
+
+class SlowReportAgent:
+    """模擬阻塞的 PDF / Excel 渲染"""
+
+    def __init__(self):
+        self.calls = []
+
+    def generate_pdf(self, markdown_content, filename=None, progress=None):
+        self.calls.append(("pdf", filename))
+        time.sleep(RENDER_SECONDS)
+        return Path(filename)
+
+    def generate_excel(self, news_data, filename=None, progress=None):
+        self.calls.append(("xlsx", filename))
+        time.sleep(RENDER_SECONDS)
+        return Path(filename)
+
+
+class TestArtifactBasename:
+    """測試決定性的文件名"""
+
+    def test_derived_from_task(self):
+        """測試文件名只取決於任務 ID 與建立時間"""
+        name = artifact_basename("1a2b3c4d-0000-1111", "2025-01-01T09:30:00.123456")
+        assert name == "東南亞金融新聞報告_20250101_093000_1a2b3c4d"
+        assert artifact_basename("1a2b3c4d-0000-1111", "2025-01-01T09:30:00.123456") == name
+
+
+class TestArtifactRenderer:
+    """測試渲染模式與計時"""
+
+    def test_threaded_renders_concurrently(self):
+        """測試 PDF 與 Excel 同時渲染，總時間接近單一格式的時間"""
+        renderer = ArtifactRenderer(max_workers=2, mode="threaded")
+        agent = SlowReportAgent()
+        try:
+            paths, timings = asyncio.run(renderer.render(agent, "# 報告", NEWS, "report_x"))
+        finally:
+            renderer.shutdown()
+
+        assert paths == {"pdf": Path("report_x.pdf"), "xlsx": Path("report_x.xlsx")}
+        assert set(timings) == {"pdf", "xlsx", "total"}
+        assert timings["pdf"] >= RENDER_SECONDS
+        assert timings["total"] < RENDER_SECONDS * 1.8
+        assert renderer.stats()["rendered"] == 1
+
+    def test_inline_renders_in_order(self):
+        """測試 inline 模式依序渲染"""
+        renderer = ArtifactRenderer(mode="inline")
+        agent = SlowReportAgent()
+        paths, timings = asyncio.run(renderer.render(agent, "# 報告", NEWS, "report_y", formats=("xlsx",)))
+
+        assert agent.calls == [("xlsx", "report_y.xlsx")]
+        assert list(paths) == ["xlsx"]
+        assert timings["total"] >= RENDER_SECONDS
+
+    def test_unknown_format(self):
+        """測試不支援的格式"""
+        renderer = ArtifactRenderer(mode="inline")
+        with pytest.raises(ValueError):
+            asyncio.run(renderer.render(SlowReportAgent(), "", [], "report_z", formats=("docx",)))
+
+    def test_unknown_mode(self):
+        """測試不支援的渲染模式"""
+        with pytest.raises(ValueError):
+            ArtifactRenderer(mode="gpu")
+
+    def test_process_pool_renders_real_artifacts(self):
+        """測試行程池中實際產生 PDF 與 Excel"""
+        renderer = ArtifactRenderer(max_workers=2, mode="process")
+        basename = artifact_basename("test-renderer-process")
+        try:
+            paths, timings = asyncio.run(renderer.render(
+                None, "# 東南亞金融新聞報告\n\n## 摘要\n- **越南**：利率調降", NEWS, basename
+            ))
+        finally:
+            renderer.shutdown()
+
+        try:
+            assert paths["pdf"].read_bytes().startswith(b"%PDF")
+            assert paths["xlsx"].stat().st_size > 0
+            assert paths["pdf"].stem == paths["xlsx"].stem == basename
+            assert timings["pdf"] > 0 and timings["xlsx"] > 0
+            stats = renderer.stats()
+            assert stats["completed"] == 2
+            assert stats["pending"] == 0
+            assert set(stats["render_seconds"]) == {"pdf", "xlsx"}
+        finally:
+            for path in paths.values():
+                path.unlink(missing_ok=True)
+
+
+class TestRenderWorkers:
+    """測試預熱的渲染 worker 與統計"""
+
+    def test_warm_up_starts_all_workers(self):
+        """測試預熱後所有 worker 都已啟動，並可接受 Markdown 轉 PDF 工作"""
+        renderer = ArtifactRenderer(max_workers=2, mode="process")
+        try:
+            renderer.warm_up(wait=True)
+            assert len(renderer._pool._processes) == 2
+
+            path = asyncio.run(renderer.render_pdf("# 預熱測試\n\n內容", "test_renderer_warm.pdf"))
+        finally:
+            renderer.shutdown()
+
+        try:
+            assert path.read_bytes().startswith(b"%PDF")
+        finally:
+            path.unlink(missing_ok=True)
+
+    def test_warm_up_is_noop_without_process_pool(self):
+        """測試執行緒模式不需要預熱"""
+        renderer = ArtifactRenderer(mode="threaded")
+        assert renderer.warm_up(wait=True) == []
+        assert renderer._pool is None
+
+    def test_metrics_track_queue_and_failures(self):
+        """測試排隊深度、排隊時間與失敗次數"""
+        class FailingAgent(SlowReportAgent):
+            def generate_excel(self, news_data, filename=None, progress=None):
+                raise RuntimeError("disk full")
+
+        renderer = ArtifactRenderer(max_workers=1, mode="threaded")
+        try:
+            asyncio.run(renderer.render(SlowReportAgent(), "# 報告", NEWS, "report_q"))
+            with pytest.raises(RuntimeError):
+                asyncio.run(renderer.render(FailingAgent(), "# 報告", NEWS, "report_f"))
+        finally:
+            renderer.shutdown()
+
+        stats = renderer.stats()
+        assert stats["completed"] == 3
+        assert stats["failed"] == 1
+        assert stats["pending"] == 0
+        assert stats["queue_depth"] == 0
+        # 只有一個 worker，第二個格式必須排隊等待第一個完成
+        assert stats["queue_wait_seconds"]["max"] >= RENDER_SECONDS * 0.9
+        assert stats["render_seconds"]["pdf"]["count"] == 2
+
+    def test_font_registered_once_per_process(self, monkeypatch):
+        """測試字體路徑只在第一次建立 ReportGeneratorAgent 時搜尋"""
+        from agents import report_agent
+
+        report_agent.register_chinese_font()
+        lookups = []
+        monkeypatch.setattr(report_agent, "_find_and_register_chinese_font", lambda: lookups.append(1) or "Helvetica")
+
+        first = report_agent.ReportGeneratorAgent()
+        second = report_agent.ReportGeneratorAgent()
+
+        assert lookups == []
+        assert first.chinese_font == second.chinese_font
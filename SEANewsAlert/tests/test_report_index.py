@@ -0,0 +1,165 @@
+"""
+測試報告全文索引（中文 bigram 斷詞、增量更新、列表與搜尋 API）
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.news_model import NewsBatch, NewsItem
+from utils.report_index import ReportIndex, build_match_query, parse_report_markdown, segment_text
+
+MARKDOWN = """# 東南亞金融新聞報告
+
+## 報告摘要
+越南央行本週降息，泰國股市震盪。
+
+## 搜尋主題
+東南亞央行動態
+
+## 新聞詳情
+
+### 1. 越南央行降息兩碼
+- **摘要**：State Bank of Vietnam cut rates.
+
+## 市場洞察
+- **利率**：區域利率走勢分歧
+- 金融科技投資持續增加
+"""
+NEWS = [
+    NewsItem(title="越南央行降息兩碼", country="越南", url="https://e.vnexpress.net/a",
+             summary="State Bank of Vietnam cut its refinancing rate.", source="VnExpress"),
+    NewsItem(title="泰國股市下跌", country="泰國", url="https://www.bangkokpost.com/b",
+             summary="SET index fell on political worries.", source="Bangkok Post"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ReportIndex(tmp_path / "report_index.sqlite3")
+    yield index
+    index.close()
+
+
+class TestSegmentation:
+    """測試中文斷詞與查詢組成"""
+
+    def test_segment_text(self):
+        """測試連續中文轉為 bigram，英數詞保持不變"""
+        assert segment_text("SBV 越南央行").split() == ["SBV", "越南", "南央", "央行"]
+        assert segment_text("泰").split() == ["泰"]
+
+    def test_build_match_query(self):
+        """測試多字詞為片語、單字與英文為字首查詢"""
+        assert build_match_query("越南央行 bank") == '"越南 南央 央行" AND "bank"*'
+        assert build_match_query("泰") == '"泰"*'
+        assert build_match_query("越南央行", any_term=True) == '"越南" OR "南央" OR "央行"'
+        assert build_match_query(' "" * ') == ""
+
+    def test_parse_report_markdown(self):
+        """測試取出標題、摘要、搜尋主題與市場洞察"""
+        parsed = parse_report_markdown(MARKDOWN)
+        assert parsed["title"] == "東南亞金融新聞報告"
+        assert parsed["summary"] == "越南央行本週降息，泰國股市震盪。"
+        assert parsed["query"] == "東南亞央行動態"
+        assert parsed["insights"] == ["利率：區域利率走勢分歧", "金融科技投資持續增加"]
+
+
+class TestReportIndex:
+    """測試索引寫入與查詢"""
+
+    def test_index_and_list(self, index, tmp_path):
+        """測試 PDF 與 Excel 合併為同一份報告，依生成時間由新到舊列出"""
+        index.index_pdf(tmp_path / "東南亞金融新聞報告_20251120_090000_aaaa.pdf", MARKDOWN)
+        index.index_excel(tmp_path / "東南亞金融新聞報告_20251120_090000_aaaa.xlsx", NewsBatch.from_items(NEWS))
+        index.index_excel(tmp_path / "東南亞金融新聞報告_20251121_090000_bbbb.xlsx", [NEWS[1].to_dict()])
+        total, reports = index.list()
+        assert total == 2
+        assert [r["generatedAt"] for r in reports] == ["2025-11-21T09:00:00", "2025-11-20T09:00:00"]
+        older = reports[1]
+        assert older["title"] == "東南亞央行動態"
+        assert older["bulletPoints"][1] == "金融科技投資持續增加"
+        assert older["countries"] == ["越南", "泰國"] and older["newsCount"] == 2
+        assert older["pdfFile"].endswith(".pdf") and older["xlsxFile"].endswith(".xlsx")
+        assert reports[0]["title"] == "東南亞金融新聞報告"
+        assert index.list(limit=1, offset=1)[1][0]["id"] == older["id"]
+
+    def test_search(self, index, tmp_path):
+        """測試以中文詞、英文字首搜尋新聞，並附上符合的新聞"""
+        index.index_pdf(tmp_path / "r1.pdf", MARKDOWN)
+        index.index_excel(tmp_path / "r1.xlsx", NEWS)
+        index.index_excel(tmp_path / "r2.xlsx", NEWS[1:])
+
+        total, reports = index.search("泰國股市")
+        assert total == 2 and {r["id"] for r in reports} == {"r1", "r2"}
+        assert reports[0]["matches"][0]["url"] == NEWS[1].url
+
+        total, reports = index.search("refinanc")
+        assert total == 1 and reports[0]["matches"][0]["title"] == "越南央行降息兩碼"
+
+        total, reports = index.search("區域利率")
+        assert total == 1 and reports[0]["id"] == "r1" and reports[0]["matches"] == []
+
+        assert index.search("印尼 央行")[0] == 1  # 沒有同時符合時改為任一詞符合
+        assert index.search("cryptocurrency") == (0, [])
+
+    def test_reindex_replaces(self, index, tmp_path):
+        """測試重新寫入同一份報告時取代舊的新聞索引"""
+        index.index_excel(tmp_path / "r1.xlsx", NEWS)
+        index.index_excel(tmp_path / "r1.xlsx", NEWS[:1])
+        assert index.search("泰國股市") == (0, [])
+        assert index.list()[1][0]["newsCount"] == 1
+
+    def test_sync_directory(self, index, tmp_path):
+        """測試補建目錄中尚未索引的 Excel 與 PDF，已索引的不重複讀取"""
+        from utils.excel_writer import write_news_excel
+
+        reports_dir = tmp_path / "reports"
+        reports_dir.mkdir()
+        write_news_excel(reports_dir / "東南亞金融新聞報告_20251121_100000.xlsx", NewsBatch.from_items(NEWS))
+        (reports_dir / "東南亞金融新聞報告_20251121_100000.pdf").write_bytes(b"%PDF-1.4")
+        assert index.sync_directory(reports_dir) == 2
+        assert index.sync_directory(reports_dir) == 0
+        total, reports = index.search("越南央行")
+        assert total == 1 and reports[0]["matches"][0]["url"] == NEWS[0].url
+
+
+class TestReportHooks:
+    """測試報告產生時增量更新索引與報告 API"""
+
+    def test_generate_excel_indexes(self, index, tmp_path, monkeypatch):
+        """測試 generate_excel 寫出後更新索引，迭代器輸入則略過"""
+        import agents.report_agent as report_agent
+
+        monkeypatch.setattr(report_agent, "get_report_index", lambda: index)
+        agent = report_agent.ReportGeneratorAgent.__new__(report_agent.ReportGeneratorAgent)
+        agent.reports_dir = tmp_path
+        agent.generate_excel(NewsBatch.from_items(NEWS), "r1")
+        agent.generate_excel(iter([NEWS[0].to_dict()]), "r2")
+        assert index.search("泰國")[1][0]["id"] == "r1"
+        assert len(index) == 1
+
+    def test_reports_api(self, index, tmp_path, monkeypatch):
+        """測試 /api/reports 分頁列表與 /api/reports/search"""
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.routers import reports
+
+        monkeypatch.setattr(reports, "get_report_index", lambda: index)
+        index.index_pdf(tmp_path / "r1.pdf", MARKDOWN)
+        index.index_excel(tmp_path / "r1.xlsx", NEWS)
+        client = TestClient(app)
+
+        response = client.get("/api/reports", params={"page": 1, "page_size": 5})
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "1" and response.json()[0]["id"] == "r1"
+
+        response = client.get("/api/reports/search", params={"q": "越南央行"})
+        assert response.json()[0]["matches"][0]["url"] == NEWS[0].url
+        assert client.get("/api/reports", params={"q": "越南央行"}).headers["X-Total-Count"] == "1"
+        assert client.get("/api/reports/search").status_code == 422
@@ -0,0 +1,155 @@
+"""
+測試結構化報告範本（json 分析模式）
+"""
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from utils.report_template import StructuredReport, parse_structured_report, render_report_markdown
+
+PAYLOAD = {
+    "summary": "越南與泰國央行本週相繼調整政策利率。",
+    "items": [
+        {
+            "title": "越南央行調降利率",
+            "source": "VnExpress",
+            "url": "https://vnexpress.net/1",
+            "date": "2025-01-02",
+            "summary": "越南國家銀行宣布調降再融資利率 50 個基點。",
+            "analysis": ["刺激信貸成長", "越南盾承壓"],
+        },
+        {
+            "title": "泰國央行維持利率不變",
+            "source": "Bangkok Post",
+            "url": "https://www.bangkokpost.com/2",
+            "date": "2025-01-03",
+            "summary": "泰國央行決議維持政策利率於 2.5%。",
+            "analysis": "通膨仍低於目標區間",
+        },
+    ],
+    "insights": ["區域貨幣政策分歧擴大", "留意匯率波動"],
+}
+
+
+def classify(title, source, summary):
+    return "越南" if "越南" in title else "泰國"
+
+
+class TestParseStructuredReport:
+    """測試解析模型輸出的 JSON"""
+
+    def test_parse_fenced_json(self):
+        """測試 ```json 程式碼區塊與欄位對應"""
+        text = f"以下是結果：\n```json\n{json.dumps(PAYLOAD, ensure_ascii=False)}\n```"
+        report = parse_structured_report(text, "越南 泰國 央行", classify)
+
+        assert report.summary == PAYLOAD["summary"]
+        assert report.insights == PAYLOAD["insights"]
+        assert len(report.news) == 2
+        first = report.news[0]
+        assert first.title == "越南央行調降利率"
+        assert first.country == "越南"
+        assert first.keyword == "越南 泰國 央行"
+        assert first.published_at == "2025-01-02"
+        assert first.analysis == "1) 刺激信貸成長 2) 越南盾承壓"
+        assert report.news[1].analysis == "通膨仍低於目標區間"
+
+    def test_parse_bare_json_and_skip_invalid_items(self):
+        """測試前後夾雜文字的 JSON，略過沒有標題的項目"""
+        payload = {"items": [{"title": ""}, "錯誤", {"title": "標題\n換行", "country": "印尼"}]}
+        report = parse_structured_report(f"好的 {json.dumps(payload, ensure_ascii=False)} 完成")
+        assert len(report.news) == 1
+        assert report.news[0].title == "標題 換行"
+        assert report.news[0].country == "印尼"
+
+    def test_invalid_output(self):
+        """測試沒有 JSON 或 JSON 損壞時報錯"""
+        with pytest.raises(ValueError):
+            parse_structured_report("# 東南亞金融新聞報告")
+        with pytest.raises(ValueError):
+            parse_structured_report('{"items": [}')
+
+
+class TestRenderReportMarkdown:
+    """測試本機範本渲染"""
+
+    def test_render_sections(self):
+        """測試固定段落、資料來源與頁尾"""
+        report = parse_structured_report(json.dumps(PAYLOAD, ensure_ascii=False), "央行", classify)
+        markdown = render_report_markdown(report, "央行", datetime(2025, 1, 5, 9, 30))
+
+        assert markdown.startswith("# 東南亞金融新聞報告")
+        assert "## 報告日期\n2025年01月05日" in markdown
+        assert "### 2. 泰國央行維持利率不變" in markdown
+        assert "- **來源**：[VnExpress](https://vnexpress.net/1)" in markdown
+        assert "1. 區域貨幣政策分歧擴大" in markdown
+        assert "- [泰國央行維持利率不變](https://www.bangkokpost.com/2)" in markdown
+        assert "**報告生成時間**：2025-01-05 09:30:00" in markdown
+
+    def test_empty_report(self):
+        """測試沒有新聞時明確說明"""
+        markdown = render_report_markdown(StructuredReport(), "央行")
+        assert "目前沒有找到符合條件的相關新聞。" in markdown
+        assert "### 1." not in markdown
+
+    def test_markdown_extraction_matches(self):
+        """測試渲染出的 Markdown 以原本的擷取邏輯解析後與 JSON 資料一致"""
+        from agents.analyst_agent import AnalystAgent
+
+        report = parse_structured_report(json.dumps(PAYLOAD, ensure_ascii=False), "央行", classify)
+        markdown = render_report_markdown(report, "央行")
+        extracted = AnalystAgent(output_mode="markdown")._extract_from_markdown(markdown, "央行")
+
+        assert [item.title for item in extracted] == [item.title for item in report.news]
+        assert [item.url for item in extracted] == [item.url for item in report.news]
+        assert [item.published_at for item in extracted] == [item.published_at for item in report.news]
+        assert [item.summary for item in extracted] == [item.summary for item in report.news]
+
+
+class TestAnalystJsonMode:
+    """測試 AnalystAgent 的 json 輸出模式"""
+
+    def _agent(self, output):
+        from agents.analyst_agent import AnalystAgent
+
+        agent = AnalystAgent(output_mode="json")
+        calls = []
+        agent._structured_agent = SimpleNamespace(run=lambda prompt: calls.append(prompt) or SimpleNamespace(content=output))
+        return agent, calls
+
+    def test_analyze_structured(self):
+        """測試模型只輸出 JSON 時，報告由範本產生、新聞欄位直接取自 JSON"""
+        agent, calls = self._agent(json.dumps(PAYLOAD, ensure_ascii=False))
+        markdown, news = agent.analyze({"query": "央行", "content": "搜尋結果"})
+
+        assert len(calls) == 1
+        assert "搜尋結果" in calls[0]
+        assert markdown.startswith("# 東南亞金融新聞報告")
+        assert len(news) == 2
+        assert news[1].country == "泰國"
+        assert news[0].summary == PAYLOAD["items"][0]["summary"]
+
+    def test_fallback_to_markdown(self, monkeypatch):
+        """測試 JSON 無法解析時改用 Markdown 模式"""
+        agent, _ = self._agent("抱歉，無法提供 JSON")
+        monkeypatch.setattr(agent.agent, "run", lambda prompt: SimpleNamespace(content="### 1. 標題\n- **來源**：[來源](https://example.com)\n"))
+        markdown, news = agent.analyze({"query": "央行", "content": ""})
+
+        assert markdown.startswith("### 1. 標題")
+        assert news[0].url == "https://example.com"
+
+    def test_unknown_mode(self):
+        """測試不支援的輸出模式"""
+        from agents.analyst_agent import AnalystAgent
+
+        with pytest.raises(ValueError):
+            AnalystAgent(output_mode="yaml")
@@ -0,0 +1,242 @@
+"""
+測試 Research Agent 串流事件處理（同步與非同步路徑）
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents import ResearchAgent
+
+
+def _recorded_events():
+    """模擬一次包含兩次網路搜尋與一則引用的 Responses 串流"""
+    citation = SimpleNamespace(type="url_citation", title="Vietnam fintech grows", url="https://e.vnexpress.net/a", index=3)
+    return [
+        SimpleNamespace(type="response.created", response=SimpleNamespace(id="resp_1")),
+        SimpleNamespace(type="response.output_item.added", item=SimpleNamespace(type="web_search_call")),
+        SimpleNamespace(type="response.output_item.done", item=SimpleNamespace(type="web_search_call", status="completed")),
+        SimpleNamespace(type="response.output_item.added", item=SimpleNamespace(type="web_search_call")),
+        SimpleNamespace(type="response.output_item.done", item=SimpleNamespace(type="web_search_call", status="completed")),
+        SimpleNamespace(type="response.content_part.delta", delta=SimpleNamespace(text="Hello ")),
+        SimpleNamespace(type="response.content_part.delta", delta=SimpleNamespace(text="world")),
+        SimpleNamespace(type="response.content_part.done", part=SimpleNamespace(text="Hello world", annotations=[citation])),
+        SimpleNamespace(type="response.done"),
+    ]
+
+
+class _SyncResponses:
+    def create(self, **kwargs):
+        return iter(_recorded_events())
+
+
+class _AsyncStream:
+    def __init__(self, events):
+        self._events = iter(events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._events)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _AsyncResponses:
+    async def create(self, **kwargs):
+        return _AsyncStream(_recorded_events())
+
+
+class TestResearchAgentStreaming:
+    """測試 search 與 asearch 共用相同的事件處理"""
+
+    @pytest.fixture
+    def agent(self):
+        agent = ResearchAgent()
+        agent.cache = None
+        agent.client = SimpleNamespace(responses=_SyncResponses())
+        agent._async_client = SimpleNamespace(responses=_AsyncResponses())
+        return agent
+
+    def test_sync_search(self, agent):
+        """測試同步串流"""
+        result = agent.search("越南金融科技")
+
+        assert result["status"] == "success"
+        assert result["content"] == "Hello world"
+        assert result["web_search_count"] == 2
+        assert result["sources"] == [
+            {"title": "Vietnam fintech grows", "url": "https://e.vnexpress.net/a", "index": 3}
+        ]
+
+    def test_async_search_matches_sync(self, agent):
+        """測試非同步串流的結果與同步串流一致"""
+        sync_result = agent.search("越南金融科技")
+        async_result = asyncio.run(agent.asearch("越南金融科技"))
+
+        assert async_result == sync_result
+
+    def test_async_search_reports_progress(self, agent):
+        """測試非同步路徑同樣會更新 task_manager 進度"""
+        from app.services.progress import task_manager
+
+        task_id = task_manager.create_task("越南金融科技", "user@example.com")
+        asyncio.run(agent.asearch("越南金融科技", task_id=task_id))
+
+        task = task_manager.get_task(task_id)
+        assert task["progress"] == 65
+        assert task["current_step"] == "searching"
+
+    def test_parts_tracked_by_index(self, agent):
+        """測試內容片段以索引追蹤：已串流的片段不重複加入，未串流的片段完整加入"""
+        from agents.research_agent import _StreamState
+
+        state = _StreamState()
+        events = [
+            SimpleNamespace(type="response.content_part.delta", output_index=1, content_index=0, delta=SimpleNamespace(text="ab")),
+            SimpleNamespace(type="response.content_part.delta", output_index=1, content_index=0, delta=SimpleNamespace(text="c")),
+            SimpleNamespace(type="response.content_part.done", output_index=1, content_index=0, part=SimpleNamespace(text="abc", annotations=[])),
+            # 第二個片段沒有 delta，且內容恰為第一段的子字串，仍應加入
+            SimpleNamespace(type="response.content_part.done", output_index=1, content_index=1, part=SimpleNamespace(text="b", annotations=[])),
+        ]
+        for event in events:
+            agent._handle_stream_event(event, state)
+
+        assert state.content == "abcb"
+        assert state.length == 4
+        assert state.text_chunks == 2
+
+    def test_stream_error_event(self, agent):
+        """測試串流錯誤事件回傳錯誤結果"""
+        error_events = [SimpleNamespace(type="error", error="rate limited")]
+        agent._async_client = SimpleNamespace(
+            responses=SimpleNamespace(create=lambda **kwargs: _awaitable(_AsyncStream(error_events)))
+        )
+
+        result = asyncio.run(agent.asearch("越南金融科技"))
+
+        assert result["status"] == "error"
+        assert "rate limited" in result["error"]
+
+
+async def _awaitable(value):
+    return value
+
+
+class _ShardResponses:
+    """依提示詞中的國家回傳不同結果的假客戶端，並記錄最大同時請求數"""
+
+    def __init__(self, delay=0.05, fail_country=None):
+        self.delay = delay
+        self.fail_country = fail_country
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, **kwargs):
+        prompt = kwargs["input"]
+        country = next(c for c in ["Singapore", "Malaysia", "Thailand", "Vietnam", "Philippines"] if f"地區：{c}（" in prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if country == self.fail_country:
+            raise RuntimeError("shard failed")
+
+        results = [
+            {"title": f"{country} news", "url": f"https://vir.com.vn/{country.lower()}"},
+            # 所有分片都回傳同一則區域新聞（URL 僅追蹤參數與 www. 不同）
+            {"title": "Regional", "url": f"https://www.dealstreetasia.com/story/?utm_source={country}"},
+        ]
+        text = "```json\n" + json.dumps({"results": results}) + "\n```"
+        citation = SimpleNamespace(type="url_citation", title="Regional", url="https://dealstreetasia.com/story", index=0)
+        return _AsyncStream([
+            SimpleNamespace(type="response.output_item.added", item=SimpleNamespace(type="web_search_call")),
+            SimpleNamespace(type="response.content_part.done", part=SimpleNamespace(text=text, annotations=[citation])),
+            SimpleNamespace(type="response.done"),
+        ])
+
+
+class TestFanoutSearch:
+    """測試依國家分片的平行搜尋"""
+
+    def test_merges_and_dedupes_by_canonical_url(self):
+        """測試合併結果並以正規化 URL 去重"""
+        agent = ResearchAgent()
+        agent.cache = None
+        agent._async_client = SimpleNamespace(responses=_ShardResponses())
+
+        result = asyncio.run(agent.fanout_search("金融科技", language="English", max_concurrency=5))
+
+        assert result["status"] == "success"
+        assert result["web_search_count"] == 5
+        assert len(result["shards"]) == 5
+        assert len(result["sources"]) == 1
+        merged = ResearchAgent._extract_results_json(result["content"])
+        assert len(merged) == 6
+        assert [item["title"] for item in merged].count("Regional") == 1
+        assert result["results"] == merged
+
+    def test_sources_without_url_are_kept(self):
+        """測試沒有網址的來源不會因為空白鍵而被當成重複"""
+        agent = ResearchAgent()
+        shards = [{"label": "Vietnam"}, {"label": "Thailand"}]
+        shard_results = [
+            {"status": "success", "results": [], "sources": [{"title": "VnExpress", "url": ""}]},
+            {"status": "success", "results": [], "sources": [{"title": "Bangkok Post", "url": ""},
+                                                             {"title": "Bangkok Post", "url": ""}]},
+        ]
+
+        result = agent._merge_shard_results("金融科技", shards, shard_results)
+
+        assert [source["title"] for source in result["sources"]] == ["VnExpress", "Bangkok Post", "Bangkok Post"]
+
+    def test_concurrency_cap_and_wall_clock(self):
+        """測試同時請求數受上限控制，且牆鐘時間接近最慢的一批分片"""
+        responses = _ShardResponses(delay=0.2)
+        agent = ResearchAgent()
+        agent.cache = None
+        agent._async_client = SimpleNamespace(responses=responses)
+
+        start = time.perf_counter()
+        asyncio.run(agent.fanout_search("金融科技", language="English", max_concurrency=5))
+        elapsed = time.perf_counter() - start
+
+        assert responses.max_in_flight == 5
+        assert elapsed < 0.2 * 2
+
+        responses = _ShardResponses(delay=0.01)
+        agent._async_client = SimpleNamespace(responses=responses)
+        asyncio.run(agent.fanout_search("金融科技", language="English", max_concurrency=2))
+        assert responses.max_in_flight == 2
+
+    def test_partial_failure_keeps_other_shards(self):
+        """測試單一分片失敗時仍回傳其他分片結果"""
+        agent = ResearchAgent()
+        agent.cache = None
+        agent._async_client = SimpleNamespace(responses=_ShardResponses(fail_country="Vietnam"))
+
+        result = asyncio.run(agent.fanout_search("金融科技", language="English"))
+
+        assert result["status"] == "success"
+        failed = [s for s in result["shards"] if s["status"] == "error"]
+        assert [s["shard"] for s in failed] == ["Vietnam"]
+
+    def test_language_split(self):
+        """測試依語言分片"""
+        agent = ResearchAgent()
+        shards = agent._plan_shards("Vietnamese", "language")
+
+        assert [s["language"] for s in shards] == ["Vietnamese", "English"]
@@ -0,0 +1,167 @@
+"""
+測試搜尋結果快取
+"""
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents import ResearchAgent
+from config import Config
+from utils.search_cache import (
+    MemoryCacheBackend,
+    SQLiteCacheBackend,
+    SearchResultCache,
+    make_cache_key,
+    ttl_for_time_window,
+)
+
+RESULT = {"status": "success", "query": "越南金融科技", "content": "...", "sources": [], "web_search_count": 1}
+
+
+class TestCacheKey:
+    """測試快取鍵正規化"""
+
+    def test_whitespace_and_case_folded(self):
+        a = make_cache_key("Vietnam  Fintech", "最近 7 天內", "5-10篇", "English")
+        b = make_cache_key(" vietnam fintech ", "最近7天內", "5-10 篇", "english")
+        assert a == b
+
+    def test_full_width_normalized(self):
+        assert make_cache_key("ＳＧＸ", "最近７天", "５篇", "English") == make_cache_key("sgx", "最近7天", "5篇", "English")
+
+    def test_countries_order_insensitive(self):
+        a = make_cache_key("q", "7天", "5篇", "English", ["Vietnam", "Thailand"])
+        b = make_cache_key("q", "7天", "5篇", "English", ["Thailand", "Vietnam"])
+        assert a == b
+        assert a != make_cache_key("q", "7天", "5篇", "English")
+
+
+class TestTTL:
+    """測試 TTL 依時間範圍決定"""
+
+    def test_longer_window_longer_ttl(self):
+        assert ttl_for_time_window("最近 1 天") < ttl_for_time_window("最近 7 天內")
+        assert ttl_for_time_window("最近 7 天內") == 7 * Config.SEARCH_CACHE_TTL_PER_DAY
+
+    def test_ttl_bounds(self):
+        assert ttl_for_time_window("最近 1 小時") == Config.SEARCH_CACHE_MIN_TTL
+        assert ttl_for_time_window("最近一年") == Config.SEARCH_CACHE_MAX_TTL
+        assert ttl_for_time_window("隨便") == Config.SEARCH_CACHE_DEFAULT_TTL
+
+    def test_english_units_are_whole_words(self):
+        """測試英文時間單位須為完整單字（Monday、holiday、weekly 不是時間範圍）"""
+        from utils.helpers import parse_time_window_days
+
+        assert parse_time_window_days("last 2 weeks") == 14
+        assert parse_time_window_days("past 3days") == 3
+        assert parse_time_window_days("Monday news") is None
+        assert parse_time_window_days("holiday") is None
+        assert parse_time_window_days("weekly roundup") is None
+        assert ttl_for_time_window("weekly roundup") == Config.SEARCH_CACHE_DEFAULT_TTL
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCacheBackend(max_entries=3)
+    else:
+        backend = SQLiteCacheBackend(tmp_path / "cache.sqlite3", max_entries=3)
+        yield backend
+        backend.close()
+
+
+class TestBackends:
+    """測試兩種後端的 TTL 與 LRU 行為"""
+
+    def test_roundtrip(self, backend):
+        cache = SearchResultCache(backend)
+        assert cache.get("q", "7天", "5篇", "English") is None
+        cache.set("q", "7天", "5篇", "English", RESULT)
+        assert cache.get("q", "7天", "5篇", "English") == RESULT
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_expiry(self, backend):
+        cache = SearchResultCache(backend)
+        cache.set("q", "7天", "5篇", "English", RESULT, ttl=0.05)
+        time.sleep(0.1)
+        assert cache.get("q", "7天", "5篇", "English") is None
+
+    def test_lru_eviction(self, backend):
+        cache = SearchResultCache(backend)
+        for i in range(3):
+            cache.set(f"q{i}", "7天", "5篇", "English", RESULT)
+            time.sleep(0.01)
+        # 存取 q0 使其成為最近使用
+        assert cache.get("q0", "7天", "5篇", "English") is not None
+        time.sleep(0.01)
+        cache.set("q3", "7天", "5篇", "English", RESULT)
+
+        assert len(backend) == 3
+        assert cache.get("q1", "7天", "5篇", "English") is None
+        assert cache.get("q0", "7天", "5篇", "English") is not None
+        assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_survives_restart(tmp_path):
+    """測試 SQLite 後端在重新開啟後仍保留資料"""
+    path = tmp_path / "cache.sqlite3"
+    first = SQLiteCacheBackend(path)
+    SearchResultCache(first).set("q", "7天", "5篇", "English", RESULT)
+    first.close()
+
+    second = SQLiteCacheBackend(path)
+    assert SearchResultCache(second).get("q", "最近 7天", "5篇", "English") is None
+    assert SearchResultCache(second).get("Q", "7 天", "5篇", "english") == RESULT
+    second.close()
+
+
+def test_stats_consistent_across_threads():
+    """測試多個執行緒同時查詢與寫入時統計數字不會遺失"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = SearchResultCache(MemoryCacheBackend(max_entries=4))
+
+    def worker(i):
+        for j in range(200):
+            if cache.get(f"q{i}-{j}", "7天", "5篇", "English") is None:
+                cache.set(f"q{i}-{j}", "7天", "5篇", "English", RESULT)
+            cache.get(f"q{i}-{j}", "7天", "5篇", "English")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(worker, range(8)))
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 200 * 2
+    assert stats["misses"] >= 8 * 200  # 每個鍵的第一次查詢都未命中並寫入
+    assert stats["evictions"] == 8 * 200 - stats["entries"]
+
+
+def test_research_agent_uses_cache():
+    """測試 ResearchAgent 第二次相同查詢不再呼叫 API"""
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return iter([
+            SimpleNamespace(type="response.content_part.done", part=SimpleNamespace(text="news", annotations=[])),
+        ])
+
+    agent = ResearchAgent()
+    agent.cache = SearchResultCache(MemoryCacheBackend())
+    agent.client = SimpleNamespace(responses=SimpleNamespace(create=create))
+
+    first = agent.search("Vietnam fintech", "最近 7 天內", "5-10篇", "English")
+    second = agent.search("vietnam  fintech", "最近7天內", "5-10篇", "English")
+
+    assert len(calls) == 1
+    assert second["content"] == first["content"]
+    assert second["cached"] is True
+    assert "cached" not in first
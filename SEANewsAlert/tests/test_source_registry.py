@@ -0,0 +1,100 @@
+"""
+測試可信新聞來源註冊表
+"""
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents import ResearchAgent
+from utils.source_registry import SourceRegistry, source_registry
+
+
+def _write(path, sources):
+    path.write_text(json.dumps({"sources": sources}, ensure_ascii=False), encoding="utf-8")
+
+
+class TestSourceRegistry:
+    """測試網域比對與查詢"""
+
+    def test_default_config_loaded(self):
+        assert len(source_registry.sources) == 18
+        assert "vnexpress.net" in source_registry.allowed_domains_str
+
+    @pytest.mark.parametrize("url", [
+        "https://vnexpress.net/a",
+        "https://e.vnexpress.net/news/business/a.html",
+        "http://WWW.BangkokPost.com/business/123",
+        "https://asia.nikkei.com/Business/Markets",
+    ])
+    def test_trusted_including_subdomains(self, url):
+        assert source_registry.is_trusted(url)
+
+    @pytest.mark.parametrize("url", [
+        "https://nikkei.com/a",                 # 只有 asia.nikkei.com 是可信來源
+        "https://notvnexpress.net/a",           # 後綴相同但不是子網域
+        "https://vnexpress.net.evil.com/a",
+        "not a url",
+        "",
+    ])
+    def test_untrusted(self, url):
+        assert not source_registry.is_trusted(url)
+
+    def test_lookup_by_region_and_language(self):
+        assert {s["domain"] for s in source_registry.by_region("cambodia")} == {
+            "khmertimeskh.com", "cc-times.com", "phnompenhpost.com"
+        }
+        assert [s["name"] for s in source_registry.by_language("Chinese")] == ["柬中時報"]
+
+    def test_filter_trusted(self):
+        items = [{"url": "https://cafef.vn/x"}, {"url": "https://example.com/y"}]
+        kept, dropped = source_registry.filter_trusted(items)
+        assert kept == [{"url": "https://cafef.vn/x"}]
+        assert dropped == 1
+
+    def test_hot_reload(self, tmp_path):
+        """測試設定檔修改後自動重新載入，格式錯誤時沿用舊版本"""
+        path = tmp_path / "sources.json"
+        _write(path, [{"name": "A", "domain": "a.com", "region": "Vietnam"}])
+        registry = SourceRegistry(path, reload_interval=0)
+        assert registry.is_trusted("https://a.com")
+
+        _write(path, [{"name": "B", "domain": "b.com", "region": "Thailand"}])
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+        assert registry.is_trusted("https://b.com")
+        assert not registry.is_trusted("https://a.com")
+        assert registry.reload_count == 1
+
+        path.write_text("{broken", encoding="utf-8")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 2_000_000))
+        assert registry.is_trusted("https://b.com")
+
+
+def test_research_agent_filters_untrusted():
+    """測試搜尋結果中的非可信來源被移除（sources、results 與 content 中的 JSON）"""
+    text = "```json\n" + json.dumps({"results": [
+        {"title": "ok", "url": "https://e.vnexpress.net/a"},
+        {"title": "spam", "url": "https://content-farm.example/b"},
+    ]}) + "\n```"
+    citations = [
+        SimpleNamespace(type="url_citation", title="ok", url="https://e.vnexpress.net/a", index=0),
+        SimpleNamespace(type="url_citation", title="spam", url="https://content-farm.example/b", index=1),
+    ]
+    events = [SimpleNamespace(type="response.content_part.done", part=SimpleNamespace(text=text, annotations=citations))]
+
+    agent = ResearchAgent()
+    agent.cache = None
+    agent.client = SimpleNamespace(responses=SimpleNamespace(create=lambda **kwargs: iter(events)))
+
+    result = agent.search("越南")
+
+    assert [s["title"] for s in result["sources"]] == ["ok"]
+    assert [r["title"] for r in result["results"]] == ["ok"]
+    assert [r["title"] for r in ResearchAgent._extract_results_json(result["content"])] == ["ok"]
@@ -0,0 +1,142 @@
+"""
+測試串流 JSON 增量解析器
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from agents import ResearchAgent
+from utils.stream_parser import StreamingResultsExtractor, aiter_results, iter_results
+
+ITEMS = [
+    {"title": f"標題 {i} \"引號\" {{括號}} [x]", "summary": "反斜線 \\ 與換行\n", "url": f"https://vnexpress.net/{i}"}
+    for i in range(5)
+]
+TEXT = (
+    "以下是搜尋結果：\n```json\n"
+    + json.dumps({"search_query": "q", "results": ITEMS, "meta": {"results": [{"nested": True}]}}, ensure_ascii=False, indent=2)
+    + "\n```\n補充說明 {\"not\": \"json block\"}"
+)
+
+
+def _split(text, seed):
+    rng = random.Random(seed)
+    chunks, pos = [], 0
+    while pos < len(text):
+        step = rng.randint(1, 9)
+        chunks.append(text[pos:pos + step])
+        pos += step
+    return chunks
+
+
+class TestStreamingResultsExtractor:
+    """測試增量解析"""
+
+    def test_random_chunk_boundaries(self):
+        """測試任意切分位置（包含切開 ```json 標記、跳脫字元）都能正確解析"""
+        for seed in range(100):
+            assert list(iter_results(_split(TEXT, seed))) == ITEMS
+
+    def test_items_emitted_when_closing_brace_arrives(self):
+        """測試每則新聞在右大括號到達時立即產出"""
+        extractor = StreamingResultsExtractor()
+        # indent=2 時第一則新聞的右大括號位於 "\n    }"（字串內的 "}" 不算）
+        first_close = TEXT.index("\n    }") + len("\n    }")
+
+        assert extractor.feed(TEXT[:first_close - 1]) == []
+        assert extractor.feed(TEXT[first_close - 1:first_close]) == [ITEMS[0]]
+
+    def test_ignores_nested_results_and_trailing_text(self):
+        """測試只擷取頂層 results，區塊結束後忽略其餘文字"""
+        extractor = StreamingResultsExtractor()
+        extractor.feed(TEXT)
+
+        assert extractor.items == ITEMS
+        assert extractor.finished
+
+    def test_malformed_item_skipped(self):
+        """測試單一格式錯誤的物件不影響後續物件"""
+        text = '```json\n{"results": [{"a": 1,}, {"b": 2}]}\n```'
+        extractor = StreamingResultsExtractor()
+
+        assert extractor.feed(text) == [{"b": 2}]
+        assert extractor.errors == 1
+
+    def test_async_iterator(self):
+        """測試非同步迭代器"""
+        async def chunks():
+            for chunk in _split(TEXT, 7):
+                yield chunk
+
+        async def collect():
+            return [item async for item in aiter_results(chunks())]
+
+        assert asyncio.run(collect()) == ITEMS
+
+
+class TestResearchAgentResultStream:
+    """測試 Research Agent 串流中逐一取得新聞"""
+
+    def _agent(self):
+        events = [
+            SimpleNamespace(type="response.content_part.delta", output_index=0, content_index=0, delta=SimpleNamespace(text=chunk))
+            for chunk in _split(TEXT, 3)
+        ]
+
+        class _Stream:
+            def __init__(self):
+                self._events = iter(events)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                await asyncio.sleep(0)
+                try:
+                    return next(self._events)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        async def create(**kwargs):
+            return _Stream()
+
+        agent = ResearchAgent()
+        agent.cache = None
+        agent._async_client = SimpleNamespace(responses=SimpleNamespace(create=create))
+        return agent
+
+    def test_on_result_callback_and_results_field(self):
+        """測試 on_result 回呼與回傳的 results 欄位"""
+        agent = self._agent()
+        received = []
+
+        result = asyncio.run(agent.asearch("q", on_result=received.append))
+
+        assert received == ITEMS
+        assert result["results"] == ITEMS
+
+    def test_astream_yields_before_stream_ends(self):
+        """測試 astream 在串流結束前就產出新聞，結束後提供完整結果"""
+        agent = self._agent()
+
+        async def consume():
+            stream = agent.astream("q")
+            seen = []
+            async for item in stream:
+                # 第一則新聞到達時搜尋尚未完成
+                seen.append((item, stream.result is None))
+            return seen, stream.result
+
+        seen, result = asyncio.run(consume())
+
+        assert [item for item, _ in seen] == ITEMS
+        assert seen[0][1] is True
+        assert result["status"] == "success"
@@ -0,0 +1,165 @@
+"""
+測試任務進度事件（分送、Last-Event-ID 續傳、心跳與 SSE 端點）
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+# 添加專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+from app.services.events import TaskEventBroker
+from app.services.progress import TaskProgress, task_manager
+
+
+def parse_sse(text: str):
+    """將 SSE 回應拆成 (event, id, data) 列表（略過 retry 與註解）"""
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            events.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return events
+
+
+class TestEventBroker:
+    """測試事件分送與續傳"""
+
+    def test_replay_after_last_event_id(self):
+        """測試依 Last-Event-ID 補送之後的事件，未提供時只送最新狀態"""
+        broker = TaskEventBroker(history=10)
+        for progress in (0, 10, 20, 30):
+            broker.publish("t", {"progress": progress})
+
+        async def run():
+            resumed = broker.subscribe("t", last_event_id=2)
+            fresh = broker.subscribe("t")
+            assert [resumed.queue.get_nowait().id for _ in range(resumed.queue.qsize())] == [3, 4]
+            assert fresh.queue.get_nowait().data == {"progress": 30} and fresh.queue.empty()
+            assert broker.subscriber_count("t") == 2
+            resumed.close()
+            fresh.close()
+            assert broker.subscriber_count() == 0
+
+        asyncio.run(run())
+
+    def test_history_gap_sends_latest(self):
+        """測試 Last-Event-ID 超出保留範圍時只送最新狀態"""
+        broker = TaskEventBroker(history=2)
+        for progress in range(5):
+            broker.publish("t", {"progress": progress})
+
+        async def run():
+            subscription = broker.subscribe("t", last_event_id=1)
+            assert subscription.queue.qsize() == 1 and subscription.queue.get_nowait().id == 5
+
+        asyncio.run(run())
+
+    def test_publish_from_worker_thread(self):
+        """測試執行緒池中的更新透過 call_soon_threadsafe 送到事件迴圈"""
+        broker = TaskEventBroker()
+
+        async def run():
+            subscription = broker.subscribe("t")
+            worker = threading.Thread(target=lambda: [broker.publish("t", {"progress": p}) for p in (10, 20)])
+            worker.start()
+            received = [await subscription.get(timeout=2), await subscription.get(timeout=2)]
+            worker.join()
+            assert [event.data["progress"] for event in received] == [10, 20]
+            assert await subscription.get(timeout=0.01) is None
+
+        asyncio.run(run())
+
+    def test_closed_loop_dropped(self):
+        """測試事件迴圈已結束的訂閱在下一次發布時移除"""
+        broker = TaskEventBroker()
+
+        async def run():
+            broker.subscribe("t")
+
+        asyncio.run(run())
+        broker.publish("t", {"progress": 1})
+        assert broker.subscriber_count("t") == 0
+
+
+class TestTaskProgressEvents:
+    """測試 TaskProgress 發布事件"""
+
+    def test_public_fields_only(self):
+        """測試只有 API 狀態欄位的更新發布事件"""
+        manager = TaskProgress()
+        task_id = manager.create_task("越南央行", "events@example.com")
+        manager.update_task(task_id, news_dedup={"collapsed": 1})
+        manager.set_progress(task_id, 40, "searching", "🔍 搜尋中")
+        events = list(manager.events._events[task_id])
+        assert [event.id for event in events] == [1, 2]
+        assert events[-1].data == manager.get_task(task_id)
+
+
+class TestEventsEndpoint:
+    """測試 GET /api/tasks/{task_id}/events"""
+
+    def _client(self):
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        return TestClient(app)
+
+    def _finished_task(self):
+        task_id = task_manager.create_task("越南央行", "events@example.com")
+        task_manager.set_running(task_id)
+        task_manager.set_progress(task_id, 50, "analyzing", "🤖 分析中")
+        task_manager.set_succeeded(task_id, pdf_path="report.pdf")
+        return task_id
+
+    def test_stream_until_terminal(self):
+        """測試送出最新狀態後以 end 事件結束"""
+        task_id = self._finished_task()
+        response = self._client().get(f"/api/tasks/{task_id}/events")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        assert [event for event, _, _ in events] == ["progress", "end"]
+        assert events[0][2]["status"] == "succeeded" and events[0][2]["artifacts"]["pdf_path"] == "report.pdf"
+
+    def test_last_event_id_resume(self):
+        """測試帶 Last-Event-ID 重連時補送之後的事件；已收到最後事件時直接結束"""
+        task_id = self._finished_task()
+        client = self._client()
+        events = parse_sse(client.get(f"/api/tasks/{task_id}/events", headers={"Last-Event-ID": "2"}).text)
+        assert [(event, event_id) for event, event_id, _ in events] == [("progress", "3"), ("progress", "4"), ("end", None)]
+        assert events[0][2]["progress"] == 50
+        events = parse_sse(client.get(f"/api/tasks/{task_id}/events", headers={"Last-Event-ID": "4"}).text)
+        assert [event for event, _, _ in events] == ["end"]
+
+    def test_unknown_task(self):
+        """測試不存在的任務"""
+        assert self._client().get("/api/tasks/missing/events").status_code == 404
+
+    def test_heartbeat_and_disconnect(self, monkeypatch):
+        """測試沒有事件時送出心跳，客戶端斷線後取消訂閱"""
+        from app.routers import tasks
+        from config import Config
+
+        monkeypatch.setattr(Config, "TASK_EVENTS_HEARTBEAT", 0.01)
+        task_id = task_manager.create_task("越南央行", "events@example.com")
+
+        class FakeRequest:
+            checks = 0
+
+            async def is_disconnected(self):
+                self.checks += 1
+                return self.checks > 1
+
+        async def run():
+            return [chunk async for chunk in tasks._task_event_stream(FakeRequest(), task_id, None)]
+
+        chunks = asyncio.run(run())
+        assert chunks[0].startswith("retry:")
+        assert chunks[1].startswith("id: 1\nevent: progress")
+        assert chunks[2:] == [": heartbeat\n\n"]
+        assert task_manager.events.subscriber_count(task_id) == 0
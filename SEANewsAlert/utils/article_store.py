@@ -0,0 +1,401 @@
+"""
+文章庫
+以 SQLite（WAL）保存每次搜尋解析出的新聞（網址、原文與翻譯標題、摘要、來源、國家、日期、語言），
+並記錄每個主題已搜尋過的時間範圍（coverage）。新的需求可先由文章庫取得時間範圍內已抓取的新聞，
+即時搜尋只需涵蓋尚未搜尋過的最近幾天。
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import math
+import re
+import sqlite3
+import threading
+import time
+
+from config import Config
+from utils.helpers import canonicalize_url, normalize_text, parse_time_window_days
+
+# 數量指令無法解析時的新聞數上限（預設數量指令「5-10篇」的上限）
+DEFAULT_ARTICLE_COUNT = 10
+
+_DATE_PATTERN = re.compile(r"(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})")
+
+# 查詢結果的欄位（與搜尋結果中逐則新聞的欄位名稱一致）
+ARTICLE_FIELDS = ("url", "title", "translated_title", "summary", "source", "country", "date", "language")
+
+
+def normalize_date(value: Any) -> str:
+    """將「2025-1-5」、「2025/01/05」、「2025年1月5日」等寫法轉為 YYYY-MM-DD，無法解析時回傳空字串"""
+    match = _DATE_PATTERN.search(str(value or ""))
+    if not match:
+        return ""
+    try:
+        return date(*(int(part) for part in match.groups())).isoformat()
+    except ValueError:
+        return ""
+
+
+def query_key(keywords: str) -> str:
+    """主題鍵（全形轉半形、大小寫與空白摺疊，與搜尋快取的關鍵字正規化相同）"""
+    return normalize_text(keywords)
+
+
+@dataclass
+class SearchPlan:
+    """
+    一次需求的搜尋計畫
+
+    Attributes:
+        window_start: 需求時間範圍的起始日（YYYY-MM-DD，無法解析時間範圍時為空字串）
+        live_time_instruction: 即時搜尋使用的時間指令；None 表示文章庫已足夠，不必即時搜尋
+        live_start: 即時搜尋涵蓋的起始日（記錄 coverage 用）
+        stored: 文章庫中時間範圍內、屬於同一主題的新聞（由新到舊，最多 max_articles 則）
+        max_articles: 需求的新聞數上限（即時搜尋與文章庫新聞合併後不超過此數）
+    """
+
+    window_start: str = ""
+    live_time_instruction: Optional[str] = None
+    live_start: str = ""
+    stored: List[Dict[str, Any]] = field(default_factory=list)
+    max_articles: Optional[int] = None
+
+    @property
+    def needs_search(self) -> bool:
+        return self.live_time_instruction is not None
+
+
+class ArticleStore:
+    """SQLite 文章庫（(country, date)、(source, date) 與正規化網址索引）"""
+
+    def __init__(self, path: Path, freshness: float = 1800):
+        """
+        Args:
+            path: SQLite 檔案路徑
+            freshness: 今天的 coverage 在幾秒內視為最新（不必再即時搜尋）
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.freshness = freshness
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                url_key TEXT UNIQUE,
+                title TEXT NOT NULL,
+                translated_title TEXT NOT NULL DEFAULT '',
+                summary TEXT NOT NULL DEFAULT '',
+                source TEXT NOT NULL DEFAULT '',
+                country TEXT NOT NULL DEFAULT '',
+                date TEXT NOT NULL DEFAULT '',
+                language TEXT NOT NULL DEFAULT '',
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_country_date ON articles(country, date);
+            CREATE INDEX IF NOT EXISTS idx_articles_source_date ON articles(source, date);
+            CREATE INDEX IF NOT EXISTS idx_articles_date ON articles(date);
+            CREATE TABLE IF NOT EXISTS article_topics (
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (topic, language, article_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                topic TEXT NOT NULL,
+                language TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_coverage_topic ON coverage(topic, language, start_date);
+            """
+        )
+        self._conn.commit()
+
+    # ============ 寫入 ============
+
+    def ingest(self, items: Iterable[Dict[str, Any]], keywords: str = "", language: str = "",
+               classify_country=None, fetched_at: float = None) -> int:
+        """
+        寫入搜尋結果中逐則的新聞（相同正規化網址的新聞更新非空欄位）
+
+        Args:
+            items: 新聞（title / summary / source / url / date / language，可另有 country / translated_title）
+            keywords: 搜尋主題（連結新聞與主題，供之後相同主題的需求使用）
+            language: 需求語言（新聞沒有 language 欄位時使用）
+            classify_country: 可選的 (標題, 來源, 摘要) -> 國家 函數（新聞沒有 country 時使用）
+            fetched_at: 抓取時間戳記（預設為現在）
+
+        Returns:
+            int: 寫入的新聞數
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        topic = query_key(keywords)
+        count = 0
+        with self._lock:
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                title, source, summary = (str(item.get(key) or "").strip() for key in ("title", "source", "summary"))
+                url = str(item.get("url") or "").strip()
+                if not title and not url:
+                    continue
+                country = str(item.get("country") or "")
+                if not country and classify_country is not None:
+                    country = classify_country(title, source, summary)
+                row = (
+                    url, canonicalize_url(url) or None, title, str(item.get("translated_title") or ""),
+                    summary, source, country, normalize_date(item.get("date") or item.get("published_at")),
+                    str(item.get("language") or language or ""), fetched_at,
+                )
+                article_id = self._upsert(row)
+                if topic:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO article_topics (topic, language, article_id) VALUES (?, ?, ?)",
+                        (topic, language or "", article_id)
+                    )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def _upsert(self, row: Sequence[Any]) -> int:
+        cursor = self._conn.execute(
+            """
+            INSERT INTO articles (url, url_key, title, translated_title, summary, source, country, date, language, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url_key) DO UPDATE SET
+                title = COALESCE(NULLIF(excluded.title, ''), title),
+                translated_title = COALESCE(NULLIF(excluded.translated_title, ''), translated_title),
+                summary = COALESCE(NULLIF(excluded.summary, ''), summary),
+                source = COALESCE(NULLIF(excluded.source, ''), source),
+                country = COALESCE(NULLIF(excluded.country, ''), country),
+                date = COALESCE(NULLIF(excluded.date, ''), date),
+                language = COALESCE(NULLIF(excluded.language, ''), language),
+                fetched_at = excluded.fetched_at
+            """,
+            row
+        )
+        if row[1] is None:
+            return cursor.lastrowid
+        return self._conn.execute("SELECT id FROM articles WHERE url_key = ?", (row[1],)).fetchone()[0]
+
+    def attach_translations(self, news) -> int:
+        """
+        以分析結果（NewsBatch / NewsItem 列表）更新翻譯標題與國家
+
+        Returns:
+            int: 更新的新聞數
+        """
+        updated = 0
+        with self._lock:
+            for item in news:
+                url_key = canonicalize_url(item.url)
+                if not url_key:
+                    continue
+                updated += self._conn.execute(
+                    """
+                    UPDATE articles SET
+                        translated_title = COALESCE(NULLIF(?, ''), translated_title),
+                        country = COALESCE(NULLIF(?, ''), country)
+                    WHERE url_key = ?
+                    """,
+                    (item.title, item.country, url_key)
+                ).rowcount
+            self._conn.commit()
+        return updated
+
+    def record_coverage(self, keywords: str, language: str, start_date: str, end_date: str,
+                        fetched_at: float = None):
+        """記錄某主題在 [start_date, end_date] 已完成即時搜尋"""
+        topic = query_key(keywords)
+        if not topic or not start_date or not end_date:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO coverage (topic, language, start_date, end_date, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (topic, language or "", start_date, end_date, time.time() if fetched_at is None else fetched_at)
+            )
+            self._conn.commit()
+
+    # ============ 查詢 ============
+
+    def query(self, start_date: str = None, end_date: str = None, countries: Sequence[str] = None,
+              sources: Sequence[str] = None, language: str = None, keywords: str = None,
+              topic_language: str = None, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        依條件查詢新聞（依日期由新到舊）
+
+        Args:
+            start_date / end_date: 日期範圍（YYYY-MM-DD，含端點；指定時排除沒有日期的新聞）
+            countries: 國家列表
+            sources: 來源名稱列表
+            language: 新聞語言
+            keywords: 搜尋主題（只回傳曾由相同主題搜尋到的新聞）
+            topic_language: 搭配 keywords，只採用以此需求語言搜尋到的新聞
+            limit / offset: 分頁
+
+        Returns:
+            List[Dict[str, Any]]: 新聞（欄位見 ARTICLE_FIELDS，另含 fetched_at）
+        """
+        clauses, params = [], []
+        if start_date:
+            clauses.append("a.date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("a.date <= ? AND a.date != ''")
+            params.append(end_date)
+        if countries:
+            clauses.append(f"a.country IN ({','.join('?' * len(countries))})")
+            params.extend(countries)
+        if sources:
+            clauses.append(f"a.source IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+        if language:
+            clauses.append("a.language = ?")
+            params.append(language)
+        if keywords:
+            topic_clause = "SELECT article_id FROM article_topics WHERE topic = ?"
+            params.append(query_key(keywords))
+            if topic_language is not None:
+                topic_clause += " AND language = ?"
+                params.append(topic_language)
+            clauses.append(f"a.id IN ({topic_clause})")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {', '.join('a.' + name for name in ARTICLE_FIELDS)}, a.fetched_at FROM articles a
+                {where}
+                ORDER BY a.date DESC, a.id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (*params, limit, offset)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """以網址（正規化後比對）取得新聞"""
+        url_key = canonicalize_url(url)
+        if not url_key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(ARTICLE_FIELDS)}, fetched_at FROM articles WHERE url_key = ?", (url_key,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def covered_until(self, keywords: str, language: str, start_date: str) -> Optional[Dict[str, Any]]:
+        """
+        從 start_date 起連續已搜尋過的最後一天
+
+        Returns:
+            Optional[Dict[str, Any]]: {"end_date": YYYY-MM-DD, "fetched_at": 最近一次涵蓋到該日的搜尋時間}，
+            start_date 當天未被任何 coverage 涵蓋時回傳 None
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT start_date, end_date, fetched_at FROM coverage
+                WHERE topic = ? AND language = ? AND end_date >= ?
+                ORDER BY start_date
+                """,
+                (query_key(keywords), language or "", start_date)
+            ).fetchall()
+        end = fetched_at = None
+        for row in rows:
+            reach = date.fromisoformat(end) + timedelta(days=1) if end else date.fromisoformat(start_date)
+            if date.fromisoformat(row["start_date"]) > reach:
+                break
+            if end is None or row["end_date"] > end:
+                end, fetched_at = row["end_date"], row["fetched_at"]
+            elif row["end_date"] == end:
+                fetched_at = max(fetched_at, row["fetched_at"])
+        return {"end_date": end, "fetched_at": fetched_at} if end else None
+
+    def plan(self, keywords: str, time_instruction: str, language: str, max_articles: int = None,
+             today: date = None, now: float = None) -> SearchPlan:
+        """
+        規劃一次需求：時間範圍內已搜尋過的部分由文章庫提供，即時搜尋只涵蓋其後的缺口
+
+        缺口從最後一次搜尋涵蓋到的那一天起算（當天稍後發布的新聞可能尚未抓到）；
+        今天已在 freshness 秒內搜尋過且文章庫中有新聞時不必即時搜尋。
+        無法解析時間範圍或沒有 coverage 時，以原本的時間指令完整搜尋。
+
+        Args:
+            max_articles: 需求的新聞數（例如由「5-10篇」解析出 10）；文章庫只取最新的這麼多則
+        """
+        today = today or date.today()
+        now = time.time() if now is None else now
+        days = parse_time_window_days(time_instruction)
+        if days is None:
+            return SearchPlan(live_time_instruction=time_instruction, max_articles=max_articles)
+        window_days = max(1, math.ceil(days))
+        window_start = (today - timedelta(days=window_days)).isoformat()
+        full = SearchPlan(window_start, time_instruction, window_start, max_articles=max_articles)
+
+        covered = self.covered_until(keywords, language, window_start)
+        if covered is None:
+            return full
+        stored = self.query(start_date=window_start, keywords=keywords, topic_language=language or "",
+                            limit=max_articles or 1000)
+        if not stored:
+            return full
+        end = date.fromisoformat(covered["end_date"])
+        if end >= today and now - covered["fetched_at"] <= self.freshness:
+            return SearchPlan(window_start, None, "", stored, max_articles)
+        gap_days = (today - min(end, today)).days + 1
+        if gap_days >= window_days:
+            return SearchPlan(window_start, time_instruction, window_start, stored, max_articles)
+        return SearchPlan(window_start, f"最近 {gap_days} 天內", min(end, today).isoformat(), stored, max_articles)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def merge_articles(live: List[Dict[str, Any]], stored: List[Dict[str, Any]],
+                   limit: int = None) -> List[Dict[str, Any]]:
+    """
+    合併即時搜尋與文章庫的新聞（即時搜尋在前；文章庫中網址重複者略過，並標記 from_store）
+
+    Args:
+        limit: 合併後的新聞數上限；即時搜尋的新聞全部保留，文章庫的新聞依序補足到上限
+    """
+    seen = {canonicalize_url(item.get("url", "")) for item in live if item.get("url")}
+    merged = list(live)
+    for article in stored:
+        if limit is not None and len(merged) >= limit:
+            break
+        url_key = canonicalize_url(article.get("url", ""))
+        if url_key and url_key in seen:
+            continue
+        seen.add(url_key)
+        merged.append({
+            "title": article["title"],
+            "summary": article["summary"],
+            "source": article["source"],
+            "url": article["url"],
+            "date": article["date"],
+            "language": article["language"],
+            "country": article["country"],
+            "from_store": True,
+        })
+    return merged
+
+
+def create_article_store() -> Optional[ArticleStore]:
+    """依設定建立文章庫（ARTICLE_STORE_ENABLED=false 時回傳 None）"""
+    if not Config.ARTICLE_STORE_ENABLED:
+        return None
+    return ArticleStore(Config.ARTICLE_STORE_PATH, Config.ARTICLE_STORE_FRESHNESS)
@@ -0,0 +1,244 @@
+"""
+新聞國家／實體標註
+由地名辭典（data/country_gazetteer.json）一次建立多樣式比對器：所有別名組成字首樹後編譯成單一正則，
+由 re 引擎以一次掃描找出每個位置最長的別名，不必對每個別名各做一次子字串搜尋。
+新聞的國家依各國被提到的次數決定（標題、來源、內文分別加權），
+批次標註時所有新聞串接後只掃描一次。
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import json
+import re
+import string
+
+from config import Config
+from utils.news_model import NewsBatch
+
+ENTITY_KINDS = ("names", "cities", "exchanges", "central_banks", "markets")
+# 串接批次文字的分隔字元（不會出現在任何別名中，也不是英數字元）
+_SEPARATOR = "\x00"
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_WORD_CHARS = frozenset(string.ascii_letters + string.digits)
+# 別名開頭的英數單字（SET Index 的 SET、VN-Index 的 VN）
+_LEADING_TOKEN = re.compile(r"[A-Za-z0-9]+")
+
+
+def _leading_token(alias: str) -> str:
+    match = _LEADING_TOKEN.match(alias)
+    return match.group(0) if match else ""
+
+
+def _is_acronym_alias(alias: str) -> bool:
+    """別名的第一個單字是否為全大寫的短縮寫（SET、SET Index、PSE Composite Index、VN-Index）"""
+    token = _leading_token(alias)
+    return token.isupper() and len(token) <= 5
+
+
+@dataclass(frozen=True)
+class Entity:
+    """地名辭典中的一個別名（case_sensitive 時開頭的縮寫須大小寫相符）"""
+
+    alias: str
+    country: str
+    kind: str
+    case_sensitive: bool
+
+    @property
+    def cased_prefix(self) -> str:
+        """須大小寫相符的部分：開頭的英數單字（沒有時為整個別名）"""
+        return _leading_token(self.alias) or self.alias
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    將字詞組成字首樹並轉為正則（同一位置優先比對最長的字詞）
+
+    例如 thai、thailand 轉為 thai(?:land)?，分支只在字首分岔時出現，掃描成本與字詞數量無關。
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class GazetteerMatcher:
+    """以單一字首樹正則比對所有別名"""
+
+    def __init__(self, entities: Iterable[Entity]):
+        """
+        Args:
+            entities: 別名列表（同一別名可屬於多個國家）
+        """
+        self.entities: Dict[str, List[Entity]] = {}
+        for entity in entities:
+            self.entities.setdefault(entity.alias.lower(), []).append(entity)
+        # 別名 -> (實體, 是否需檢查大小寫, 是否需檢查前方單字邊界, 是否需檢查後方單字邊界)
+        self._checks: Dict[str, Tuple[List[Entity], bool, bool, bool]] = {
+            key: (
+                matched,
+                any(entity.case_sensitive for entity in matched),
+                key[0] in _WORD_CHARS,
+                key[-1] in _WORD_CHARS,
+            )
+            for key, matched in self.entities.items()
+        }
+        self.pattern = re.compile(_trie_pattern(self.entities)) if self.entities else None
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, List[Entity]]]:
+        """
+        依序找出文字中的別名
+
+        英數別名必須是完整單字（前後不是英數字元），以縮寫開頭的別名其縮寫須大小寫相符；
+        不符合時從下一個字元重新比對，因此不會遮蔽重疊的其他別名。
+
+        Yields:
+            Tuple[int, int, List[Entity]]: 起訖位置與符合的實體
+        """
+        if self.pattern is None or not text:
+            return
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # 少數字元轉小寫後長度改變，改為只轉換 ASCII 以保持位置對應
+            lowered = text.translate(_ASCII_LOWER)
+        checks = self._checks
+        length = len(text)
+        position = 0
+        while position < length:
+            for match in self.pattern.finditer(lowered, position):
+                start, end = match.span()
+                matched, case_check, start_word, end_word = checks[match.group(0)]
+                if (start_word and start and text[start - 1] in _WORD_CHARS) or \
+                        (end_word and end < length and text[end] in _WORD_CHARS):
+                    break
+                if case_check:
+                    matched = [e for e in matched if not e.case_sensitive or text.startswith(e.cased_prefix, start)]
+                    if not matched:
+                        break
+                yield start, end, matched
+            else:
+                return
+            position = start + 1
+
+
+class CountryTagger:
+    """依地名辭典判斷新聞所屬國家"""
+
+    # 標題、來源、內文中每次提及的權重
+    FIELD_WEIGHTS = (3, 2, 1)
+
+    def __init__(self, gazetteer: Dict[str, Any]):
+        """
+        Args:
+            gazetteer: 地名辭典內容（格式見 data/country_gazetteer.json）
+        """
+        self.default = gazetteer.get("default", "東南亞")
+        self.countries = [country["name"] for country in gazetteer.get("countries", [])]
+        entities = []
+        for country in gazetteer.get("countries", []):
+            for kind in ENTITY_KINDS:
+                for alias in country.get(kind, []):
+                    alias = alias.strip()
+                    if not alias:
+                        continue
+                    # 全大寫的短縮寫（SET、MAS、PSE）與一般英文單字同形，以其開頭的別名（SET Index）須大小寫相符
+                    entities.append(Entity(alias, country["name"], kind, _is_acronym_alias(alias)))
+        self.matcher = GazetteerMatcher(entities)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CountryTagger":
+        """由地名辭典檔案建立"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def entities(self, text: str) -> List[Tuple[int, int, Entity]]:
+        """
+        列出文字中提到的所有實體
+
+        Returns:
+            List[Tuple[int, int, Entity]]: (起點, 終點, 實體)
+        """
+        return [
+            (start, end, entity)
+            for start, end, matched in self.matcher.finditer(text)
+            for entity in matched
+        ]
+
+    def scores_many(self, records: Iterable[Sequence[Optional[str]]]) -> List[Dict[str, int]]:
+        """
+        批次計算各則新聞中每個國家的加權提及次數（所有文字串接後只掃描一次）
+
+        Args:
+            records: 每則新聞的 (標題, 來源, 內文)
+
+        Returns:
+            List[Dict[str, int]]: 每則新聞的 {國家: 分數}，依首次出現的順序排列
+        """
+        parts: List[str] = []
+        starts: List[int] = []
+        owners: List[Tuple[int, int]] = []
+        offset = 0
+        count = 0
+        for index, record in enumerate(records):
+            count += 1
+            for weight, text in zip(self.FIELD_WEIGHTS, record):
+                text = (text or "").replace(_SEPARATOR, " ")
+                parts.append(text)
+                starts.append(offset)
+                owners.append((index, weight))
+                offset += len(text) + 1
+
+        scores: List[Dict[str, int]] = [{} for _ in range(count)]
+        for start, _, matched in self.matcher.finditer(_SEPARATOR.join(parts)):
+            index, weight = owners[bisect_right(starts, start) - 1]
+            counts = scores[index]
+            for country in {entity.country for entity in matched}:
+                counts[country] = counts.get(country, 0) + weight
+        return scores
+
+    def _best(self, counts: Dict[str, int]) -> str:
+        if not counts:
+            return self.default
+        # 分數相同時取最先被提到的國家（dict 保留插入順序）
+        return max(counts, key=counts.get)
+
+    def tag_many(self, records: Iterable[Sequence[Optional[str]]]) -> List[str]:
+        """
+        批次判斷多則新聞的國家
+
+        Args:
+            records: 每則新聞的 (標題, 來源, 內文)
+
+        Returns:
+            List[str]: 國家名稱（沒有提到任何國家時為地名辭典的 default）
+        """
+        return [self._best(counts) for counts in self.scores_many(records)]
+
+    def tag(self, title: str = "", source: str = "", content: str = "") -> str:
+        """判斷單則新聞的國家"""
+        return self.tag_many([(title, source, content)])[0]
+
+    def tag_batch(self, news: NewsBatch) -> NewsBatch:
+        """以標題、來源與摘要＋重點分析重新判斷整批新聞的國家（直接更新 country 欄位）"""
+        columns = news.columns
+        contents = (f"{summary}\n{analysis}" for summary, analysis in zip(columns["summary"], columns["analysis"]))
+        columns["country"] = self.tag_many(zip(columns["title"], columns["source"], contents))
+        return news
+
+
+# 全域國家標註器實例
+country_tagger = CountryTagger.from_file(Config.COUNTRY_GAZETTEER_PATH)
@@ -0,0 +1,189 @@
+"""
+新聞 Excel 輸出
+streaming 模式以 openpyxl 的 write-only 工作簿逐列寫出：欄寬與儲存格樣式只建立一次，
+資料列直接由新聞項目的迭代器寫入，記憶體用量與列數無關，也不需要 pandas。
+傳入 NewsBatch 時直接依欄位逐列讀值，不必對每則新聞做中文鍵查詢。
+pandas 模式保留原本的 DataFrame + ExcelWriter 寫法（需另外安裝 pandas）。
+"""
+from pathlib import Path
+from typing import Any, Iterable, List, Mapping, Optional, Tuple, Union
+
+from openpyxl import Workbook
+from openpyxl.cell.cell import Cell, ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from utils.news_model import LABEL_FIELDS, NewsBatch
+from utils.progress_reporter import ProgressReporter
+
+SHEET_NAME = "新聞報告"
+# (欄位名稱, 欄寬)，依輸出順序排列
+NEWS_COLUMNS: List[Tuple[str, int]] = [
+    ("新聞標題（中文）", 50),
+    ("來源國家", 15),
+    ("來源網站連結", 60),
+    ("發布日期", 15),
+    ("摘要", 80),
+    ("重點分析", 80),
+]
+LINK_COLUMN = "來源網站連結"
+WRITER_MODES = ("streaming", "pandas")
+
+
+def _header_style():
+    return dict(
+        font=Font(bold=True, size=12),
+        fill=PatternFill(start_color='CCE5FF', end_color='CCE5FF', fill_type='solid'),
+        alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+    )
+
+
+def _body_style(is_link: bool):
+    style = dict(alignment=Alignment(horizontal='left', vertical='top', wrap_text=True))
+    if is_link:
+        style["font"] = Font(color='0000FF', underline='single')
+    return style
+
+
+def _clean_value(value: Any) -> Any:
+    """空值轉為空字串，移除 Excel 不接受的控制字元"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+
+class StreamingNewsWriter:
+    """以 write-only 模式逐列寫出新聞 Excel"""
+
+    def __init__(self, columns: List[Tuple[str, int]] = None, sheet_name: str = SHEET_NAME):
+        """
+        Args:
+            columns: (欄位名稱, 欄寬) 列表，預設為 NEWS_COLUMNS
+            sheet_name: 工作表名稱
+        """
+        self.columns = columns or NEWS_COLUMNS
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        for index, (_, width) in enumerate(self.columns, start=1):
+            self.sheet.column_dimensions[get_column_letter(index)].width = width
+
+        # 每一欄的樣式只建立一次，之後的儲存格直接複製樣式索引
+        self._header_style = self._style_array(_header_style())
+        self._body_styles = [self._style_array(_body_style(name == LINK_COLUMN)) for name, _ in self.columns]
+        self.rows = 0
+
+    def _style_array(self, attributes: dict):
+        cell = Cell(self.sheet, row=1, column=1)
+        for name, value in attributes.items():
+            setattr(cell, name, value)
+        return cell._style
+
+    def _append(self, values: Iterable[Any], styles):
+        sheet = self.sheet
+        sheet.append([
+            Cell(sheet, row=1, column=1, value=_clean_value(value), style_array=style)
+            for value, style in zip(values, styles)
+        ])
+
+    def write_header(self):
+        self._append((name for name, _ in self.columns), [self._header_style] * len(self.columns))
+
+    def write_item(self, item: Mapping[str, Any]):
+        """寫入一則新聞"""
+        self.write_row(item.get(name) for name, _ in self.columns)
+
+    def write_row(self, values: Iterable[Any]):
+        """寫入一列已依欄位順序排列的值"""
+        self._append(values, self._body_styles)
+        self.rows += 1
+
+    def save(self, path: Path):
+        self.workbook.save(path)
+
+
+def write_news_excel(
+    path: Path,
+    news_items: Union[NewsBatch, Iterable[Mapping[str, Any]]],
+    mode: str = "streaming",
+    progress: Optional[ProgressReporter] = None,
+    progress_every: int = 1000
+) -> int:
+    """
+    將新聞寫成 Excel
+
+    Args:
+        path: 輸出路徑
+        news_items: NewsBatch，或新聞項目（dict 或任何 Mapping）的列表或迭代器
+        mode: 'streaming'（write-only，逐列寫出）或 'pandas'（DataFrame + ExcelWriter）
+        progress: 可選的合併式進度回報器
+        progress_every: streaming 模式每寫入幾列回報一次進度
+
+    Returns:
+        int: 寫入的新聞數
+    """
+    if mode not in WRITER_MODES:
+        raise ValueError(f"不支援的 Excel 輸出模式: {mode}（可用: {', '.join(WRITER_MODES)}）")
+    if mode == "pandas":
+        return _write_with_pandas(path, news_items, progress)
+
+    writer = StreamingNewsWriter()
+    writer.write_header()
+    if progress:
+        progress.report(None, "generating_report", "📊 正在寫入 Excel...")
+    if isinstance(news_items, NewsBatch):
+        rows = news_items.rows([LABEL_FIELDS[name] for name, _ in writer.columns])
+        write = writer.write_row
+    else:
+        rows = news_items
+        write = writer.write_item
+    for row in rows:
+        write(row)
+        if progress and writer.rows % progress_every == 0:
+            progress.report(None, "generating_report", f"📊 正在寫入 Excel（已寫入 {writer.rows} 則新聞）...")
+    writer.save(path)
+    return writer.rows
+
+
+def _write_with_pandas(path: Path, news_items: Union[NewsBatch, Iterable[Mapping[str, Any]]],
+                       progress: Optional[ProgressReporter] = None) -> int:
+    """原本的寫法：整份資料載入 DataFrame 後寫出，再逐格套用樣式"""
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError("pandas 未安裝，無法使用 EXCEL_WRITER_MODE=pandas（可改用 streaming）") from e
+
+    if isinstance(news_items, NewsBatch):
+        df = news_items.to_pandas()
+    else:
+        df = pd.DataFrame(list(news_items))
+
+    # 調整列順序，加入「摘要」和「重點分析」，移除「關鍵字」和「來源」
+    columns_order = [name for name, _ in NEWS_COLUMNS]
+    existing_columns = [col for col in columns_order if col in df.columns]
+    df = df[existing_columns]
+
+    if progress:
+        progress.report(None, "generating_report", f"📊 正在寫入 Excel（{len(df)} 則新聞）...")
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name=SHEET_NAME)
+        worksheet = writer.sheets[SHEET_NAME]
+
+        for index, (_, width) in enumerate(NEWS_COLUMNS, start=1):
+            worksheet.column_dimensions[get_column_letter(index)].width = width
+
+        header = _header_style()
+        for cell in worksheet[1]:
+            cell.font = header["font"]
+            cell.fill = header["fill"]
+            cell.alignment = header["alignment"]
+
+        body = _body_style(False)
+        link_font = _body_style(True)["font"]
+        for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
+            for idx, cell in enumerate(row):
+                cell.alignment = body["alignment"]
+                if idx == 2:  # 來源網站連結
+                    cell.font = link_font
+    return len(df)
@@ -2,9 +2,14 @@
 輔助工具函數
 """
 from typing import List, Dict, Any
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import re
+import unicodedata
 from datetime import datetime
 
+# 不影響文章內容的追蹤參數
+TRACKING_QUERY_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid"}
+
 
 def validate_email(email: str) -> bool:
     """
@@ -94,6 +99,22 @@ def clean_markdown(markdown_text: str) -> str:
     return '\n'.join(cleaned_lines)
 
 
+def normalize_text(text: str) -> str:
+    """
+    正規化文字，用於快取鍵與主題比對
+    
+    全形轉半形、轉小寫並合併空白
+    
+    Args:
+        text: 原始文字（None 視為空字串）
+        
+    Returns:
+        str: 正規化後的文字
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+
 def extract_urls(text: str) -> List[str]:
     """
     從文字中提取 URL
@@ -108,6 +129,133 @@ def extract_urls(text: str) -> List[str]:
     return re.findall(url_pattern, text)
 
 
+def canonicalize_url(url: str) -> str:
+    """
+    將 URL 正規化，用於去重比對
+    
+    - scheme 與網域轉小寫，移除 www. 前綴與預設埠號
+    - 移除 fragment、utm_* 等追蹤參數，其餘參數排序
+    - 移除路徑結尾的斜線
+    
+    Args:
+        url: 原始 URL
+        
+    Returns:
+        str: 正規化後的 URL（無法解析時回傳去除空白的原始字串）
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port if parts.port and parts.port not in (80, 443) else None
+    netloc = f"{host}:{port}" if port else host
+    
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_QUERY_PARAMS
+    ]
+    path = parts.path.rstrip("/") or ""
+    
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ""))
+
+
+CHINESE_NUMERALS = {"零": 0, "一": 1, "兩": 2, "二": 2, "三": 3, "四": 4, "五": 5,
+                    "六": 6, "七": 7, "八": 8, "九": 9, "十": 10, "半": 0.5}
+
+TIME_UNIT_DAYS = {
+    "小時": 1 / 24, "hour": 1 / 24, "hours": 1 / 24,
+    "天": 1, "日": 1, "day": 1, "days": 1,
+    "週": 7, "周": 7, "星期": 7, "禮拜": 7, "week": 7, "weeks": 7,
+    "個月": 30, "月": 30, "month": 30, "months": 30,
+    "年": 365, "year": 365, "years": 365,
+}
+
+_TIME_WINDOW_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?|[零一兩二三四五六七八九十半]+)?\s*"
+    r"(小時|天|日|週|周|星期|禮拜|個月|月|年|(?<![a-z])(?:hours?|days?|weeks?|months?|years?)\b)",
+    re.IGNORECASE
+)
+
+
+def _parse_number(token: str) -> float:
+    """解析阿拉伯數字或簡單中文數字（一～九十九）"""
+    if not token:
+        return 1
+    if token[0].isdigit():
+        return float(token)
+    if token == "半":
+        return 0.5
+    if "十" in token:
+        tens, _, ones = token.partition("十")
+        return CHINESE_NUMERALS.get(tens, 1) * 10 + CHINESE_NUMERALS.get(ones, 0)
+    return CHINESE_NUMERALS.get(token, 1)
+
+
+def parse_time_window_days(time_instruction: str) -> float:
+    """
+    從時間範圍指令中解析出天數
+    
+    支援「最近 7 天內」、「一個月內」、「兩週」、「24小時」、「last 2 weeks」等寫法。
+    
+    Args:
+        time_instruction: 時間範圍指令
+        
+    Returns:
+        float: 天數，無法解析時回傳 None
+    """
+    if not time_instruction:
+        return None
+    text = unicodedata.normalize("NFKC", time_instruction).lower()
+    if "今天" in text or "今日" in text or "today" in text:
+        return 1
+    if "昨天" in text or "yesterday" in text:
+        return 2
+    match = _TIME_WINDOW_PATTERN.search(text)
+    if not match:
+        return None
+    return _parse_number(match.group(1)) * TIME_UNIT_DAYS[match.group(2).lower()]
+
+
+_ARTICLE_COUNT_PATTERN = re.compile(
+    r"(\d+|[零一兩二三四五六七八九十]+)\s*(?:(?:-|~|～|到|至|to)\s*(\d+|[零一兩二三四五六七八九十]+))?"
+    r"(\s*(?:篇|則|条|條|個|个|articles?|news|stories|items|results))?",
+    re.IGNORECASE
+)
+
+
+def parse_article_count(num_instruction: str) -> int:
+    """
+    從新聞數量指令中解析出最多需要的新聞數（範圍取上限）
+    
+    支援「5-10篇」、「約15篇」、「十則」、「top 10」、「10 to 20 articles」等寫法。
+    
+    Args:
+        num_instruction: 新聞數量指令
+        
+    Returns:
+        int: 新聞數，無法解析時回傳 None
+    """
+    if not num_instruction:
+        return None
+    for match in _ARTICLE_COUNT_PATTERN.finditer(unicodedata.normalize("NFKC", num_instruction)):
+        # 中文數字須帶單位（「十則」），避免「一些」被當成 1 則
+        if not match.group(1)[0].isdigit() and not match.group(3):
+            continue
+        count = int(_parse_number(match.group(2) or match.group(1)))
+        return count if count > 0 else None
+    return None
+
+
 if __name__ == "__main__":
     # 測試工具函數
     print("測試郵箱驗證:")
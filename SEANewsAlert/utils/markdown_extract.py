@@ -0,0 +1,189 @@
+"""
+分析報告 Markdown 的結構化擷取
+以逐行的狀態機掃描一次報告：「### N. 標題」開始一則新聞，任何其他標題結束目前的新聞，
+「- **欄位**：值」切換目前的欄位，其餘行依目前欄位的續行規則接到摘要或重點分析之後。
+每一行只檢查固定的前綴，所用的正則都不含巢狀重複，耗時與報告長度成線性關係，
+不會因為過長或格式錯誤的模型輸出而大量回溯。
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import re
+
+from utils.news_model import NewsItem
+
+# 新聞標題行：### 1. 標題（也接受更深的標題層級與 1) / 1、）
+_ITEM_HEADING = re.compile(r"#{3,}\s*\d{1,4}[.)、]\s*(\S.*)")
+_URL_PATTERN = re.compile(r"https?://[^\s)]+")
+_DATE_PATTERN = re.compile(r"\d{4}[-/.]\d{1,2}[-/.]\d{1,2}")
+_DATE_PATTERN_CN = re.compile(r"\d{4}年\d{1,2}月\d{1,2}日")
+
+# 欄位名稱 -> NewsItem 欄位（「發布日期」為常見的變化寫法）
+FIELD_MARKERS: Dict[str, str] = {
+    "來源": "source",
+    "日期": "date",
+    "發布日期": "date",
+    "摘要": "summary",
+    "重點分析": "analysis",
+}
+# 可跨多行的欄位
+_MULTILINE_FIELDS = ("summary", "analysis")
+
+
+def _field_marker(line: str) -> Optional[Tuple[str, str]]:
+    """
+    解析欄位行（「- **摘要**：...」、「**摘要：** ...」、全形或半形冒號）
+
+    Returns:
+        Optional[Tuple[str, str]]: (欄位, 冒號之後的值)，不是已知欄位時為 None
+    """
+    body = line
+    if body[:1] in "-*+" and body[1:2].isspace():
+        body = body[2:].lstrip()
+    if not body.startswith("**"):
+        return None
+    end = body.find("**", 2)
+    if end < 0:
+        return None
+    name, rest = body[2:end].strip(), body[end + 2:].lstrip()
+    if name[-1:] in "：:":
+        name = name[:-1].rstrip()
+    elif rest[:1] in "：:":
+        rest = rest[1:]
+    else:
+        return None
+    field = FIELD_MARKERS.get(name)
+    return (field, rest.strip()) if field else None
+
+
+def _is_bold_bullet(line: str) -> bool:
+    """是否為以粗體開頭的項目符號行（「- **」、「* **」），摘要與重點分析在此結束"""
+    if line[:1] not in "-*":
+        return False
+    return line[1:].lstrip().startswith("**")
+
+
+def _split_source(value: str) -> Tuple[str, str]:
+    """由「[名稱](網址)」、「名稱(網址)」或「名稱 網址」取出 (名稱, 網址)"""
+    match = _URL_PATTERN.search(value)
+    if not match:
+        return value.strip("[]() "), ""
+    name = value[:match.start()].rstrip()
+    if name.endswith("("):
+        name = name[:-1]
+    if name.endswith("]"):
+        name = name[:-1]
+    if name.startswith("["):
+        name = name[1:]
+    return name.strip(), match.group(0)
+
+
+def iter_news_sections(markdown_report: str) -> Iterator[Tuple[str, List[str]]]:
+    """
+    逐行切出每則新聞的 (標題, 內容行)
+
+    Args:
+        markdown_report: Markdown 報告（LF 或 CRLF 換行）
+
+    Yields:
+        Tuple[str, List[str]]: 標題與該則新聞到下一個標題之前的所有行
+    """
+    title = None
+    lines: List[str] = []
+    for raw_line in markdown_report.splitlines():
+        stripped = raw_line.strip()
+        if stripped[:1] == "#":
+            if title is not None:
+                yield title, lines
+            heading = _ITEM_HEADING.match(stripped)
+            title, lines = (heading.group(1).strip(), []) if heading else (None, [])
+        elif title is not None:
+            lines.append(raw_line)
+    if title is not None:
+        yield title, lines
+
+
+def parse_news_section(lines: List[str]) -> Dict[str, str]:
+    """
+    以狀態機解析一則新聞的內容行
+
+    摘要在下一個粗體項目符號行結束；重點分析也在粗體項目符號行結束，
+    但內容含「分析」的粗體子項目（例如「- **市場分析**：」）仍屬於重點分析。
+    沒有「來源」網址時使用內容中第一個網址，沒有「日期」時使用內容中第一個日期。
+
+    Args:
+        lines: iter_news_sections 產生的內容行
+
+    Returns:
+        Dict[str, str]: source / url / date / summary / analysis
+    """
+    values = {"source": "", "url": "", "date": "", "summary": "", "analysis": ""}
+    collected: Dict[str, List[str]] = {field: [] for field in _MULTILINE_FIELDS}
+    current = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        marker = _field_marker(line) if "**" in line else None
+        if marker:
+            field, value = marker
+            if field in _MULTILINE_FIELDS:
+                # 重複的欄位只採用第一次出現的內容
+                current = None if collected[field] else field
+                if current:
+                    collected[field].append(value)
+                continue
+            current = None
+            if field == "source" and not values["url"]:
+                values["source"], values["url"] = _split_source(value)
+            elif field == "date" and not values["date"]:
+                values["date"] = value.split("*", 1)[0].strip()
+            continue
+
+        if current is None:
+            continue
+        if "**" in line and _is_bold_bullet(line) and not (current == "analysis" and "分析" in line):
+            current = None
+            continue
+        collected[current].append(raw_line.rstrip())
+
+    for field in _MULTILINE_FIELDS:
+        values[field] = "\n".join(collected[field]).strip()
+
+    if not values["url"] or not values["date"]:
+        text = "\n".join(lines)
+        if not values["url"]:
+            match = _URL_PATTERN.search(text)
+            values["url"] = match.group(0) if match else ""
+        if not values["date"]:
+            match = _DATE_PATTERN.search(text) or _DATE_PATTERN_CN.search(text)
+            values["date"] = match.group(0) if match else ""
+    return values
+
+
+def extract_news(
+    markdown_report: str,
+    keyword: str = "",
+    classify_country: Optional[Callable[[str, str, str], str]] = None
+) -> Iterator[NewsItem]:
+    """
+    從分析報告 Markdown 中擷取新聞
+
+    Args:
+        markdown_report: Markdown 報告
+        keyword: 寫入每則新聞的關鍵字（搜尋查詢）
+        classify_country: 由 (標題, 來源, 內容) 判斷來源國家的函數
+
+    Yields:
+        NewsItem: 依報告順序的新聞
+    """
+    for title, lines in iter_news_sections(markdown_report):
+        values = parse_news_section(lines)
+        country = classify_country(title, values["source"], "\n".join(lines)) if classify_country else ""
+        yield NewsItem(
+            title=title,
+            country=country,
+            keyword=keyword,
+            url=values["url"],
+            published_at=values["date"],
+            summary=values["summary"],
+            analysis=values["analysis"],
+            source=values["source"]
+        )
@@ -0,0 +1,252 @@
+"""
+Markdown 轉 ReportLab Flowable 編譯器
+逐行掃描一次：區塊（標題、項目符號、編號列表、分隔線、段落）以行首判斷，
+行內格式（粗體、斜體、連結）以單一預先編譯的正則切成帶格式的文字片段。
+片段直接組成 Paragraph 的 frags（不再經過 ReportLab 的 XML 解析），因此文字中的 <、& 不需要跳脫也不會破壞排版。
+"""
+from typing import Dict, List, Optional, Tuple
+import re
+
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer
+from reportlab.platypus.paraparser import ParaParser
+
+from utils.progress_reporter import ProgressReporter
+
+# 片段格式旗標
+BOLD = 1
+ITALIC = 2
+LINK = 4
+
+# 連結與強調標記（連結優先，「***」優先於「**」與「*」）
+_INLINE_PATTERN = re.compile(r"\[([^\]\n]*)\]\(([^)\s]*)\)|\*\*\*|\*\*|__|\*|_")
+_SPECIAL_PATTERN = re.compile(r"[*_\[]")
+_NUMBERED_PATTERN = re.compile(r"(\d{1,3})[.)]\s+(.*)")
+
+_FLAGS = {"**": BOLD, "__": BOLD, "*": ITALIC, "_": ITALIC}
+# 建立片段樣板時交給 ReportLab 解析的標記（每種樣式與格式組合只解析一次）
+_SAMPLE_MARKUP = {
+    BOLD: ("<b>", "</b>"),
+    ITALIC: ("<i>", "</i>"),
+    LINK: ('<font color="blue">', "</font>"),
+}
+
+Segment = Tuple[str, int]
+
+
+def escape_xml(text: str) -> str:
+    """跳脫 ReportLab 段落標記中的 XML 特殊字元"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _wrap(text: str, flags: int) -> str:
+    for flag in (LINK, ITALIC, BOLD):
+        if flags & flag:
+            start, end = _SAMPLE_MARKUP[flag]
+            text = f"{start}{text}{end}"
+    return text
+
+
+def tokenize_inline(text: str) -> List[Segment]:
+    """
+    將一行 Markdown 切成 (原始文字, 格式旗標) 片段
+
+    強調標記須緊鄰文字才會生效（「2 * 3」不是斜體），底線在單字內部不視為標記（snake_case、網址），
+    未配對的標記保留原樣。連結輸出為「文字 網址」，網址以 LINK 旗標標示。
+
+    Args:
+        text: 一行 Markdown 文字
+
+    Returns:
+        List[Tuple[str, int]]: 相鄰且格式相同的片段已合併
+    """
+    if not _SPECIAL_PATTERN.search(text):
+        return [(text, 0)] if text else []
+
+    # 第一階段：配對標記。items 為原始文字（str）、已配對的標記（旗標, +1/-1）或連結
+    items: list = []
+    # 尚未關閉的強調標記：(標記, 在 items 中的位置)
+    openers: List[Tuple[str, int]] = []
+    position = 0
+    length = len(text)
+
+    for match in _INLINE_PATTERN.finditer(text):
+        start, end = match.span()
+        if start > position:
+            items.append(text[position:start])
+        position = end
+        token = match.group(0)
+
+        if token[0] == "[":
+            items.append(("link", tokenize_inline(match.group(1)), match.group(2)))
+            continue
+
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < length else " "
+        if token[0] == "_" and before.isalnum() and after.isalnum():
+            items.append(token)
+            continue
+
+        can_close = not before.isspace()
+        # 「***」同時是粗體與斜體，關閉時依開啟順序的相反方向關閉
+        if token == "***":
+            markers = ["*", "**"] if openers and openers[-1][0] == "*" else ["**", "*"]
+        else:
+            markers = [token]
+        for marker in markers:
+            index = next((i for i in range(len(openers) - 1, -1, -1) if openers[i][0] == marker), None)
+            if can_close and index is not None:
+                # 關閉標記：中間未配對的標記保留原樣
+                del openers[index + 1:]
+                _, opener_position = openers.pop()
+                items[opener_position] = (_FLAGS[marker], 1)
+                items.append((_FLAGS[marker], -1))
+            elif not after.isspace():
+                openers.append((marker, len(items)))
+                items.append(marker)
+            else:
+                items.append(marker)
+
+    if position < length:
+        items.append(text[position:])
+
+    # 第二階段：依巢狀深度計算每段文字的格式
+    segments: List[Segment] = []
+    depth = {BOLD: 0, ITALIC: 0}
+
+    def emit(chunk: str, flags: int):
+        if not chunk:
+            return
+        if segments and segments[-1][1] == flags:
+            segments[-1] = (segments[-1][0] + chunk, flags)
+        else:
+            segments.append((chunk, flags))
+
+    for item in items:
+        flags = (BOLD if depth[BOLD] else 0) | (ITALIC if depth[ITALIC] else 0)
+        if isinstance(item, str):
+            emit(item, flags)
+        elif item[0] == "link":
+            _, label, url = item
+            for chunk, label_flags in label:
+                emit(chunk, flags | label_flags)
+            emit(" ", flags)
+            emit(url, flags | LINK)
+        else:
+            depth[item[0]] += item[1]
+    return segments
+
+
+def render_inline(text: str) -> str:
+    """
+    將一行 Markdown 的行內格式轉為 ReportLab 段落標記（其餘文字一律跳脫）
+
+    Args:
+        text: 一行 Markdown 文字
+
+    Returns:
+        str: 可直接傳給 Paragraph 的標記文字
+    """
+    return "".join(_wrap(escape_xml(chunk), flags) for chunk, flags in tokenize_inline(text))
+
+
+class MarkdownFlowableCompiler:
+    """將報告 Markdown 轉為 ReportLab Story（Flowable 列表）"""
+
+    def __init__(self, styles):
+        """
+        Args:
+            styles: 含 CustomTitle / CustomHeading2 / CustomHeading3 / CustomBody / CustomListItem 的樣式表
+        """
+        self.title_style = styles['CustomTitle']
+        self.heading2_style = styles['CustomHeading2']
+        self.heading3_style = styles['CustomHeading3']
+        self.body_style = styles['CustomBody']
+        self.list_style = styles['CustomListItem']
+        # (樣式名稱, 格式旗標) -> ReportLab 解析出的片段樣板
+        self._templates: Dict[Tuple[str, int], object] = {}
+
+    def _template(self, style, flags: int):
+        key = (style.name, flags)
+        template = self._templates.get(key)
+        if template is None:
+            _, frags, _ = ParaParser().parse(_wrap("x", flags), style)
+            template = self._templates[key] = frags[0]
+        return template
+
+    def paragraph(self, text: str, style, bulletText: str = None) -> Paragraph:
+        """
+        由一行 Markdown 建立 Paragraph（直接組成 frags，不經過 XML 解析）
+
+        Args:
+            text: 一行 Markdown 文字
+            style: 段落樣式
+            bulletText: 項目符號或編號
+
+        Returns:
+            Paragraph: 段落
+        """
+        segments = tokenize_inline(text) or [("", 0)]
+        frags = [self._template(style, flags).clone(text=chunk) for chunk, flags in segments]
+        return Paragraph(text, style, bulletText=bulletText, frags=frags)
+
+    def compile(self, markdown_content: str, progress: Optional[ProgressReporter] = None) -> list:
+        """
+        編譯 Markdown 為 Flowable 列表
+
+        Args:
+            markdown_content: Markdown 報告
+            progress: 可選的合併式進度回報器（每個三級標題回報一次）
+
+        Returns:
+            list: ReportLab Story
+        """
+        story = []
+        append = story.append
+        paragraph = self.paragraph
+
+        for raw_line in markdown_content.splitlines():
+            line = raw_line.strip()
+
+            if not line:
+                append(Spacer(1, 0.2 * inch))
+                continue
+
+            first = line[0]
+            if first == "#":
+                level = len(line) - len(line.lstrip("#"))
+                if level <= 3 and line[level:level + 1] == " ":
+                    text = line[level + 1:].strip()
+                    if level == 1:
+                        append(paragraph(text, self.title_style))
+                        append(Spacer(1, 0.3 * inch))
+                    elif level == 2:
+                        append(paragraph(text, self.heading2_style))
+                        append(Spacer(1, 0.2 * inch))
+                    else:
+                        if progress:
+                            progress.report(None, "generating_report", f"📄 正在排版：{text[:80]}")
+                        append(paragraph(text, self.heading3_style))
+                        append(Spacer(1, 0.1 * inch))
+                    continue
+
+            if first in "-*" and line[1:2] == " ":
+                append(paragraph(line[2:].strip(), self.list_style, bulletText="•"))
+                continue
+
+            if line.startswith("---") or line.startswith("***"):
+                append(Spacer(1, 0.2 * inch))
+                append(Paragraph("_" * 80, self.body_style))
+                append(Spacer(1, 0.2 * inch))
+                continue
+
+            if first.isdigit():
+                numbered = _NUMBERED_PATTERN.match(line)
+                if numbered:
+                    append(paragraph(numbered.group(2), self.list_style, bulletText=f"{numbered.group(1)}."))
+                    continue
+
+            append(paragraph(line, self.body_style))
+            append(Spacer(1, 0.1 * inch))
+
+        return story
@@ -0,0 +1,475 @@
+"""
+新聞近似重複偵測
+以 MinHash 為每則新聞的標題＋摘要建立簽章，並以分段 LSH（banded LSH）找出候選重複：
+簽章切成 bands 段、每段 rows 個值，任一段完全相同的兩則新聞才比較估計的 Jaccard 相似度。
+同一次搜尋中互相重複的新聞合併成一則（保留最先出現者，其餘列入 duplicates），
+並與近期報告中出現過的新聞指紋比對，依設定標註或移除。
+指紋索引支援記憶體與 SQLite（重啟後保留）兩種後端；SQLite 只以分段桶鍵查詢候選，
+不必掃描所有指紋，可容納數十萬筆。
+"""
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+
+from config import Config
+from utils.helpers import canonicalize_url
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = 0xFFFFFFFF
+_NON_WORD = re.compile(r"[\W_]+")
+# 每則新聞最多取用的字元數（摘要過長時只影響成本，不影響判斷）
+_MAX_TEXT_CHARS = 2000
+
+
+def _fingerprint_text(text: str) -> str:
+    """全形轉半形、轉小寫，標點與連續空白合併為單一空白"""
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(text: str, size: int = 3) -> set:
+    """
+    正規化後的字元 n-gram 集合（中文與越南文等不依賴斷詞）
+
+    Args:
+        text: 原始文字
+        size: 每個 shingle 的字元數
+
+    Returns:
+        set: shingle 的 32 位元雜湊值
+    """
+    text = _fingerprint_text(text)[:_MAX_TEXT_CHARS]
+    if not text:
+        return set()
+    if len(text) <= size:
+        return {zlib.crc32(text.encode("utf-8"))}
+    return {zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+
+
+class MinHasher:
+    """MinHash 簽章產生器（固定種子，簽章可跨行程保存與比較）"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 20251121, shingle_size: int = 3):
+        """
+        Args:
+            num_perm: 簽章長度（雜湊函數數量）
+            seed: 產生雜湊參數的種子，改變後舊簽章無法比較
+            shingle_size: shingle 的字元數
+        """
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, text: str) -> Optional[Tuple[int, ...]]:
+        """計算文字的 MinHash 簽章，沒有可比對的內容時回傳 None"""
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return None
+        prime = _MERSENNE_PRIME
+        return tuple(
+            min([(a * h + b) % prime for h in hashes]) & _MAX_HASH
+            for a, b in self.params
+        )
+
+
+def jaccard(first: Sequence[int], second: Sequence[int]) -> float:
+    """由兩個簽章估計 Jaccard 相似度（相同位置的值相等的比例）"""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(a == b for a, b in zip(first, second)) / len(first)
+
+
+def band_keys(signature: Sequence[int], bands: int) -> List[int]:
+    """
+    將簽章切成 bands 段，每段轉為一個 64 位元的桶鍵（高位為段號，不同段的桶鍵不會相同）
+
+    Returns:
+        List[int]: 每段的桶鍵（可直接作為 SQLite INTEGER）
+    """
+    rows = len(signature) // bands
+    return [
+        (band << 32) | zlib.crc32(array("I", signature[band * rows:(band + 1) * rows]).tobytes())
+        for band in range(bands)
+    ]
+
+
+@dataclass
+class Fingerprint:
+    """索引中的一則新聞指紋"""
+
+    signature: Tuple[int, ...]
+    title: str = ""
+    url: str = ""
+    seen_at: float = 0.0
+    report: str = ""
+    id: Optional[int] = field(default=None, compare=False)
+
+
+class MemoryFingerprintIndex:
+    """記憶體指紋索引（桶鍵 -> 指紋編號）"""
+
+    def __init__(self):
+        self._fingerprints: Dict[int, Tuple[Fingerprint, List[int]]] = {}
+        self._buckets: Dict[int, set] = {}
+        self._by_url: Dict[str, int] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def candidates(self, keys: Iterable[int]) -> List[Fingerprint]:
+        with self._lock:
+            ids = set()
+            for key in keys:
+                ids.update(self._buckets.get(key, ()))
+            return [self._fingerprints[fid][0] for fid in sorted(ids)]
+
+    def add(self, entries: Iterable[Tuple[Fingerprint, List[int]]]) -> int:
+        """加入指紋（相同正規化網址的舊指紋會被取代），回傳加入的筆數"""
+        count = 0
+        with self._lock:
+            for fingerprint, keys in entries:
+                url_key = canonicalize_url(fingerprint.url) if fingerprint.url else ""
+                if url_key and url_key in self._by_url:
+                    self._remove(self._by_url[url_key])
+                fid = self._next_id
+                self._next_id += 1
+                fingerprint.id = fid
+                self._fingerprints[fid] = (fingerprint, keys)
+                for key in keys:
+                    self._buckets.setdefault(key, set()).add(fid)
+                if url_key:
+                    self._by_url[url_key] = fid
+                count += 1
+        return count
+
+    def _remove(self, fid: int):
+        fingerprint, keys = self._fingerprints.pop(fid)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(fid)
+                if not bucket:
+                    del self._buckets[key]
+        url_key = canonicalize_url(fingerprint.url) if fingerprint.url else ""
+        if self._by_url.get(url_key) == fid:
+            del self._by_url[url_key]
+
+    def prune(self, before: float) -> int:
+        """移除 seen_at 早於 before 的指紋，回傳移除的筆數"""
+        with self._lock:
+            expired = [fid for fid, (fp, _) in self._fingerprints.items() if fp.seen_at < before]
+            for fid in expired:
+                self._remove(fid)
+            return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._fingerprints.clear()
+            self._buckets.clear()
+            self._by_url.clear()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+
+class SQLiteFingerprintIndex:
+    """SQLite 指紋索引（WAL；桶鍵表為 WITHOUT ROWID 的 (bucket, fid) 主鍵，查詢只讀取命中的桶）"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                id INTEGER PRIMARY KEY,
+                url_key TEXT UNIQUE,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                seen_at REAL NOT NULL,
+                report TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                bucket INTEGER NOT NULL,
+                fid INTEGER NOT NULL,
+                PRIMARY KEY (bucket, fid)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fingerprints_seen_at ON fingerprints(seen_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _row(row) -> Fingerprint:
+        fid, url, title, signature, seen_at, report = row
+        return Fingerprint(tuple(array("I", signature)), title, url, seen_at, report, fid)
+
+    def candidates(self, keys: Iterable[int]) -> List[Fingerprint]:
+        keys = list(keys)
+        if not keys:
+            return []
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT id, url, title, signature, seen_at, report FROM fingerprints
+                WHERE id IN (SELECT fid FROM lsh_buckets WHERE bucket IN ({placeholders}))
+                ORDER BY id
+                """,
+                keys
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def add(self, entries: Iterable[Tuple[Fingerprint, List[int]]]) -> int:
+        """加入指紋（相同正規化網址的舊指紋會被取代），回傳加入的筆數"""
+        count = 0
+        with self._lock:
+            for fingerprint, keys in entries:
+                url_key = canonicalize_url(fingerprint.url) if fingerprint.url else None
+                if url_key:
+                    row = self._conn.execute("SELECT id FROM fingerprints WHERE url_key = ?", (url_key,)).fetchone()
+                    if row:
+                        self._delete_ids([row[0]])
+                cursor = self._conn.execute(
+                    "INSERT INTO fingerprints (url_key, url, title, signature, seen_at, report) VALUES (?, ?, ?, ?, ?, ?)",
+                    (url_key, fingerprint.url, fingerprint.title,
+                     array("I", fingerprint.signature).tobytes(), fingerprint.seen_at, fingerprint.report)
+                )
+                fingerprint.id = cursor.lastrowid
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO lsh_buckets (bucket, fid) VALUES (?, ?)",
+                    [(key, fingerprint.id) for key in keys]
+                )
+                count += 1
+            self._conn.commit()
+        return count
+
+    def _delete_ids(self, ids: List[int]):
+        if not ids:
+            return
+        placeholders = ",".join("?" * len(ids))
+        self._conn.execute(f"DELETE FROM lsh_buckets WHERE fid IN ({placeholders})", ids)
+        self._conn.execute(f"DELETE FROM fingerprints WHERE id IN ({placeholders})", ids)
+
+    def prune(self, before: float) -> int:
+        """移除 seen_at 早於 before 的指紋，回傳移除的筆數"""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT id FROM fingerprints WHERE seen_at < ?", (before,))]
+            for start in range(0, len(ids), 500):
+                self._delete_ids(ids[start:start + 500])
+            self._conn.commit()
+            return len(ids)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM lsh_buckets")
+            self._conn.execute("DELETE FROM fingerprints")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NewsDeduplicator:
+    """新聞去重 - 位於 ResearchAgent.search 與 AnalystAgent.analyze 之間"""
+
+    HISTORY_POLICIES = ("flag", "suppress", "off")
+
+    def __init__(self, index=None, threshold: float = 0.5, history: str = "flag",
+                 retention_days: float = 30, num_perm: int = 64, bands: int = 16):
+        """
+        Args:
+            index: MemoryFingerprintIndex 或 SQLiteFingerprintIndex（None 時只做同批去重）
+            threshold: 視為重複的估計 Jaccard 相似度下限
+            history: 與近期報告重複時的處理：'flag'（標註 previously_reported）、'suppress'（移除）或 'off'
+            retention_days: 指紋保留天數
+            num_perm: MinHash 簽章長度（必須能被 bands 整除）
+            bands: LSH 分段數；每段 num_perm / bands 個值，候選門檻約為 (1 / bands) ** (bands / num_perm)
+        """
+        if history not in self.HISTORY_POLICIES:
+            raise ValueError(f"不支援的歷史去重策略: {history}（可用: {', '.join(self.HISTORY_POLICIES)}）")
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) 必須能被 bands ({bands}) 整除")
+        self.index = index
+        self.threshold = threshold
+        self.history = history
+        self.retention_days = retention_days
+        self.bands = bands
+        self.hasher = MinHasher(num_perm)
+
+    @staticmethod
+    def item_text(item: Dict[str, Any]) -> str:
+        """用於比對的文字：標題＋摘要"""
+        return f"{item.get('title') or ''}\n{item.get('summary') or ''}"
+
+    def fingerprint(self, item: Dict[str, Any]) -> Optional[Tuple[Tuple[int, ...], List[int]]]:
+        """計算一則新聞的 (簽章, 桶鍵)，沒有標題與摘要時回傳 None"""
+        signature = self.hasher.signature(self.item_text(item))
+        if signature is None:
+            return None
+        return signature, band_keys(signature, self.bands)
+
+    def _best_match(self, signature, candidates: Iterable) -> Tuple[Optional[Any], float]:
+        best, best_score = None, 0.0
+        for candidate, candidate_signature in candidates:
+            score = jaccard(signature, candidate_signature)
+            if score >= self.threshold and score > best_score:
+                best, best_score = candidate, score
+        return best, best_score
+
+    def deduplicate(self, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        合併同批重複的新聞，並依 history 策略處理近期報告中出現過的新聞
+
+        Args:
+            items: 搜尋結果中逐則的新聞（不會被修改）
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, Any]]: (保留的新聞, 統計)
+                保留的新聞若合併了其他來源，duplicates 列出被合併者的 title / source / url / similarity；
+                flag 策略下與近期報告重複的新聞帶有 previously_reported；
+                文章庫重用的新聞（from_store）本來就來自先前的搜尋，不與近期報告比對
+        """
+        start = time.perf_counter()
+        kept: List[Dict[str, Any]] = []
+        kept_signatures: List[Tuple[int, ...]] = []
+        buckets: Dict[int, List[int]] = {}
+        collapsed = 0
+
+        for item in items:
+            fingerprint = self.fingerprint(item)
+            if fingerprint is None:
+                kept.append(dict(item))
+                kept_signatures.append(())
+                continue
+            signature, keys = fingerprint
+            candidate_ids = sorted({i for key in keys for i in buckets.get(key, ())})
+            match, score = self._best_match(signature, ((i, kept_signatures[i]) for i in candidate_ids))
+            if match is not None:
+                kept[match].setdefault("duplicates", []).append({
+                    "title": item.get("title", ""),
+                    "source": item.get("source", ""),
+                    "url": item.get("url", ""),
+                    "similarity": round(score, 3),
+                })
+                collapsed += 1
+                continue
+            for key in keys:
+                buckets.setdefault(key, []).append(len(kept))
+            kept.append(dict(item))
+            kept_signatures.append(signature)
+
+        flagged = suppressed = 0
+        if self.index is not None and self.history != "off":
+            results = []
+            for item, signature in zip(kept, kept_signatures):
+                previous = None
+                if signature and not item.get("from_store"):
+                    candidates = self.index.candidates(band_keys(signature, self.bands))
+                    previous, score = self._best_match(signature, ((fp, fp.signature) for fp in candidates))
+                if previous is None:
+                    results.append(item)
+                elif self.history == "suppress":
+                    suppressed += 1
+                else:
+                    item["previously_reported"] = {
+                        "title": previous.title,
+                        "url": previous.url,
+                        "report": previous.report,
+                        "seen_at": time.strftime("%Y-%m-%d", time.localtime(previous.seen_at)),
+                        "similarity": round(score, 3),
+                    }
+                    results.append(item)
+                    flagged += 1
+            kept = results
+
+        stats = {
+            "input": len(items),
+            "kept": len(kept),
+            "collapsed": collapsed,
+            "flagged": flagged,
+            "suppressed": suppressed,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+        return kept, stats
+
+    def remember(self, items: Iterable[Dict[str, Any]], report: str = "", seen_at: float = None) -> int:
+        """
+        將已寫入報告的新聞加入指紋索引，並移除超過保留天數的舊指紋
+
+        Args:
+            items: 報告中的新聞
+            report: 報告識別（例如任務 ID）
+            seen_at: 時間戳記（預設為現在）
+
+        Returns:
+            int: 加入的指紋數
+        """
+        if self.index is None:
+            return 0
+        seen_at = time.time() if seen_at is None else seen_at
+        entries = []
+        for item in items:
+            fingerprint = self.fingerprint(item)
+            if fingerprint is None:
+                continue
+            signature, keys = fingerprint
+            entries.append((
+                Fingerprint(signature, str(item.get("title") or ""), str(item.get("url") or ""), seen_at, report),
+                keys
+            ))
+        added = self.index.add(entries)
+        if self.retention_days:
+            self.index.prune(seen_at - self.retention_days * 86400)
+        return added
+
+
+def create_news_deduplicator(backend: str = None) -> Optional[NewsDeduplicator]:
+    """
+    依設定建立新聞去重器
+
+    Args:
+        backend: 'sqlite'、'memory' 或 'off'（預設使用 Config.NEWS_DEDUP_BACKEND）
+
+    Returns:
+        Optional[NewsDeduplicator]: 停用時回傳 None
+    """
+    backend = (backend or Config.NEWS_DEDUP_BACKEND).lower()
+    if backend == "off":
+        return None
+    if backend == "memory":
+        index = MemoryFingerprintIndex()
+    elif backend == "sqlite":
+        index = SQLiteFingerprintIndex(Config.NEWS_DEDUP_PATH)
+    else:
+        raise ValueError(f"不支援的指紋索引後端: {backend}")
+    return NewsDeduplicator(
+        index,
+        threshold=Config.NEWS_DEDUP_THRESHOLD,
+        history=Config.NEWS_DEDUP_HISTORY,
+        retention_days=Config.NEWS_DEDUP_RETENTION_DAYS,
+    )
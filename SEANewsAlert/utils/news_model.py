@@ -0,0 +1,159 @@
+"""
+結構化新聞模型
+NewsItem 是單則新聞（slots dataclass，沒有每筆 dict 的開銷），
+NewsBatch 以欄位為單位存放整批新聞（每個欄位一個列表），供分析、報告與匯出階段共用；
+匯出 Excel 時直接逐列讀取欄位，不必對每則新聞做中文鍵查詢。
+pandas / pyarrow 為選用套件，只在轉換為 DataFrame / Arrow Table 時才匯入。
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# 欄位 -> 對外（Excel、舊版 dict）使用的中文欄名
+FIELD_LABELS: Dict[str, str] = {
+    "title": "新聞標題（中文）",
+    "country": "來源國家",
+    "keyword": "關鍵字",
+    "url": "來源網站連結",
+    "published_at": "發布日期",
+    "summary": "摘要",
+    "analysis": "重點分析",
+    "source": "來源",
+}
+LABEL_FIELDS: Dict[str, str] = {label: field for field, label in FIELD_LABELS.items()}
+
+
+@dataclass(slots=True)
+class NewsItem:
+    """單則結構化新聞"""
+
+    title: str = ""
+    country: str = ""
+    keyword: str = ""
+    url: str = ""
+    published_at: str = ""
+    summary: str = ""
+    analysis: str = ""
+    source: str = ""
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, Any]) -> "NewsItem":
+        """由中文欄名（舊版 dict）或英文欄位名的 dict 建立"""
+        values = {}
+        for key, value in data.items():
+            field = LABEL_FIELDS.get(key, key)
+            if field in FIELD_LABELS and value is not None:
+                values[field] = str(value)
+        return cls(**values)
+
+    def to_dict(self, labels: bool = True) -> Dict[str, str]:
+        """轉為 dict（labels=True 時使用中文欄名）"""
+        return {
+            (FIELD_LABELS[field] if labels else field): getattr(self, field)
+            for field in FIELD_LABELS
+        }
+
+    # 相容舊版以中文欄名讀取的程式碼
+    def __getitem__(self, label: str) -> str:
+        try:
+            return getattr(self, LABEL_FIELDS.get(label, label))
+        except AttributeError:
+            raise KeyError(label) from None
+
+    def get(self, label: str, default: Any = None) -> Any:
+        field = LABEL_FIELDS.get(label, label)
+        return getattr(self, field) if field in FIELD_LABELS else default
+
+
+FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(NewsItem))
+
+
+class NewsBatch:
+    """以欄位為單位存放的一批新聞"""
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Optional[Dict[str, List[str]]] = None):
+        """
+        Args:
+            columns: 欄位名稱 -> 值列表（各欄長度須一致），未提供時建立空批次
+        """
+        self.columns: Dict[str, List[str]] = {field: [] for field in FIELDS}
+        if columns:
+            lengths = {len(values) for values in columns.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"各欄位長度不一致: {sorted(lengths)}")
+            size = lengths.pop() if lengths else 0
+            for field in FIELDS:
+                self.columns[field] = list(columns.get(field) or [""] * size)
+
+    @classmethod
+    def from_items(cls, items: Iterable[Any]) -> "NewsBatch":
+        """由 NewsItem 或 dict（中文或英文欄名）建立"""
+        batch = cls()
+        for item in items:
+            batch.append(item)
+        return batch
+
+    def append(self, item: Any):
+        """加入一則新聞（NewsItem 或 dict）"""
+        if not isinstance(item, NewsItem):
+            item = NewsItem.from_mapping(item)
+        for field, values in self.columns.items():
+            values.append(getattr(item, field))
+
+    def __len__(self) -> int:
+        return len(self.columns["title"])
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index: int) -> NewsItem:
+        return NewsItem(*(self.columns[field][index] for field in FIELDS))
+
+    def __iter__(self) -> Iterator[NewsItem]:
+        for values in zip(*(self.columns[field] for field in FIELDS)):
+            yield NewsItem(*values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NewsBatch) and self.columns == other.columns
+
+    def rows(self, field_names: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+        """依指定欄位逐列輸出值（不建立 NewsItem）"""
+        return zip(*(self.columns[field] for field in field_names))
+
+    def to_dicts(self, labels: bool = True) -> List[Dict[str, str]]:
+        """轉為 dict 列表（labels=True 時使用中文欄名）"""
+        return [item.to_dict(labels) for item in self]
+
+    def _export_columns(self, labels: bool) -> Dict[str, List[str]]:
+        if not labels:
+            return self.columns
+        return {FIELD_LABELS[field]: values for field, values in self.columns.items()}
+
+    def to_pandas(self, labels: bool = True):
+        """
+        轉為 pandas DataFrame（需安裝 pandas）
+
+        欄位列表直接交給 DataFrame，不經過逐列 dict。
+
+        Args:
+            labels: 是否使用中文欄名
+        """
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("NewsBatch.to_pandas 需要安裝 pandas") from e
+        return pd.DataFrame(self._export_columns(labels))
+
+    def to_arrow(self, labels: bool = True):
+        """
+        轉為 pyarrow Table（需安裝 pyarrow）
+
+        Args:
+            labels: 是否使用中文欄名
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("NewsBatch.to_arrow 需要安裝 pyarrow") from e
+        return pa.table(self._export_columns(labels))
@@ -0,0 +1,244 @@
+"""
+OpenAI 客戶端工廠
+整個行程共用一組 OpenAI 客戶端與 keep-alive 連線池（連線數上限由 Config 設定），
+讓 Research Agent、Analyst Agent 與需求解析共用 TLS 連線，不必每個請求重新握手。
+依 Config.OPENAI_REPLAY_MODE 也可切換為錄製或重播用的客戶端。
+"""
+from typing import Any, AsyncIterator, Dict, Tuple
+import asyncio
+import threading
+
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+
+from config import Config
+from utils.openai_replay import FixtureStore, RecordingOpenAI, ReplayOpenAI
+
+
+class PoolStats:
+    """
+    連線池命中統計
+
+    透過 httpcore 的 trace 擴充觀察每個請求是否建立了新的 TCP 連線：
+    建立新連線記為 miss，沿用 keep-alive 連線記為 hit。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _count_connection(self, event_name: str):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    def on_request(self, request: httpx.Request):
+        """同步 httpx 請求事件：掛上 trace 回呼"""
+        self._count_request()
+        request.extensions["trace"] = self._trace
+
+    async def aon_request(self, request: httpx.Request):
+        """非同步 httpx 請求事件：掛上 trace 回呼"""
+        self._count_request()
+        request.extensions["trace"] = self._atrace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        self._count_connection(event_name)
+
+    async def _atrace(self, event_name: str, info: Dict[str, Any]):
+        self._count_connection(event_name)
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """回傳連線池統計"""
+        with self._lock:
+            requests, misses = self.requests, self.new_connections
+        hits = max(0, requests - misses)
+        return {
+            "requests": requests,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / requests, 4) if requests else 0.0,
+            "max_connections": Config.OPENAI_MAX_CONNECTIONS,
+            "max_keepalive_connections": Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            "keepalive_expiry": Config.OPENAI_KEEPALIVE_EXPIRY,
+        }
+
+
+# 全域連線池統計實例
+pool_stats = PoolStats()
+
+_lock = threading.Lock()
+_sync_client = None
+# httpx.AsyncClient 的連線綁定在建立它的事件迴圈上，因此每個事件迴圈各有一個；
+# 事件迴圈 -> (客戶端, 在該迴圈結束時關閉客戶端的 async generator)
+_async_clients: Dict[asyncio.AbstractEventLoop, Tuple[Any, AsyncIterator[None]]] = {}
+_replay_clients: Dict[bool, ReplayOpenAI] = {}
+_fixture_store = None
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Config.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=Config.OPENAI_KEEPALIVE_EXPIRY,
+    )
+
+
+def create_http_client() -> httpx.Client:
+    """建立套用連線池設定與命中統計的同步 httpx 客戶端"""
+    return DefaultHttpxClient(limits=_pool_limits(), event_hooks={"request": [pool_stats.on_request]})
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """建立套用連線池設定與命中統計的非同步 httpx 客戶端"""
+    return DefaultAsyncHttpxClient(limits=_pool_limits(), event_hooks={"request": [pool_stats.aon_request]})
+
+
+def _recording(client):
+    """錄製模式：同步與非同步客戶端寫入同一個 fixture 目錄（共用檔案序號）"""
+    global _fixture_store
+    if _fixture_store is None:
+        _fixture_store = FixtureStore(Config.OPENAI_FIXTURES_DIR)
+    return RecordingOpenAI(client, _fixture_store)
+
+
+def _replay_latency():
+    latency = Config.OPENAI_REPLAY_LATENCY
+    return latency if latency == "recorded" else float(latency or 0)
+
+
+def _replay_client(is_async: bool) -> ReplayOpenAI:
+    """重播客戶端共用同一份 fixture 索引（只讀取一次目錄）"""
+    with _lock:
+        client = _replay_clients.get(is_async)
+        if client is None:
+            shared = next(iter(_replay_clients.values()), None)
+            client = ReplayOpenAI(
+                Config.OPENAI_FIXTURES_DIR,
+                latency=_replay_latency(),
+                is_async=is_async,
+                index=shared.index if shared else None
+            )
+            _replay_clients[is_async] = client
+        return client
+
+
+def get_openai_client():
+    """取得行程共用的同步 OpenAI 客戶端（依 OPENAI_REPLAY_MODE 決定是否錄製／重播）"""
+    global _sync_client
+    if Config.OPENAI_REPLAY_MODE == "replay":
+        return _replay_client(is_async=False)
+    with _lock:
+        if _sync_client is None:
+            client = OpenAI(api_key=Config.OPENAI_API_KEY, http_client=create_http_client())
+            if Config.OPENAI_REPLAY_MODE == "record":
+                client = _recording(client)
+            _sync_client = client
+        return _sync_client
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, client) -> AsyncIterator[None]:
+    """
+    停在 yield 上直到被關閉：事件迴圈結束時 asyncio.run／uvicorn 會以 shutdown_asyncgens 關閉
+    該迴圈中所有未結束的 async generator，此時在迴圈仍可用時關閉客戶端的連線池
+    """
+    try:
+        yield
+    finally:
+        with _lock:
+            if _async_clients.get(loop, (None,))[0] is client:
+                del _async_clients[loop]
+        await client.close()
+
+
+def get_async_openai_client():
+    """
+    取得目前事件迴圈共用的 AsyncOpenAI 客戶端（依 OPENAI_REPLAY_MODE 決定是否錄製／重播）
+
+    快取的客戶端在其事件迴圈結束時（或 aclose_openai_clients）關閉；
+    在沒有執行中事件迴圈的情況下呼叫時，回傳一個新的客戶端（由呼叫者負責生命週期）。
+    """
+    if Config.OPENAI_REPLAY_MODE == "replay":
+        return _replay_client(is_async=True)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _lock:
+        # 迴圈結束前 closer 沒有機會開始迭代的項目（客戶端未曾使用，沒有連線需要關閉）
+        for closed in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[closed]
+        entry = _async_clients.get(loop) if loop else None
+        if entry is not None:
+            return entry[0]
+        client = AsyncOpenAI(api_key=Config.OPENAI_API_KEY, http_client=create_async_http_client())
+        if Config.OPENAI_REPLAY_MODE == "record":
+            client = _recording(client)
+        if loop is None:
+            return client
+        closer = _close_with_loop(loop, client)
+        _async_clients[loop] = (client, closer)
+    # 第一次迭代時 async generator 登記到目前的事件迴圈
+    asyncio.ensure_future(closer.__anext__())
+    return client
+
+
+def openai_chat_client_kwargs() -> Dict[str, Any]:
+    """
+    傳給 agno OpenAIChat 的客戶端參數
+
+    注入行程共用的同步客戶端（agno 的 Agent.run 走同步路徑），
+    每次建立 OpenAIChat 時都沿用同一個連線池。
+    """
+    return {"client": get_openai_client()}
+
+
+def close_openai_clients():
+    """關閉共用的同步客戶端與連線池（非同步客戶端在各自的事件迴圈結束時關閉）"""
+    global _sync_client
+    with _lock:
+        client, _sync_client = _sync_client, None
+        _replay_clients.clear()
+    if client is not None:
+        client.close()
+
+
+async def aclose_openai_clients():
+    """
+    關閉所有共用的客戶端與連線池（服務關閉時在事件迴圈中呼叫）
+
+    目前事件迴圈的客戶端直接關閉；其他仍在執行的事件迴圈的客戶端交給該迴圈關閉並等待完成。
+    """
+    close_openai_clients()
+    current = asyncio.get_running_loop()
+    with _lock:
+        entries = list(_async_clients.items())
+        _async_clients.clear()
+    for loop, (client, closer) in entries:
+        if loop is current:
+            await _close_in_loop(client, closer)
+        elif loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(_close_in_loop(client, closer), loop)
+            await asyncio.wrap_future(future)
+
+
+async def _close_in_loop(client, closer: AsyncIterator[None]):
+    # closer 尚未開始迭代時 aclose 不會執行 finally，因此另外關閉客戶端（重複關閉無副作用）
+    await closer.aclose()
+    await client.close()
+
+
+def reset_replay_clients():
+    """清除快取的重播客戶端（fixture 目錄更新後使用）"""
+    with _lock:
+        _replay_clients.clear()
@@ -0,0 +1,388 @@
+"""
+OpenAI 錄製／重播工具
+錄製模式：包裝真實的 OpenAI 客戶端，將每個 Responses 串流事件與 chat completion
+寫入 gzip 壓縮的 JSONL fixture。
+重播模式：本地假客戶端讀取 fixture 並以可設定的逐事件延遲重播，
+讓 ResearchAgent.search、AnalystAgent.analyze 與 _parse_prompt 可離線、可重現地測試與壓測。
+
+Fixture 格式（每個檔案一次 API 呼叫）：
+    第 1 行  {"kind": "responses" | "chat.completions", "key": ..., "stream": bool, "request": {...}}
+    之後    {"t": 距離請求開始的秒數, "event": {...}}   （串流事件）
+            {"t": ..., "response": {...}}             （非串流回應）
+"""
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Union
+import asyncio
+import gzip
+import hashlib
+import itertools
+import json
+import re
+import threading
+import time
+
+FIXTURE_SUFFIX = ".jsonl.gz"
+
+# 計算請求鍵時忽略日期與時間，讓每天重新產生的提示詞仍能對應到同一份 fixture
+_VOLATILE_PATTERNS = [
+    re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}:\d{2})?"),
+    re.compile(r"\d{4}年\d{1,2}月\d{1,2}日"),
+]
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """以請求內容（忽略日期時間）計算 fixture 鍵"""
+    payload = json.dumps(
+        {"kind": kind, "model": request.get("model"),
+         "input": request.get("input"), "messages": request.get("messages"),
+         "tools": request.get("tools")},
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    for pattern in _VOLATILE_PATTERNS:
+        payload = pattern.sub("<date>", payload)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _dump(obj: Any) -> Any:
+    """將 OpenAI 回應物件轉為 JSON 相容結構"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", exclude_unset=False)
+    if isinstance(obj, SimpleNamespace):
+        return {key: _dump(value) for key, value in vars(obj).items()}
+    if isinstance(obj, dict):
+        return {key: _dump(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_dump(value) for value in obj]
+    return obj
+
+
+def _to_namespace(data: Any) -> Any:
+    """將 JSON 結構轉回可用屬性存取的物件（與 SDK 事件物件的存取方式相同）"""
+    if isinstance(data, dict):
+        return SimpleNamespace(**{key: _to_namespace(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return [_to_namespace(value) for value in data]
+    return data
+
+
+def _sanitize_request(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """移除無法序列化或不應寫入 fixture 的參數"""
+    return {
+        key: _dump(value) for key, value in kwargs.items()
+        if key not in ("extra_headers", "timeout")
+    }
+
+
+class FixtureWriter:
+    """寫入單一 fixture 檔案"""
+
+    def __init__(self, path: Path, header: Dict[str, Any]):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._start = time.perf_counter()
+        self._write(header)
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def event(self, event: Any):
+        self._write({"t": round(time.perf_counter() - self._start, 6), "event": _dump(event)})
+
+    def response(self, response: Any):
+        self._write({"t": round(time.perf_counter() - self._start, 6), "response": _dump(response)})
+
+    def close(self):
+        self._file.close()
+
+
+class FixtureStore:
+    """fixture 目錄：負責命名、寫入與查詢"""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._counter = itertools.count(len(list(self.directory.glob(f"*{FIXTURE_SUFFIX}"))) + 1)
+
+    def new_writer(self, kind: str, request: Dict[str, Any], stream: bool) -> FixtureWriter:
+        key = request_key(kind, request)
+        with self._lock:
+            sequence = next(self._counter)
+        path = self.directory / f"{kind}-{sequence:04d}-{key}{FIXTURE_SUFFIX}"
+        header = {
+            "kind": kind,
+            "key": key,
+            "stream": stream,
+            "recorded_at": datetime.now().isoformat(),
+            "request": _sanitize_request(request),
+        }
+        return FixtureWriter(path, header)
+
+    def load(self) -> List[Dict[str, Any]]:
+        """讀取目錄中所有 fixture（依檔名排序）"""
+        fixtures = []
+        for path in sorted(self.directory.glob(f"*{FIXTURE_SUFFIX}")):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines:
+                fixtures.append({"path": path, "header": lines[0], "records": lines[1:]})
+        return fixtures
+
+
+def write_fixture(directory: Union[str, Path], kind: str, request: Dict[str, Any],
+                  events: List[Any] = None, response: Any = None) -> Path:
+    """
+    直接寫入一份 fixture（用於合成測試資料）
+
+    Args:
+        directory: fixture 目錄
+        kind: 'responses' 或 'chat.completions'
+        request: 請求參數
+        events: 串流事件列表（串流 fixture）
+        response: 非串流回應
+    """
+    writer = FixtureStore(directory).new_writer(kind, request, stream=events is not None)
+    for event in events or []:
+        writer.event(event)
+    if response is not None:
+        writer.response(response)
+    writer.close()
+    return writer.path
+
+
+# ============ 錄製 ============
+
+class _RecordingResponses:
+    def __init__(self, target, store: FixtureStore):
+        self._target = target
+        self._store = store
+
+    def create(self, **kwargs):
+        stream = bool(kwargs.get("stream"))
+        writer = self._store.new_writer("responses", kwargs, stream)
+        result = self._target.create(**kwargs)
+        if not stream:
+            writer.response(result)
+            writer.close()
+            return result
+        return self._record_stream(result, writer)
+
+    @staticmethod
+    def _record_stream(stream, writer: FixtureWriter) -> Iterator[Any]:
+        try:
+            for event in stream:
+                writer.event(event)
+                yield event
+        finally:
+            writer.close()
+
+
+class _AsyncRecordingResponses:
+    def __init__(self, target, store: FixtureStore):
+        self._target = target
+        self._store = store
+
+    async def create(self, **kwargs):
+        stream = bool(kwargs.get("stream"))
+        writer = self._store.new_writer("responses", kwargs, stream)
+        result = await self._target.create(**kwargs)
+        if not stream:
+            writer.response(result)
+            writer.close()
+            return result
+        return self._record_stream(result, writer)
+
+    @staticmethod
+    async def _record_stream(stream, writer: FixtureWriter):
+        try:
+            async for event in stream:
+                writer.event(event)
+                yield event
+        finally:
+            writer.close()
+
+
+class _RecordingCompletions:
+    def __init__(self, target, store: FixtureStore, is_async: bool):
+        self._target = target
+        self._store = store
+        self._is_async = is_async
+
+    def create(self, **kwargs):
+        writer = self._store.new_writer("chat.completions", kwargs, stream=False)
+        if self._is_async:
+            return self._acreate(writer, **kwargs)
+        try:
+            result = self._target.create(**kwargs)
+            writer.response(result)
+            return result
+        finally:
+            writer.close()
+
+    async def _acreate(self, writer: FixtureWriter, **kwargs):
+        try:
+            result = await self._target.create(**kwargs)
+            writer.response(result)
+            return result
+        finally:
+            writer.close()
+
+
+class RecordingOpenAI:
+    """
+    錄製用客戶端：包裝真實的 OpenAI / AsyncOpenAI 客戶端，
+    responses.create 與 chat.completions.create 的結果會同時寫入 fixture
+    """
+
+    def __init__(self, client, directory: Union[str, Path, FixtureStore]):
+        self._client = client
+        self.store = directory if isinstance(directory, FixtureStore) else FixtureStore(directory)
+        is_async = type(client).__name__.startswith("Async")
+        responses_cls = _AsyncRecordingResponses if is_async else _RecordingResponses
+        self.responses = responses_cls(client.responses, self.store)
+        self.chat = SimpleNamespace(
+            completions=_RecordingCompletions(client.chat.completions, self.store, is_async)
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# ============ 重播 ============
+
+class _FixtureIndex:
+    """依請求鍵查詢 fixture；找不到完全相符的鍵時依類型輪流使用"""
+
+    def __init__(self, directory: Union[str, Path]):
+        fixtures = FixtureStore(directory).load()
+        if not fixtures:
+            raise FileNotFoundError(f"fixture 目錄中沒有任何 {FIXTURE_SUFFIX} 檔案: {directory}")
+        self._by_key: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for fixture in fixtures:
+            header = fixture["header"]
+            self._by_key.setdefault(header["key"], []).append(fixture)
+            self._by_kind.setdefault(header["kind"], []).append(fixture)
+        self._cursors = {kind: itertools.cycle(items) for kind, items in self._by_kind.items()}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.fallback_hits = 0
+
+    def lookup(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            matches = self._by_key.get(request_key(kind, request))
+            if matches:
+                self.exact_hits += 1
+                return matches[0]
+            if kind not in self._cursors:
+                raise LookupError(f"沒有可重播的 {kind} fixture")
+            self.fallback_hits += 1
+            return next(self._cursors[kind])
+
+
+class _Latency:
+    """逐事件延遲：固定秒數，或 'recorded' 依錄製時的時間間隔"""
+
+    def __init__(self, latency: Union[float, str] = 0.0):
+        self.recorded = latency == "recorded"
+        self.fixed = 0.0 if self.recorded else float(latency or 0.0)
+
+    def delays(self, records: List[Dict[str, Any]]) -> Iterator[float]:
+        previous = 0.0
+        for record in records:
+            if self.recorded:
+                delay = max(0.0, record.get("t", previous) - previous)
+                previous = record.get("t", previous)
+                yield delay
+            else:
+                yield self.fixed
+
+
+def _chat_completion(data: Dict[str, Any]):
+    """將錄製的 chat completion 還原為 SDK 型別（agno 依賴其欄位結構）"""
+    try:
+        from openai.types.chat import ChatCompletion
+        return ChatCompletion.model_validate(data)
+    except Exception:
+        return _to_namespace(data)
+
+
+class _ReplayResponses:
+    def __init__(self, index: _FixtureIndex, latency: _Latency):
+        self._index = index
+        self._latency = latency
+
+    def create(self, **kwargs):
+        fixture = self._index.lookup("responses", kwargs)
+        records = fixture["records"]
+        if not fixture["header"].get("stream"):
+            return _to_namespace(records[0]["response"]) if records else None
+        return self._replay(records)
+
+    def _replay(self, records):
+        for record, delay in zip(records, self._latency.delays(records)):
+            if delay:
+                time.sleep(delay)
+            yield _to_namespace(record["event"])
+
+
+class _AsyncReplayResponses(_ReplayResponses):
+    async def create(self, **kwargs):
+        fixture = self._index.lookup("responses", kwargs)
+        records = fixture["records"]
+        if not fixture["header"].get("stream"):
+            return _to_namespace(records[0]["response"]) if records else None
+        return self._areplay(records)
+
+    async def _areplay(self, records):
+        for record, delay in zip(records, self._latency.delays(records)):
+            await asyncio.sleep(delay)
+            yield _to_namespace(record["event"])
+
+
+class _ReplayCompletions:
+    def __init__(self, index: _FixtureIndex, latency: _Latency, is_async: bool):
+        self._index = index
+        self._latency = latency
+        self._is_async = is_async
+
+    def create(self, **kwargs):
+        fixture = self._index.lookup("chat.completions", kwargs)
+        record = fixture["records"][0]
+        delay = next(self._latency.delays([record]))
+        if self._is_async:
+            return self._acreate(record, delay)
+        if delay:
+            time.sleep(delay)
+        return _chat_completion(record["response"])
+
+    async def _acreate(self, record, delay):
+        await asyncio.sleep(delay)
+        return _chat_completion(record["response"])
+
+
+class ReplayOpenAI:
+    """
+    重播用的本地假客戶端（介面與 OpenAI 客戶端相同的子集）
+
+    Args:
+        directory: fixture 目錄
+        latency: 每個事件的延遲秒數，或 'recorded' 依錄製時的節奏重播
+        is_async: True 時模擬 AsyncOpenAI（create 為協程、串流為 async 迭代器）
+    """
+
+    def __init__(self, directory: Union[str, Path], latency: Union[float, str] = 0.0,
+                 is_async: bool = False, index: Optional[_FixtureIndex] = None):
+        self.index = index or _FixtureIndex(directory)
+        latency = _Latency(latency)
+        responses_cls = _AsyncReplayResponses if is_async else _ReplayResponses
+        self.responses = responses_cls(self.index, latency)
+        self.chat = SimpleNamespace(completions=_ReplayCompletions(self.index, latency, is_async))
+
+    def is_closed(self) -> bool:
+        return False
+
+    def close(self):
+        pass
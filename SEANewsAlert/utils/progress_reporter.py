@@ -0,0 +1,106 @@
+"""
+合併式進度回報器
+串流等高頻迴圈中的進度更新先在這裡合併，再以固定最短間隔寫入任務管理器
+"""
+from typing import Dict, Optional
+import threading
+import time
+
+from config import Config
+
+
+class ProgressReporter:
+    """
+    合併式進度回報器
+    
+    間隔內的多次更新只保留最新一筆（latest-wins），進度值只增不減，
+    close() 時強制送出最後一筆。每次送出才會寫入任務狀態並輸出到 console，
+    讓串流迴圈中每個事件的同步成本只剩一次時間比較。
+    """
+    
+    def __init__(self, manager, task_id: Optional[str], stage: str, interval: float = None):
+        """
+        Args:
+            manager: 任務管理器（TaskProgress，None 時只輸出到 console）
+            task_id: 任務 ID
+            stage: 階段名稱
+            interval: 合併間隔秒數（預設使用 Config.PROGRESS_COALESCE_INTERVAL）
+        """
+        self.manager = manager
+        self.task_id = task_id
+        self.stage = stage
+        self.interval = Config.PROGRESS_COALESCE_INTERVAL if interval is None else interval
+        self.reported = 0
+        self.published = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._pending = None
+        self._last_publish = float("-inf")
+        self._closed = False
+        task = manager.get_task_details(task_id) if manager else None
+        self._progress = task["progress"] if task else 0
+    
+    def report(self, progress: Optional[int] = None, step: str = None, message: str = None, force: bool = False):
+        """
+        回報進度（間隔內的更新會被合併，只有最新一筆會送出）
+        
+        Args:
+            progress: 進度百分比（低於已回報的值時沿用較高值；None 表示不變）
+            step: 目前步驟
+            message: 步驟訊息
+            force: 立即送出（例如階段邊界）
+        """
+        with self._lock:
+            self.reported += 1
+            if progress is not None and progress > self._progress:
+                self._progress = progress
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (step, message)
+            now = time.monotonic()
+            if not force and now - self._last_publish < self.interval:
+                return
+            self._last_publish = now
+            self.published += 1
+            update, self._pending = self._pending, None
+        self._publish(*update)
+    
+    def flush(self):
+        """送出尚未送出的最新更新"""
+        with self._lock:
+            update, self._pending = self._pending, None
+            if update is None:
+                return
+            self._last_publish = time.monotonic()
+            self.published += 1
+        self._publish(*update)
+    
+    def close(self):
+        """強制送出最後一筆更新並記錄統計（可重複呼叫）"""
+        self.flush()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self.manager:
+            self.manager.record_progress_stats(self.task_id, self.stage, self.stats())
+    
+    def _publish(self, step: Optional[str], message: Optional[str]):
+        if message:
+            print(message)
+        if self.manager:
+            # 同一任務可能有多個回報器（例如分片搜尋），以任務目前進度為下限
+            task = self.manager.get_task_details(self.task_id)
+            if task and task["progress"] > self._progress:
+                self._progress = task["progress"]
+            self.manager.set_progress(self.task_id, self._progress, step, message)
+    
+    def stats(self) -> Dict[str, int]:
+        """回報統計：reported（呼叫次數）、published（實際送出）、coalesced（被合併略過）"""
+        return {"reported": self.reported, "published": self.published, "coalesced": self.coalesced}
+    
+    def __enter__(self) -> "ProgressReporter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
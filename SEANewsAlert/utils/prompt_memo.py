@@ -0,0 +1,146 @@
+"""
+需求解析結果快取
+以正規化的 user_prompt（全形轉半形、大小寫與空白摺疊）為鍵，
+快取 LLM 解析出的 keywords / time_instruction / num_instruction / language（TTL + LRU 淘汰），
+排程或重複的提示詞不必每次都呼叫 LLM。可在啟動時從檔案預熱。
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+import json
+import threading
+
+from config import Config
+from utils.helpers import normalize_text
+from utils.search_cache import MemoryCacheBackend
+
+PARSED_FIELDS = ("keywords", "time_instruction", "num_instruction", "language")
+
+
+def normalize_prompt(user_prompt: str) -> str:
+    """正規化提示詞（全形轉半形、轉小寫、合併空白）"""
+    return normalize_text(user_prompt)
+
+
+class PromptParseMemo:
+    """需求解析結果快取"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 86400):
+        """
+        Args:
+            max_entries: 最多保留的提示詞數量（超過時淘汰最久未使用者）
+            ttl: 每筆結果的有效秒數
+        """
+        self.ttl = ttl
+        self.backend = MemoryCacheBackend(max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.warmed = 0
+
+    def get(self, user_prompt: str) -> Optional[Dict[str, Any]]:
+        """查詢快取，未命中或已過期時回傳 None（回傳副本，呼叫者可自由修改）"""
+        value = self.backend.get(normalize_prompt(user_prompt))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return dict(value)
+
+    def set(self, user_prompt: str, parsed: Dict[str, Any]):
+        """寫入一筆解析結果（只應寫入 LLM 成功解析的結果）"""
+        key = normalize_prompt(user_prompt)
+        if not key:
+            return
+        value = {field: parsed[field] for field in PARSED_FIELDS if field in parsed}
+        evicted = self.backend.set(key, value, self.ttl)
+        with self._lock:
+            self.evictions += evicted
+
+    def clear(self):
+        self.backend.clear()
+
+    def warm_up(self, path: Path, parse: Callable[[str], Dict[str, Any]] = None) -> int:
+        """
+        從檔案預熱快取
+
+        檔案每行一筆：純文字提示詞，或 JSON（字串，或 {"prompt": ..., "parsed": {...}}）。
+        帶有 parsed 的項目直接寫入；只有提示詞的項目在提供 parse 時逐一解析後寫入。
+
+        Args:
+            path: 預熱檔案路徑
+            parse: 可選的解析函數（例如呼叫 LLM 的 _parse_prompt；已自行寫入快取的結果不會重複寫入）
+
+        Returns:
+            int: 寫入快取的筆數
+        """
+        count = 0
+        for prompt, parsed in self._read_warmup_file(path):
+            if parsed is None:
+                key = normalize_prompt(prompt)
+                if parse is None or self.backend.get(key) is not None:
+                    continue
+                try:
+                    parsed = parse(prompt)
+                except Exception as e:
+                    print(f"⚠️ 預熱解析失敗（{prompt[:40]}）: {str(e)}")
+                    continue
+                if not parsed or parsed.get("parser") == "fallback":
+                    continue
+                # 工作流程的 _parse_prompt 解析成功時已經寫入快取，不再重複寫入
+                if self.backend.get(key) is not None:
+                    count += 1
+                    continue
+            self.set(prompt, parsed)
+            count += 1
+        with self._lock:
+            self.warmed += count
+        return count
+
+    @staticmethod
+    def _read_warmup_file(path: Path) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line[0] in "{\"":
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        entry = line
+                else:
+                    entry = line
+                if isinstance(entry, dict):
+                    prompt = entry.get("prompt")
+                    parsed = entry.get("parsed")
+                    if prompt:
+                        yield prompt, parsed if isinstance(parsed, dict) else None
+                elif isinstance(entry, str) and entry:
+                    yield entry, None
+
+    def stats(self) -> Dict[str, Any]:
+        """回傳快取命中統計"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "warmed": self.warmed,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def create_prompt_memo() -> Optional[PromptParseMemo]:
+    """
+    依設定建立需求解析結果快取
+
+    Returns:
+        Optional[PromptParseMemo]: PROMPT_MEMO_ENABLED=false 時回傳 None
+    """
+    if not Config.PROMPT_MEMO_ENABLED:
+        return None
+    return PromptParseMemo(Config.PROMPT_MEMO_MAX_ENTRIES, Config.PROMPT_MEMO_TTL)
@@ -0,0 +1,236 @@
+"""
+規則式需求解析
+以確定性的規則解析常見的中英文時間與數量寫法（最近7天、一個月內、約15篇、last 2 weeks），
+並套用請求中明確帶入的 language / time_range / count_hint。
+只有在需求含糊時才回傳 None，交由 LLM 解析。
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import re
+import threading
+import unicodedata
+
+from utils.helpers import parse_time_window_days
+
+SUPPORTED_LANGUAGES = ("English", "Chinese", "Vietnamese", "Thai", "Malay", "Indonesian")
+
+DEFAULT_TIME_INSTRUCTION = "最近7天內"
+DEFAULT_NUM_INSTRUCTION = "5-10篇"
+DEFAULT_LANGUAGE = "English"
+
+_NUMBER = r"\d+(?:\.\d+)?|[零一兩二三四五六七八九十半]+"
+
+# 時間：需有前綴（最近／過去／last）或數字，避免把「天然氣」的「天」當成時間
+_TIME_PATTERN = re.compile(
+    r"(?P<prefix>最近|過去|近|這|本|last|past|previous|within(?:\s+the)?(?:\s+(?:last|past))?|in(?:\s+the)?\s+(?:last|past))?\s*"
+    rf"(?P<number>{_NUMBER})?\s*"
+    r"(?P<unit>小時|天|日|週|周|星期|禮拜|個月|月|年|hours?|days?|weeks?|months?|years?)"
+    r"(?P<suffix>\s*(?:內|以內|之內))?",
+    re.IGNORECASE
+)
+_RELATIVE_DAY_PATTERN = re.compile(r"今天|今日|昨天|today|yesterday|本週|this\s+week", re.IGNORECASE)
+# 規則無法確定範圍的時間寫法（本季、今年、今年以來、上個月、since ...）
+_AMBIGUOUS_TIME_PATTERN = re.compile(
+    r"季|以來|上個|上週|上周|年初|年底|今年|今月|since|quarter|ytd|year[-\s]to[-\s]date|this\s+(?:month|year)",
+    re.IGNORECASE
+)
+
+_COUNT_PATTERN = re.compile(
+    r"(?P<prefix>約|大約|大概|至少|最多|不超過|around|about|approximately|at\s+least|up\s+to|top)?\s*"
+    rf"(?P<low>{_NUMBER})\s*(?:(?:-|~|～|到|至|to)\s*(?P<high>{_NUMBER}))?\s*"
+    r"(?P<unit>篇|則|條|個|articles?|news|stories|items|results)?",
+    re.IGNORECASE
+)
+
+# 語言名稱：(語言, 中文寫法, 英文寫法, 本身就是語言名稱的英文寫法)
+# 英文的國籍形容詞（"Thai baht"、"Chinese investment"）是主題的一部分，
+# 只有 "in Thai"、"Thai-language" 這類明確寫法才視為指定語言；
+# "in Thai" 之後若接著主題名詞（"investment in Thai banks"）則不是指定語言
+_AFTER_LANGUAGE = (
+    r"(?!\s+(?!(?:news|media|press|sources?|articles?|reports?|outlets?|only|please|"
+    r"from|within|over|during|last|past|for|about|on|covering)\b)[a-z])"
+)
+_LANGUAGE_NAMES: List[Tuple[str, str, str, Optional[str]]] = [
+    ("English", "英文|英語", "english", None),
+    ("Chinese", "中文|華文|華語", "chinese|mandarin", None),
+    ("Vietnamese", "越南文|越南語|越文", "vietnamese", None),
+    ("Thai", "泰文|泰語", "thai", None),
+    ("Malay", "馬來文|馬來語", "malay", r"bahasa\s+melayu"),
+    ("Indonesian", "印尼文|印尼語", "indonesian", r"bahasa\s+indonesia"),
+]
+_LANGUAGE_PATTERNS: List[Tuple[re.Pattern, str]] = []
+for _language, _chinese, _english, _native in _LANGUAGE_NAMES:
+    _explicit = (rf"(?:in|into)\s+(?:the\s+)?(?:{_english})(?:\s+language)?\b{_AFTER_LANGUAGE}"
+                 rf"|(?:{_english})[-\s]language")
+    if _native:
+        _explicit += f"|(?:in\\s+)?{_native}"
+    _LANGUAGE_PATTERNS.append((re.compile(rf"(?:用|以)?(?:{_chinese})"), _language))
+    _LANGUAGE_PATTERNS.append((re.compile(rf"\b(?:{_explicit})\b", re.IGNORECASE), _language))
+
+# 移除後剩下的才是搜尋主題
+_FILLER_PATTERN = re.compile(
+    r"請|幫我|幫忙|麻煩|我想|我要|想要|給我|搜尋|搜索|查詢|查找|尋找|找一下|找|整理|提供|列出|"
+    r"關於|有關|相關的|相關|方面的|的新聞|新聞|報導|資訊|消息|文章|來源|"
+    r"\b(?:please|search|find|get|show|give|me|latest|recent|news|articles?|stories|about|on|for|regarding|related\s+to|sources?)\b",
+    re.IGNORECASE
+)
+_CLAUSE_PATTERN = re.compile(r"[，。；;？?！!]|並且|以及|然後|\band\s+then\b|\bcompare\b|比較", re.IGNORECASE)
+_MAX_KEYWORD_LENGTH = 40
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").strip()
+
+
+class RulePromptParser:
+    """規則式需求解析器（附命中率統計）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.miss_reasons: Dict[str, int] = {}
+
+    def parse(self, user_prompt: str, language: str = None, time_range: str = None,
+              count_hint: str = None) -> Optional[Dict[str, Any]]:
+        """
+        以規則解析使用者需求
+
+        時間與數量依序採用：需求文字中的寫法 → 請求欄位（可解析時）→ 預設值；
+        語言以請求欄位為準，需求文字中明確指定的語言（"in Thai"、用泰文）與其不同時交由 LLM 解析。
+
+        Args:
+            user_prompt: 使用者輸入的搜尋需求
+            language: 請求中的新聞語言
+            time_range: 請求中的時間範圍
+            count_hint: 請求中的數量提示
+
+        Returns:
+            Optional[Dict]: 與 LLM 解析相同格式的結果（另附 parser='rules'），需求含糊時回傳 None
+        """
+        text = _normalize(user_prompt)
+        spans: List[Tuple[int, int]] = []
+
+        if _AMBIGUOUS_TIME_PATTERN.search(text):
+            return self._miss("ambiguous_time")
+
+        time_instruction = self._find_time(text, spans)
+        if time_instruction is None and time_range:
+            if parse_time_window_days(time_range) is None:
+                return self._miss("unparsed_time_range")
+            time_instruction = _normalize(time_range)
+
+        num_instruction = self._find_count(text, spans)
+        if num_instruction is None and count_hint:
+            if not _COUNT_PATTERN.search(_normalize(count_hint)):
+                return self._miss("unparsed_count_hint")
+            num_instruction = _normalize(count_hint)
+
+        # 請求欄位優先；需求文字明確指定了不同的語言時無法判斷使用者的意思，交由 LLM 解析
+        detected_language = self._find_language(text, spans)
+        if language:
+            if language not in SUPPORTED_LANGUAGES:
+                return self._miss("unsupported_language")
+            if detected_language and detected_language != language:
+                return self._miss("language_conflict")
+            detected_language = language
+
+        keywords = self._keywords(text, spans)
+        if not keywords:
+            return self._miss("empty_keywords")
+        if len(keywords) > _MAX_KEYWORD_LENGTH or _CLAUSE_PATTERN.search(keywords):
+            return self._miss("complex_prompt")
+
+        with self._lock:
+            self.hits += 1
+        return {
+            "keywords": keywords,
+            "time_instruction": time_instruction or DEFAULT_TIME_INSTRUCTION,
+            "num_instruction": num_instruction or DEFAULT_NUM_INSTRUCTION,
+            "language": detected_language or DEFAULT_LANGUAGE,
+            "parser": "rules",
+        }
+
+    def _find_time(self, text: str, spans: List[Tuple[int, int]]) -> Optional[str]:
+        relative = _RELATIVE_DAY_PATTERN.search(text)
+        if relative:
+            spans.append(relative.span())
+            return relative.group(0)
+        for match in _TIME_PATTERN.finditer(text):
+            prefix, number, unit = match.group("prefix"), match.group("number"), match.group("unit")
+            if not prefix and not number:
+                continue
+            # 「5月」「2025年」「3日」通常是日期而不是時間範圍
+            if not prefix and unit in ("月", "年", "日"):
+                continue
+            if number and number[0].isdigit() and float(number) > 100:
+                continue
+            phrase = match.group(0).strip()
+            if parse_time_window_days(phrase) is None:
+                continue
+            spans.append(match.span())
+            return phrase
+        return None
+
+    def _find_count(self, text: str, spans: List[Tuple[int, int]]) -> Optional[str]:
+        for match in _COUNT_PATTERN.finditer(text):
+            if self._overlaps(match.span(), spans):
+                continue
+            prefix, unit = match.group("prefix"), match.group("unit")
+            # 沒有單位的數字（例如 "5G"、"2025"）不視為數量，"top 10" 例外
+            if not unit and not (prefix and prefix.lower() == "top"):
+                continue
+            low = match.group("low")
+            if low[0].isdigit() and float(low) > 100:
+                continue
+            spans.append(match.span())
+            return match.group(0).strip()
+        return None
+
+    @staticmethod
+    def _find_language(text: str, spans: List[Tuple[int, int]]) -> Optional[str]:
+        for pattern, language in _LANGUAGE_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                spans.append(match.span())
+                return language
+        return None
+
+    @staticmethod
+    def _overlaps(span: Tuple[int, int], spans: List[Tuple[int, int]]) -> bool:
+        return any(span[0] < end and start < span[1] for start, end in spans)
+
+    @staticmethod
+    def _keywords(text: str, spans: List[Tuple[int, int]]) -> str:
+        """移除時間、數量、語言片段與填充詞後剩下的主題"""
+        pieces = []
+        position = 0
+        for start, end in sorted(spans):
+            pieces.append(text[position:start])
+            pieces.append(" ")
+            position = max(position, end)
+        pieces.append(text[position:])
+        remainder = _FILLER_PATTERN.sub(" ", "".join(pieces))
+        remainder = re.sub(r"(?<![A-Za-z])的|的(?![A-Za-z])", " ", remainder)
+        remainder = re.sub(r"[\s,、:：\"'「」『』()（）]+", " ", remainder)
+        return remainder.strip()
+
+    def _miss(self, reason: str) -> None:
+        with self._lock:
+            self.misses += 1
+            self.miss_reasons[reason] = self.miss_reasons.get(reason, 0) + 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """回傳規則解析命中統計"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "miss_reasons": dict(self.miss_reasons),
+            }
+
+
+# 全域規則解析器實例
+rule_prompt_parser = RulePromptParser()
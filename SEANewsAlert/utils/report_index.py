@@ -0,0 +1,438 @@
+"""
+報告全文索引
+以 SQLite FTS5 建立已產生報告與其新聞的倒排索引，ReportGeneratorAgent 每寫出一個報告檔案
+（PDF 的 Markdown 內容、Excel 的結構化新聞）就增量更新該報告的索引，
+查詢 API 只讀取索引，不必在每次請求時掃描 reports/ 目錄。
+
+中文、日文、韓文與泰文沒有空白斷詞，FTS5 的 unicode61 斷詞器會把整段文字視為一個詞；
+寫入與查詢前先把這些文字轉成相鄰兩字的 bigram（「越南央行」→「越南 南央 央行」），
+查詢時多字詞以片語比對相鄰的 bigram，單一字元以字首比對。
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from config import Config
+from utils.news_model import NewsItem
+
+# 沒有空白斷詞的文字：CJK 統一表意文字、日文假名、韓文、泰文
+_UNSEGMENTED = r"฀-๿぀-ヿ㐀-䶿一-鿿가-힯豈-﫿"
+_UNSEGMENTED_RUN = re.compile(f"[{_UNSEGMENTED}]+")
+_QUERY_TERM = re.compile(f"[{_UNSEGMENTED}]+|[^\\W_{_UNSEGMENTED}]+")
+_BASENAME_TIME = re.compile(r"_(\d{8}_\d{6})")
+_BULLET = re.compile(r"^\s*(?:[-*+]|\d+[.)、])\s+")
+# 每份報告在列表中最多附上的符合新聞數
+_MAX_MATCHES = 3
+
+
+def _bigrams(run: str) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def segment_text(text: str) -> str:
+    """將沒有空白斷詞的文字轉為以空白分隔的 bigram（其他文字保持不變），供 FTS5 索引"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _UNSEGMENTED_RUN.sub(lambda match: " " + " ".join(_bigrams(match.group(0))) + " ", text)
+
+
+def build_match_query(query: str, any_term: bool = False) -> str:
+    """
+    將使用者輸入轉為 FTS5 查詢
+
+    中文等連續文字轉為相鄰 bigram 的片語（單一字元為字首查詢），英數詞為字首查詢；
+    預設所有詞都必須出現（AND），any_term=True 時任一 bigram／詞出現即可（OR）。
+
+    Returns:
+        str: FTS5 MATCH 字串，沒有可查詢的詞時為空字串
+    """
+    terms = []
+    for match in _QUERY_TERM.finditer(unicodedata.normalize("NFKC", query or "").casefold()):
+        term = match.group(0)
+        if _UNSEGMENTED_RUN.fullmatch(term):
+            grams = _bigrams(term)
+            if len(term) == 1:
+                terms.append(f'"{term}"*')
+            elif any_term:
+                terms.extend(f'"{gram}"' for gram in grams)
+            else:
+                terms.append('"' + " ".join(grams) + '"')
+        else:
+            terms.append(f'"{term}"*')
+    if any_term:
+        terms = list(dict.fromkeys(terms))
+    return (" OR " if any_term else " AND ").join(terms)
+
+
+def parse_report_markdown(markdown: str) -> Dict[str, Any]:
+    """
+    由報告 Markdown 取出標題、報告摘要、搜尋主題、市場洞察條列與全文
+
+    Returns:
+        Dict[str, Any]: title / summary / query / insights / body
+    """
+    title = ""
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for line in (markdown or "").splitlines():
+        stripped = line.strip()
+        if stripped.startswith("# ") and not title:
+            title = stripped[2:].strip()
+        elif stripped.startswith("## "):
+            current = stripped[3:].strip()
+            sections.setdefault(current, [])
+        elif current is not None and stripped:
+            sections[current].append(stripped)
+    insights = []
+    for name, lines in sections.items():
+        if "洞察" in name:
+            insights = [_BULLET.sub("", line).replace("**", "").strip() for line in lines if _BULLET.match(line)]
+            break
+    return {
+        "title": title,
+        "summary": " ".join(sections.get("報告摘要", [])).strip(),
+        "query": " ".join(sections.get("搜尋主題", [])).strip(),
+        "insights": insights,
+        "body": markdown or "",
+    }
+
+
+def _generated_at(path: Path) -> str:
+    """報告生成時間：優先使用基礎文件名中的時間（artifact_basename），否則使用檔案修改時間"""
+    match = _BASENAME_TIME.search(path.stem)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat()
+        except ValueError:
+            pass
+    try:
+        return datetime.fromtimestamp(path.stat().st_mtime).isoformat(timespec="seconds")
+    except OSError:
+        return datetime.now().isoformat(timespec="seconds")
+
+
+class ReportIndex:
+    """報告與新聞的 SQLite FTS5 全文索引"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # 行程池中的渲染 worker 與服務同時寫入同一個檔案，等待對方的交易結束
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                id TEXT PRIMARY KEY,
+                title TEXT NOT NULL DEFAULT '',
+                summary TEXT NOT NULL DEFAULT '',
+                query TEXT NOT NULL DEFAULT '',
+                insights TEXT NOT NULL DEFAULT '[]',
+                countries TEXT NOT NULL DEFAULT '[]',
+                sources TEXT NOT NULL DEFAULT '[]',
+                news_count INTEGER NOT NULL DEFAULT 0,
+                pdf_path TEXT NOT NULL DEFAULT '',
+                xlsx_path TEXT NOT NULL DEFAULT '',
+                generated_at TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_generated_at ON reports(generated_at);
+            CREATE TABLE IF NOT EXISTS report_news (
+                report_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                country TEXT NOT NULL,
+                url TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (report_id, position)
+            ) WITHOUT ROWID;
+            -- 全文索引的文件：每份報告的 Markdown（position = -1）與每則新聞；
+            -- FTS5 的 rowid 即為 id（UNINDEXED 欄位沒有索引，依報告刪除會掃描整個 FTS 表）
+            CREATE TABLE IF NOT EXISTS report_docs (
+                id INTEGER PRIMARY KEY,
+                report_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                UNIQUE (report_id, position)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(
+                title,
+                body,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ============ 寫入 ============
+
+    def _ensure_report(self, report_id: str, path: Path):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO reports (id, generated_at, indexed_at) VALUES (?, ?, ?)",
+            (report_id, _generated_at(path), time.time())
+        )
+
+    def _replace_docs(self, report_id: str, markdown_doc: bool, docs: Sequence[Tuple[int, str, str]]):
+        """取代報告的 Markdown 文件（markdown_doc=True）或所有新聞文件；docs 為 (position, title, body)"""
+        condition = "position = -1" if markdown_doc else "position >= 0"
+        self._conn.execute(
+            f"DELETE FROM report_fts WHERE rowid IN (SELECT id FROM report_docs WHERE report_id = ? AND {condition})",
+            (report_id,)
+        )
+        self._conn.execute(f"DELETE FROM report_docs WHERE report_id = ? AND {condition}", (report_id,))
+        for position, title, body in docs:
+            doc_id = self._conn.execute(
+                "INSERT INTO report_docs (report_id, position) VALUES (?, ?)", (report_id, position)
+            ).lastrowid
+            self._conn.execute(
+                "INSERT INTO report_fts (rowid, title, body) VALUES (?, ?, ?)",
+                (doc_id, segment_text(title), segment_text(body))
+            )
+
+    def index_pdf(self, pdf_path: Path, markdown: str) -> str:
+        """
+        以 PDF 的 Markdown 內容更新報告的標題、摘要、主題、市場洞察與全文索引
+
+        Returns:
+            str: 報告 ID（檔案的基礎文件名，PDF 與 Excel 共用）
+        """
+        pdf_path = Path(pdf_path)
+        report_id = pdf_path.stem
+        parsed = parse_report_markdown(markdown)
+        with self._lock:
+            self._ensure_report(report_id, pdf_path)
+            self._conn.execute(
+                """
+                UPDATE reports SET title = ?, summary = ?, query = ?, insights = ?, pdf_path = ?, indexed_at = ?
+                WHERE id = ?
+                """,
+                (parsed["title"], parsed["summary"], parsed["query"],
+                 json.dumps(parsed["insights"], ensure_ascii=False), str(pdf_path), time.time(), report_id)
+            )
+            self._replace_docs(report_id, True, [(-1, f"{parsed['title']} {parsed['query']}", parsed["body"])])
+            self._conn.commit()
+        return report_id
+
+    def index_excel(self, xlsx_path: Path, news: Iterable[Any]) -> str:
+        """
+        以 Excel 的結構化新聞更新報告的新聞列表、國家、來源與新聞全文索引
+
+        Args:
+            xlsx_path: Excel 路徑
+            news: NewsBatch、NewsItem 列表或新聞 dict（中文欄名或英文欄位名）列表
+
+        Returns:
+            str: 報告 ID
+        """
+        xlsx_path = Path(xlsx_path)
+        report_id = xlsx_path.stem
+        items = [item if isinstance(item, NewsItem) else NewsItem.from_mapping(item) for item in news]
+        countries = list(dict.fromkeys(item.country for item in items if item.country))
+        sources = list(dict.fromkeys(item.source for item in items if item.source))
+        with self._lock:
+            self._ensure_report(report_id, xlsx_path)
+            self._conn.execute(
+                """
+                UPDATE reports SET countries = ?, sources = ?, news_count = ?, xlsx_path = ?, indexed_at = ?
+                WHERE id = ?
+                """,
+                (json.dumps(countries, ensure_ascii=False), json.dumps(sources, ensure_ascii=False),
+                 len(items), str(xlsx_path), time.time(), report_id)
+            )
+            self._conn.execute("DELETE FROM report_news WHERE report_id = ?", (report_id,))
+            self._conn.executemany(
+                """
+                INSERT INTO report_news (report_id, position, title, country, url, published_at, summary, source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(report_id, position, item.title, item.country, item.url, item.published_at, item.summary, item.source)
+                 for position, item in enumerate(items)]
+            )
+            self._replace_docs(report_id, False, [
+                (position, item.title, f"{item.country} {item.source} {item.summary} {item.analysis}")
+                for position, item in enumerate(items)
+            ])
+            self._conn.commit()
+        return report_id
+
+    def indexed_paths(self) -> set:
+        """已建立索引的報告檔案路徑"""
+        with self._lock:
+            rows = self._conn.execute("SELECT pdf_path, xlsx_path FROM reports").fetchall()
+        return {path for row in rows for path in row if path}
+
+    def sync_directory(self, reports_dir: Path) -> int:
+        """
+        補建目錄中尚未索引的報告（服務啟動時執行一次，之後由 ReportGeneratorAgent 增量更新）
+
+        Excel 讀取新聞列；沒有對應 Markdown 的舊 PDF 只建立報告項目（以文件名為標題）。
+
+        Returns:
+            int: 新建立索引的檔案數
+        """
+        from openpyxl import load_workbook
+
+        known = self.indexed_paths()
+        count = 0
+        for path in sorted(Path(reports_dir).glob("*")):
+            if path.suffix not in (".pdf", ".xlsx") or str(path) in known:
+                continue
+            try:
+                if path.suffix == ".xlsx":
+                    workbook = load_workbook(path, read_only=True)
+                    try:
+                        rows = workbook.active.iter_rows(values_only=True)
+                        header = [str(cell or "") for cell in next(rows, ())]
+                        news = [dict(zip(header, row)) for row in rows if any(row)]
+                    finally:
+                        workbook.close()
+                    self.index_excel(path, news)
+                else:
+                    self.index_pdf(path, f"# {path.stem}")
+                count += 1
+            except Exception as e:
+                print(f"⚠️ 無法建立報告索引 {path.name}: {str(e)}")
+        return count
+
+    # ============ 查詢 ============
+
+    def _reports(self, report_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        if not report_ids:
+            return []
+        placeholders = ",".join("?" * len(report_ids))
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM reports WHERE id IN ({placeholders})", list(report_ids)).fetchall()
+        by_id = {row["id"]: self._to_dict(row) for row in rows}
+        return [by_id[report_id] for report_id in report_ids if report_id in by_id]
+
+    @staticmethod
+    def _to_dict(row) -> Dict[str, Any]:
+        """轉為前端 AIReport 格式（另附報告 ID、檔名與新聞數）"""
+        countries = json.loads(row["countries"])
+        sources = json.loads(row["sources"])
+        return {
+            "id": row["id"],
+            "title": row["query"] or row["title"] or row["id"].split("_")[0],
+            "summary": row["summary"],
+            "bulletPoints": json.loads(row["insights"]),
+            "countries": countries,
+            "source": "、".join(sources[:5]),
+            "generatedAt": row["generated_at"],
+            "query": row["query"],
+            "newsCount": row["news_count"],
+            "pdfFile": Path(row["pdf_path"]).name if row["pdf_path"] else None,
+            "xlsxFile": Path(row["xlsx_path"]).name if row["xlsx_path"] else None,
+        }
+
+    def list(self, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        依生成時間由新到舊列出報告
+
+        Returns:
+            Tuple[int, List[Dict[str, Any]]]: (報告總數, 此頁的報告)
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM reports ORDER BY generated_at DESC, id DESC LIMIT ? OFFSET ?", (limit, offset)
+            )]
+        return total, self._reports(ids)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        全文搜尋報告與其新聞（依最相關的項目排序）
+
+        所有詞都必須出現在同一份報告或同一則新聞中；沒有結果時改為任一詞出現即可
+        （前端允許「上週越南貿易新聞摘要」這類自然語言輸入）。
+        只對最新寫入的 REPORT_INDEX_MAX_HITS 個符合項目計算相關性（FTS5 依 rowid 由新到舊逐筆讀取，
+        常見詞不必對整個索引的符合項目排序），總數也以這些項目為上限。
+        每份報告附上 matches：最多 3 則符合的新聞（title / url / country）。
+
+        Returns:
+            Tuple[int, List[Dict[str, Any]]]: (符合的報告數, 此頁的報告)
+        """
+        for any_term in (False, True):
+            match = build_match_query(query, any_term)
+            if not match:
+                return 0, []
+            with self._lock:
+                hits = self._conn.execute(
+                    """
+                    SELECT docs.report_id, docs.position FROM (
+                        SELECT rowid, rank FROM report_fts WHERE report_fts MATCH ? ORDER BY rowid DESC LIMIT ?
+                    ) AS hits JOIN report_docs AS docs ON docs.id = hits.rowid
+                    ORDER BY hits.rank
+                    """,
+                    (match, Config.REPORT_INDEX_MAX_HITS)
+                ).fetchall()
+            if hits:
+                break
+        else:
+            return 0, []
+
+        matched_news: Dict[str, List[int]] = {}
+        for report_id, position in hits:
+            positions = matched_news.setdefault(report_id, [])
+            if position >= 0 and len(positions) < _MAX_MATCHES:
+                positions.append(position)
+        report_ids = list(matched_news)
+        page = report_ids[offset:offset + limit]
+        reports = self._reports(page)
+        with self._lock:
+            for report in reports:
+                positions = matched_news[report["id"]]
+                if not positions:
+                    report["matches"] = []
+                    continue
+                placeholders = ",".join("?" * len(positions))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT position, title, url, country FROM report_news
+                    WHERE report_id = ? AND position IN ({placeholders})
+                    """,
+                    (report["id"], *positions)
+                ).fetchall()
+                by_position = {row["position"]: row for row in rows}
+                report["matches"] = [
+                    {"title": by_position[p]["title"], "url": by_position[p]["url"], "country": by_position[p]["country"]}
+                    for p in positions if p in by_position
+                ]
+        return len(report_ids), reports
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_report_index: Optional[ReportIndex] = None
+_report_index_lock = threading.Lock()
+
+
+def get_report_index() -> Optional[ReportIndex]:
+    """
+    取得行程共用的報告索引（第一次使用時開啟；REPORT_INDEX_ENABLED=false 時回傳 None）
+
+    行程池中的每個渲染 worker 各自開啟一個連線，寫入同一個 SQLite 檔案。
+    """
+    global _report_index
+    if not Config.REPORT_INDEX_ENABLED:
+        return None
+    with _report_index_lock:
+        if _report_index is None:
+            _report_index = ReportIndex(Config.REPORT_INDEX_PATH)
+        return _report_index
@@ -0,0 +1,187 @@
+"""
+結構化報告範本
+json 分析模式下，模型只輸出精簡的 JSON（逐則的翻譯標題、摘要、重點分析與整體洞察），
+固定的標題、日期、資料來源列表與頁尾由本模組在本機產生，
+新聞欄位直接由 JSON 取得（不再以正則從 Markdown 反解析），PDF 與 Excel 也由同一份資料渲染。
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+import json
+import re
+
+from config import Config
+from utils.news_model import NewsBatch, NewsItem
+
+REPORT_HEADING = "東南亞金融新聞報告"
+_FENCE_PATTERN = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# 要求模型輸出的 JSON 結構（放進提示詞）
+STRUCTURED_SCHEMA = """{
+  "summary": "用 2-3 句話總結本報告的核心內容",
+  "items": [
+    {
+      "title": "新聞標題（翻譯成繁體中文）",
+      "source": "來源名稱",
+      "url": "原文網址（照抄搜尋結果）",
+      "date": "YYYY-MM-DD",
+      "summary": "新聞的詳細摘要，100-300 字",
+      "analysis": ["重點分析 1", "重點分析 2", "重點分析 3"]
+    }
+  ],
+  "insights": ["市場洞察 1", "市場洞察 2", "市場洞察 3"]
+}"""
+
+
+@dataclass
+class StructuredReport:
+    """模型輸出的結構化報告"""
+
+    summary: str = ""
+    news: NewsBatch = field(default_factory=NewsBatch)
+    insights: List[str] = field(default_factory=list)
+
+
+def _text(value: Any) -> str:
+    """轉為單行文字（合併換行與連續空白）"""
+    if value is None:
+        return ""
+    return _WHITESPACE_PATTERN.sub(" ", str(value)).strip()
+
+
+def _numbered(value: Any) -> str:
+    """重點分析可為字串或列表，列表輸出為「1) ... 2) ...」"""
+    if isinstance(value, (list, tuple)):
+        points = [_text(point) for point in value if _text(point)]
+        return " ".join(f"{index}) {point}" for index, point in enumerate(points, start=1))
+    return _text(value)
+
+
+def parse_structured_report(
+    text: str,
+    keyword: str = "",
+    classify_country: Optional[Callable[[str, str, str], str]] = None
+) -> StructuredReport:
+    """
+    解析模型輸出的 JSON 報告
+
+    Args:
+        text: 模型輸出（可包在 ```json 程式碼區塊中，或前後夾雜說明文字）
+        keyword: 寫入每則新聞的關鍵字（搜尋查詢）
+        classify_country: 由 (標題, 來源, 摘要) 判斷來源國家的函數
+
+    Returns:
+        StructuredReport: 結構化報告
+
+    Raises:
+        ValueError: 找不到可解析的 JSON 物件
+    """
+    fenced = _FENCE_PATTERN.search(text)
+    if fenced:
+        payload = fenced.group(1)
+    else:
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start:
+            raise ValueError("模型輸出中沒有 JSON 物件")
+        payload = text[start:end + 1]
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"模型輸出的 JSON 無法解析: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("模型輸出的 JSON 不是物件")
+
+    news = NewsBatch()
+    for entry in data.get("items") or []:
+        if not isinstance(entry, dict) or not _text(entry.get("title")):
+            continue
+        title, source, summary = _text(entry.get("title")), _text(entry.get("source")), _text(entry.get("summary"))
+        country = _text(entry.get("country"))
+        if not country and classify_country:
+            country = classify_country(title, source, summary)
+        news.append(NewsItem(
+            title=title,
+            country=country,
+            keyword=keyword,
+            url=_text(entry.get("url")),
+            published_at=_text(entry.get("date")),
+            summary=summary,
+            analysis=_numbered(entry.get("analysis")),
+            source=source
+        ))
+
+    insights = data.get("insights") or []
+    if isinstance(insights, str):
+        insights = [insights]
+    return StructuredReport(
+        summary=_text(data.get("summary")),
+        news=news,
+        insights=[_text(insight) for insight in insights if _text(insight)]
+    )
+
+
+def _link_label(text: str) -> str:
+    return text.replace("[", "［").replace("]", "］")
+
+
+def render_report_markdown(report: StructuredReport, query: str, generated_at: Optional[datetime] = None) -> str:
+    """
+    以固定範本將結構化報告渲染為 Markdown（與 markdown 分析模式要求模型輸出的格式相同）
+
+    Args:
+        report: 結構化報告
+        query: 搜尋查詢
+        generated_at: 報告生成時間，未提供時使用目前時間
+
+    Returns:
+        str: Markdown 報告
+    """
+    generated_at = generated_at or datetime.now()
+    lines = [
+        f"# {REPORT_HEADING}",
+        "",
+        "## 報告摘要",
+        report.summary or "本期未整理出報告摘要。",
+        "",
+        "## 搜尋主題",
+        _text(query),
+        "",
+        "## 報告日期",
+        generated_at.strftime("%Y年%m月%d日"),
+        "",
+        "## 新聞詳情",
+        "",
+    ]
+
+    if not report.news:
+        lines += ["目前沒有找到符合條件的相關新聞。", ""]
+    sources = []
+    seen_urls = set()
+    for index, item in enumerate(report.news, start=1):
+        label = _link_label(item.source or item.title)
+        source = f"[{label}]({item.url})" if item.url else label
+        lines += [
+            f"### {index}. {item.title}",
+            f"- **來源**：{source}",
+            f"- **日期**：{item.published_at or '未提供'}",
+            f"- **摘要**：{item.summary}",
+            f"- **重點分析**：{item.analysis}",
+            "",
+        ]
+        if item.url and item.url not in seen_urls:
+            seen_urls.add(item.url)
+            sources.append(f"- [{_link_label(item.title)}]({item.url})")
+
+    lines.append("## 市場洞察")
+    lines += [f"{index}. {insight}" for index, insight in enumerate(report.insights, start=1)]
+    lines += ["", "## 資料來源"]
+    lines += sources or ["- 無"]
+    lines += [
+        "",
+        "---",
+        f"**報告生成時間**：{generated_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        f"**系統**：{Config.APP_NAME}",
+        "",
+    ]
+    return "\n".join(lines)
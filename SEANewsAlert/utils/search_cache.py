@@ -0,0 +1,261 @@
+"""
+搜尋結果快取
+以正規化的搜尋參數為鍵，快取 ResearchAgent 的搜尋結果（TTL + LRU 淘汰）
+支援記憶體與 SQLite（重啟後保留）兩種後端
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from config import Config
+from utils.helpers import normalize_text, parse_time_window_days
+
+
+def make_cache_key(keywords: str, time_instruction: str, num_instruction: str,
+                   language: str, countries=None) -> Tuple[str, ...]:
+    """
+    建立正規化的快取鍵
+
+    時間與數量指令會移除所有空白（「最近 7 天內」與「最近7天內」視為相同），
+    國家列表會排序。
+
+    Returns:
+        Tuple[str, ...]: (keywords, time_instruction, num_instruction, language, countries)
+    """
+    return (
+        normalize_text(keywords),
+        normalize_text(time_instruction).replace(" ", ""),
+        normalize_text(num_instruction).replace(" ", ""),
+        normalize_text(language),
+        ",".join(sorted(normalize_text(c) for c in countries)) if countries else "",
+    )
+
+
+def ttl_for_time_window(time_instruction: str) -> float:
+    """
+    依要求的時間範圍決定 TTL（秒）
+
+    時間範圍越長，新文章對結果的影響越小，可快取越久：
+    每一天的時間範圍給予 SEARCH_CACHE_TTL_PER_DAY 秒，並限制在
+    [SEARCH_CACHE_MIN_TTL, SEARCH_CACHE_MAX_TTL] 之間；無法解析時使用 SEARCH_CACHE_DEFAULT_TTL。
+    """
+    days = parse_time_window_days(time_instruction)
+    if days is None:
+        return Config.SEARCH_CACHE_DEFAULT_TTL
+    ttl = days * Config.SEARCH_CACHE_TTL_PER_DAY
+    return max(Config.SEARCH_CACHE_MIN_TTL, min(ttl, Config.SEARCH_CACHE_MAX_TTL))
+
+
+class MemoryCacheBackend:
+    """記憶體快取後端（LRU）"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> int:
+        """寫入一筆資料，回傳因容量限制而淘汰的筆數"""
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """SQLite 快取後端（LRU，服務重啟後仍保留）"""
+
+    def __init__(self, path: Path, max_entries: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_last_access ON search_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> int:
+        """寫入一筆資料，回傳因過期或容量限制而淘汰的筆數"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now)
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM search_cache WHERE expires_at <= ?", (now,)
+            ).rowcount
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                evicted += self._conn.execute(
+                    """
+                    DELETE FROM search_cache WHERE key IN (
+                        SELECT key FROM search_cache ORDER BY last_access ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,)
+                ).rowcount
+            self._conn.commit()
+            return evicted
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SearchResultCache:
+    """搜尋結果快取 - 位於 ResearchAgent.search 之前"""
+
+    def __init__(self, backend):
+        """
+        Args:
+            backend: MemoryCacheBackend 或 SQLiteCacheBackend（任何提供 get/set/delete/clear 的物件）
+        """
+        self.backend = backend
+        # 搜尋（含各國家／語言的分片）在多個執行緒中查詢與寫入快取
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _digest(key: Tuple[str, ...]) -> str:
+        return hashlib.sha256("\x1f".join(key).encode("utf-8")).hexdigest()
+
+    def get(self, keywords: str, time_instruction: str, num_instruction: str,
+            language: str, countries=None) -> Optional[Dict[str, Any]]:
+        """查詢快取，未命中或已過期時回傳 None"""
+        key = make_cache_key(keywords, time_instruction, num_instruction, language, countries)
+        value = self.backend.get(self._digest(key))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return value
+
+    def set(self, keywords: str, time_instruction: str, num_instruction: str,
+            language: str, result: Dict[str, Any], countries=None, ttl: float = None):
+        """寫入快取（只應寫入成功的搜尋結果）"""
+        key = make_cache_key(keywords, time_instruction, num_instruction, language, countries)
+        ttl = ttl if ttl is not None else ttl_for_time_window(time_instruction)
+        evicted = self.backend.set(self._digest(key), result, ttl)
+        with self._lock:
+            self.evictions += evicted
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """回傳快取命中統計"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "entries": len(self.backend),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def create_search_cache(backend: str = None) -> Optional[SearchResultCache]:
+    """
+    依設定建立搜尋結果快取
+
+    Args:
+        backend: 'memory'、'sqlite' 或 'off'（預設使用 Config.SEARCH_CACHE_BACKEND）
+
+    Returns:
+        Optional[SearchResultCache]: 停用時回傳 None
+    """
+    backend = (backend or Config.SEARCH_CACHE_BACKEND).lower()
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return SearchResultCache(MemoryCacheBackend(Config.SEARCH_CACHE_MAX_ENTRIES))
+    if backend == "sqlite":
+        return SearchResultCache(
+            SQLiteCacheBackend(Config.SEARCH_CACHE_PATH, Config.SEARCH_CACHE_MAX_ENTRIES)
+        )
+    raise ValueError(f"不支援的快取後端: {backend}")
@@ -0,0 +1,174 @@
+"""
+可信新聞來源註冊表
+從設定檔載入可信來源，一次編譯成以網域後綴索引的比對表，
+提供 O(1) 的網域比對（含 e.vnexpress.net 這類子網域）、依地區／語言查詢、
+預先產生的提示詞片段，以及套用在 sources 與解析結果上的 is_trusted 過濾。
+設定檔修改後會自動重新載入，無需重啟服務。
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import threading
+import time
+
+from config import Config
+
+
+class CompiledSources:
+    """編譯後的來源快照（不可變，重新載入時整份替換）"""
+
+    def __init__(self, sources: List[Dict[str, Any]]):
+        self.sources = [dict(src, domain=src["domain"].lower().strip(".")) for src in sources]
+        self.by_domain: Dict[str, Dict[str, Any]] = {src["domain"]: src for src in self.sources}
+
+        self.by_region: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_language: Dict[str, List[Dict[str, Any]]] = {}
+        for src in self.sources:
+            self.by_region.setdefault(src.get("region", "").casefold(), []).append(src)
+            for language in src.get("languages", []):
+                self.by_language.setdefault(language.casefold(), []).append(src)
+
+        # 預先產生的提示詞片段
+        self.allowed_domains_str = ", ".join(src["domain"] for src in self.sources)
+        self.sources_list = "\n".join(
+            f"  - {src['name']} (site:{src['domain']}) - {src.get('region', '')}"
+            for src in self.sources
+        )
+        self.site_search_example = " OR ".join(f"site:{src['domain']}" for src in self.sources[:5])
+
+    def match_host(self, host: str) -> Optional[Dict[str, Any]]:
+        """
+        以網域後綴比對主機名稱
+
+        依序查詢 e.vnexpress.net → vnexpress.net → net，
+        每次都是一次 dict 查詢，成本只與網域層數有關。
+        """
+        host = host.lower().rstrip(".")
+        while host:
+            src = self.by_domain.get(host)
+            if src is not None:
+                return src
+            _, _, host = host.partition(".")
+        return None
+
+
+class SourceRegistry:
+    """可信新聞來源註冊表"""
+
+    def __init__(self, path: Path = None, reload_interval: float = None):
+        """
+        Args:
+            path: 來源設定檔（JSON）路徑（預設使用 Config.TRUSTED_SOURCES_PATH）
+            reload_interval: 檢查設定檔是否更新的最短間隔秒數（預設使用 Config.TRUSTED_SOURCES_RELOAD_INTERVAL）
+        """
+        self.path = Path(path or Config.TRUSTED_SOURCES_PATH)
+        self.reload_interval = (
+            Config.TRUSTED_SOURCES_RELOAD_INTERVAL if reload_interval is None else reload_interval
+        )
+        self.reload_count = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self._compiled = self._load()
+
+    def _load(self) -> CompiledSources:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        sources = data["sources"] if isinstance(data, dict) else data
+        self._mtime = self.path.stat().st_mtime_ns
+        return CompiledSources(sources)
+
+    def reload(self) -> bool:
+        """強制重新載入設定檔，成功時回傳 True（格式錯誤時保留舊版本）"""
+        with self._lock:
+            try:
+                compiled = self._load()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ 可信來源設定檔載入失敗，沿用目前版本: {e}")
+                return False
+            self._compiled = compiled
+            self.reload_count += 1
+        print(f"🔄 已重新載入可信來源設定檔（{len(compiled.sources)} 個來源）")
+        return True
+
+    def _current(self) -> CompiledSources:
+        """取得目前的編譯快照，必要時檢查設定檔是否已修改"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError:
+                mtime = self._mtime
+            if mtime != self._mtime:
+                self.reload()
+        return self._compiled
+
+    @property
+    def sources(self) -> List[Dict[str, Any]]:
+        """所有可信來源"""
+        return self._current().sources
+
+    @property
+    def allowed_domains_str(self) -> str:
+        """以逗號分隔的網域列表（提示詞片段）"""
+        return self._current().allowed_domains_str
+
+    @property
+    def sources_list(self) -> str:
+        """條列式來源說明（提示詞片段）"""
+        return self._current().sources_list
+
+    @property
+    def site_search_example(self) -> str:
+        """site: 搜尋範例（提示詞片段）"""
+        return self._current().site_search_example
+
+    def by_region(self, region: str) -> List[Dict[str, Any]]:
+        """依地區查詢來源"""
+        return self._current().by_region.get(region.casefold(), [])
+
+    def by_language(self, language: str) -> List[Dict[str, Any]]:
+        """依語言查詢來源"""
+        return self._current().by_language.get(language.casefold(), [])
+
+    def source_for(self, url: str) -> Optional[Dict[str, Any]]:
+        """回傳 URL 所屬的可信來源，不屬於任何可信來源時回傳 None"""
+        if not url:
+            return None
+        try:
+            host = urlsplit(url.strip()).hostname
+        except ValueError:
+            return None
+        if not host:
+            return None
+        return self._current().match_host(host)
+
+    def is_trusted(self, url: str) -> bool:
+        """URL 是否屬於可信來源（含子網域）"""
+        return self.source_for(url) is not None
+
+    def filter_trusted(self, items: Iterable[Dict[str, Any]], url_key: str = "url") -> Tuple[List[Dict[str, Any]], int]:
+        """
+        過濾出屬於可信來源的項目
+
+        Args:
+            items: 含有 URL 欄位的字典（sources 或解析出的 results）
+            url_key: URL 欄位名稱
+
+        Returns:
+            Tuple[List[Dict], int]: (可信項目, 被移除的數量)
+        """
+        kept = []
+        dropped = 0
+        for item in items:
+            if self.is_trusted(item.get(url_key, "")):
+                kept.append(item)
+            else:
+                dropped += 1
+        return kept, dropped
+
+
+# 全域可信來源註冊表實例
+source_registry = SourceRegistry()
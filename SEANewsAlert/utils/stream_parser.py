@@ -0,0 +1,196 @@
+"""
+串流 JSON 增量解析器
+在 Research Agent 的 delta 串流中找出 ```json 區塊，每當 results 陣列中的
+一個物件的右大括號到達時就立即解析並輸出，不必等待整個串流結束
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List
+import json
+import re
+
+FENCE_OPEN = "```json"
+# 字串內只需關心引號與跳脫字元，其餘字元可整段跳過
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class StreamingResultsExtractor:
+    """
+    results 陣列的增量解析器
+
+    以字元為單位的狀態機：追蹤字串／跳脫狀態與括號深度，
+    只在頂層物件的 "results": [ 之後，將深度剛好在陣列內的每個物件切出來 json.loads。
+    整個串流只掃描一次（線性時間）。
+    """
+
+    def __init__(self, key: str = "results", require_fence: bool = True):
+        """
+        Args:
+            key: 要擷取的陣列欄位名稱
+            require_fence: 是否只解析 ```json 區塊內的內容（False 時從第一個 '{' 開始）
+        """
+        self.key = key
+        self.require_fence = require_fence
+        self.items: List[Dict[str, Any]] = []
+        self.errors = 0
+
+        self._buffer = ""
+        self._pos = 0
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string = None
+        self._after_colon = False
+        self._array_depth = None
+        self._item_start = -1
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        餵入一段串流文字
+
+        Returns:
+            List[Dict]: 這段文字中新完成的 results 物件
+        """
+        if self._finished or not text:
+            return []
+        self._buffer += text
+        if not self._started and not self._find_start():
+            return []
+        return self._scan()
+
+    def _find_start(self) -> bool:
+        """尋找 JSON 區塊起點（處理跨 delta 被切開的 ```json 標記）"""
+        if self.require_fence:
+            index = self._buffer.find(FENCE_OPEN)
+            if index < 0:
+                # 只保留可能是被切開的標記前綴
+                self._buffer = self._buffer[-(len(FENCE_OPEN) - 1):]
+                return False
+            start = index + len(FENCE_OPEN)
+        else:
+            start = self._buffer.find("{")
+            if start < 0:
+                self._buffer = ""
+                return False
+        self._buffer = self._buffer[start:]
+        self._pos = 0
+        self._started = True
+        return True
+
+    def _scan(self) -> List[Dict[str, Any]]:
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+        length = len(buffer)
+
+        while pos < length:
+            char = buffer[pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = buffer[self._string_start + 1:pos]
+                else:
+                    match = _STRING_SPECIAL.search(buffer, pos)
+                    pos = match.start() if match else length
+                    continue
+                pos += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char == ":":
+                self._after_colon = True
+                pos += 1
+                continue
+            elif char in "{[":
+                if (char == "[" and self._depth == 1 and self._array_depth is None
+                        and self._after_colon and self._last_string == self.key):
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._item_start >= 0 and self._depth == self._array_depth:
+                    item = self._decode(buffer[self._item_start:pos + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = -1
+                elif char == "]" and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+                if self._depth <= 0:
+                    self._finished = True
+                    pos += 1
+                    break
+            elif char == "`" and self._depth <= 0:
+                self._finished = True
+                break
+
+            if not char.isspace():
+                self._after_colon = False
+            pos += 1
+
+        # 丟棄已處理且不再需要的內容，保持緩衝區只含目前物件
+        keep_from = self._item_start if self._item_start >= 0 else pos
+        if self._in_string and self._string_start < keep_from:
+            keep_from = self._string_start
+        self._buffer = buffer[keep_from:]
+        if self._item_start >= 0:
+            self._item_start -= keep_from
+        if self._in_string:
+            self._string_start -= keep_from
+        self._pos = pos - keep_from
+
+        self.items.extend(completed)
+        return completed
+
+    def _decode(self, raw: str):
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError:
+            self.errors += 1
+            return None
+        return item if isinstance(item, dict) else None
+
+    @property
+    def finished(self) -> bool:
+        """JSON 區塊是否已完整結束"""
+        return self._finished
+
+
+def iter_results(chunks: Iterable[str], **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    同步迭代器：從文字片段中依序產出完成的 results 物件
+
+    Args:
+        chunks: 串流文字片段
+        **kwargs: 傳遞給 StreamingResultsExtractor
+    """
+    extractor = StreamingResultsExtractor(**kwargs)
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+        if extractor.finished:
+            return
+
+
+async def aiter_results(chunks: AsyncIterable[str], **kwargs) -> AsyncIterator[Dict[str, Any]]:
+    """
+    非同步迭代器：從非同步文字片段中依序產出完成的 results 物件
+
+    Args:
+        chunks: 非同步串流文字片段
+        **kwargs: 傳遞給 StreamingResultsExtractor
+    """
+    extractor = StreamingResultsExtractor(**kwargs)
+    async for chunk in chunks:
+        for item in extractor.feed(chunk):
+            yield item
+        if extractor.finished:
+            return
@@ -11,13 +11,21 @@ from datetime import datetime
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from config import Config
+from utils.openai_client import openai_chat_client_kwargs
+from utils.prompt_parser import rule_prompt_parser
 
 
 class SEANewsWorkflow:
     """東南亞金融新聞工作流程"""
     
     def _parse_prompt(self, user_prompt: str) -> dict:
-        """使用 LLM 解析用戶 prompt，提取關鍵字、時間指令和數量指令。"""
+        """解析用戶 prompt，提取關鍵字、時間指令和數量指令（常見寫法以規則解析，含糊時才呼叫 LLM）。"""
+        if Config.PROMPT_RULE_PARSER:
+            parsed = rule_prompt_parser.parse(user_prompt)
+            if parsed:
+                self._update_progress(None, "prompt_parsing", f"⚡ 需求解析完成（規則）：主題='{parsed['keywords']}', 時間='{parsed['time_instruction']}', 數量='{parsed['num_instruction']}', 語言='{parsed['language']}'")
+                return parsed
+        
         try:
             self._update_progress(None, "prompt_parsing", "🧠 正在解析您的需求...")
             
@@ -26,7 +34,8 @@ class SEANewsWorkflow:
                 name="需求解析專家",
                 model=OpenAIChat(
                     id=Config.OPENAI_MODEL,
-                    api_key=Config.OPENAI_API_KEY
+                    api_key=Config.OPENAI_API_KEY,
+                    **openai_chat_client_kwargs()
                 ),
                 description="專門解析使用者需求的專家",
                 instructions=[